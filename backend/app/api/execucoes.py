@@ -1,5 +1,6 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
 from backend.app.models import Categoria, Execucao, db
+import base64
 import json
 import os
 from datetime import datetime
@@ -7,16 +8,20 @@ from backend.app.utils.log_event import log_event
 from time import perf_counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-from backend.app.services.execucao_service import processar_lote_execucoes
+from backend.app.services.execucao_service import processar_lote_execucoes, obter_status_lote
+from backend.app.services.keyword_index_service import (
+    indexar_palavras_chave, execucoes_por_termo, categorias_por_termo, top_termos_por_nicho
+)
 from backend.app.middleware.auth_middleware import auth_required
 from typing import Dict, List, Optional, Any
+from sqlalchemy import and_, or_
 from pydantic import ValidationError
 from backend.app.schemas.execucao import (
     ExecucaoCreateRequest, ExecucaoLoteRequest, ExecucaoFilterRequest,
     ExecucaoUpdateRequest, ExecucaoResponse, ExecucaoCreateResponse,
     ExecucaoLoteResponse, ExecucaoLoteStatusResponse, ExecucaoErrorResponse,
     validar_json_palavras_chave, validar_status_transicao, sanitizar_palavra_chave,
-    validar_limites_execucao, sanitizar_cluster
+    validar_limites_execucao, sanitizar_cluster, CAMPOS_LISTAGEM_EXECUCAO
 )
 from backend.app.middleware.execucao_rate_limiting import execucao_rate_limited, validate_batch_size
 
@@ -28,6 +33,29 @@ from infrastructure.resilience.timeout_manager import TimeoutConfig, timeout
 
 execucoes_bp = Blueprint('execucoes', __name__, url_prefix='/api/execucoes')
 
+TAMANHO_BLOCO_STREAMING = 500
+
+def _codificar_cursor(linha) -> str:
+    """Cursor opaco (base64 url-safe) com a posição (data_execucao, id) da última linha."""
+    posicao = json.dumps([linha.data_execucao.isoformat(), linha.id])
+    return base64.urlsafe_b64encode(posicao.encode()).decode().rstrip('=')
+
+def _decodificar_cursor(cursor: str) -> tuple:
+    bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    data_execucao, execucao_id = json.loads(bruto)
+    return datetime.fromisoformat(data_execucao), int(execucao_id)
+
+def _serializar_execucao(linha, campos: List[str]) -> Dict[str, Any]:
+    item = {}
+    for campo in campos:
+        valor = getattr(linha, campo)
+        if campo == 'palavras_chave':
+            valor = json.loads(valor)
+        elif campo == 'data_execucao':
+            valor = valor.isoformat() if valor else None
+        item[campo] = valor
+    return item
+
 @execucoes_bp.route('/', methods=['POST'])
 @auth_required()
 @execucao_rate_limited()
@@ -198,6 +226,7 @@ def executar_prompt():
             log_path=None
         )
         db.session.add(execucao)
+        indexar_palavras_chave(execucao, palavras_chave_sanitizadas)
         db.session.commit()
         
         log_event('execução', 'Execucao', id_referencia=execucao.id, detalhes=f'Execução realizada para categoria {execucao_request.categoria_id}')
@@ -274,7 +303,23 @@ def listar_execucoes():
           type: integer
           minimum: 0
           default: 0
-        description: Offset para paginação
+        description: Offset para paginação (legado; prefira cursor)
+      - name: cursor
+        in: query
+        schema:
+          type: string
+        description: Cursor da próxima página, retornado no header X-Next-Cursor
+      - name: fields
+        in: query
+        schema:
+          type: string
+        description: Campos a retornar, separados por vírgula (ex. id,status,data_execucao)
+      - name: stream
+        in: query
+        schema:
+          type: boolean
+          default: false
+        description: Resposta em streaming para exportações (sem limite, salvo se informado)
     responses:
       200:
         description: Lista de execuções retornada com sucesso
@@ -373,22 +418,28 @@ def listar_execucoes():
                     codigo='INVALID_END_DATE'
                 ).dict()), 400
         
+        if 'fields' in args:
+            args['fields'] = [campo.strip() for campo in args['fields'].split(',') if campo.strip()]
+        
+        if 'stream' in args:
+            args['stream'] = args['stream'].lower() in ('1', 'true', 'sim')
+        
         # Validar com Pydantic
         filtros = ExecucaoFilterRequest(**args)
         
-        # Construir query com filtros validados
-        query = Execucao.query
+        # Colunas projetadas; id e data_execucao são sempre lidos porque compõem o cursor
+        campos = filtros.fields or list(CAMPOS_LISTAGEM_EXECUCAO)
+        colunas = list(dict.fromkeys(['id', 'data_execucao', *campos]))
+        query = db.session.query(*[getattr(Execucao, coluna) for coluna in colunas])
         
         if filtros.categoria_id:
-            query = query.filter_by(id_categoria=filtros.categoria_id)
+            query = query.filter(Execucao.id_categoria == filtros.categoria_id)
         elif filtros.nicho_id:
-            from backend.app.models import Categoria
-            categorias = Categoria.query.filter_by(id_nicho=filtros.nicho_id).all()
-            cat_ids = [c.id for c in categorias]
-            query = query.filter(Execucao.id_categoria.in_(cat_ids))
+            query = query.join(Categoria, Categoria.id == Execucao.id_categoria) \
+                .filter(Categoria.id_nicho == filtros.nicho_id)
         
         if filtros.status:
-            query = query.filter_by(status=filtros.status.value)
+            query = query.filter(Execucao.status == filtros.status.value)
         
         if filtros.data_inicio:
             query = query.filter(Execucao.data_execucao >= filtros.data_inicio)
@@ -396,26 +447,48 @@ def listar_execucoes():
         if filtros.data_fim:
             query = query.filter(Execucao.data_execucao <= filtros.data_fim)
         
-        # Aplicar paginação
-        query = query.order_by(Execucao.data_execucao.desc())
-        query = query.offset(filtros.offset).limit(filtros.limit)
+        # Paginação por cursor em (data_execucao, id): custo constante em qualquer página
+        if filtros.cursor:
+            try:
+                data_cursor, id_cursor = _decodificar_cursor(filtros.cursor)
+            except (TypeError, ValueError):
+                return jsonify(ExecucaoErrorResponse(
+                    erro='cursor inválido',
+                    codigo='INVALID_CURSOR'
+                ).dict()), 400
+            query = query.filter(or_(
+                Execucao.data_execucao < data_cursor,
+                and_(Execucao.data_execucao == data_cursor, Execucao.id < id_cursor)
+            ))
+        elif filtros.offset:
+            query = query.offset(filtros.offset)
+        
+        query = query.order_by(Execucao.data_execucao.desc(), Execucao.id.desc())
         
-        execucoes = query.all()
+        # Exportação em streaming: sem limite implícito, linhas lidas em blocos
+        if filtros.stream:
+            if 'limit' in request.args:
+                query = query.limit(filtros.limit)
+            log_event('info', 'Execucao', detalhes='Exportação de execuções em streaming')
+            
+            def gerar():
+                yield '['
+                for indice, linha in enumerate(query.yield_per(TAMANHO_BLOCO_STREAMING)):
+                    yield (',' if indice else '') + json.dumps(_serializar_execucao(linha, campos), ensure_ascii=False)
+                yield ']'
+            
+            return Response(stream_with_context(gerar()), mimetype='application/json')
+        
+        execucoes = query.limit(filtros.limit).all()
         
         # Log de sucesso
         log_event('info', 'Execucao', detalhes=f'Listagem de execuções com {len(execucoes)} resultados')
         
-        # Retornar resposta estruturada
-        return jsonify([
-            {
-                'id': e.id,
-                'id_categoria': e.id_categoria,
-                'palavras_chave': json.loads(e.palavras_chave),
-                'cluster_usado': e.cluster_usado,
-                'status': e.status,
-                'data_execucao': e.data_execucao.isoformat() if e.data_execucao else None
-            } for e in execucoes
-        ]), 200
+        # Retornar resposta estruturada; a próxima página vem no header X-Next-Cursor
+        resposta = jsonify([_serializar_execucao(e, campos) for e in execucoes])
+        if execucoes and len(execucoes) == filtros.limit:
+            resposta.headers['X-Next-Cursor'] = _codificar_cursor(execucoes[-1])
+        return resposta, 200
         
     except ValidationError as e:
         # Log detalhado dos erros de validação
@@ -527,7 +600,10 @@ def detalhe_execucao(execucao_id):
 @validate_batch_size()
 def executar_lote():
     """
-    Executa múltiplas execuções em lote.
+    Enfileira múltiplas execuções em lote.
+    
+    O lote é validado e persistido na fila durável; a resposta traz o
+    id_lote imediatamente e o progresso é consultado em /lote/status.
     
     ---
     tags:
@@ -541,8 +617,8 @@ def executar_lote():
           schema:
             $ref: '#/components/schemas/ExecucaoLoteRequest'
     responses:
-      200:
-        description: Lote processado com sucesso
+      202:
+        description: Lote enfileirado (contém id_lote)
         content:
           application/json:
             schema:
@@ -557,6 +633,12 @@ def executar_lote():
         description: Não autorizado
       403:
         description: Acesso negado
+      503:
+        description: Lote não pôde ser enfileirado
+        content:
+          application/json:
+            schema:
+              $ref: '#/components/schemas/ExecucaoErrorResponse'
     """
     try:
         data = request.get_json()
@@ -571,10 +653,26 @@ def executar_lote():
         for execucao in lote_request.execucoes:
             execucao.palavras_chave = [sanitizar_palavra_chave(p) for p in execucao.palavras_chave]
             execucao.cluster = sanitizar_cluster(execucao.cluster) if execucao.cluster else None
-        # Aqui chamaria o processar_lote_execucoes, adaptando para receber objetos validados
-        resultado = processar_lote_execucoes([e.dict() for e in lote_request.execucoes])
-        log_event('info', 'Execucao', detalhes=f'Lote processado com {len(lote_request.execucoes)} execuções')
-        return jsonify(resultado), 200
+        resultado = processar_lote_execucoes(
+            [e.dict() for e in lote_request.execucoes],
+            prioridade=lote_request.prioridade,
+            max_concurrent=lote_request.max_concurrent
+        )
+        if 'erros_validacao' in resultado:
+            log_event('erro', 'Execucao', detalhes=f'Lote rejeitado na validação: {resultado["erros_validacao"]}')
+            return jsonify(ExecucaoErrorResponse(
+                erro='Dados de entrada inválidos',
+                codigo='VALIDATION_ERROR',
+                detalhes={'erros': resultado['erros_validacao']}
+            ).dict()), 400
+        if not resultado.get('id_lote'):
+            log_event('erro', 'Execucao', detalhes=f'Lote não enfileirado: {resultado}')
+            return jsonify(ExecucaoErrorResponse(
+                erro='Fila de lotes indisponível',
+                codigo='QUEUE_UNAVAILABLE'
+            ).dict()), 503
+        log_event('info', 'Execucao', detalhes=f'Lote {resultado["id_lote"]} enfileirado com {len(lote_request.execucoes)} execuções')
+        return jsonify(resultado), 202
     except ValidationError as e:
         erros_validacao = []
         for error in e.errors():
@@ -638,6 +736,15 @@ def status_lote():
                   type: number
                   format: float
                   description: Percentual de progresso (0-100)
+                status:
+                  type: string
+                  description: Status do lote na fila (pendente, em_execucao, concluido, falhou, cancelado)
+                pendentes:
+                  type: integer
+                  description: Itens aguardando worker
+                em_execucao:
+                  type: integer
+                  description: Itens sendo executados
                 itens:
                   type: array
                   items:
@@ -681,7 +788,7 @@ def status_lote():
       403:
         description: Acesso negado
       404:
-        description: Log do lote não encontrado
+        description: Lote não encontrado na fila nem no log
         content:
           application/json:
             schema:
@@ -694,6 +801,11 @@ def status_lote():
     id_lote = request.args.get('id_lote')
     if not id_lote:
         return jsonify({'erro': 'id_lote é obrigatório'}), 400
+    # Lotes enfileirados: progresso vivo lido da fila durável
+    status_fila = obter_status_lote(id_lote)
+    if status_fila is not None:
+        return jsonify(status_fila)
+    # Lotes antigos: progresso reconstruído a partir do log de execução
     log_path = f'logs/exec_trace/execucao_lotes_{id_lote}.log'
     if not os.path.exists(log_path):
         return jsonify({'erro': 'Log de lote não encontrado'}), 404
@@ -732,4 +844,131 @@ def status_lote():
         'erros': erros,
         'progresso': progresso,
         'itens': itens
-    }) 
\ No newline at end of file
+    }) 
+def _parse_periodo(args) -> tuple:
+    """Lê data_inicio/data_fim (ISO) da query string; ValueError se inválidas."""
+    periodo = []
+    for nome in ('data_inicio', 'data_fim'):
+        valor = args.get(nome)
+        periodo.append(datetime.fromisoformat(valor.replace('Z', '+00:00')) if valor else None)
+    return tuple(periodo)
+
+@execucoes_bp.route('/termos', methods=['GET'])
+@auth_required()
+def buscar_termo():
+    """
+    Execuções e categorias que usaram um termo (consulta indexada em execucao_keywords).
+    
+    ---
+    tags:
+      - Execuções
+    security:
+      - Bearer: []
+    parameters:
+      - name: termo
+        in: query
+        required: true
+        schema:
+          type: string
+        description: Palavra-chave buscada (comparação sem diferenciar maiúsculas)
+      - name: data_inicio
+        in: query
+        schema:
+          type: string
+          format: date-time
+      - name: data_fim
+        in: query
+        schema:
+          type: string
+          format: date-time
+      - name: limit
+        in: query
+        schema:
+          type: integer
+          minimum: 1
+          maximum: 1000
+          default: 100
+        description: Limite de execuções retornadas
+    responses:
+      200:
+        description: Execuções (mais recentes primeiro) e categorias com totais
+      400:
+        description: Parâmetros inválidos
+    """
+    termo = request.args.get('termo', '').strip()
+    if not termo:
+        return jsonify(ExecucaoErrorResponse(erro='termo é obrigatório', codigo='MISSING_TERM').dict()), 400
+    try:
+        data_inicio, data_fim = _parse_periodo(request.args)
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify(ExecucaoErrorResponse(erro='Parâmetros de busca inválidos', codigo='INVALID_FILTERS').dict()), 400
+
+    try:
+        return jsonify({
+            'termo': termo,
+            'execucoes': execucoes_por_termo(termo, data_inicio, data_fim, limit),
+            'categorias': categorias_por_termo(termo, data_inicio, data_fim)
+        }), 200
+    except Exception as e:
+        log_event('erro', 'Execucao', detalhes=f'Erro na busca por termo: {str(e)}')
+        return jsonify(ExecucaoErrorResponse(erro='Erro interno do servidor', codigo='INTERNAL_ERROR').dict()), 500
+
+@execucoes_bp.route('/termos/top', methods=['GET'])
+@auth_required()
+def top_termos():
+    """
+    Termos mais usados nas execuções de um nicho em um período.
+    
+    ---
+    tags:
+      - Execuções
+    security:
+      - Bearer: []
+    parameters:
+      - name: nicho_id
+        in: query
+        required: true
+        schema:
+          type: integer
+      - name: data_inicio
+        in: query
+        schema:
+          type: string
+          format: date-time
+      - name: data_fim
+        in: query
+        schema:
+          type: string
+          format: date-time
+      - name: limit
+        in: query
+        schema:
+          type: integer
+          minimum: 1
+          maximum: 500
+          default: 50
+    responses:
+      200:
+        description: Lista de termos com o número de execuções em que aparecem
+      400:
+        description: Parâmetros inválidos
+    """
+    try:
+        nicho_id = int(request.args['nicho_id'])
+        data_inicio, data_fim = _parse_periodo(request.args)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except (KeyError, ValueError):
+        return jsonify(ExecucaoErrorResponse(
+            erro='nicho_id (inteiro) é obrigatório e as datas devem estar no formato ISO',
+            codigo='INVALID_FILTERS'
+        ).dict()), 400
+
+    try:
+        return jsonify({
+            'nicho_id': nicho_id,
+            'termos': top_termos_por_nicho(nicho_id, data_inicio, data_fim, limit)
+        }), 200
+    except Exception as e:
+        log_event('erro', 'Execucao', detalhes=f'Erro no ranking de termos: {str(e)}')
+        return jsonify(ExecucaoErrorResponse(erro='Erro interno do servidor', codigo='INTERNAL_ERROR').dict()), 500
@@ -26,6 +26,9 @@ from functools import wraps
 import redis
 from redis.exceptions import RedisError
 
+from infrastructure.cache.local_store import connect_redis
+from infrastructure.cache.tiered_cache import get_tiered_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,7 +91,11 @@ class IntelligentCache:
     
     def __init__(self, redis_url: str = "redis://localhost:6379/0"):
         """Initialize intelligent cache system."""
-        self.redis_client = redis.from_url(redis_url, decode_responses=True)
+        # Falls back to the shared local store (CACHE_LOCAL_STORE_PATH) when
+        # Redis does not answer; without it, errors surface per operation
+        self.redis_client = connect_redis(
+            redis_url, decode_responses=True, factory=redis.from_url, require_connection=False
+        )
         self.cache_stats = defaultdict(int)
         self.volatility_scores = defaultdict(float)
         self.access_patterns = defaultdict(lambda: deque(maxlen=20))
@@ -99,6 +106,12 @@ class IntelligentCache:
         self.max_ttl = 7200  # 2 hours
         self.default_ttl = 3600  # 1 hour
         
+        # Redis-only: nothing is kept in process memory, but hit ratios are
+        # reported through the process-wide tiered cache registry
+        self.metrics_source = get_tiered_cache().register_metrics_source(
+            "backend.intelligent_cache", self.get_stats
+        )
+        
         logger.info("Intelligent cache system initialized")
     
     def _generate_key(self, key: str, namespace: str = "default") -> str:
@@ -0,0 +1,537 @@
+"""
+Scheduled Cache Warming
+=======================
+
+Pre-warms caches for runs that are already on the schedule instead of
+guessing keys from access patterns (see CacheWarmingService). Upcoming runs
+are read from the `execucoes_agendadas` table and from AgendamentoService;
+in the minutes before each run the warmer prefetches what the run will read:
+
+- collector results (through the collector's own cache, so the run hits it)
+- embeddings of the seed terms (persistent embedding store)
+- the prompt template of the run's category (PromptService cache)
+
+Provider calls made while warming draw from a per-provider warming budget
+(a fraction of the provider's rate), so warming never starves live runs;
+work that does not fit the budget is deferred to the next cycle. Each
+prefetcher reports hits on the entries it warmed; when a run finishes, the
+load time of the warmed entries the run actually hit is reported as latency
+saved for that run.
+
+Author: Omni Keywords Finder Team
+Date: 2025-01-27
+Tracing ID: CACHE_SCHEDULED_WARMING_20250127_001
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from infrastructure.rate_limiting.adaptive_rate_limiter import AsyncTokenBucket, obter_token_bucket_compartilhado
+
+logger = logging.getLogger(__name__)
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive datetimes in the schedule tables are stored in UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+@dataclass
+class UpcomingRun:
+    """A run known from the schedule."""
+    run_id: str
+    scheduled_at: datetime
+    categoria_id: int
+    palavras_chave: List[str]
+    cluster: Optional[str] = None
+    source: str = ""
+
+
+@dataclass
+class WarmTask:
+    """
+    One load to prefetch for a run. A load may fill several cache entries
+    (`entries`, default: just `key`); its time is split evenly among them.
+    """
+    key: str
+    kind: str
+    load: Callable[[], Union[Any, Awaitable[Any]]]
+    provider: Optional[str] = None
+    cost: float = 1.0
+    entries: Optional[List[str]] = None
+
+
+@dataclass
+class RunWarmingReport:
+    """Warming outcome of one scheduled run."""
+    run_id: str
+    scheduled_at: datetime
+    warmed: int = 0
+    already_cached: int = 0  # prefetchers with nothing left to load (last cycle)
+    deferred: int = 0  # tasks left for the next cycle (last cycle)
+    failed: int = 0
+    load_time: float = 0.0
+    entries: Dict[str, Tuple[str, float]] = field(default_factory=dict)  # key -> (kind, load time)
+    hits: Set[str] = field(default_factory=set)  # warmed keys the run read
+    run_duration: Optional[float] = None
+
+    @property
+    def latency_saved_by_kind(self) -> Dict[str, float]:
+        saved: Dict[str, float] = {}
+        for key in self.hits:
+            kind, elapsed = self.entries[key]
+            saved[kind] = saved.get(kind, 0.0) + elapsed
+        return saved
+
+    @property
+    def latency_saved(self) -> float:
+        """Seconds the run did not spend loading (warmed entries it hit)."""
+        return sum(self.entries[key][1] for key in self.hits)
+
+    @property
+    def saved_fraction(self) -> Optional[float]:
+        """Share of the run's unwarmed latency that warming removed."""
+        if self.run_duration is None:
+            return None
+        saved = self.latency_saved
+        total = self.run_duration + saved
+        return saved / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "scheduled_at": self.scheduled_at.isoformat(),
+            "warmed": self.warmed,
+            "already_cached": self.already_cached,
+            "deferred": self.deferred,
+            "failed": self.failed,
+            "hits": len(self.hits),
+            "load_time": round(self.load_time, 4),
+            "latency_saved": round(self.latency_saved, 4),
+            "latency_saved_by_kind": {k: round(v, 4) for k, v in self.latency_saved_by_kind.items()},
+            "run_duration": self.run_duration,
+            "saved_fraction": round(self.saved_fraction, 4) if self.saved_fraction is not None else None
+        }
+
+
+# Schedule sources
+
+def upcoming_from_execucoes_agendadas(now: datetime, horizon: timedelta) -> List[UpcomingRun]:
+    """Pending rows of `execucoes_agendadas` due within the horizon (requires app context)."""
+    from backend.app.models.execucao_agendada import ExecucaoAgendada
+
+    now_naive = now.astimezone(timezone.utc).replace(tzinfo=None)
+    rows = ExecucaoAgendada.query.filter(
+        ExecucaoAgendada.status == 'pendente',
+        ExecucaoAgendada.data_agendada >= now_naive,
+        ExecucaoAgendada.data_agendada <= now_naive + horizon
+    ).order_by(ExecucaoAgendada.data_agendada.asc()).all()
+
+    runs = []
+    for row in rows:
+        try:
+            palavras_chave = json.loads(row.palavras_chave)
+        except (TypeError, ValueError):
+            logger.warning(f"Scheduled execution {row.id} has invalid palavras_chave; skipping warm-up")
+            continue
+        runs.append(UpcomingRun(
+            run_id=execucao_agendada_run_id(row.id),
+            scheduled_at=_utc(row.data_agendada),
+            categoria_id=row.categoria_id,
+            palavras_chave=palavras_chave,
+            cluster=row.cluster,
+            source="execucoes_agendadas"
+        ))
+    return runs
+
+
+def upcoming_from_agendamento_service(service: Any, now: datetime, horizon: timedelta) -> List[UpcomingRun]:
+    """Executions of active AgendamentoService schedules whose next run is within the horizon."""
+    runs = []
+    for agendamento in list(service.agendamentos.values()):
+        if getattr(agendamento.status, "value", agendamento.status) != "ativo" or not agendamento.proxima_execucao:
+            continue
+        scheduled_at = _utc(agendamento.proxima_execucao)
+        if not now <= scheduled_at <= now + horizon:
+            continue
+        for execucao in agendamento.execucoes:
+            runs.append(UpcomingRun(
+                run_id=agendamento_run_id(agendamento.id, execucao.id),
+                scheduled_at=scheduled_at,
+                categoria_id=execucao.categoria_id,
+                palavras_chave=list(execucao.palavras_chave),
+                cluster=execucao.cluster,
+                source="agendamento_service"
+            ))
+    return runs
+
+
+def agendamento_run_id(agendamento_id: str, execucao_id: str) -> str:
+    return f"agendamento:{agendamento_id}:{execucao_id}"
+
+
+def execucao_agendada_run_id(execucao_agendada_id: int) -> str:
+    return f"execucao_agendada:{execucao_agendada_id}"
+
+
+# Prefetchers
+
+class Prefetcher:
+    """Plans the cache entries a run will read that are not cached yet."""
+
+    kind = "generic"
+
+    def budget(self) -> Optional[AsyncTokenBucket]:
+        """Warming budget of the provider behind this prefetcher (None = unlimited)."""
+        return None
+
+    def watch(self, on_hit: Callable[[str], None]) -> None:
+        """Reports reads that hit this prefetcher's cache as `on_hit(key)` (task keys)."""
+
+    async def plan(self, run: UpcomingRun) -> List[WarmTask]:
+        raise NotImplementedError
+
+
+def _chain_hook(owner: Any, attribute: str, hook: Callable[..., None]) -> None:
+    """Installs `hook` as a callback attribute, keeping any callback already set."""
+    previous = getattr(owner, attribute, None)
+
+    def chained(*args):
+        hook(*args)
+        if previous:
+            previous(*args)
+
+    setattr(owner, attribute, chained)
+
+
+class CollectorPrefetcher(Prefetcher):
+    """
+    Warms collector results by running the collector ahead of time.
+
+    The collector caches each term under `keyword:{termo}` in its own
+    CacheDistribuido, which is what the run reads; terms already cached are
+    skipped. Warming may use `budget_fraction` of the collector's rate. Hits
+    are reported by this collector instance, so the run should use it too.
+    """
+
+    kind = "collector"
+
+    def __init__(self, coletor: Any, budget_fraction: float = 0.5):
+        self.coletor = coletor
+        self.provider = f"coletor.{coletor.nome}"
+        rate = coletor.token_bucket.rate * budget_fraction
+        self._budget = obter_token_bucket_compartilhado(f"aquecimento.{self.provider}", rate, max(1.0, rate * 60))
+
+    def budget(self) -> Optional[AsyncTokenBucket]:
+        return self._budget
+
+    def _key(self, termo: str) -> str:
+        return f"{self.provider}:keyword:{termo}"
+
+    def watch(self, on_hit: Callable[[str], None]) -> None:
+        def on_cache_hit(termos):
+            for termo in termos:
+                on_hit(self._key(termo))
+
+        _chain_hook(self.coletor, "on_cache_hit", on_cache_hit)
+
+    async def plan(self, run: UpcomingRun) -> List[WarmTask]:
+        termos = list(dict.fromkeys(run.palavras_chave))
+        chaves = {termo: f"keyword:{termo}" for termo in termos}
+        em_cache = await self.coletor.cache.get_many(list(chaves.values())) if termos else {}
+        return [
+            WarmTask(
+                key=self._key(termo),
+                kind=self.kind,
+                load=lambda termo=termo: self.coletor.coletar_keywords([termo]),
+                provider=self.provider
+            )
+            for termo in termos if not em_cache.get(chaves[termo])
+        ]
+
+
+class EmbeddingPrefetcher(Prefetcher):
+    """Encodes seed terms missing from the persistent embedding store."""
+
+    kind = "embeddings"
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+        self.model_name = model_name
+
+    def _store(self):
+        from infrastructure.ml.embedding_store import obter_store
+        return obter_store(self.model_name)
+
+    def _key(self, termo: str) -> str:
+        return f"embeddings:{self.model_name}:{self._store().normalizar_termo(termo)}"
+
+    def watch(self, on_hit: Callable[[str], None]) -> None:
+        def on_cache_hit(termos):
+            for termo in termos:
+                on_hit(f"embeddings:{self.model_name}:{termo}")
+
+        _chain_hook(self._store(), "on_cache_hit", on_cache_hit)
+
+    async def plan(self, run: UpcomingRun) -> List[WarmTask]:
+        store = self._store()
+        faltantes = [termo for termo in dict.fromkeys(run.palavras_chave) if termo not in store]
+        if not faltantes:
+            return []
+
+        def load():
+            from infrastructure.ml.embeddings import gerar_embeddings
+            return gerar_embeddings(faltantes, model_name=self.model_name, usar_store=True)
+
+        return [WarmTask(
+            key=f"embeddings:{self.model_name}:{run.run_id}",
+            kind=self.kind,
+            load=load,
+            entries=list(dict.fromkeys(self._key(termo) for termo in faltantes))
+        )]
+
+
+class PromptTemplatePrefetcher(Prefetcher):
+    """
+    Reads the prompt template of the run's category through the PromptService
+    the run uses, so the run finds it in that service's cache.
+    """
+
+    kind = "prompt_template"
+
+    def __init__(self, prompt_service: Any):
+        self.prompt_service = prompt_service
+
+    @staticmethod
+    def _key(prompt_path: str) -> str:
+        return f"prompt:{prompt_path}"
+
+    def watch(self, on_hit: Callable[[str], None]) -> None:
+        _chain_hook(self.prompt_service, "on_cache_hit", lambda prompt_path: on_hit(self._key(prompt_path)))
+
+    async def plan(self, run: UpcomingRun) -> List[WarmTask]:
+        from backend.app.models import Categoria
+
+        categoria = Categoria.query.get(run.categoria_id)
+        if categoria is None or self.prompt_service.prompt_em_cache(categoria.prompt_path):
+            return []
+
+        def load():
+            sucesso, erro, _ = self.prompt_service.ler_prompt(categoria.prompt_path)
+            if not sucesso:
+                raise RuntimeError(erro)
+
+        return [WarmTask(key=self._key(categoria.prompt_path), kind=self.kind, load=load)]
+
+
+# Warmer
+
+class ScheduledCacheWarmer:
+    """
+    Prefetches cache entries for scheduled runs shortly before they start.
+
+    Each cycle reads the runs due within `lead_time`, plans the missing
+    entries with every prefetcher (soonest run first) and loads them within
+    the provider budgets. Prefetchers report hits on warmed entries through
+    `record_hit`; call `record_run` (or `attach` to the services that run the
+    schedules) to report the latency saved once the run finishes. Reports of
+    runs that never finish are dropped `report_ttl` after their scheduled time.
+    """
+
+    def __init__(
+        self,
+        prefetchers: Iterable[Prefetcher],
+        sources: Optional[Iterable[Callable[[datetime, timedelta], List[UpcomingRun]]]] = None,
+        lead_time: timedelta = timedelta(minutes=10),
+        max_tasks_per_cycle: int = 200,
+        history_size: int = 100,
+        report_ttl: timedelta = timedelta(hours=1)
+    ):
+        self.prefetchers = list(prefetchers)
+        self.sources = list(sources) if sources is not None else [upcoming_from_execucoes_agendadas]
+        self.lead_time = lead_time
+        self.max_tasks_per_cycle = max_tasks_per_cycle
+        self.report_ttl = report_ttl
+
+        self._lock = threading.Lock()
+        self._reports: Dict[str, RunWarmingReport] = {}
+        self._warmed_by: Dict[str, str] = {}  # warmed key -> run_id of the pending report
+        self._completed: deque = deque(maxlen=history_size)
+        self.stats = {
+            "cycles": 0,
+            "runs_seen": 0,
+            "tasks_warmed": 0,
+            "tasks_deferred": 0,
+            "tasks_failed": 0,
+            "reports_expired": 0,
+            "load_time": 0.0
+        }
+        for prefetcher in self.prefetchers:
+            prefetcher.watch(self.record_hit)
+
+    def add_source(self, source: Callable[[datetime, timedelta], List[UpcomingRun]]) -> None:
+        self.sources.append(source)
+
+    def attach(self, agendamento_service: Any) -> None:
+        """Reads upcoming runs from the service and reports each finished execution."""
+        self.add_source(lambda now, horizon: upcoming_from_agendamento_service(agendamento_service, now, horizon))
+
+        def on_execucao_concluida(agendamento, execucao, duracao):
+            self.record_run(agendamento_run_id(agendamento.id, execucao.id), duracao)
+
+        _chain_hook(agendamento_service, "on_execucao_concluida", on_execucao_concluida)
+
+    def attach_execucao_service(self, execucao_service: Any) -> None:
+        """Reports each `execucoes_agendadas` row the service finishes (the default source)."""
+        def on_execucao_agendada_concluida(execucao_agendada, duracao):
+            self.record_run(execucao_agendada_run_id(execucao_agendada.id), duracao)
+
+        _chain_hook(execucao_service, "on_execucao_agendada_concluida", on_execucao_agendada_concluida)
+
+    def upcoming_runs(self, now: Optional[datetime] = None) -> List[UpcomingRun]:
+        now = now or datetime.now(timezone.utc)
+        runs: Dict[str, UpcomingRun] = {}
+        for source in self.sources:
+            try:
+                for run in source(now, self.lead_time):
+                    runs.setdefault(run.run_id, run)
+            except Exception as e:
+                logger.error(f"Failed to read schedule source for warming: {e}")
+        return sorted(runs.values(), key=lambda run: run.scheduled_at)
+
+    def _drop_report(self, run_id: str) -> Optional[RunWarmingReport]:
+        report = self._reports.pop(run_id, None)
+        if report is not None:
+            for key in report.entries:
+                if self._warmed_by.get(key) == run_id:
+                    del self._warmed_by[key]
+        return report
+
+    def expire_reports(self, now: Optional[datetime] = None) -> int:
+        """Drops reports of runs scheduled more than `report_ttl` ago that never finished."""
+        limit = (now or datetime.now(timezone.utc)) - self.report_ttl
+        with self._lock:
+            stale = [run_id for run_id, report in self._reports.items() if report.scheduled_at < limit]
+            for run_id in stale:
+                self._drop_report(run_id)
+        if stale:
+            self.stats["reports_expired"] += len(stale)
+            logger.info(f"Dropped {len(stale)} warming reports of runs that never finished")
+        return len(stale)
+
+    async def _load(self, task: WarmTask) -> float:
+        start = time.perf_counter()
+        result = task.load()
+        if inspect.isawaitable(result):
+            await result
+        return time.perf_counter() - start
+
+    def _record_load(self, report: RunWarmingReport, task: WarmTask, elapsed: float) -> None:
+        keys = task.entries or [task.key]
+        with self._lock:
+            report.warmed += 1
+            report.load_time += elapsed
+            for key in keys:
+                report.entries[key] = (task.kind, elapsed / len(keys))
+                if self._reports.get(report.run_id) is report:
+                    self._warmed_by[key] = report.run_id
+
+    async def run_cycle(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Warms the runs due within the lead time; returns a summary of the cycle."""
+        now = now or datetime.now(timezone.utc)
+        self.expire_reports(now)
+        runs = self.upcoming_runs(now)
+        self.stats["cycles"] += 1
+        summary = {"runs": len(runs), "warmed": 0, "deferred": 0, "failed": 0, "load_time": 0.0}
+        remaining = self.max_tasks_per_cycle
+
+        for run in runs:
+            with self._lock:
+                report = self._reports.get(run.run_id)
+                if report is None or report.scheduled_at != run.scheduled_at:
+                    self._drop_report(run.run_id)
+                    report = self._reports[run.run_id] = RunWarmingReport(run.run_id, run.scheduled_at)
+                    self.stats["runs_seen"] += 1
+            report.deferred = 0
+            report.already_cached = 0
+
+            for prefetcher in self.prefetchers:
+                try:
+                    tasks = await prefetcher.plan(run)
+                except Exception as e:
+                    logger.warning(f"Failed to plan {prefetcher.kind} warm-up for {run.run_id}: {e}")
+                    continue
+                if not tasks:
+                    report.already_cached += 1
+                    continue
+
+                budget = prefetcher.budget()
+                for task in tasks:
+                    if remaining <= 0 or (budget is not None and not budget.try_acquire(task.cost)):
+                        report.deferred += 1
+                        summary["deferred"] += 1
+                        continue
+                    remaining -= 1
+                    try:
+                        elapsed = await self._load(task)
+                    except Exception as e:
+                        report.failed += 1
+                        summary["failed"] += 1
+                        logger.warning(f"Failed to warm {task.key} for {run.run_id}: {e}")
+                        continue
+                    self._record_load(report, task, elapsed)
+                    summary["warmed"] += 1
+                    summary["load_time"] += elapsed
+
+        self.stats["tasks_warmed"] += summary["warmed"]
+        self.stats["tasks_deferred"] += summary["deferred"]
+        self.stats["tasks_failed"] += summary["failed"]
+        self.stats["load_time"] += summary["load_time"]
+        if summary["warmed"] or summary["deferred"]:
+            logger.info(f"Scheduled warming cycle: {summary}")
+        return summary
+
+    def run_cycle_sync(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Entry point for thread-based schedulers (APScheduler jobs)."""
+        return asyncio.run(self.run_cycle(now))
+
+    def record_hit(self, key: str) -> None:
+        """Marks a warmed entry as read by its run (called by the prefetchers' caches)."""
+        with self._lock:
+            run_id = self._warmed_by.get(key)
+            if run_id is not None:
+                self._reports[run_id].hits.add(key)
+
+    def record_run(self, run_id: str, duration: float) -> Optional[RunWarmingReport]:
+        """Closes the warming report of a finished run."""
+        with self._lock:
+            report = self._drop_report(run_id)
+        if report is None:
+            return None
+        report.run_duration = duration
+        self._completed.append(report)
+        logger.info(
+            f"Run {run_id} finished in {duration:.3f}s; hit {len(report.hits)}/{len(report.entries)} "
+            f"warmed entries, saving {report.latency_saved:.3f}s"
+        )
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        completed = list(self._completed)
+        saved = sum(report.latency_saved for report in completed)
+        duration = sum(report.run_duration or 0.0 for report in completed)
+        return {
+            **self.stats,
+            "pending_runs": len(self._reports),
+            "completed_runs": len(completed),
+            "latency_saved": round(saved, 4),
+            "saved_fraction": round(saved / (saved + duration), 4) if saved + duration > 0 else 0.0,
+            "recent_runs": [report.to_dict() for report in completed[-10:]]
+        }
@@ -7,4 +7,5 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.getenv('SECRET_KEY', 'changeme') 
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY', 'changeme')
+    LOTES_FILA_DB_PATH = os.getenv('LOTES_FILA_DB_PATH', 'lotes_execucao.db') 
\ No newline at end of file
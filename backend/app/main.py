@@ -299,14 +299,47 @@ app.register_blueprint(auditoria_bp)
 app.register_blueprint(openapi_bp)
 app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
 
+# Serviço de execuções ligado à app: os workers da fila de lotes só começam
+# aqui, com executor e app configurados
+from backend.app.services.execucao_service import init_execucao_service
+init_execucao_service(app)
+
 # Inicialização do APScheduler
 scheduler = BackgroundScheduler()
 
 def processar_execucoes_agendadas_job():
     from backend.app.services.execucao_service import processar_execucoes_agendadas
-    processar_execucoes_agendadas()
+    with app.app_context():
+        processar_execucoes_agendadas()
 
 scheduler.add_job(processar_execucoes_agendadas_job, 'interval', seconds=30)
+
+# Pré-aquecimento de cache guiado pela agenda (execucoes_agendadas + AgendamentoService)
+_aquecedor_agendado = None
+
+def _obter_aquecedor_agendado():
+    global _aquecedor_agendado
+    if _aquecedor_agendado is None:
+        from backend.app.cache.scheduled_warming import (
+            EmbeddingPrefetcher, PromptTemplatePrefetcher, ScheduledCacheWarmer
+        )
+        from backend.app.services.execucao_service import obter_execucao_service
+        from shared.config import EMBEDDING_STORE_CONFIG
+
+        execucao_service = obter_execucao_service()
+        prefetchers = [PromptTemplatePrefetcher(execucao_service.prompt_service)]
+        if EMBEDDING_STORE_CONFIG["enabled"]:
+            prefetchers.append(EmbeddingPrefetcher())
+        _aquecedor_agendado = ScheduledCacheWarmer(prefetchers)
+        _aquecedor_agendado.attach(execucao_service.agendamento_service)
+        _aquecedor_agendado.attach_execucao_service(execucao_service)
+    return _aquecedor_agendado
+
+def aquecer_cache_agendado_job():
+    with app.app_context():
+        _obter_aquecedor_agendado().run_cycle_sync()
+
+scheduler.add_job(aquecer_cache_agendado_job, 'interval', seconds=60)
 scheduler.start()
 
 @app.route('/')
@@ -1,6 +1,7 @@
 from .nicho import db, Nicho
 from .categoria import Categoria
 from .execucao import Execucao
+from .execucao_keyword import Termo, ExecucaoKeyword
 from .execucao_agendada import ExecucaoAgendada
 from .log import Log
 from .user import User
@@ -13,6 +14,8 @@ __all__ = [
     'Nicho',
     'Categoria',
     'Execucao',
+    'Termo',
+    'ExecucaoKeyword',
     'ExecucaoAgendada',
     'Log',
     'User',
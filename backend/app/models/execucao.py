@@ -4,6 +4,10 @@ from typing import Dict, List, Optional, Any
 
 class Execucao(db.Model):
     __tablename__ = 'execucoes'
+    __table_args__ = (
+        db.Index('ix_execucoes_categoria_data', 'id_categoria', 'data_execucao'),
+        db.Index('ix_execucoes_data_id', 'data_execucao', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     id_categoria = db.Column(db.Integer, db.ForeignKey('categorias.id'), nullable=False)
@@ -0,0 +1,31 @@
+from .nicho import db
+from typing import Dict, List, Optional, Any
+
+class Termo(db.Model):
+    """Dicionário de termos: cada palavra-chave normalizada é armazenada uma única vez."""
+    __tablename__ = 'termos'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    termo = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    data_criacao = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Termo(id={self.id}, termo='{self.termo}')>"
+
+
+class ExecucaoKeyword(db.Model):
+    """Palavra-chave usada em uma execução (substitui a busca no JSON de Execucao.palavras_chave)."""
+    __tablename__ = 'execucao_keywords'
+    __table_args__ = (
+        db.Index('ix_execucao_keywords_termo_execucao', 'termo_id', 'execucao_id'),
+    )
+
+    execucao_id = db.Column(db.Integer, db.ForeignKey('execucoes.id', ondelete='CASCADE'), primary_key=True)
+    termo_id = db.Column(db.Integer, db.ForeignKey('termos.id'), primary_key=True)
+    posicao = db.Column(db.Integer, nullable=False, default=0)
+
+    execucao = db.relationship('Execucao', backref=db.backref('keywords', cascade='all, delete-orphan', passive_deletes=True))
+    termo = db.relationship('Termo')
+
+    def __repr__(self):
+        return f"<ExecucaoKeyword(execucao={self.execucao_id}, termo={self.termo_id}, posicao={self.posicao})>"
@@ -92,6 +92,7 @@ class ExecucaoLoteRequest(BaseModel):
     """
     execucoes: List[ExecucaoCreateRequest] = Field(..., min_items=1, max_items=50, description="Lista de execuções")
     max_concurrent: Optional[int] = Field(5, ge=1, le=20, description="Máximo de execuções simultâneas")
+    prioridade: Optional[int] = Field(1, ge=1, le=10, description="Prioridade do lote na fila (maior = antes)")
     
     @validator('execucoes')
     def validar_execucoes(cls, v):
@@ -127,6 +128,9 @@ class ExecucaoLoteRequest(BaseModel):
         
         return v
 
+# Campos que a listagem de execuções pode retornar (parâmetro fields)
+CAMPOS_LISTAGEM_EXECUCAO = ('id', 'id_categoria', 'palavras_chave', 'cluster_usado', 'status', 'data_execucao')
+
 class ExecucaoFilterRequest(BaseModel):
     """
     Schema para filtros de listagem de execuções
@@ -137,7 +141,10 @@ class ExecucaoFilterRequest(BaseModel):
     data_inicio: Optional[datetime] = Field(None, description="Data de início para filtro")
     data_fim: Optional[datetime] = Field(None, description="Data de fim para filtro")
     limit: Optional[int] = Field(100, ge=1, le=1000, description="Limite de resultados")
-    offset: Optional[int] = Field(0, ge=0, description="Offset para paginação")
+    offset: Optional[int] = Field(0, ge=0, description="Offset para paginação (prefira cursor)")
+    cursor: Optional[str] = Field(None, max_length=200, description="Cursor opaco da página seguinte (header X-Next-Cursor)")
+    fields: Optional[List[str]] = Field(None, description="Campos a retornar (projeção)")
+    stream: Optional[bool] = Field(False, description="Resposta JSON em streaming para exportações")
     
     @validator('categoria_id', 'nicho_id')
     def validar_ids(cls, v):
@@ -174,6 +181,17 @@ class ExecucaoFilterRequest(BaseModel):
         
         return v
     
+    @validator('fields')
+    def validar_fields(cls, v):
+        """Valida a projeção de campos"""
+        if v is not None:
+            invalidos = [campo for campo in v if campo not in CAMPOS_LISTAGEM_EXECUCAO]
+            if invalidos:
+                raise ValueError(f'Campos inválidos: {", ".join(invalidos)}')
+            if not v:
+                raise ValueError('fields deve conter ao menos um campo')
+        return v
+    
     @root_validator
     def validar_datas(cls, values):
         """Valida se data_inicio é anterior a data_fim"""
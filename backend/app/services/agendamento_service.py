@@ -101,6 +101,8 @@ class AgendamentoService:
         self.on_execucao_agendada: Optional[Callable] = None
         self.on_agendamento_complete: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
+        # (agendamento, execucao, duracao_segundos) ao fim de cada execução
+        self.on_execucao_concluida: Optional[Callable] = None
         
         # Inicializar banco de dados
         self._init_database()
@@ -360,6 +362,7 @@ class AgendamentoService:
             falhas = 0
             
             for execucao in agendamento.execucoes:
+                inicio_execucao = time.perf_counter()
                 try:
                     # Chamar callback de execução
                     if self.on_execucao_agendada:
@@ -379,6 +382,12 @@ class AgendamentoService:
                     
                     # Registrar no histórico
                     self._registrar_execucao_historico(agendamento.id, False, None, str(e))
+                
+                if self.on_execucao_concluida:
+                    try:
+                        self.on_execucao_concluida(agendamento, execucao, time.perf_counter() - inicio_execucao)
+                    except Exception as e:
+                        logger.warning(f"Erro no callback de execução concluída {execucao.id}: {str(e)}")
             
             # Atualizar estatísticas
             agendamento.execucoes_sucesso += sucessos
@@ -13,7 +13,7 @@ import json
 from datetime import datetime
 from time import perf_counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
 from backend.app.models import Categoria, Execucao, ExecucaoAgendada, db
 from backend.app.utils.log_event import log_event
 
@@ -29,6 +29,7 @@ from .lote_execucao_service import LoteExecucaoService
 from .agendamento_service import AgendamentoService
 from .validacao_execucao_service import ValidacaoExecucaoService
 from .prompt_service import PromptService
+from .keyword_index_service import indexar_palavras_chave
 
 
 class ExecucaoService:
@@ -47,27 +48,45 @@ class ExecucaoService:
     - Compatibilidade: Mantém API existente
     """
     
-    def __init__(self):
-        """Inicializa o serviço principal de execuções."""
-        self.lote_service = LoteExecucaoService()
+    def __init__(self, app=None, fila_db_path: Optional[str] = None):
+        """
+        Inicializa o serviço principal de execuções.
+        
+        Args:
+            app: App Flask em cujo contexto os workers da fila de lotes executam;
+                 sem ela os workers não são iniciados
+            fila_db_path: Arquivo SQLite da fila durável de lotes
+        """
         self.agendamento_service = AgendamentoService()
         self.validacao_service = ValidacaoExecucaoService()
         self.prompt_service = PromptService()
+        # (execucao_agendada, duracao_segundos) ao fim de cada execução agendada
+        self.on_execucao_agendada_concluida: Optional[Callable] = None
+        # Criado por último: com a app, os workers podem reservar na hora itens
+        # recuperados da fila, e o executor usa os serviços acima
+        self.lote_service = LoteExecucaoService({
+            'fila_db_path': fila_db_path or os.getenv('LOTES_FILA_DB_PATH', 'lotes_execucao.db'),
+            'executor_item': self._executar_item_lote if app is not None else None,
+            'app': app
+        })
         
         log_event('info', 'ExecucaoService', 
                  detalhes='Serviço principal de execuções inicializado com serviços especializados')
     
     @trace_function(operation_name="processar_lote_execucoes", service_name="execucao-service")
-    def processar_lote_execucoes(self, dados: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def processar_lote_execucoes(self, dados: List[Dict[str, Any]], prioridade: int = 1,
+                                 max_concurrent: int = 5) -> Dict[str, Any]:
         """
-        Processa um lote de execuções em paralelo.
-        Mantém compatibilidade com API existente.
+        Valida o lote e o enfileira na fila durável do LoteExecucaoService.
+        Retorna o id_lote sem aguardar a execução dos itens.
         
         Args:
             dados: Lista de itens a serem processados
+            prioridade: Prioridade do lote (1-10, maior = antes)
+            max_concurrent: Máximo de itens do lote executando ao mesmo tempo
             
         Returns:
-            Dicionário com resultados do processamento
+            Dicionário com id_lote e status do enfileiramento
         """
         try:
             # Validar lote completo
@@ -86,11 +105,13 @@ class ExecucaoService:
                     'erros_validacao': erros
                 }
             
-            # Processar lote usando serviço especializado
-            resultado = self.lote_service.processar_lote(dados_validados)
+            # Enfileirar lote no serviço especializado
+            resultado = self.lote_service.processar_lote(
+                dados_validados, prioridade=prioridade, max_concurrent=max_concurrent
+            )
             
             log_event('info', 'ExecucaoService', 
-                     detalhes=f'Lote processado com sucesso: {len(dados_validados)} itens')
+                     detalhes=f'Lote {resultado["id_lote"]} enfileirado: {len(dados_validados)} itens')
             
             return resultado
             
@@ -110,29 +131,84 @@ class ExecucaoService:
     @trace_function(operation_name="processar_execucoes_agendadas", service_name="execucao-service")
     def processar_execucoes_agendadas(self) -> Optional[Dict[str, Any]]:
         """
-        Processa execuções agendadas pendentes.
-        Mantém compatibilidade com API existente.
+        Executa as linhas de `execucoes_agendadas` pendentes cuja data já chegou.
+        Cada linha é reservada (pendente -> executando) antes de executar, para
+        que dois processos não a executem em dobro.
         
         Returns:
             Dicionário com resultados do processamento ou None se não há pendências
         """
         try:
-            resultado = self.agendamento_service.processar_agendamentos()
+            pendentes = ExecucaoAgendada.query.filter(
+                ExecucaoAgendada.status == 'pendente',
+                ExecucaoAgendada.data_agendada <= datetime.utcnow()
+            ).order_by(ExecucaoAgendada.data_agendada.asc()).all()
             
-            if resultado:
-                log_event('info', 'ExecucaoService', 
-                         detalhes=f'Execuções agendadas processadas: {resultado["total_processadas"]} itens')
-            else:
+            if not pendentes:
                 log_event('info', 'ExecucaoService', 
                          detalhes='Nenhuma execução agendada pendente')
+                return None
             
+            logs_execucao = []
+            for agendada in pendentes:
+                reservada = ExecucaoAgendada.query.filter_by(id=agendada.id, status='pendente').update(
+                    {'status': 'executando'}, synchronize_session=False
+                )
+                db.session.commit()
+                if not reservada:
+                    continue
+                
+                inicio = perf_counter()
+                try:
+                    resultado = self.executar_prompt_individual(
+                        agendada.categoria_id, json.loads(agendada.palavras_chave), agendada.cluster
+                    )
+                    erro = resultado.get('erro')
+                except (TypeError, ValueError) as e:
+                    erro = f'palavras_chave inválidas: {e}'
+                duracao = perf_counter() - inicio
+                
+                if erro:
+                    # Descarta o que a execução deixou pendente na sessão
+                    db.session.rollback()
+                agendada.status = 'erro' if erro else 'concluida'
+                agendada.erro = erro
+                agendada.executado_em = datetime.utcnow()
+                db.session.commit()
+                logs_execucao.append({'agendamento_id': agendada.id, 'status': agendada.status, 'erro': erro})
+                
+                if self.on_execucao_agendada_concluida:
+                    try:
+                        self.on_execucao_agendada_concluida(agendada, duracao)
+                    except Exception as e:
+                        log_event('erro', 'ExecucaoService', 
+                                 detalhes=f'Erro no callback de execução agendada {agendada.id}: {e}')
+            
+            resultado = {
+                'total_processadas': len(logs_execucao),
+                'logs_execucao': logs_execucao,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            log_event('info', 'ExecucaoService', 
+                     detalhes=f'Execuções agendadas processadas: {resultado["total_processadas"]} itens')
             return resultado
             
         except Exception as e:
+            db.session.rollback()
             log_event('erro', 'ExecucaoService', 
                      detalhes=f'Erro no processamento de execuções agendadas: {e}')
             return None
     
+    def _executar_item_lote(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa um item da fila de lotes (chamado pelos workers do LoteExecucaoService)."""
+        return self.executar_prompt_individual(
+            item['categoria_id'], item['palavras_chave'], item.get('cluster')
+        )
+    
+    def obter_status_lote(self, id_lote: str) -> Optional[Dict[str, Any]]:
+        """Progresso de um lote lido da fila durável."""
+        return self.lote_service.obter_status_fila(id_lote)
+    
     def executar_prompt_individual(self, categoria_id: int, palavras_chave: List[str], 
                                  cluster: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -188,6 +264,7 @@ class ExecucaoService:
             )
             
             db.session.add(execucao)
+            indexar_palavras_chave(execucao, palavras_chave)
             db.session.commit()
             
             t1 = perf_counter()
@@ -291,20 +368,49 @@ class ExecucaoService:
             return {'erro': str(e)}
 
 
-# Instância global para compatibilidade
-_execucao_service = ExecucaoService()
+# Instância global para compatibilidade (criada na inicialização da app)
+_execucao_service: Optional[ExecucaoService] = None
+
+
+def init_execucao_service(app) -> ExecucaoService:
+    """
+    Cria a instância global ligada à app Flask e inicia os workers da fila de lotes.
+    Chamado na inicialização da app; o arquivo da fila vem de LOTES_FILA_DB_PATH.
+    """
+    global _execucao_service
+    if _execucao_service is None:
+        _execucao_service = ExecucaoService(app, fila_db_path=app.config.get('LOTES_FILA_DB_PATH'))
+    return _execucao_service
+
+
+def obter_execucao_service() -> ExecucaoService:
+    """Instância global; usa a app corrente se init_execucao_service ainda não rodou."""
+    if _execucao_service is None:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            return init_execucao_service(current_app._get_current_object())
+        raise RuntimeError('ExecucaoService não inicializado: chame init_execucao_service(app)')
+    return _execucao_service
+
 
 # Funções de compatibilidade com API existente
-def processar_lote_execucoes(dados):
+def processar_lote_execucoes(dados, prioridade=1, max_concurrent=5):
     """
     Função de compatibilidade para processamento de lotes.
     Delega para o serviço especializado.
     """
-    return _execucao_service.processar_lote_execucoes(dados)
+    return obter_execucao_service().processar_lote_execucoes(dados, prioridade=prioridade, max_concurrent=max_concurrent)
+
+def obter_status_lote(id_lote):
+    """
+    Função de compatibilidade para consulta de progresso de lotes.
+    Delega para o serviço especializado.
+    """
+    return obter_execucao_service().obter_status_lote(id_lote)
 
 def processar_execucoes_agendadas():
     """
     Função de compatibilidade para processamento de agendamentos.
     Delega para o serviço especializado.
     """
-    return _execucao_service.processar_execucoes_agendadas() 
\ No newline at end of file
+    return obter_execucao_service().processar_execucoes_agendadas() 
\ No newline at end of file
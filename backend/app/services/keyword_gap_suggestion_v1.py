@@ -2,8 +2,100 @@
 Módulo: keyword_gap_suggestion_v1
 Sugere preenchimento de lacunas e valida complementaridade semântica entre palavras-chave primárias e secundárias.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import difflib
+import heapq
+import math
+import random
+import time
+
+import numpy as np
+
+
+class IndiceCandidatos:
+    """
+    Índice dos candidatos para a busca por similaridade.
+
+    Guarda o comprimento e a contagem de caracteres de cada termo. Antes do
+    SequenceMatcher, cada primária é restrita à faixa de comprimentos
+    compatível com o threshold (limite de ``real_quick_ratio``) e depois aos
+    candidatos cujo limite por caracteres em comum (``quick_ratio``) ainda
+    alcança o threshold. Os dois são limites superiores do ``ratio``, então
+    nenhum candidato acima do threshold é descartado.
+
+    Os sobreviventes ainda passam pelo comprimento da maior subsequência comum
+    (LCS, calculada bit a bit), outro limite superior do ``ratio``, bem mais
+    barato que o SequenceMatcher.
+    """
+    def __init__(self, candidatos: List[Dict[str, Any]]):
+        self.candidatos = candidatos
+        self.termos = [c.get('termo', '') for c in candidatos]
+        comprimentos = np.array([len(t) for t in self.termos], dtype=np.int64)
+
+        self.ordem = np.argsort(comprimentos, kind='stable')
+        self.comprimentos = comprimentos[self.ordem]
+        self.alfabeto = {ch: i for i, ch in enumerate(sorted({ch for t in self.termos for ch in t}))}
+        self.contagens = np.zeros((len(self.termos), len(self.alfabeto)), dtype=np.uint16)
+        for linha, indice in enumerate(self.ordem):
+            for ch in self.termos[indice]:
+                self.contagens[linha, self.alfabeto[ch]] += 1
+
+        # Máscaras de posição de cada caractere, para a LCS bit a bit
+        self.mascaras: List[Dict[str, int]] = []
+        for termo in self.termos:
+            mascara: Dict[str, int] = {}
+            for posicao, ch in enumerate(termo):
+                mascara[ch] = mascara.get(ch, 0) | (1 << posicao)
+            self.mascaras.append(mascara)
+
+    def __len__(self) -> int:
+        return len(self.termos)
+
+    def limites(self, termo: str, threshold: float):
+        """
+        Retorna (índices originais, limite superior do ratio) dos candidatos que
+        podem atingir o threshold contra ``termo``.
+        """
+        la = len(termo)
+        inicio, fim = 0, len(self.comprimentos)
+        if threshold > 0 and la:
+            # Faixa aproximada por busca binária; o filtro exato vem logo abaixo
+            inicio = int(np.searchsorted(self.comprimentos, math.floor(la * threshold / (2 - threshold)) - 1, 'left'))
+            fim = int(np.searchsorted(self.comprimentos, math.ceil(la * (2 - threshold) / threshold) + 1, 'right'))
+
+        comprimentos = self.comprimentos[inicio:fim]
+        total = comprimentos + la
+        with np.errstate(divide='ignore', invalid='ignore'):
+            limite = np.where(total > 0, 2.0 * np.minimum(comprimentos, la) / total, 1.0)
+            linhas = np.flatnonzero(limite >= threshold)
+
+            vetor = np.zeros(len(self.alfabeto), dtype=np.uint16)
+            for ch in termo:
+                coluna = self.alfabeto.get(ch)
+                if coluna is not None:
+                    vetor[coluna] += 1
+            comuns = np.minimum(self.contagens[inicio + linhas], vetor).sum(axis=1)
+            limite = np.where(total[linhas] > 0, 2.0 * comuns / total[linhas], 1.0)
+
+        passou = limite >= threshold
+        return self.ordem[inicio + linhas[passou]], limite[passou]
+
+    def lcs(self, termo: str, i: int) -> int:
+        """Comprimento da maior subsequência comum entre ``termo`` e o candidato ``i`` (Hyyrö)."""
+        mascara = self.mascaras[i]
+        lb = len(self.termos[i])
+        todos = (1 << lb) - 1
+        v = todos
+        for ch in termo:
+            u = v & mascara.get(ch, 0)
+            v = ((v + u) | (v - u)) & todos
+        return lb - bin(v).count('1')
+
+    def pode_atingir(self, termo: str, i: int, threshold: float) -> bool:
+        """Limite pela LCS: os blocos do SequenceMatcher formam uma subsequência comum."""
+        total = len(termo) + len(self.termos[i])
+        return not total or 2.0 * self.lcs(termo, i) / total >= threshold
+
 
 class KeywordGapSuggester:
     """
@@ -21,16 +113,77 @@ class KeywordGapSuggester:
             'falta_secundaria': len(secundarias) == 0
         }
 
-    def sugerir_secundarias(self, primarias: List[Dict[str, Any]], candidatos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def sugerir_secundarias(self, primarias: List[Dict[str, Any]],
+                            candidatos: Union[List[Dict[str, Any]], IndiceCandidatos]) -> List[Dict[str, Any]]:
         """
         Sugere secundárias relevantes para cada primária com base em similaridade textual.
+
+        Aceita a lista de candidatos ou um IndiceCandidatos já construído (para
+        reaproveitar entre chamadas). O resultado é o mesmo da comparação
+        exaustiva: por primária, os candidatos acima do threshold na ordem original.
+        """
+        indice = self._indice(candidatos)
+        termos_p = [p.get('termo', '') for p in primarias]
+
+        # Agrupa as comparações por candidato: o SequenceMatcher guarda a análise
+        # da segunda sequência, que passa a ser feita uma vez por candidato
+        por_candidato: Dict[int, List[int]] = {}
+        for j, termo_p in enumerate(termos_p):
+            for i in indice.limites(termo_p, self.threshold)[0].tolist():
+                por_candidato.setdefault(i, []).append(j)
+
+        aceitos: List[List[int]] = [[] for _ in primarias]
+        matcher = difflib.SequenceMatcher(None)
+        for i, js in por_candidato.items():
+            matcher.set_seq2(indice.termos[i])
+            for j in js:
+                if not indice.pode_atingir(termos_p[j], i, self.threshold):
+                    continue
+                matcher.set_seq1(termos_p[j])
+                if matcher.ratio() >= self.threshold:
+                    aceitos[j].append(i)
+
+        return [indice.candidatos[i] for indices in aceitos for i in sorted(indices)]
+
+    def sugerir_top_k(self, primarias: List[Dict[str, Any]],
+                      candidatos: Union[List[Dict[str, Any]], IndiceCandidatos],
+                      k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Para cada primária, as k secundárias mais similares acima do threshold.
+
+        Retorna [{'primaria': ..., 'sugestoes': [{'candidato': ..., 'similaridade': float}]}],
+        sugestões em ordem decrescente de similaridade (empate: ordem original).
         """
-        sugestoes = []
+        indice = self._indice(candidatos)
+        resultado = []
         for p in primarias:
             termo_p = p.get('termo', '')
-            similares = [c for c in candidatos if self.similaridade(termo_p, c.get('termo', '')) >= self.threshold]
-            sugestoes.extend(similares)
-        return sugestoes
+            indices, limites = indice.limites(termo_p, self.threshold)
+            melhores = []  # heap mínimo de (similaridade, -indice)
+            for posicao in np.lexsort((indices, -limites)):
+                # Candidatos em ordem decrescente de limite: quando o limite não
+                # alcança o k-ésimo melhor, nenhum candidato restante entra
+                if len(melhores) == k and limites[posicao] < melhores[0][0]:
+                    break
+                i = int(indices[posicao])
+                if not indice.pode_atingir(termo_p, i, self.threshold):
+                    continue
+                score = self.similaridade(termo_p, indice.termos[i])
+                if score < self.threshold:
+                    continue
+                item = (score, -i)
+                if len(melhores) < k:
+                    heapq.heappush(melhores, item)
+                elif item > melhores[0]:
+                    heapq.heapreplace(melhores, item)
+            resultado.append({
+                'primaria': p,
+                'sugestoes': [
+                    {'candidato': indice.candidatos[-i], 'similaridade': score}
+                    for score, i in sorted(melhores, reverse=True)
+                ]
+            })
+        return resultado
 
     def validar_complementaridade(self, primaria: Dict[str, Any], secundaria: Dict[str, Any]) -> bool:
         """
@@ -42,4 +195,61 @@ class KeywordGapSuggester:
         """
         Similaridade simples baseada em SequenceMatcher (0 a 1).
         """
-        return difflib.SequenceMatcher(None, a, b).ratio() 
\ No newline at end of file
+        return difflib.SequenceMatcher(None, a, b).ratio()
+
+    def _indice(self, candidatos: Union[List[Dict[str, Any]], IndiceCandidatos]) -> IndiceCandidatos:
+        return candidatos if isinstance(candidatos, IndiceCandidatos) else IndiceCandidatos(candidatos)
+
+
+def benchmark_sugestoes(n_primarias: int = 50, n_candidatos: int = 2000, threshold: float = 0.6,
+                        seed: Optional[int] = 42) -> Dict[str, Any]:
+    """
+    Compara a busca exaustiva (primária × candidato) com a busca indexada.
+
+    Gera termos sintéticos a partir de um vocabulário comum e retorna os tempos,
+    o número de comparações exatas (SequenceMatcher) de cada abordagem e se os
+    resultados são idênticos.
+    """
+    rng = random.Random(seed)
+    vocabulario = [
+        'marketing', 'digital', 'conteudo', 'seo', 'vendas', 'curso', 'gratis', 'online',
+        'financas', 'pessoais', 'investimento', 'receita', 'saudavel', 'treino', 'casa',
+        'como', 'fazer', 'melhor', 'barato', 'para', 'iniciantes', 'avancado', 'loja', 'blog'
+    ]
+
+    def termo():
+        return ' '.join(rng.sample(vocabulario, rng.randint(2, 4)))
+
+    primarias = [{'termo': termo()} for _ in range(n_primarias)]
+    candidatos = [{'termo': termo()} for _ in range(n_candidatos)]
+    sugg = KeywordGapSuggester(threshold=threshold)
+
+    inicio = time.perf_counter()
+    exaustivo = []
+    for p in primarias:
+        exaustivo.extend(c for c in candidatos if sugg.similaridade(p['termo'], c['termo']) >= threshold)
+    tempo_exaustivo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    indice = IndiceCandidatos(candidatos)
+    tempo_indice = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    indexado = sugg.sugerir_secundarias(primarias, indice)
+    tempo_busca = time.perf_counter() - inicio
+
+    pre_selecionados = [(p['termo'], indice.limites(p['termo'], threshold)[0].tolist()) for p in primarias]
+    comparacoes = sum(
+        indice.pode_atingir(termo_p, i, threshold) for termo_p, indices in pre_selecionados for i in indices
+    )
+    return {
+        'primarias': n_primarias,
+        'candidatos': n_candidatos,
+        'sugestoes': len(indexado),
+        'identico': [id(c) for c in indexado] == [id(c) for c in exaustivo],
+        'comparacoes_exaustivo': n_primarias * n_candidatos,
+        'comparacoes_indexado': comparacoes,
+        'tempo_exaustivo_s': tempo_exaustivo,
+        'tempo_indice_s': tempo_indice,
+        'tempo_indexado_s': tempo_busca,
+        'speedup': tempo_exaustivo / (tempo_indice + tempo_busca) if tempo_indice + tempo_busca else float('inf')
+    }
@@ -0,0 +1,160 @@
+"""
+Índice normalizado de palavras-chave das execuções.
+
+Cada termo é gravado uma única vez em ``termos`` e ligado às execuções por
+``execucao_keywords``; as consultas "quais execuções/categorias usaram o
+termo X" e "termos mais usados por nicho num período" passam a usar índices
+em vez de varrer o JSON de ``Execucao.palavras_chave``.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.models import Categoria, Execucao, ExecucaoKeyword, Termo, db
+
+_ESPACOS = re.compile(r'\s+')
+TAMANHO_MAXIMO_TERMO = 255
+
+
+def normalizar_termo(texto: Any) -> str:
+    """Forma canônica do termo: minúsculas e espaços colapsados."""
+    return _ESPACOS.sub(' ', str(texto)).strip().lower()[:TAMANHO_MAXIMO_TERMO]
+
+
+def obter_ids_termos(textos: Iterable[Any]) -> Dict[str, int]:
+    """Retorna {termo_normalizado: id}, criando no dicionário os termos ainda inexistentes."""
+    termos = {normalizar_termo(t) for t in textos}
+    termos.discard('')
+    if not termos:
+        return {}
+
+    ids = _ler_ids(termos)
+    faltantes = termos - ids.keys()
+    if faltantes:
+        try:
+            with db.session.begin_nested():
+                db.session.add_all([Termo(termo=t) for t in sorted(faltantes)])
+        except IntegrityError:
+            # Outro processo criou parte dos termos ao mesmo tempo e o savepoint
+            # desfez todos; insere um a um os que ainda faltam
+            for termo in sorted(faltantes - _ler_ids(faltantes).keys()):
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(Termo(termo=termo))
+                except IntegrityError:
+                    pass
+        ids.update(_ler_ids(faltantes))
+    return ids
+
+
+def _ler_ids(termos: Iterable[str]) -> Dict[str, int]:
+    return dict(db.session.query(Termo.termo, Termo.id).filter(Termo.termo.in_(termos)).all())
+
+
+def indexar_palavras_chave(execucao: Execucao, palavras_chave: Iterable[Any]) -> int:
+    """
+    Registra as palavras-chave da execução no índice (sem commit).
+
+    Termos repetidos na mesma execução contam uma vez, na primeira posição.
+    Retorna o número de vínculos criados.
+    """
+    if execucao.id is None:
+        db.session.flush()
+
+    posicoes: Dict[str, int] = {}
+    for posicao, texto in enumerate(palavras_chave):
+        termo = normalizar_termo(texto)
+        if termo and termo not in posicoes:
+            posicoes[termo] = posicao
+
+    ids = obter_ids_termos(posicoes)
+    db.session.add_all([
+        ExecucaoKeyword(execucao_id=execucao.id, termo_id=ids[termo], posicao=posicao)
+        for termo, posicao in posicoes.items()
+    ])
+    return len(posicoes)
+
+
+def _id_termo(termo: str) -> Optional[int]:
+    return db.session.query(Termo.id).filter(Termo.termo == normalizar_termo(termo)).scalar()
+
+
+def _filtrar_periodo(query, data_inicio: Optional[datetime], data_fim: Optional[datetime]):
+    if data_inicio:
+        query = query.filter(Execucao.data_execucao >= data_inicio)
+    if data_fim:
+        query = query.filter(Execucao.data_execucao <= data_fim)
+    return query
+
+
+def execucoes_por_termo(termo: str, data_inicio: Optional[datetime] = None,
+                        data_fim: Optional[datetime] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """Execuções que usaram o termo, das mais recentes para as mais antigas."""
+    termo_id = _id_termo(termo)
+    if termo_id is None:
+        return []
+
+    query = db.session.query(
+        Execucao.id, Execucao.id_categoria, Execucao.status, Execucao.data_execucao
+    ).join(ExecucaoKeyword, ExecucaoKeyword.execucao_id == Execucao.id).filter(ExecucaoKeyword.termo_id == termo_id)
+    query = _filtrar_periodo(query, data_inicio, data_fim)
+
+    return [
+        {
+            'id': id_,
+            'id_categoria': id_categoria,
+            'status': status,
+            'data_execucao': data_execucao.isoformat() if data_execucao else None
+        }
+        for id_, id_categoria, status, data_execucao in
+        query.order_by(Execucao.data_execucao.desc(), Execucao.id.desc()).limit(limit)
+    ]
+
+
+def categorias_por_termo(termo: str, data_inicio: Optional[datetime] = None,
+                         data_fim: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Categorias em que o termo foi usado, com o total de execuções e a última ocorrência."""
+    termo_id = _id_termo(termo)
+    if termo_id is None:
+        return []
+
+    total = func.count(Execucao.id)
+    query = db.session.query(
+        Categoria.id, Categoria.nome, Categoria.id_nicho, total, func.max(Execucao.data_execucao)
+    ).join(Execucao, Execucao.id_categoria == Categoria.id) \
+     .join(ExecucaoKeyword, ExecucaoKeyword.execucao_id == Execucao.id) \
+     .filter(ExecucaoKeyword.termo_id == termo_id)
+    query = _filtrar_periodo(query, data_inicio, data_fim)
+
+    return [
+        {
+            'id_categoria': id_categoria,
+            'nome': nome,
+            'id_nicho': id_nicho,
+            'execucoes': execucoes,
+            'ultima_execucao': ultima.isoformat() if ultima else None
+        }
+        for id_categoria, nome, id_nicho, execucoes, ultima in
+        query.group_by(Categoria.id, Categoria.nome, Categoria.id_nicho).order_by(total.desc(), Categoria.id)
+    ]
+
+
+def top_termos_por_nicho(nicho_id: int, data_inicio: Optional[datetime] = None,
+                         data_fim: Optional[datetime] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """Termos mais usados nas execuções das categorias do nicho, no período informado."""
+    categorias = db.session.query(Categoria.id).filter(Categoria.id_nicho == nicho_id)
+    total = func.count(ExecucaoKeyword.execucao_id)
+
+    query = db.session.query(Termo.termo, total) \
+        .join(ExecucaoKeyword, ExecucaoKeyword.termo_id == Termo.id) \
+        .join(Execucao, Execucao.id == ExecucaoKeyword.execucao_id) \
+        .filter(Execucao.id_categoria.in_(categorias.scalar_subquery()))
+    query = _filtrar_periodo(query, data_inicio, data_fim)
+
+    return [
+        {'termo': termo, 'execucoes': execucoes}
+        for termo, execucoes in query.group_by(Termo.id, Termo.termo).order_by(total.desc(), Termo.termo).limit(limit)
+    ]
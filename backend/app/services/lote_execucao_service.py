@@ -20,6 +20,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from queue import Queue, Empty
 
+from .lote_fila_store import LoteFilaStore
+
 logger = logging.getLogger(__name__)
 
 class LoteStatus(Enum):
@@ -92,9 +94,26 @@ class LoteExecucaoService:
             'lotes_processados': 0,
             'execucoes_processadas': 0,
             'tempo_total_processamento': 0.0,
-            'taxa_sucesso_geral': 0.0
+            'taxa_sucesso_geral': 0.0,
+            'itens_fila_processados': 0,
+            'itens_fila_falharam': 0
         }
         
+        # Fila durável (SQLite) consumida pelos workers
+        self.fila = LoteFilaStore(self.config.get('fila_db_path', 'lotes_execucao.db'))
+        self.workers_fila = self.config.get('workers_fila', 4)
+        self.lease_segundos = self.config.get('lease_segundos', 600)
+        self.retry_delay = self.config.get('retry_delay', 60)
+        self.intervalo_polling = self.config.get('intervalo_polling', 0.5)
+        self.worker_threads: List[threading.Thread] = []
+        # Executa um item da fila: recebe o dict do item e retorna o resultado
+        # ({'execucao_id', 'tempo_real'} ou {'erro'}); passado por ExecucaoService.
+        # Sem executor os workers não são iniciados: itens recuperados da fila
+        # após um restart esperam em vez de gastar tentativas
+        self.executor_item: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = self.config.get('executor_item')
+        # App Flask usada para abrir app_context nos workers
+        self.app = self.config.get('app')
+        
         # Callbacks
         self.on_lote_complete: Optional[Callable] = None
         self.on_execucao_complete: Optional[Callable] = None
@@ -113,12 +132,30 @@ class LoteExecucaoService:
             )
             self.processing_thread.start()
             logger.info("Serviço de lote iniciado")
+        self._iniciar_workers_fila()
+    
+    def _iniciar_workers_fila(self):
+        """Inicia os workers que consomem a fila durável (só com executor configurado)"""
+        if self.executor_item is None:
+            logger.info("Executor de itens de lote não configurado; workers da fila não iniciados")
+            return
+        self.worker_threads = [t for t in self.worker_threads if t.is_alive()]
+        for indice in range(len(self.worker_threads), self.workers_fila):
+            worker = threading.Thread(
+                target=self._worker_fila_loop,
+                args=(f"lote-worker-{uuid.uuid4().hex[:8]}-{indice}",),
+                daemon=True
+            )
+            worker.start()
+            self.worker_threads.append(worker)
     
     def stop_processing(self):
         """Para o processamento"""
         self.running = False
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=5)
+        for worker in self.worker_threads:
+            worker.join(timeout=5)
         self.executor.shutdown(wait=True)
         logger.info("Serviço de lote parado")
     
@@ -190,6 +227,129 @@ class LoteExecucaoService:
         logger.info(f"Lote criado: {lote_id} com {len(execucoes_items)} execuções")
         return lote_id
     
+    def enfileirar_lote(
+        self,
+        execucoes: List[Dict[str, Any]],
+        prioridade: int = 1,
+        max_concurrent: int = 5,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Persiste o lote na fila durável e retorna imediatamente o id_lote.
+        
+        Args:
+            execucoes: Itens com categoria_id, palavras_chave e cluster
+            prioridade: 1-10, maior = consumido antes
+            max_concurrent: Máximo de itens do lote em execução simultânea
+            user_id: ID do usuário que criou o lote
+            
+        Returns:
+            ID do lote enfileirado
+        """
+        id_lote = self.fila.criar_lote(
+            execucoes,
+            prioridade=prioridade,
+            max_concurrent=max_concurrent,
+            max_tentativas=self.config.get('max_tentativas', LoteConfig.max_retries),
+            user_id=user_id
+        )
+        if self.running:
+            self._iniciar_workers_fila()
+        return id_lote
+    
+    def processar_lote(
+        self,
+        dados: List[Dict[str, Any]],
+        prioridade: int = 1,
+        max_concurrent: int = 5,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Enfileira um lote já validado (compatível com ExecucaoService).
+        
+        Returns:
+            Resposta com id_lote; o progresso é lido em obter_status_fila
+        """
+        itens = [
+            {
+                'categoria_id': item['categoria_id'],
+                'palavras_chave': item['palavras_chave'],
+                'cluster': item.get('cluster')
+            }
+            for item in dados
+        ]
+        id_lote = self.enfileirar_lote(itens, prioridade=prioridade, max_concurrent=max_concurrent, user_id=user_id)
+        return {
+            'id_lote': id_lote,
+            'status': 'enfileirado',
+            'total': len(itens),
+            'resultados': [],
+            'tempo_total': 0.0,
+            'qtd_executada': 0,
+            'log_path': None
+        }
+    
+    def obter_status_fila(self, id_lote: str) -> Optional[Dict[str, Any]]:
+        """Progresso do lote lido diretamente da fila durável"""
+        return self.fila.obter_status(id_lote)
+    
+    def _worker_fila_loop(self, worker_id: str):
+        """Loop de um worker: reserva, executa e registra itens da fila"""
+        while self.running:
+            try:
+                item = self.fila.reservar_item(worker_id, self.lease_segundos)
+            except Exception as e:
+                logger.error(f"Erro ao reservar item da fila: {str(e)}")
+                time.sleep(self.intervalo_polling)
+                continue
+            if item is None:
+                time.sleep(self.intervalo_polling)
+                continue
+            self._executar_item_fila(item)
+    
+    def _executar_item_fila(self, item: Dict[str, Any]):
+        """Executa um item reservado e registra o resultado na fila"""
+        inicio = time.time()
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    resultado = self._chamar_executor_item(item)
+            else:
+                resultado = self._chamar_executor_item(item)
+        except Exception as e:
+            resultado = {'erro': str(e)}
+        
+        if resultado.get('erro'):
+            reagendado = self.fila.falhar_item(item['id'], item['worker'], str(resultado['erro']), self.retry_delay)
+            if reagendado is None:
+                return
+            if not reagendado:
+                self.stats['itens_fila_falharam'] += 1
+            logger.warning(
+                f"Item {item['id']} do lote {item['id_lote']} falhou "
+                f"({'reagendado' if reagendado else 'definitivo'}): {resultado['erro']}"
+            )
+            if self.on_error:
+                self.on_error(Exception(f"Erro no item {item['id']} do lote {item['id_lote']}: {resultado['erro']}"))
+            return
+        
+        registrado = self.fila.concluir_item(
+            item['id'],
+            item['worker'],
+            execucao_id=resultado.get('execucao_id'),
+            tempo_real=resultado.get('tempo_real', time.time() - inicio)
+        )
+        if not registrado:
+            return
+        self.stats['itens_fila_processados'] += 1
+        if self.on_execucao_complete:
+            self.on_execucao_complete(item, resultado)
+    
+    def _chamar_executor_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        if self.executor_item is None:
+            return {'erro': 'Executor de itens de lote não configurado'}
+        return self.executor_item(item)
+    
     def _process_lote(self, lote_info: Dict[str, Any]):
         """Processa um lote de execuções"""
         lote_id = lote_info['id']
@@ -482,6 +642,10 @@ class LoteExecucaoService:
             'execucoes_processadas': self.stats['execucoes_processadas'],
             'tempo_total_processamento': self.stats['tempo_total_processamento'],
             'taxa_sucesso_geral': self.stats['taxa_sucesso_geral'],
+            'itens_fila_processados': self.stats['itens_fila_processados'],
+            'itens_fila_falharam': self.stats['itens_fila_falharam'],
+            'itens_fila_pendentes': self.fila.contar_itens(),
+            'workers_fila': sum(1 for t in self.worker_threads if t.is_alive()),
             'status_por_lote': {
                 status.value: sum(1 for l in self.lotes_ativos.values() if l['status'] == status)
                 for status in LoteStatus
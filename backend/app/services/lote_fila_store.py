@@ -0,0 +1,356 @@
+"""
+Fila durável de lotes de execução - Omni Keywords Finder
+Armazena lotes e itens em SQLite (WAL) para processamento assíncrono
+
+Prompt: Fila assíncrona para POST /execucoes/lote
+Ruleset: enterprise_control_layer.yaml
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Status dos itens seguem o vocabulário do log de lote ('ok'/'erro')
+ITEM_PENDENTE = "pendente"
+ITEM_EM_EXECUCAO = "em_execucao"
+ITEM_OK = "ok"
+ITEM_ERRO = "erro"
+ITEM_CANCELADO = "cancelado"
+
+LOTE_PENDENTE = "pendente"
+LOTE_EM_EXECUCAO = "em_execucao"
+LOTE_CONCLUIDO = "concluido"
+LOTE_FALHOU = "falhou"
+LOTE_CANCELADO = "cancelado"
+
+
+def _agora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LoteFilaStore:
+    """
+    Fila de itens de lote persistida em SQLite.
+
+    Cada item é reservado atomicamente (BEGIN IMMEDIATE) por um worker com um
+    lease; itens cujo lease expira (worker morto, processo reiniciado) contam
+    uma tentativa e voltam para a fila, ou falham ao esgotar `max_tentativas`.
+    Só o worker que detém o lease registra o resultado do item. A ordem de
+    consumo é prioridade do lote (maior primeiro) e ordem de chegada,
+    respeitando o `max_concurrent` de cada lote.
+    """
+
+    def __init__(self, db_path: str = 'lotes_execucao.db'):
+        self.db_path = db_path
+        self._init_database()
+
+    @contextmanager
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transacao(self):
+        with self._conectar() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _init_database(self):
+        """Inicializa tabelas e índices da fila"""
+        with self._conectar() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS lotes_fila (
+                    id_lote TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    prioridade INTEGER NOT NULL DEFAULT 1,
+                    max_concurrent INTEGER NOT NULL DEFAULT 5,
+                    user_id TEXT,
+                    total INTEGER NOT NULL,
+                    criado_em TEXT NOT NULL,
+                    inicio TEXT,
+                    fim TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS lote_itens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id_lote TEXT NOT NULL,
+                    posicao INTEGER NOT NULL,
+                    categoria_id INTEGER NOT NULL,
+                    palavras_chave TEXT NOT NULL,
+                    cluster TEXT,
+                    prioridade INTEGER NOT NULL DEFAULT 1,
+                    status TEXT NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    max_tentativas INTEGER NOT NULL DEFAULT 3,
+                    disponivel_em REAL NOT NULL DEFAULT 0,
+                    lease_ate REAL,
+                    worker TEXT,
+                    inicio TEXT,
+                    fim TEXT,
+                    tempo_real REAL,
+                    execucao_id INTEGER,
+                    erro TEXT,
+                    FOREIGN KEY (id_lote) REFERENCES lotes_fila (id_lote)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_lote_itens_fila ON lote_itens(status, prioridade DESC, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_lote_itens_lote ON lote_itens(id_lote, status)')
+
+    def criar_lote(
+        self,
+        itens: List[Dict[str, Any]],
+        prioridade: int = 1,
+        max_concurrent: int = 5,
+        max_tentativas: int = 3,
+        user_id: Optional[str] = None
+    ) -> str:
+        """Persiste um lote e seus itens como pendentes; retorna o id_lote"""
+        id_lote = str(uuid.uuid4())
+        with self._transacao() as conn:
+            conn.execute(
+                'INSERT INTO lotes_fila (id_lote, status, prioridade, max_concurrent, user_id, total, criado_em) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (id_lote, LOTE_PENDENTE, prioridade, max_concurrent, user_id, len(itens), _agora_iso())
+            )
+            conn.executemany(
+                'INSERT INTO lote_itens (id_lote, posicao, categoria_id, palavras_chave, cluster, prioridade, '
+                'status, max_tentativas) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        id_lote, posicao, item['categoria_id'],
+                        json.dumps(item['palavras_chave'], ensure_ascii=False),
+                        item.get('cluster'), prioridade, ITEM_PENDENTE, max_tentativas
+                    )
+                    for posicao, item in enumerate(itens)
+                ]
+            )
+        logger.info(f"Lote enfileirado: {id_lote} com {len(itens)} itens (prioridade {prioridade})")
+        return id_lote
+
+    def reservar_item(self, worker_id: str, lease_segundos: float = 600.0) -> Optional[Dict[str, Any]]:
+        """
+        Reserva o próximo item elegível para o worker.
+
+        Returns:
+            Dados do item reservado ou None se a fila está vazia
+        """
+        agora = time.time()
+        with self._transacao() as conn:
+            self._recuperar_leases_expirados(conn, agora)
+            row = conn.execute(
+                '''
+                SELECT i.* FROM lote_itens i
+                JOIN lotes_fila l ON l.id_lote = i.id_lote
+                WHERE i.status = ? AND i.disponivel_em <= ?
+                  AND l.status IN (?, ?)
+                  AND (SELECT COUNT(*) FROM lote_itens r
+                       WHERE r.id_lote = i.id_lote AND r.status = ?) < l.max_concurrent
+                ORDER BY i.prioridade DESC, i.id
+                LIMIT 1
+                ''',
+                (ITEM_PENDENTE, agora, LOTE_PENDENTE, LOTE_EM_EXECUCAO, ITEM_EM_EXECUCAO)
+            ).fetchone()
+            if row is None:
+                return None
+            inicio = _agora_iso()
+            conn.execute(
+                'UPDATE lote_itens SET status = ?, worker = ?, lease_ate = ?, inicio = ? WHERE id = ?',
+                (ITEM_EM_EXECUCAO, worker_id, agora + lease_segundos, inicio, row['id'])
+            )
+            conn.execute(
+                'UPDATE lotes_fila SET status = ?, inicio = COALESCE(inicio, ?) WHERE id_lote = ? AND status = ?',
+                (LOTE_EM_EXECUCAO, inicio, row['id_lote'], LOTE_PENDENTE)
+            )
+        item = dict(row)
+        item['palavras_chave'] = json.loads(item['palavras_chave'])
+        item['inicio'] = inicio
+        item['worker'] = worker_id
+        return item
+
+    def _recuperar_leases_expirados(self, conn: sqlite3.Connection, agora: float):
+        """Lease expirado conta como tentativa: volta para a fila ou falha de vez"""
+        expirados = conn.execute(
+            'SELECT id, worker, tentativas, max_tentativas FROM lote_itens WHERE status = ? AND lease_ate < ?',
+            (ITEM_EM_EXECUCAO, agora)
+        ).fetchall()
+        for row in expirados:
+            tentativas = row['tentativas'] + 1
+            erro = f"Lease expirado (worker {row['worker']})"
+            if tentativas < row['max_tentativas']:
+                conn.execute(
+                    'UPDATE lote_itens SET status = ?, tentativas = ?, erro = ?, worker = NULL, lease_ate = NULL '
+                    'WHERE id = ?',
+                    (ITEM_PENDENTE, tentativas, erro, row['id'])
+                )
+            else:
+                conn.execute(
+                    'UPDATE lote_itens SET status = ?, tentativas = ?, erro = ?, fim = ?, worker = NULL, '
+                    'lease_ate = NULL WHERE id = ?',
+                    (ITEM_ERRO, tentativas, erro, _agora_iso(), row['id'])
+                )
+                self._atualizar_status_lote(conn, row['id'])
+            logger.warning(f"Item {row['id']}: {erro} (tentativa {tentativas}/{row['max_tentativas']})")
+
+    def concluir_item(
+        self,
+        item_id: int,
+        worker_id: str,
+        execucao_id: Optional[int] = None,
+        tempo_real: Optional[float] = None
+    ) -> bool:
+        """
+        Marca item como concluído com sucesso.
+
+        Returns:
+            False se o worker não detém mais o item (lease expirado e
+            recuperado); nesse caso nada é gravado
+        """
+        with self._transacao() as conn:
+            atualizado = conn.execute(
+                'UPDATE lote_itens SET status = ?, fim = ?, execucao_id = ?, tempo_real = ?, '
+                'lease_ate = NULL, erro = NULL WHERE id = ? AND worker = ? AND status = ?',
+                (ITEM_OK, _agora_iso(), execucao_id, tempo_real, item_id, worker_id, ITEM_EM_EXECUCAO)
+            ).rowcount
+            if atualizado:
+                self._atualizar_status_lote(conn, item_id)
+        if not atualizado:
+            logger.warning(f"Resultado do item {item_id} descartado: worker {worker_id} não detém mais o lease")
+        return bool(atualizado)
+
+    def falhar_item(self, item_id: int, worker_id: str, erro: str, retry_delay: float = 60.0) -> Optional[bool]:
+        """
+        Registra falha de um item. Reagenda enquanto houver tentativas.
+
+        Returns:
+            True se o item voltou para a fila, False se falhou definitivamente,
+            None se o worker não detém mais o item (nada é gravado)
+        """
+        with self._transacao() as conn:
+            row = conn.execute(
+                'SELECT tentativas, max_tentativas FROM lote_itens WHERE id = ? AND worker = ? AND status = ?',
+                (item_id, worker_id, ITEM_EM_EXECUCAO)
+            ).fetchone()
+            if row is None:
+                logger.warning(f"Falha do item {item_id} descartada: worker {worker_id} não detém mais o lease")
+                return None
+            tentativas = row['tentativas'] + 1
+            reagendar = tentativas < row['max_tentativas']
+            if reagendar:
+                conn.execute(
+                    'UPDATE lote_itens SET status = ?, tentativas = ?, erro = ?, disponivel_em = ?, '
+                    'lease_ate = NULL, worker = NULL WHERE id = ?',
+                    (ITEM_PENDENTE, tentativas, erro, time.time() + retry_delay, item_id)
+                )
+            else:
+                conn.execute(
+                    'UPDATE lote_itens SET status = ?, tentativas = ?, erro = ?, fim = ?, lease_ate = NULL '
+                    'WHERE id = ?',
+                    (ITEM_ERRO, tentativas, erro, _agora_iso(), item_id)
+                )
+                self._atualizar_status_lote(conn, item_id)
+        return reagendar
+
+    def _atualizar_status_lote(self, conn: sqlite3.Connection, item_id: int):
+        """Fecha o lote quando não restam itens pendentes ou em execução"""
+        row = conn.execute(
+            '''
+            SELECT l.id_lote, l.status,
+                   SUM(CASE WHEN i.status IN (?, ?) THEN 1 ELSE 0 END) AS abertos,
+                   SUM(CASE WHEN i.status = ? THEN 1 ELSE 0 END) AS concluidos
+            FROM lotes_fila l JOIN lote_itens i ON i.id_lote = l.id_lote
+            WHERE l.id_lote = (SELECT id_lote FROM lote_itens WHERE id = ?)
+            GROUP BY l.id_lote
+            ''',
+            (ITEM_PENDENTE, ITEM_EM_EXECUCAO, ITEM_OK, item_id)
+        ).fetchone()
+        if row is None or row['abertos'] or row['status'] == LOTE_CANCELADO:
+            return
+        status = LOTE_CONCLUIDO if row['concluidos'] else LOTE_FALHOU
+        conn.execute(
+            'UPDATE lotes_fila SET status = ?, fim = ? WHERE id_lote = ?',
+            (status, _agora_iso(), row['id_lote'])
+        )
+        logger.info(f"Lote finalizado: {row['id_lote']} ({status})")
+
+    def cancelar_lote(self, id_lote: str) -> bool:
+        """Cancela itens pendentes de um lote; itens em execução terminam normalmente"""
+        with self._transacao() as conn:
+            atualizado = conn.execute(
+                'UPDATE lotes_fila SET status = ?, fim = ? WHERE id_lote = ? AND status IN (?, ?)',
+                (LOTE_CANCELADO, _agora_iso(), id_lote, LOTE_PENDENTE, LOTE_EM_EXECUCAO)
+            ).rowcount
+            if not atualizado:
+                return False
+            conn.execute(
+                'UPDATE lote_itens SET status = ?, fim = ? WHERE id_lote = ? AND status = ?',
+                (ITEM_CANCELADO, _agora_iso(), id_lote, ITEM_PENDENTE)
+            )
+        logger.info(f"Lote cancelado: {id_lote}")
+        return True
+
+    def obter_status(self, id_lote: str) -> Optional[Dict[str, Any]]:
+        """Progresso atual do lote, no formato de /execucoes/lote/status"""
+        with self._conectar() as conn:
+            lote = conn.execute('SELECT * FROM lotes_fila WHERE id_lote = ?', (id_lote,)).fetchone()
+            if lote is None:
+                return None
+            itens = conn.execute(
+                'SELECT * FROM lote_itens WHERE id_lote = ? ORDER BY posicao', (id_lote,)
+            ).fetchall()
+
+        contagem = {ITEM_PENDENTE: 0, ITEM_EM_EXECUCAO: 0, ITEM_OK: 0, ITEM_ERRO: 0, ITEM_CANCELADO: 0}
+        for item in itens:
+            contagem[item['status']] = contagem.get(item['status'], 0) + 1
+        total = lote['total']
+        finalizados = contagem[ITEM_OK] + contagem[ITEM_ERRO] + contagem[ITEM_CANCELADO]
+        return {
+            'id_lote': id_lote,
+            'status': lote['status'],
+            'prioridade': lote['prioridade'],
+            'total': total,
+            'concluidos': contagem[ITEM_OK],
+            'erros': contagem[ITEM_ERRO],
+            'pendentes': contagem[ITEM_PENDENTE],
+            'em_execucao': contagem[ITEM_EM_EXECUCAO],
+            'cancelados': contagem[ITEM_CANCELADO],
+            'progresso': finalizados / total * 100 if total else 0,
+            'criado_em': lote['criado_em'],
+            'inicio': lote['inicio'],
+            'fim': lote['fim'],
+            'itens': [
+                {
+                    'categoria_id': item['categoria_id'],
+                    'inicio': item['inicio'],
+                    'fim': item['fim'],
+                    'status': item['status'],
+                    'erro': item['erro'],
+                    'execucao_id': item['execucao_id'],
+                    'tempo_real': item['tempo_real'],
+                    'tentativas': item['tentativas']
+                }
+                for item in itens
+            ]
+        }
+
+    def contar_itens(self, status: str = ITEM_PENDENTE) -> int:
+        """Quantidade de itens com o status informado (todos os lotes)"""
+        with self._conectar() as conn:
+            return conn.execute('SELECT COUNT(*) FROM lote_itens WHERE status = ?', (status,)).fetchone()[0]
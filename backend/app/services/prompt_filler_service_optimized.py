@@ -17,8 +17,10 @@ Tracing ID: PROMPT_FILLER_OPTIMIZED_001
 """
 
 import json
+import re
 import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
@@ -66,6 +68,67 @@ class ProcessingResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+# Lacunas suportadas e o campo de DadosColetados que preenche cada uma
+LACUNAS_PREENCHIMENTO = {
+    '[PALAVRA-CHAVE PRINCIPAL DO CLUSTER]': 'primary_keyword',
+    '[PALAVRAS-CHAVE SECUNDÁRIAS]': 'secondary_keywords',
+    '[CLUSTER DE CONTEÚDO]': 'cluster_content'
+}
+_PADRAO_LACUNAS = re.compile('|'.join(re.escape(lacuna) for lacuna in LACUNAS_PREENCHIMENTO))
+
+ETAPAS_LOTE = ('carga', 'compilacao', 'preenchimento', 'persistencia')
+
+
+@dataclass
+class PlanoPreenchimento:
+    """
+    Template de prompt compilado: trechos literais intercalados com as lacunas.
+
+    ``posicoes`` guarda (início, fim, lacuna) de cada ocorrência no template
+    original; preencher é só juntar os trechos com os valores, sem varrer o
+    texto de novo para cada categoria.
+    """
+    trechos: List[str]
+    lacunas_ordem: List[str]
+    posicoes: List[Tuple[int, int, str]]
+    lacunas: List[str]
+
+    @classmethod
+    def compilar(cls, conteudo: str) -> 'PlanoPreenchimento':
+        trechos, lacunas_ordem, posicoes = [], [], []
+        cursor = 0
+        for match in _PADRAO_LACUNAS.finditer(conteudo):
+            trechos.append(conteudo[cursor:match.start()])
+            lacunas_ordem.append(match.group())
+            posicoes.append((match.start(), match.end(), match.group()))
+            cursor = match.end()
+        trechos.append(conteudo[cursor:])
+        presentes = set(lacunas_ordem)
+        return cls(
+            trechos=trechos,
+            lacunas_ordem=lacunas_ordem,
+            posicoes=posicoes,
+            lacunas=[lacuna for lacuna in LACUNAS_PREENCHIMENTO if lacuna in presentes]
+        )
+
+    def preencher(self, dados: Dict[str, Any]) -> str:
+        """
+        Como em ``_preencher_lacunas`` (caminho por item), falha se uma lacuna
+        presente no template não tiver valor; valores vazios são aceitos.
+        """
+        valores = {}
+        for lacuna in self.lacunas:
+            campo = LACUNAS_PREENCHIMENTO[lacuna]
+            if dados.get(campo) is None:
+                raise ValueError(f"Campo '{campo}' ausente para a lacuna {lacuna}")
+            valores[lacuna] = dados[campo]
+        partes = [self.trechos[0]]
+        for lacuna, trecho in zip(self.lacunas_ordem, self.trechos[1:]):
+            partes.append(valores[lacuna])
+            partes.append(trecho)
+        return ''.join(partes)
+
+
 class PromptFillerServiceOptimized:
     """Serviço otimizado de preenchimento de prompts"""
     
@@ -79,6 +142,11 @@ class PromptFillerServiceOptimized:
         self.default_ttl = 3600  # 1 hora
         self.max_retries = 3
         self.timeout_seconds = 30
+        self.max_workers_lote = 8
+        self.max_planos_cache = 256
+        
+        # Planos de preenchimento compilados, por hash do conteúdo do template
+        self._planos: Dict[str, PlanoPreenchimento] = {}
         
         # Estatísticas
         self.stats = {
@@ -86,7 +154,15 @@ class PromptFillerServiceOptimized:
             'cache_hits': 0,
             'cache_misses': 0,
             'errors': 0,
-            'avg_processing_time': 0.0
+            'avg_processing_time': 0.0,
+            'batches': 0,
+            'plan_compilations': 0,
+            'plan_cache_hits': 0
+        }
+        
+        # Tempo por etapa do processamento em lote (último lote e acumulado)
+        self.batch_stage_timings = {
+            etapa: {'last': 0.0, 'total': 0.0} for etapa in ETAPAS_LOTE
         }
         
         self.logger.info("Serviço de preenchimento de prompts otimizado inicializado")
@@ -369,11 +445,65 @@ class PromptFillerServiceOptimized:
             updated_at=datetime.utcnow()
         )
     
+    def _obter_plano(self, prompt_base: PromptBase) -> PlanoPreenchimento:
+        """Plano compilado do template, reaproveitado enquanto o conteúdo não muda"""
+        chave = prompt_base.hash_conteudo or str(hash(prompt_base.conteudo))
+        plano = self._planos.get(chave)
+        if plano is not None:
+            self.stats['plan_cache_hits'] += 1
+            return plano
+        
+        plano = PlanoPreenchimento.compilar(prompt_base.conteudo)
+        if len(self._planos) >= self.max_planos_cache:
+            self._planos.pop(next(iter(self._planos)))
+        self._planos[chave] = plano
+        self.stats['plan_compilations'] += 1
+        return plano
+    
+    def _preencher_item(self, dados: DadosColetados, plano: PlanoPreenchimento) -> ProcessingResult:
+        """Preenche um item do lote (sem acesso ao banco; executado nos workers)"""
+        inicio = time.perf_counter()
+        cache_key = f"prompt_fill_{dados.categoria_id}_{dados.id}"
+        try:
+            cached_result = self.cache.get(cache_key)
+            if cached_result:
+                return ProcessingResult(
+                    success=True,
+                    prompt_preenchido=cached_result,
+                    lacunas_detectadas=plano.lacunas,
+                    lacunas_preenchidas=plano.lacunas,
+                    tempo_processamento=time.perf_counter() - inicio,
+                    cache_hit=True
+                )
+            
+            prompt_preenchido = plano.preencher({
+                'primary_keyword': dados.primary_keyword,
+                'secondary_keywords': dados.secondary_keywords,
+                'cluster_content': dados.cluster_content
+            })
+            if not self._validar_preenchimento(prompt_preenchido, plano.lacunas):
+                return ProcessingResult(success=False, error="Preenchimento inválido")
+            
+            self.cache.set(cache_key, prompt_preenchido, ttl=self.default_ttl, level=CacheLevel.L1)
+            return ProcessingResult(
+                success=True,
+                prompt_preenchido=prompt_preenchido,
+                lacunas_detectadas=plano.lacunas,
+                lacunas_preenchidas=plano.lacunas,
+                tempo_processamento=time.perf_counter() - inicio
+            )
+        except Exception as e:
+            return ProcessingResult(success=False, error=str(e))
+    
     @monitor_performance("prompt_fill_batch")
     def processar_lote(self, nicho_id: int) -> List[PromptPreenchido]:
         """
         Processa preenchimento em lote para um nicho
         
+        Carrega dados, templates e registros existentes em poucas consultas,
+        compila cada template uma vez, preenche as categorias em paralelo e
+        grava tudo em um único flush/commit ao final.
+        
         Args:
             nicho_id: ID do nicho
             
@@ -387,39 +517,115 @@ class PromptFillerServiceOptimized:
             function="processar_lote",
             metadata={'nicho_id': nicho_id}
         )
+        tempos = dict.fromkeys(ETAPAS_LOTE, 0.0)
         
         try:
             db = next(get_db())
             
-            # Buscar todas as categorias do nicho com dados coletados
+            # Etapa 1: carga em lote (dados do nicho, templates e registros já existentes)
+            etapa = time.perf_counter()
             categorias_com_dados = db.query(DadosColetados).filter(
                 DadosColetados.nicho_id == nicho_id,
                 DadosColetados.status == 'ativo'
             ).all()
+            categoria_ids = {dados.categoria_id for dados in categorias_com_dados}
+            prompts_base = {
+                prompt_base.categoria_id: prompt_base
+                for prompt_base in db.query(PromptBase).filter(PromptBase.categoria_id.in_(categoria_ids)).all()
+            } if categoria_ids else {}
+            dados_ids = [dados.id for dados in categorias_com_dados]
+            existentes = {
+                prompt.dados_coletados_id: prompt
+                for prompt in db.query(PromptPreenchido).filter(PromptPreenchido.dados_coletados_id.in_(dados_ids)).all()
+            } if dados_ids else {}
+            tempos['carga'] = time.perf_counter() - etapa
             
-            resultados = []
-            sucessos = 0
-            erros = 0
+            # Etapa 2: um plano compilado por template
+            etapa = time.perf_counter()
+            planos = {
+                categoria_id: self._obter_plano(prompt_base)
+                for categoria_id, prompt_base in prompts_base.items()
+            }
+            tempos['compilacao'] = time.perf_counter() - etapa
             
-            for dados in categorias_com_dados:
-                try:
-                    prompt_preenchido = self.processar_preenchimento(
-                        dados.categoria_id, dados.id
-                    )
-                    resultados.append(prompt_preenchido)
-                    sucessos += 1
-                    
-                except Exception as e:
+            sem_template = sorted(categoria_ids - planos.keys())
+            if sem_template:
+                self.logger.warning(
+                    f"Categorias sem PromptBase ignoradas no lote: {sem_template}",
+                    category=LogCategory.BUSINESS,
+                    context=context,
+                    data={'categorias_sem_template': sem_template}
+                )
+            
+            # Etapa 3: preenchimento paralelo (sem acesso ao banco nos workers)
+            etapa = time.perf_counter()
+            itens = [dados for dados in categorias_com_dados if dados.categoria_id in planos]
+            erros = len(categorias_com_dados) - len(itens)
+            with ThreadPoolExecutor(max_workers=self.max_workers_lote) as executor:
+                resultados_itens = list(executor.map(
+                    lambda dados: self._preencher_item(dados, planos[dados.categoria_id]), itens
+                ))
+            tempos['preenchimento'] = time.perf_counter() - etapa
+            
+            # Etapa 4: gravação única (inserts agrupados pelo flush + um commit)
+            etapa = time.perf_counter()
+            resultados = []
+            agora = datetime.utcnow()
+            for dados, result in zip(itens, resultados_itens):
+                if result.cache_hit:
+                    self.stats['cache_hits'] += 1
+                else:
+                    self.stats['cache_misses'] += 1
+                if not result.success:
                     erros += 1
                     self.logger.error(
                         f"Erro no processamento de lote para categoria {dados.categoria_id}",
                         category=LogCategory.ERROR,
                         context=context,
-                        error=e
+                        error=Exception(result.error)
                     )
+                    continue
+                
+                campos = {
+                    'prompt_base_id': prompts_base[dados.categoria_id].id,
+                    'prompt_original': prompts_base[dados.categoria_id].conteudo,
+                    'prompt_preenchido': result.prompt_preenchido,
+                    'lacunas_detectadas': json.dumps(result.lacunas_detectadas),
+                    'lacunas_preenchidas': json.dumps(result.lacunas_preenchidas),
+                    'status': 'pronto',
+                    'tempo_processamento': int(result.tempo_processamento * 1000)
+                }
+                prompt = existentes.get(dados.id)
+                if prompt is None:
+                    prompt = PromptPreenchido(dados_coletados_id=dados.id, **campos)
+                    db.add(prompt)
+                else:
+                    for campo, valor in campos.items():
+                        setattr(prompt, campo, valor)
+                    prompt.updated_at = agora
+                resultados.append(prompt)
+            
+            if resultados:
+                db.commit()
+            tempos['persistencia'] = time.perf_counter() - etapa
             
+            sucessos = len(resultados)
             processing_time = time.time() - start_time
             
+            # Atualizar estatísticas
+            self.stats['batches'] += 1
+            self.stats['errors'] += erros
+            if sucessos:
+                total_anterior = self.stats['total_processed']
+                self.stats['total_processed'] += sucessos
+                self.stats['avg_processing_time'] = (
+                    (self.stats['avg_processing_time'] * total_anterior + processing_time)
+                    / self.stats['total_processed']
+                )
+            for nome, duracao in tempos.items():
+                self.batch_stage_timings[nome]['last'] = duracao
+                self.batch_stage_timings[nome]['total'] += duracao
+            
             # Registrar métricas
             record_response_time("prompt_fill_batch", processing_time * 1000)
             record_error_rate("prompt_fill_batch", erros, sucessos + erros)
@@ -432,7 +638,8 @@ class PromptFillerServiceOptimized:
                     'total_processados': len(categorias_com_dados),
                     'sucessos': sucessos,
                     'erros': erros,
-                    'tempo_processamento': processing_time
+                    'tempo_processamento': processing_time,
+                    'tempo_etapas': tempos
                 }
             )
             
@@ -468,6 +675,12 @@ class PromptFillerServiceOptimized:
                 if self.stats['total_processed'] > 0 else 0
             ),
             'avg_processing_time': self.stats['avg_processing_time'],
+            'batches': self.stats['batches'],
+            'plan_compilations': self.stats['plan_compilations'],
+            'plan_cache_hits': self.stats['plan_cache_hits'],
+            'batch_stage_timings': {
+                etapa: dict(tempos) for etapa, tempos in self.batch_stage_timings.items()
+            },
             'cache_stats': self.cache.get_stats(),
             'performance_stats': self.performance_monitor.get_dashboard_data()
         }
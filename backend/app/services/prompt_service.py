@@ -10,7 +10,7 @@ Versão: 1.0.0
 
 import os
 import json
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from backend.app.utils.log_event import log_event
 
 
@@ -43,6 +43,8 @@ class PromptService:
         self.cache_enabled = cache_enabled
         self.max_cache_size = max_cache_size
         self._prompt_cache = {}
+        # (prompt_path) a cada leitura servida pelo cache
+        self.on_cache_hit: Optional[Callable[[str], None]] = None
         self._template_placeholders = {
             '[PALAVRA-CHAVE]': 'palavras_chave',
             '[CLUSTER]': 'cluster',
@@ -88,6 +90,20 @@ class PromptService:
             for key in keys_to_remove:
                 del self._prompt_cache[key]
     
+    def prompt_em_cache(self, prompt_path: str) -> bool:
+        """
+        Indica se o prompt está no cache (sem ler o arquivo).
+        
+        Args:
+            prompt_path: Caminho do arquivo de prompt
+            
+        Returns:
+            True se a próxima leitura for servida pelo cache
+        """
+        if not self.cache_enabled:
+            return False
+        return self._gerar_chave_cache(self._normalizar_caminho(prompt_path)) in self._prompt_cache
+    
     def ler_prompt(self, prompt_path: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Lê um arquivo de prompt.
@@ -105,6 +121,12 @@ class PromptService:
             if self.cache_enabled:
                 chave_cache = self._gerar_chave_cache(caminho_normalizado)
                 if chave_cache in self._prompt_cache:
+                    if self.on_cache_hit:
+                        try:
+                            self.on_cache_hit(prompt_path)
+                        except Exception as e:
+                            log_event('erro', 'PromptService',
+                                     detalhes=f'Erro no callback de acerto de cache: {e}')
                     return True, None, self._prompt_cache[chave_cache]
             
             # Verificar se arquivo existe
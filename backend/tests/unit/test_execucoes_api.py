@@ -266,9 +266,9 @@ class TestExecucoesAPI:
         # Mock do processamento de lote
         with patch('backend.app.api.execucoes.processar_lote_execucoes') as mock_process:
             mock_process.return_value = {
-                "lote_id": "lote-123",
-                "total_execucoes": 2,
-                "status": "processando"
+                "id_lote": "lote-123",
+                "total": 2,
+                "status": "enfileirado"
             }
             
             # Act
@@ -277,11 +277,11 @@ class TestExecucoesAPI:
                                  content_type='application/json')
             
             # Assert
-            assert response.status_code == 200
+            assert response.status_code == 202
             response_data = json.loads(response.data)
-            assert 'lote_id' in response_data
-            assert 'total_execucoes' in response_data
-            assert 'status' in response_data
+            assert response_data['id_lote'] == 'lote-123'
+            assert response_data['total'] == 2
+            assert response_data['status'] == 'enfileirado'
     
     def test_status_lote_success(self, client, mock_auth_required, mock_db_session):
         """
@@ -349,4 +349,203 @@ class TestExecucoesAPI:
         
         # Teste fora dos limites
         assert 51 > limite_max_palavras
-        assert 101 > limite_max_execucoes_lote 
\ No newline at end of file
+        assert 101 > limite_max_execucoes_lote
+    
+    def test_cursor_de_paginacao_ida_e_volta(self):
+        """
+        Teste: Cursor opaco da listagem preserva a posição (data_execucao, id)
+        Baseado nos helpers reais de GET /api/execucoes/
+        """
+        from backend.app.api.execucoes import _codificar_cursor, _decodificar_cursor
+        
+        linha = Mock(data_execucao=datetime(2025, 1, 27, 10, 30, 5, 120), id=42)
+        cursor = _codificar_cursor(linha)
+        
+        assert '=' not in cursor
+        assert _decodificar_cursor(cursor) == (datetime(2025, 1, 27, 10, 30, 5, 120), 42)
+        with pytest.raises(ValueError):
+            _decodificar_cursor('cursor-invalido')
+    
+    def test_filtro_valida_projecao_de_campos(self):
+        """
+        Teste: Parâmetro fields aceita apenas campos da listagem
+        """
+        filtros = ExecucaoFilterRequest(fields=['id', 'status'], stream=True)
+        assert filtros.fields == ['id', 'status']
+        assert filtros.stream is True
+        
+        with pytest.raises(ValueError):
+            ExecucaoFilterRequest(fields=['id', 'prompt_usado'])
+
+
+class TestListagemExecucoesSQLite:
+    """
+    Testes de GET /api/execucoes/ contra um SQLite real
+    (paginação por cursor, filtro por nicho, projeção e streaming)
+    """
+    
+    @pytest.fixture
+    def app(self):
+        """Aplicação com o blueprint real; a autenticação é removida da view"""
+        from backend.app.api.execucoes import listar_execucoes
+        from backend.app.models import Nicho
+        
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(app)
+        app.register_blueprint(execucoes_bp)
+        app.view_functions['execucoes.listar_execucoes'] = listar_execucoes.__wrapped__
+        
+        with app.app_context():
+            db.create_all()
+            saude = Nicho(nome='Saúde')
+            tecnologia = Nicho(nome='Tecnologia')
+            categorias = {
+                nicho.nome: Categoria(nome=f'Blog {nicho.nome}', nicho=nicho, perfil_cliente='pme',
+                                      cluster='geral', prompt_path='p.txt')
+                for nicho in (saude, tecnologia)
+            }
+            db.session.add_all(categorias.values())
+            db.session.flush()
+            
+            # Cinco execuções de Saúde com a mesma data_execucao e duas de Tecnologia
+            mesma_data = datetime(2025, 1, 27, 10, 0)
+            for indice in range(5):
+                db.session.add(Execucao(
+                    id_categoria=categorias['Saúde'].id, palavras_chave=json.dumps([f'termo {indice}']),
+                    cluster_usado='geral', prompt_usado='p.txt', status='executado', data_execucao=mesma_data
+                ))
+            for dia in (26, 28):
+                db.session.add(Execucao(
+                    id_categoria=categorias['Tecnologia'].id, palavras_chave=json.dumps(['api']),
+                    cluster_usado='geral', prompt_usado='p.txt', status='executado',
+                    data_execucao=datetime(2025, 1, dia, 10, 0)
+                ))
+            db.session.commit()
+            app.config['NICHOS'] = {'saude': saude.id, 'tecnologia': tecnologia.id}
+            yield app
+            db.session.remove()
+            db.drop_all()
+    
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+    
+    def _ordem_esperada(self):
+        return [
+            e.id for e in Execucao.query.order_by(Execucao.data_execucao.desc(), Execucao.id.desc())
+        ]
+    
+    def test_paginas_por_cursor_cobrem_datas_iguais_sem_repetir(self, client):
+        """
+        Teste: Páginas seguidas pelo header X-Next-Cursor não repetem nem pulam
+        linhas com a mesma data_execucao (desempate por id)
+        """
+        ids = []
+        url = '/api/execucoes/?limit=2'
+        while True:
+            response = client.get(url)
+            assert response.status_code == 200
+            ids.extend(item['id'] for item in response.get_json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            url = f'/api/execucoes/?limit=2&cursor={cursor}'
+        
+        assert ids == self._ordem_esperada()
+        assert len(ids) == 7
+    
+    def test_filtro_por_nicho(self, app, client):
+        """
+        Teste: nicho_id filtra pela categoria da execução
+        """
+        response = client.get(f"/api/execucoes/?nicho_id={app.config['NICHOS']['tecnologia']}")
+        
+        assert response.status_code == 200
+        datas = [item['data_execucao'] for item in response.get_json()]
+        assert datas == ['2025-01-28T10:00:00', '2025-01-26T10:00:00']
+    
+    def test_projecao_de_campos(self, client):
+        """
+        Teste: fields restringe as chaves de cada item da resposta
+        """
+        response = client.get('/api/execucoes/?fields=status,palavras_chave&limit=1')
+        
+        assert response.status_code == 200
+        assert response.get_json() == [{'status': 'executado', 'palavras_chave': ['api']}]
+    
+    def test_streaming_retorna_array_json_completo(self, app, client):
+        """
+        Teste: stream=true devolve todas as linhas, sem limite implícito,
+        como um único array JSON
+        """
+        response = client.get(
+            f"/api/execucoes/?stream=true&fields=id&nicho_id={app.config['NICHOS']['saude']}"
+        )
+        
+        assert response.status_code == 200
+        assert response.is_streamed
+        itens = json.loads(response.get_data(as_text=True))
+        assert [item['id'] for item in itens] == self._ordem_esperada()[1:6]
+        assert all(set(item) == {'id'} for item in itens)
+
+
+class TestEnfileiramentoLote:
+    """
+    Testes dos códigos de resposta de POST /api/execucoes/lote
+    """
+    
+    @pytest.fixture
+    def client(self):
+        """Aplicação com o blueprint real; autenticação e limites são removidos da view"""
+        import inspect
+        from backend.app.api.execucoes import executar_lote
+        
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(app)
+        app.register_blueprint(execucoes_bp)
+        app.view_functions['execucoes.executar_lote'] = inspect.unwrap(executar_lote)
+        
+        with app.app_context():
+            db.create_all()
+            yield app.test_client()
+            db.session.remove()
+            db.drop_all()
+    
+    def _enviar(self, client, resultado):
+        request_data = {
+            "execucoes": [
+                {
+                    "categoria_id": 1,
+                    "palavras_chave": ["palavra1"],
+                    "cluster": "cluster-1"
+                }
+            ]
+        }
+        with patch('backend.app.api.execucoes.processar_lote_execucoes', return_value=resultado):
+            return client.post('/api/execucoes/lote',
+                               data=json.dumps(request_data),
+                               content_type='application/json')
+    
+    def test_lote_enfileirado_retorna_202(self, client):
+        response = self._enviar(client, {'id_lote': 'lote-123', 'status': 'enfileirado', 'total': 1})
+        
+        assert response.status_code == 202
+        assert json.loads(response.data)['id_lote'] == 'lote-123'
+    
+    def test_lote_invalido_retorna_400(self, client):
+        response = self._enviar(client, {'id_lote': None, 'erros_validacao': ['Categoria 1 não encontrada']})
+        
+        assert response.status_code == 400
+        response_data = json.loads(response.data)
+        assert response_data['codigo'] == 'VALIDATION_ERROR'
+        assert response_data['detalhes']['erros'] == ['Categoria 1 não encontrada']
+    
+    def test_falha_da_fila_retorna_503(self, client):
+        response = self._enviar(client, {'id_lote': None, 'erro_interno': 'database is locked'})
+        
+        assert response.status_code == 503
+        assert json.loads(response.data)['codigo'] == 'QUEUE_UNAVAILABLE'
@@ -2,7 +2,7 @@ from typing import Dict, List, Optional, Any
 """
 Testes unitários para KeywordGapSuggester (keyword_gap_suggestion_v1.py)
 """
-from backend.app.services.keyword_gap_suggestion_v1 import KeywordGapSuggester
+from backend.app.services.keyword_gap_suggestion_v1 import IndiceCandidatos, KeywordGapSuggester, benchmark_sugestoes
 
 def test_detectar_lacunas():
     sugg = KeywordGapSuggester()
@@ -33,4 +33,37 @@ def test_validar_complementaridade():
 def test_similaridade_edge_case():
     sugg = KeywordGapSuggester()
     assert sugg.similaridade('', '') == 1.0
-    assert sugg.similaridade('a', '') == 0.0 
\ No newline at end of file
+    assert sugg.similaridade('a', '') == 0.0 
+def test_sugerir_secundarias_indexado_igual_ao_exaustivo():
+    sugg = KeywordGapSuggester(threshold=0.6)
+    primarias = [{'termo': 'marketing digital'}, {'termo': 'seo local'}, {'termo': ''}]
+    candidatos = [
+        {'termo': 'marketing digital avancado'},
+        {'termo': 'seo local para lojas'},
+        {'termo': 'financas pessoais'},
+        {'termo': 'marketing digital'},
+        {'termo': 'seo'},
+        {'termo': ''},
+    ]
+    exaustivo = [c for p in primarias for c in candidatos if sugg.similaridade(p['termo'], c['termo']) >= 0.6]
+    assert sugg.sugerir_secundarias(primarias, candidatos) == exaustivo
+    assert sugg.sugerir_secundarias(primarias, IndiceCandidatos(candidatos)) == exaustivo
+
+def test_sugerir_top_k_com_scores():
+    sugg = KeywordGapSuggester(threshold=0.5)
+    candidatos = [
+        {'termo': 'marketing de conteudo'},
+        {'termo': 'marketing digital avancado'},
+        {'termo': 'marketing digital'},
+        {'termo': 'culinaria vegana'},
+    ]
+    resultado = sugg.sugerir_top_k([{'termo': 'marketing digital'}], candidatos, k=2)
+    sugestoes = resultado[0]['sugestoes']
+    assert [item['candidato']['termo'] for item in sugestoes] == ['marketing digital', 'marketing digital avancado']
+    assert sugestoes[0]['similaridade'] == 1.0
+    assert sugestoes[0]['similaridade'] >= sugestoes[1]['similaridade'] >= 0.5
+
+def test_benchmark_resultado_identico_com_menos_comparacoes():
+    resultado = benchmark_sugestoes(n_primarias=10, n_candidatos=200, threshold=0.7)
+    assert resultado['identico']
+    assert resultado['comparacoes_indexado'] < resultado['comparacoes_exaustivo']
@@ -0,0 +1,232 @@
+"""
+Representação colunar de lotes de keywords.
+
+KeywordBatch guarda cada campo de Keyword em um array NumPy (uma posição por
+keyword), permitindo que normalização, validação e score operem sobre a
+coluna inteira em vez de reconstruir objetos Keyword um a um.
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from domain.models import IntencaoBusca, Keyword
+
+# Códigos inteiros da coluna `intencao` (posição no enum)
+INTENCOES: List[IntencaoBusca] = list(IntencaoBusca)
+CODIGO_INTENCAO: Dict[IntencaoBusca, int] = {intencao: codigo for codigo, intencao in enumerate(INTENCOES)}
+
+
+def _coluna_objeto(valores: Sequence) -> np.ndarray:
+    """Array 1-D de objetos (evita que NumPy tente inferir shape de strings/datetimes)."""
+    coluna = np.empty(len(valores), dtype=object)
+    coluna[:] = list(valores)
+    return coluna
+
+
+@dataclass
+class KeywordBatch:
+    """
+    Lote colunar de keywords.
+
+    Colunas numéricas usam dtypes nativos (int64/float64/int8) e colunas de
+    texto usam arrays de objetos. Fatiar com slices retorna views (sem cópia);
+    máscaras booleanas e arrays de índices retornam cópias, como em NumPy.
+    """
+    termo: np.ndarray
+    volume_busca: np.ndarray
+    cpc: np.ndarray
+    concorrencia: np.ndarray
+    intencao: np.ndarray
+    score: np.ndarray
+    justificativa: np.ndarray
+    fonte: np.ndarray
+    data_coleta: np.ndarray
+    ordem_no_cluster: np.ndarray
+    fase_funil: np.ndarray
+    nome_artigo: np.ndarray
+
+    def __post_init__(self):
+        tamanhos = {len(getattr(self, campo.name)) for campo in fields(self)}
+        if len(tamanhos) > 1:
+            raise ValueError("Todas as colunas do KeywordBatch devem ter o mesmo tamanho")
+
+    def __len__(self) -> int:
+        return len(self.termo)
+
+    def __getitem__(self, seletor: Union[slice, np.ndarray, List[int]]) -> "KeywordBatch":
+        if isinstance(seletor, (int, np.integer)):
+            seletor = slice(seletor, seletor + 1 if seletor != -1 else None)
+        return KeywordBatch(**{campo.name: getattr(self, campo.name)[seletor] for campo in fields(self)})
+
+    def __iter__(self) -> Iterator[Keyword]:
+        return iter(self.para_keywords())
+
+    def copy(self) -> "KeywordBatch":
+        return KeywordBatch(**{campo.name: getattr(self, campo.name).copy() for campo in fields(self)})
+
+    @classmethod
+    def vazio(cls) -> "KeywordBatch":
+        return cls.from_keywords([])
+
+    @classmethod
+    def from_keywords(cls, keywords: Sequence[Keyword]) -> "KeywordBatch":
+        """Converte List[Keyword] para o formato colunar (sem perda de campos)."""
+        return cls(
+            termo=_coluna_objeto([kw.termo for kw in keywords]),
+            volume_busca=np.fromiter((kw.volume_busca for kw in keywords), dtype=np.int64, count=len(keywords)),
+            cpc=np.fromiter((kw.cpc for kw in keywords), dtype=np.float64, count=len(keywords)),
+            concorrencia=np.fromiter((kw.concorrencia for kw in keywords), dtype=np.float64, count=len(keywords)),
+            intencao=np.fromiter((CODIGO_INTENCAO[kw.intencao] for kw in keywords), dtype=np.int8, count=len(keywords)),
+            score=np.fromiter((kw.score for kw in keywords), dtype=np.float64, count=len(keywords)),
+            justificativa=_coluna_objeto([kw.justificativa for kw in keywords]),
+            fonte=_coluna_objeto([kw.fonte for kw in keywords]),
+            data_coleta=_coluna_objeto([kw.data_coleta for kw in keywords]),
+            ordem_no_cluster=np.fromiter((kw.ordem_no_cluster for kw in keywords), dtype=np.int32, count=len(keywords)),
+            fase_funil=_coluna_objeto([kw.fase_funil for kw in keywords]),
+            nome_artigo=_coluna_objeto([kw.nome_artigo for kw in keywords]),
+        )
+
+    @classmethod
+    def from_colunas(
+        cls,
+        termo: Sequence[str],
+        volume_busca: Sequence[int],
+        cpc: Sequence[float],
+        concorrencia: Sequence[float],
+        intencao: Union[Sequence[int], Sequence[IntencaoBusca]],
+        score: Optional[Sequence[float]] = None,
+        fonte: Union[str, Sequence[str]] = "",
+        data_coleta: Optional[datetime] = None
+    ) -> "KeywordBatch":
+        """Monta um lote diretamente de colunas (ex.: saída de coletores)."""
+        total = len(termo)
+        intencao = list(intencao)
+        if intencao and isinstance(intencao[0], IntencaoBusca):
+            intencao = [CODIGO_INTENCAO[valor] for valor in intencao]
+        data_coleta = data_coleta or datetime.utcnow()
+        return cls(
+            termo=_coluna_objeto(termo),
+            volume_busca=np.asarray(volume_busca, dtype=np.int64),
+            cpc=np.asarray(cpc, dtype=np.float64),
+            concorrencia=np.asarray(concorrencia, dtype=np.float64),
+            intencao=np.asarray(intencao, dtype=np.int8),
+            score=np.zeros(total) if score is None else np.asarray(score, dtype=np.float64),
+            justificativa=_coluna_objeto([""] * total),
+            fonte=_coluna_objeto([fonte] * total if isinstance(fonte, str) else fonte),
+            data_coleta=_coluna_objeto([data_coleta] * total),
+            ordem_no_cluster=np.full(total, -1, dtype=np.int32),
+            fase_funil=_coluna_objeto([""] * total),
+            nome_artigo=_coluna_objeto([""] * total),
+        )
+
+    @staticmethod
+    def concatenar(lotes: Sequence["KeywordBatch"]) -> "KeywordBatch":
+        if not lotes:
+            return KeywordBatch.vazio()
+        return KeywordBatch(**{
+            campo.name: np.concatenate([getattr(lote, campo.name) for lote in lotes])
+            for campo in fields(KeywordBatch)
+        })
+
+    def intencoes(self) -> List[IntencaoBusca]:
+        """Decodifica a coluna de intenção para o enum."""
+        return [INTENCOES[codigo] for codigo in self.intencao]
+
+    def para_keywords(self, validar: bool = True) -> List[Keyword]:
+        """
+        Converte de volta para List[Keyword].
+
+        Com `validar=False` os objetos são montados sem passar por
+        Keyword.__post_init__ — use apenas para lotes cujos termos já
+        vieram de Keywords válidas.
+        """
+        keywords = []
+        for linha in range(len(self)):
+            valores = {
+                "termo": self.termo[linha],
+                "volume_busca": int(self.volume_busca[linha]),
+                "cpc": float(self.cpc[linha]),
+                "concorrencia": float(self.concorrencia[linha]),
+                "intencao": INTENCOES[self.intencao[linha]],
+                "score": float(self.score[linha]),
+                "justificativa": self.justificativa[linha],
+                "fonte": self.fonte[linha],
+                "data_coleta": self.data_coleta[linha],
+                "ordem_no_cluster": int(self.ordem_no_cluster[linha]),
+                "fase_funil": self.fase_funil[linha],
+                "nome_artigo": self.nome_artigo[linha],
+            }
+            if validar:
+                keywords.append(Keyword(**valores))
+            else:
+                kw = object.__new__(Keyword)
+                kw.__dict__.update(valores)
+                keywords.append(kw)
+        return keywords
+
+    def calcular_scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Versão colunar de Keyword.calcular_score: atualiza e retorna a coluna
+        `score`. Justificativas só são geradas sob demanda (ver justificativas).
+        """
+        self.score[:] = calcular_scores_lote(self.volume_busca, self.cpc, self.concorrencia, self.intencao, weights)
+        return self.score
+
+    def justificativas(self, weights: Dict[str, float], indices: Optional[Sequence[int]] = None) -> List[str]:
+        """Texto de justificativa do score (mesmo formato de Keyword.calcular_score)."""
+        linhas = range(len(self)) if indices is None else indices
+        return [
+            justificativa_score(
+                int(self.volume_busca[linha]), float(self.cpc[linha]), float(self.concorrencia[linha]),
+                int(self.intencao[linha]), float(self.score[linha]), weights
+            )
+            for linha in linhas
+        ]
+
+
+_CODIGOS_INTENCAO_FORTE = np.array([
+    CODIGO_INTENCAO[IntencaoBusca.COMERCIAL], CODIGO_INTENCAO[IntencaoBusca.TRANSACIONAL]
+], dtype=np.int8)
+
+
+def calcular_scores_lote(
+    volume_busca: np.ndarray,
+    cpc: np.ndarray,
+    concorrencia: np.ndarray,
+    intencao: np.ndarray,
+    weights: Dict[str, float]
+) -> np.ndarray:
+    """
+    Score de Keyword.calcular_score para arrays inteiros em uma única passada.
+
+    `intencao` são os códigos inteiros de CODIGO_INTENCAO. O resultado é
+    idêntico, elemento a elemento, ao cálculo escalar (mesma ordem de operações).
+    """
+    volume_busca = np.asarray(volume_busca)
+    intencao_val = np.where(np.isin(np.asarray(intencao), _CODIGOS_INTENCAO_FORTE), 1.0, 0.5)
+    return (
+        weights.get("volume", 0.4) * (volume_busca / 100) +
+        weights.get("cpc", 0.3) * np.asarray(cpc, dtype=np.float64) +
+        weights.get("intencao", 0.2) * intencao_val +
+        weights.get("concorrencia", 0.1) * np.asarray(concorrencia, dtype=np.float64)
+    )
+
+
+def justificativa_score(
+    volume_busca: int,
+    cpc: float,
+    concorrencia: float,
+    intencao: int,
+    score: float,
+    weights: Dict[str, float]
+) -> str:
+    """Justificativa textual de uma linha, no formato de Keyword.calcular_score."""
+    intencao_val = 1.0 if intencao in _CODIGOS_INTENCAO_FORTE else 0.5
+    return (
+        f"Score = {weights.get('volume', 0.4)}*volume({volume_busca}) + "
+        f"{weights.get('cpc', 0.3)}*cpc({cpc}) + "
+        f"{weights.get('intencao', 0.2)}*intencao({intencao_val}) + "
+        f"{weights.get('concorrencia', 0.1)}*concorrencia({concorrencia}) = {score:.4f}"
+    )
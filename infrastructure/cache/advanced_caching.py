@@ -28,10 +28,14 @@ import base64
 from functools import wraps
 import statistics
 
+from infrastructure.cache.tiered_cache import get_tiered_cache
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class CacheStrategy(Enum):
     """Estratégias de cache."""
     LRU = "lru"
@@ -510,20 +514,27 @@ class AdvancedCaching:
             config.compression_threshold
         )
         
-        # Caches por nível
+        # Caches por nível: namespaces do cache em camadas do processo, então
+        # memória e hit ratio entram no registro global de métricas
         self.l1_cache = None
         self.l2_cache = None
         self.l3_cache = None
         
-        if config.l1_enabled:
-            if config.strategy == CacheStrategy.LRU:
-                self.l1_cache = LRUCache(config.l1_max_size)
-            elif config.strategy == CacheStrategy.LFU:
-                self.l1_cache = LFUCache(config.l1_max_size)
+        tiered_cache = get_tiered_cache()
+        if config.l1_enabled and config.strategy in (CacheStrategy.LRU, CacheStrategy.LFU):
+            self.l1_cache = tiered_cache.namespace(
+                prefix="advanced_caching.l1",
+                max_entries=config.l1_max_size,
+                policy="lru" if config.strategy == CacheStrategy.LRU else "w-tinylfu"
+            )
         
         # Redis para L2 (simulado por enquanto)
         if config.l2_enabled:
-            self.l2_cache = LRUCache(config.l2_max_size)
+            self.l2_cache = tiered_cache.namespace(
+                prefix="advanced_caching.l2",
+                max_entries=config.l2_max_size,
+                policy="lru"
+            )
         
         # Sistema de warming e invalidation
         self.warming = CacheWarming(self, config)
@@ -572,26 +583,26 @@ class AdvancedCaching:
         
         try:
             # Tenta L1 primeiro
-            if level == CacheLevel.L1 and self.l1_cache:
-                entry = self.l1_cache.get(key)
-                if entry and not self._is_expired(entry):
+            if level == CacheLevel.L1 and self.l1_cache is not None:
+                value = self.l1_cache.get(key, _MISSING)
+                if value is not _MISSING:
                     self._record_operation_time('get', time.time() - start_time)
                     self.metrics.hits += 1
                     self.metrics.l1_hits += 1
-                    return entry.value
+                    return value
             
             # Tenta L2
-            if level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache:
-                entry = self.l2_cache.get(key)
-                if entry and not self._is_expired(entry):
-                    # Promove para L1 se disponível
-                    if self.l1_cache:
-                        self.l1_cache.set(key, entry)
+            if level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache is not None:
+                value = self.l2_cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    # Promove para L1 se disponível, com o TTL restante
+                    if self.l1_cache is not None:
+                        self.l1_cache.set(key, value, ttl=self.l2_cache.ttl_remaining(key))
                     
                     self._record_operation_time('get', time.time() - start_time)
                     self.metrics.hits += 1
                     self.metrics.l2_hits += 1
-                    return entry.value
+                    return value
             
             # Miss
             self.metrics.misses += 1
@@ -623,25 +634,12 @@ class AdvancedCaching:
         ttl = ttl or self.config.default_ttl
         
         try:
-            # Serializa e comprime
-            serialized = self.serializer.serialize(value)
-            compressed = self.compressor.compress(serialized)
-            
-            entry = CacheEntry(
-                key=key,
-                value=compressed,
-                created_at=time.time(),
-                accessed_at=time.time(),
-                access_count=0,
-                ttl=ttl,
-                level=level
-            )
-            
-            # Armazena no nível apropriado
-            if level == CacheLevel.L1 and self.l1_cache:
-                self.l1_cache.set(key, entry)
-            elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache:
-                self.l2_cache.set(key, entry)
+            # Valores em memória ficam como objetos; a serialização acontece
+            # apenas nos níveis inferiores do cache em camadas
+            if level == CacheLevel.L1 and self.l1_cache is not None:
+                self.l1_cache.set(key, value, ttl=ttl)
+            elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache is not None:
+                self.l2_cache.set(key, value, ttl=ttl)
             
             self.metrics.sets += 1
             
@@ -667,10 +665,10 @@ class AdvancedCaching:
         try:
             success = False
             
-            if level == CacheLevel.L1 and self.l1_cache:
+            if level == CacheLevel.L1 and self.l1_cache is not None:
                 success = self.l1_cache.delete(key) or success
             
-            if level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache:
+            if level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache is not None:
                 success = self.l2_cache.delete(key) or success
             
             if success:
@@ -716,10 +714,10 @@ class AdvancedCaching:
         
         # Atualiza tamanho total
         total_size = 0
-        if self.l1_cache:
-            total_size += self.l1_cache.size()
-        if self.l2_cache:
-            total_size += self.l2_cache.size()
+        if self.l1_cache is not None:
+            total_size += len(self.l1_cache)
+        if self.l2_cache is not None:
+            total_size += len(self.l2_cache)
         
         self.metrics.total_size = total_size
         
@@ -727,23 +725,23 @@ class AdvancedCaching:
     
     def clear(self, level: CacheLevel = CacheLevel.L1):
         """Limpa cache do nível especificado."""
-        if level == CacheLevel.L1 and self.l1_cache:
+        if level == CacheLevel.L1 and self.l1_cache is not None:
             self.l1_cache.clear()
-        elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache:
+        elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache is not None:
             self.l2_cache.clear()
     
     def clear_all(self):
         """Limpa todos os caches."""
-        if self.l1_cache:
+        if self.l1_cache is not None:
             self.l1_cache.clear()
-        if self.l2_cache:
+        if self.l2_cache is not None:
             self.l2_cache.clear()
     
     def get_keys(self, level: CacheLevel = CacheLevel.L1) -> List[str]:
         """Obtém todas as chaves do nível especificado."""
-        if level == CacheLevel.L1 and self.l1_cache:
+        if level == CacheLevel.L1 and self.l1_cache is not None:
             return self.l1_cache.keys()
-        elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache:
+        elif level in [CacheLevel.L2, CacheLevel.L3] and self.l2_cache is not None:
             return self.l2_cache.keys()
         return []
     
@@ -753,12 +751,12 @@ class AdvancedCaching:
             "status": "healthy",
             "l1_cache": {
                 "enabled": self.config.l1_enabled,
-                "size": self.l1_cache.size() if self.l1_cache else 0,
+                "size": len(self.l1_cache) if self.l1_cache is not None else 0,
                 "max_size": self.config.l1_max_size
             },
             "l2_cache": {
                 "enabled": self.config.l2_enabled,
-                "size": self.l2_cache.size() if self.l2_cache else 0,
+                "size": len(self.l2_cache) if self.l2_cache is not None else 0,
                 "max_size": self.config.l2_max_size
             },
             "warming": {
@@ -0,0 +1,556 @@
+"""
+📄 Codec de Valores do Cache
+🎯 Objetivo: Formato binário compacto para listas de Keyword/Cluster e arrays
+   NumPy, com compressão escolhida pelo tamanho do payload
+📊 Métricas: Bytes por keyword e vazão de encode/decode por codec (benchmark_codecs)
+🔧 Integração: TieredCache (níveis L2/L3), IntelligentCache (Redis),
+   DistributedCache (SerializationFormat.BINARY)
+
+Tracing ID: CACHE_CODEC_20250127_001
+Data: 2025-01-27
+Versão: 1.0
+
+Formato binário: cabeçalho de 4 bytes (marca, versão, tipo, compressão)
+seguido do payload. Keywords são gravadas em colunas (índices numa tabela de
+strings sem repetição e arrays numéricos little-endian), arrays NumPy como
+buffer bruto little-endian com dtype e shape; demais valores usam JSON.
+Nenhum tipo é lido com pickle: quem escreve no Redis ou no arquivo do L2 não
+consegue executar código nos leitores.
+"""
+
+import json
+import logging
+import struct
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from domain.models import Cluster, IntencaoBusca, Keyword
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xC5
+VERSAO_FORMATO = 1
+
+_CABECALHO = struct.Struct("<BBBB")
+_U32 = struct.Struct("<I")
+
+# Tipos de payload
+TIPO_JSON = 0
+TIPO_KEYWORDS = 1
+TIPO_CLUSTERS = 2
+TIPO_NDARRAY = 3
+TIPO_KEYWORD = 4
+TIPO_CLUSTER = 5
+
+# Algoritmos de compressão
+COMPRESSAO_NENHUMA = 0
+COMPRESSAO_ZLIB = 1
+
+_EPOCA = datetime(1970, 1, 1)
+_SEM_DATA = -(2 ** 63)
+_SEM_STRING = 0xFFFFFFFF
+_INTENCOES = list(IntencaoBusca)
+_INDICE_INTENCAO = {intencao: indice for indice, intencao in enumerate(_INTENCOES)}
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+@dataclass
+class CompressionPolicy:
+    """
+    Escolha da compressão pelo tamanho do payload.
+
+    Abaixo de `min_bytes` não comprime (o cabeçalho do zlib não compensa);
+    até `fast_above_bytes` usa `level`; acima dele usa `fast_level`, para
+    limitar a latência de payloads grandes. A versão comprimida só é mantida
+    se ficar abaixo de `max_ratio` do original.
+    """
+    min_bytes: int = 1024
+    level: int = 6
+    fast_above_bytes: int = 1024 * 1024
+    fast_level: int = 1
+    max_ratio: float = 0.9
+    enabled: bool = True
+
+    def compress(self, payload: bytes) -> Tuple[int, bytes]:
+        if not self.enabled or len(payload) < self.min_bytes:
+            return COMPRESSAO_NENHUMA, payload
+        level = self.fast_level if len(payload) > self.fast_above_bytes else self.level
+        compressed = zlib.compress(payload, level)
+        if len(compressed) >= len(payload) * self.max_ratio:
+            return COMPRESSAO_NENHUMA, payload
+        return COMPRESSAO_ZLIB, compressed
+
+
+def _le_bytes(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _le_array(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def _data_para_micros(data: Optional[datetime]) -> int:
+    if data is None:
+        return _SEM_DATA
+    if data.tzinfo is not None:
+        raise ValueError("Datas com fuso horário não são suportadas no formato binário")
+    delta = data - _EPOCA
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _micros_para_data(micros: int) -> Optional[datetime]:
+    return None if micros == _SEM_DATA else _EPOCA + timedelta(microseconds=micros)
+
+
+def _texto(textos: List[str], indice: int) -> Optional[str]:
+    return None if indice == _SEM_STRING else textos[indice]
+
+
+class _StringTable:
+    """Strings sem repetição (fonte, fase do funil e status se repetem muito)."""
+
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+
+    def add(self, texto: Optional[str]) -> int:
+        if texto is None:
+            return _SEM_STRING
+        indice = self.indices.get(texto)
+        if indice is None:
+            indice = self.indices[texto] = len(self.indices)
+        return indice
+
+    def encode(self) -> bytes:
+        codificadas = [texto.encode("utf-8") for texto in self.indices]
+        tamanhos = array("I", map(len, codificadas))
+        return _U32.pack(len(codificadas)) + _le_bytes(tamanhos) + b"".join(codificadas)
+
+    @staticmethod
+    def decode(view: memoryview, offset: int) -> Tuple[List[str], int]:
+        (quantidade,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        tamanhos = _le_array("I", view[offset:offset + 4 * quantidade])
+        offset += 4 * quantidade
+        blob = bytes(view[offset:offset + sum(tamanhos)])
+        fins = list(accumulate(tamanhos))
+        inicios = [0] + fins[:-1]
+        textos = [blob[inicio:fim].decode("utf-8") for inicio, fim in zip(inicios, fins)]
+        return textos, offset + len(blob)
+
+
+def _encode_keywords(keywords: Sequence[Keyword], strings: _StringTable) -> bytes:
+    indices = array("I")
+    volumes = array("q")
+    reais = array("d")
+    datas = array("q")
+    ordens = array("i")
+    intencoes = bytearray()
+    for keyword in keywords:
+        indices.extend((
+            strings.add(keyword.termo),
+            strings.add(keyword.justificativa),
+            strings.add(keyword.fonte),
+            strings.add(keyword.fase_funil),
+            strings.add(keyword.nome_artigo)
+        ))
+        volumes.append(keyword.volume_busca)
+        reais.extend((keyword.cpc, keyword.concorrencia, keyword.score))
+        datas.append(_data_para_micros(keyword.data_coleta))
+        ordens.append(keyword.ordem_no_cluster)
+        intencoes.append(_INDICE_INTENCAO[keyword.intencao])
+    return b"".join((
+        _U32.pack(len(keywords)),
+        _le_bytes(indices),
+        _le_bytes(volumes),
+        _le_bytes(reais),
+        _le_bytes(datas),
+        _le_bytes(ordens),
+        bytes(intencoes)
+    ))
+
+
+def _decode_keywords(view: memoryview, offset: int, textos: List[str]) -> Tuple[List[Keyword], int]:
+    (quantidade,) = _U32.unpack_from(view, offset)
+    offset += _U32.size
+    colunas = []
+    for typecode, largura in (("I", 20), ("q", 8), ("d", 24), ("q", 8), ("i", 4)):
+        tamanho = largura * quantidade
+        colunas.append(_le_array(typecode, view[offset:offset + tamanho]))
+        offset += tamanho
+    indices, volumes, reais, datas, ordens = colunas
+    intencoes = view[offset:offset + quantidade]
+    offset += quantidade
+
+    keywords = []
+    for posicao in range(quantidade):
+        base = posicao * 5
+        # Os valores foram validados quando a Keyword foi criada; montar o
+        # objeto direto evita repetir as validações (regex) a cada leitura
+        keyword = object.__new__(Keyword)
+        keyword.__dict__.update(
+            termo=_texto(textos, indices[base]),
+            volume_busca=volumes[posicao],
+            cpc=reais[posicao * 3],
+            concorrencia=reais[posicao * 3 + 1],
+            intencao=_INTENCOES[intencoes[posicao]],
+            score=reais[posicao * 3 + 2],
+            justificativa=_texto(textos, indices[base + 1]),
+            fonte=_texto(textos, indices[base + 2]),
+            data_coleta=_micros_para_data(datas[posicao]),
+            ordem_no_cluster=ordens[posicao],
+            fase_funil=_texto(textos, indices[base + 3]),
+            nome_artigo=_texto(textos, indices[base + 4])
+        )
+        keywords.append(keyword)
+    return keywords, offset
+
+
+def _encode_clusters(clusters: Sequence[Cluster], strings: _StringTable) -> bytes:
+    indices = array("I")
+    similaridades = array("d")
+    datas = array("q")
+    quantidades = array("I")
+    keywords: List[Keyword] = []
+    for cluster in clusters:
+        indices.extend((
+            strings.add(cluster.id),
+            strings.add(cluster.fase_funil),
+            strings.add(cluster.categoria),
+            strings.add(cluster.blog_dominio),
+            strings.add(cluster.status_geracao),
+            strings.add(cluster.prompt_gerado)
+        ))
+        similaridades.append(cluster.similaridade_media)
+        datas.append(_data_para_micros(cluster.data_criacao))
+        quantidades.append(len(cluster.keywords))
+        keywords.extend(cluster.keywords)
+    return b"".join((
+        _U32.pack(len(clusters)),
+        _le_bytes(indices),
+        _le_bytes(similaridades),
+        _le_bytes(datas),
+        _le_bytes(quantidades),
+        _encode_keywords(keywords, strings)
+    ))
+
+
+def _decode_clusters(view: memoryview, offset: int, textos: List[str]) -> Tuple[List[Cluster], int]:
+    (quantidade,) = _U32.unpack_from(view, offset)
+    offset += _U32.size
+    colunas = []
+    for typecode, largura in (("I", 24), ("d", 8), ("q", 8), ("I", 4)):
+        tamanho = largura * quantidade
+        colunas.append(_le_array(typecode, view[offset:offset + tamanho]))
+        offset += tamanho
+    indices, similaridades, datas, quantidades = colunas
+    keywords, offset = _decode_keywords(view, offset, textos)
+
+    clusters = []
+    inicio = 0
+    for posicao in range(quantidade):
+        base = posicao * 6
+        fim = inicio + quantidades[posicao]
+        cluster = object.__new__(Cluster)
+        cluster.__dict__.update(
+            id=_texto(textos, indices[base]),
+            keywords=keywords[inicio:fim],
+            similaridade_media=similaridades[posicao],
+            fase_funil=_texto(textos, indices[base + 1]),
+            categoria=_texto(textos, indices[base + 2]),
+            blog_dominio=_texto(textos, indices[base + 3]),
+            data_criacao=_micros_para_data(datas[posicao]),
+            status_geracao=_texto(textos, indices[base + 4]),
+            prompt_gerado=_texto(textos, indices[base + 5])
+        )
+        clusters.append(cluster)
+        inicio = fim
+    return clusters, offset
+
+
+def _encode_ndarray(valor: Any) -> bytes:
+    valor = np.ascontiguousarray(valor)
+    if valor.dtype.byteorder == ">" or (valor.dtype.byteorder == "=" and _BIG_ENDIAN):
+        valor = valor.astype(valor.dtype.newbyteorder("<"))
+    dtype = valor.dtype.str.encode("ascii")
+    return b"".join((
+        struct.pack("<B", len(dtype)),
+        dtype,
+        struct.pack(f"<B{valor.ndim}Q", valor.ndim, *valor.shape),
+        valor.tobytes()
+    ))
+
+
+def _decode_ndarray(view: memoryview) -> Any:
+    tamanho_dtype = view[0]
+    dtype = np.dtype(bytes(view[1:1 + tamanho_dtype]).decode("ascii"))
+    offset = 1 + tamanho_dtype
+    ndim = view[offset]
+    shape = struct.unpack_from(f"<{ndim}Q", view, offset + 1)
+    offset += 1 + 8 * ndim
+    return np.frombuffer(view, dtype=dtype, offset=offset, count=int(np.prod(shape))).reshape(shape).copy()
+
+
+def _lista_de(valor: Any, tipo: type) -> bool:
+    return isinstance(valor, list) and bool(valor) and all(type(item) is tipo for item in valor)
+
+
+class CacheCodec:
+    """Interface de um codec de valores do cache."""
+
+    name = "codec"
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+def _para_json(value: Any) -> Any:
+    if isinstance(value, Keyword):
+        return {"__tipo__": "keyword", "item": value.to_dict()}
+    if isinstance(value, Cluster):
+        return {"__tipo__": "cluster", "item": value.to_dict()}
+    if _lista_de(value, Keyword):
+        return {"__tipo__": "keywords", "itens": [keyword.to_dict() for keyword in value]}
+    if _lista_de(value, Cluster):
+        return {"__tipo__": "clusters", "itens": [cluster.to_dict() for cluster in value]}
+    if NUMPY_AVAILABLE and isinstance(value, np.ndarray):
+        return {"__tipo__": "ndarray", "dtype": value.dtype.str, "itens": value.tolist()}
+    return value
+
+
+def _de_json(value: Any) -> Any:
+    if isinstance(value, dict) and "__tipo__" in value:
+        if value["__tipo__"] == "keyword":
+            return Keyword.from_dict(value["item"])
+        if value["__tipo__"] == "cluster":
+            return Cluster.from_dict(value["item"])
+        if value["__tipo__"] == "keywords":
+            return [Keyword.from_dict(item) for item in value["itens"]]
+        if value["__tipo__"] == "clusters":
+            return [Cluster.from_dict(item) for item in value["itens"]]
+        if value["__tipo__"] == "ndarray" and NUMPY_AVAILABLE:
+            return np.array(value["itens"], dtype=value["dtype"])
+    return value
+
+
+class JsonCodec(CacheCodec):
+    """
+    JSON em texto, como os caches gravavam até agora (referência dos benchmarks).
+
+    Keyword/Cluster passam por to_dict/from_dict e arrays por tolist.
+    """
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(_para_json(value), default=str).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return _de_json(json.loads(data))
+
+
+class BinaryCodec(CacheCodec):
+    """
+    Formato binário compacto com compressão escolhida pelo tamanho.
+
+    Listas de Keyword/Cluster (e instâncias isoladas) usam o formato em
+    colunas; arrays NumPy numéricos, buffer bruto little-endian (sem
+    compressão para floats, que quase não comprimem); o resto é gravado em
+    JSON. Se o formato em colunas não puder representar o valor (ex.: datas
+    com fuso horário), o valor também cai no JSON. Valores que o JSON não
+    representa são recusados com TypeError.
+
+    `decode` aceita também valores legados em JSON puro (sem cabeçalho).
+    """
+
+    name = "binary"
+
+    def __init__(self, compression: Optional[CompressionPolicy] = None):
+        self.compression = compression or CompressionPolicy()
+
+    @staticmethod
+    def is_encoded(data: Any) -> bool:
+        """Indica se `data` foi gerado por este codec (valores legados são JSON puro)."""
+        return isinstance(data, (bytes, bytearray, memoryview)) and len(data) >= _CABECALHO.size and data[0] == MAGIC
+
+    def _payload(self, value: Any) -> Tuple[int, bytes]:
+        try:
+            if isinstance(value, Keyword):
+                strings = _StringTable()
+                corpo = _encode_keywords([value], strings)
+                return TIPO_KEYWORD, strings.encode() + corpo
+            if isinstance(value, Cluster):
+                strings = _StringTable()
+                corpo = _encode_clusters([value], strings)
+                return TIPO_CLUSTER, strings.encode() + corpo
+            if _lista_de(value, Keyword):
+                strings = _StringTable()
+                corpo = _encode_keywords(value, strings)
+                return TIPO_KEYWORDS, strings.encode() + corpo
+            if _lista_de(value, Cluster):
+                strings = _StringTable()
+                corpo = _encode_clusters(value, strings)
+                return TIPO_CLUSTERS, strings.encode() + corpo
+            if NUMPY_AVAILABLE and isinstance(value, np.ndarray) and value.dtype.kind in "biufc":
+                return TIPO_NDARRAY, _encode_ndarray(value)
+        except (ValueError, TypeError, KeyError, OverflowError, struct.error) as e:
+            logger.debug(f"Valor fora do formato binário, usando JSON: {e}")
+        try:
+            payload = json.dumps(_para_json(value), ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            raise TypeError(f"Valor do tipo {type(value).__name__} não pode ser gravado no cache: {e}") from e
+        return TIPO_JSON, payload.encode("utf-8")
+
+    def encode(self, value: Any) -> bytes:
+        tipo, payload = self._payload(value)
+        if tipo == TIPO_NDARRAY and value.dtype.kind in "fc":
+            compressao = COMPRESSAO_NENHUMA
+        else:
+            compressao, payload = self.compression.compress(payload)
+        return _CABECALHO.pack(MAGIC, VERSAO_FORMATO, tipo, compressao) + payload
+
+    def decode(self, data: bytes) -> Any:
+        if not self.is_encoded(data):
+            return _de_json(json.loads(data))
+        _, versao, tipo, compressao = _CABECALHO.unpack_from(data)
+        if versao != VERSAO_FORMATO:
+            raise ValueError(f"Versão do formato binário não suportada: {versao}")
+        view = memoryview(data)[_CABECALHO.size:]
+        if compressao == COMPRESSAO_ZLIB:
+            view = memoryview(zlib.decompress(view))
+        elif compressao != COMPRESSAO_NENHUMA:
+            raise ValueError(f"Compressão desconhecida: {compressao}")
+
+        if tipo == TIPO_JSON:
+            return _de_json(json.loads(bytes(view)))
+        if tipo == TIPO_NDARRAY:
+            return _decode_ndarray(view)
+        textos, offset = _StringTable.decode(view, 0)
+        if tipo in (TIPO_KEYWORDS, TIPO_KEYWORD):
+            keywords, _ = _decode_keywords(view, offset, textos)
+            return keywords if tipo == TIPO_KEYWORDS else keywords[0]
+        if tipo in (TIPO_CLUSTERS, TIPO_CLUSTER):
+            clusters, _ = _decode_clusters(view, offset, textos)
+            return clusters if tipo == TIPO_CLUSTERS else clusters[0]
+        raise ValueError(f"Tipo de payload desconhecido: {tipo}")
+
+
+_CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+
+def get_codec(name: str = "binary") -> CacheCodec:
+    """Obtém um codec pelo nome (json ou binary)."""
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Codec desconhecido: {name}")
+
+
+def _amostra_keywords(quantidade: int) -> List[Keyword]:
+    fontes = ["google_suggest", "google_trends", "youtube"]
+    return [
+        Keyword(
+            termo=f"palavra-chave-{indice}",
+            volume_busca=100 + indice,
+            cpc=1.25 + indice % 7,
+            concorrencia=(indice % 10) / 10,
+            intencao=_INTENCOES[indice % len(_INTENCOES)],
+            score=indice / quantidade,
+            fonte=fontes[indice % len(fontes)],
+            fase_funil="descoberta",
+            data_coleta=datetime(2025, 1, 27, 12, 0, 0)
+        )
+        for indice in range(quantidade)
+    ]
+
+
+def _medir(codec: CacheCodec, valor: Any, repeticoes: int) -> Dict[str, float]:
+    dados = codec.encode(valor)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        codec.encode(valor)
+    tempo_encode = (time.perf_counter() - inicio) / repeticoes
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        codec.decode(dados)
+    tempo_decode = (time.perf_counter() - inicio) / repeticoes
+    return {
+        "bytes": len(dados),
+        "encode_ms": tempo_encode * 1000,
+        "decode_ms": tempo_decode * 1000,
+        "tempo_encode": tempo_encode,
+        "tempo_decode": tempo_decode
+    }
+
+
+def benchmark_codecs(
+    n_keywords: int = 1000,
+    n_embeddings: int = 256,
+    dimensao_embedding: int = 384,
+    repeticoes: int = 5,
+    codecs: Optional[Sequence[str]] = None
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Compara os codecs em listas de Keyword, de Cluster e em embeddings float32.
+
+    Returns:
+        Por conjunto de dados e codec: bytes, bytes por keyword (ou por
+        embedding), tempos médios e vazão de encode/decode em itens/s e MB/s
+    """
+    keywords = _amostra_keywords(n_keywords)
+    clusters = [
+        Cluster(
+            id=f"cluster-{indice}",
+            keywords=keywords[inicio:inicio + 5],
+            similaridade_media=0.8,
+            fase_funil="descoberta",
+            categoria="tecnologia",
+            blog_dominio="blog.exemplo.com"
+        )
+        for indice, inicio in enumerate(range(0, n_keywords - 4, 5))
+    ]
+    conjuntos = {"keywords": (keywords, len(keywords)), "clusters": (clusters, 5 * len(clusters))}
+    if NUMPY_AVAILABLE:
+        embeddings = np.random.default_rng(0).random((n_embeddings, dimensao_embedding), dtype=np.float32)
+        conjuntos["embeddings"] = (embeddings, n_embeddings)
+
+    resultado: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for conjunto, (valor, itens) in conjuntos.items():
+        resultado[conjunto] = {}
+        for nome in codecs or list(_CODECS):
+            medida = _medir(get_codec(nome), valor, repeticoes)
+            megabytes = medida["bytes"] / (1024 * 1024)
+            resultado[conjunto][nome] = {
+                "bytes": medida["bytes"],
+                "bytes_por_item": medida["bytes"] / itens if itens else 0.0,
+                "encode_ms": medida["encode_ms"],
+                "decode_ms": medida["decode_ms"],
+                "encode_itens_s": itens / medida["tempo_encode"] if medida["tempo_encode"] else 0.0,
+                "decode_itens_s": itens / medida["tempo_decode"] if medida["tempo_decode"] else 0.0,
+                "encode_mb_s": megabytes / medida["tempo_encode"] if medida["tempo_encode"] else 0.0,
+                "decode_mb_s": megabytes / medida["tempo_decode"] if medida["tempo_decode"] else 0.0
+            }
+    logger.info(f"Benchmark de codecs: {resultado}")
+    return resultado
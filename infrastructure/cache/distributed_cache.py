@@ -43,9 +43,14 @@ import weakref
 import statistics
 import functools
 
+from infrastructure.cache.codec import BinaryCodec, CompressionPolicy
+from infrastructure.cache.tiered_cache import get_tiered_cache
+
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class CacheStrategy(Enum):
     """Estratégias de cache"""
     LRU = "lru"
@@ -59,6 +64,7 @@ class SerializationFormat(Enum):
     PICKLE = "pickle"
     COMPRESSED = "compressed"
     CUSTOM = "custom"
+    BINARY = "binary"
 
 @dataclass
 class CacheConfig:
@@ -195,18 +201,29 @@ class DistributedCache:
             SerializationFormat.JSON: self._serialize_json,
             SerializationFormat.PICKLE: self._serialize_pickle,
             SerializationFormat.COMPRESSED: self._serialize_compressed,
-            SerializationFormat.CUSTOM: self._serialize_custom
+            SerializationFormat.CUSTOM: self._serialize_custom,
+            SerializationFormat.BINARY: self._serialize_binary
         }
         self._deserializers = {
             SerializationFormat.JSON: self._deserialize_json,
             SerializationFormat.PICKLE: self._deserialize_pickle,
             SerializationFormat.COMPRESSED: self._deserialize_compressed,
-            SerializationFormat.CUSTOM: self._deserialize_custom
+            SerializationFormat.CUSTOM: self._deserialize_custom,
+            SerializationFormat.BINARY: self._deserialize_binary
         }
+        # O formato binário escolhe a própria compressão pelo tamanho do payload
+        self._binary_codec = BinaryCodec(CompressionPolicy(
+            min_bytes=config.compression_threshold,
+            enabled=config.enable_compression
+        ))
         
-        # Otimizações
-        self._local_cache = {}  # Cache local para acesso rápido
-        self._local_cache_size = 0
+        # Otimizações: cache local (namespace do cache em camadas do processo),
+        # limitado por max_cache_size e com o mesmo TTL do Redis
+        self._local_cache = get_tiered_cache().namespace(
+            prefix="distributed_cache",
+            max_entries=config.max_cache_size,
+            policy="lru"
+        )
         self._background_cleanup_task = None
         
         logger.info(f"Distributed Cache inicializado com configuração: {self.config}")
@@ -360,6 +377,14 @@ class DistributedCache:
         else:
             return pickle.dumps(data)
     
+    def _serialize_binary(self, data: Any) -> bytes:
+        """Serializa no formato binário do cache (Keyword/Cluster em colunas, arrays brutos)"""
+        return self._binary_codec.encode(data)
+    
+    def _deserialize_binary(self, data: bytes) -> Any:
+        """Deserializa o formato binário do cache"""
+        return self._binary_codec.decode(data)
+    
     def _deserialize_custom(self, data: bytes) -> Any:
         """Deserialização customizada"""
         try:
@@ -377,9 +402,10 @@ class DistributedCache:
         
         try:
             # Verificar cache local primeiro
-            if cache_key in self._local_cache:
+            value = self._local_cache.get(cache_key, _MISSING)
+            if value is not _MISSING:
                 self.metrics.add_request(True, time.time() - start_time)
-                return self._local_cache[cache_key]
+                return value
             
             if not self.redis_pool:
                 self.metrics.add_request(False, time.time() - start_time)
@@ -398,9 +424,7 @@ class DistributedCache:
                 value = deserializer(data)
                 
                 # Adicionar ao cache local
-                if self._local_cache_size < self.config.max_cache_size:
-                    self._local_cache[cache_key] = value
-                    self._local_cache_size += 1
+                self._local_cache.set(cache_key, value, ttl=self.config.default_ttl)
                 
                 self.metrics.add_request(True, time.time() - start_time, len(data))
                 return value
@@ -426,8 +450,9 @@ class DistributedCache:
             serializer = self._serializers[self.config.serialization_format]
             original_data = serializer(value)
             
-            # Comprimir se habilitado
-            if self.config.enable_compression and isinstance(original_data, bytes):
+            # Comprimir se habilitado (o formato binário já vem comprimido)
+            if (self.config.enable_compression and isinstance(original_data, bytes)
+                    and self.config.serialization_format != SerializationFormat.BINARY):
                 if len(original_data) > self.config.compression_threshold:
                     compressed_data = gzip.compress(original_data)
                     data = base64.b64encode(compressed_data)
@@ -437,9 +462,7 @@ class DistributedCache:
                 data = original_data
             
             # Adicionar ao cache local
-            if self._local_cache_size < self.config.max_cache_size:
-                self._local_cache[cache_key] = value
-                self._local_cache_size += 1
+            self._local_cache.set(cache_key, value, ttl=ttl)
             
             # Salvar no Redis
             if aioredis is not None and self.redis_pool is not None:
@@ -461,9 +484,7 @@ class DistributedCache:
         
         try:
             # Remover do cache local
-            if cache_key in self._local_cache:
-                del self._local_cache[cache_key]
-                self._local_cache_size -= 1
+            self._local_cache.delete(cache_key)
             
             # Remover do Redis
             if self.redis_pool:
@@ -534,6 +555,7 @@ class DistributedCache:
         """Limpa todas as chaves de um namespace"""
         try:
             pattern = f"{self.config.cache_key_prefix}:{namespace}:*"
+            local_removed = self._local_cache.invalidate_pattern(pattern)
             
             if self.redis_pool:
                 redis_client = aioredis.Redis(connection_pool=self.redis_pool)
@@ -544,7 +566,7 @@ class DistributedCache:
                     logger.info(f"Namespace {namespace} limpo: {len(keys)} chaves removidas")
                     return True
             
-            return False
+            return local_removed > 0
             
         except Exception as e:
             logger.error(f"Erro ao limpar namespace {namespace}: {e}")
@@ -588,9 +610,7 @@ class DistributedCache:
                             results[key] = deserialized_value
                             
                             # Adicionar ao cache local
-                            if self._local_cache_size < self.config.max_cache_size:
-                                self._local_cache[cache_key] = deserialized_value
-                                self._local_cache_size += 1
+                            self._local_cache.set(cache_key, deserialized_value, ttl=self.config.default_ttl)
                                 
                         except Exception as e:
                             logger.error(f"Erro ao deserializar {cache_key}: {e}")
@@ -625,8 +645,9 @@ class DistributedCache:
                 cache_key = self._generate_key(key, namespace)
                 serialized_data = serializer(value)
                 
-                # Comprimir se necessário
-                if self.config.enable_compression and isinstance(serialized_data, bytes):
+                # Comprimir se necessário (o formato binário já vem comprimido)
+                if (self.config.enable_compression and isinstance(serialized_data, bytes)
+                        and self.config.serialization_format != SerializationFormat.BINARY):
                     if len(serialized_data) > self.config.compression_threshold:
                         compressed_data = gzip.compress(serialized_data)
                         cache_data[cache_key] = base64.b64encode(compressed_data)
@@ -636,9 +657,7 @@ class DistributedCache:
                     cache_data[cache_key] = serialized_data
                 
                 # Adicionar ao cache local
-                if self._local_cache_size < self.config.max_cache_size:
-                    self._local_cache[cache_key] = value
-                    self._local_cache_size += 1
+                self._local_cache.set(cache_key, value, ttl=ttl)
             
             # Salvar no Redis
             if self.redis_pool:
@@ -666,6 +685,8 @@ class DistributedCache:
     async def invalidate_pattern(self, pattern: str) -> int:
         """Invalida chaves por padrão"""
         try:
+            local_removed = self._local_cache.invalidate_pattern(pattern)
+            
             if self.redis_pool:
                 redis_client = aioredis.Redis(connection_pool=self.redis_pool)
                 keys = await redis_client.keys(pattern)
@@ -675,7 +696,7 @@ class DistributedCache:
                     logger.info(f"Padrão {pattern} invalidado: {len(keys)} chaves removidas")
                     return len(keys)
             
-            return 0
+            return local_removed
             
         except Exception as e:
             logger.error(f"Erro ao invalidar padrão {pattern}: {e}")
@@ -684,7 +705,9 @@ class DistributedCache:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Obtém métricas do cache"""
-        return self.metrics.get_summary()
+        summary = self.metrics.get_summary()
+        summary["local_cache"] = self._local_cache.get_stats()
+        return summary
     
     def reset_metrics(self):
         """Reseta métricas"""
@@ -0,0 +1,403 @@
+"""
+📄 Motor de Eviction - Cache L1
+🎯 Objetivo: Eviction O(1) com LFU por buckets de frequência, admissão W-TinyLFU,
+   orçamento em bytes, índice de tags e expiração por timer wheel
+🔧 Integração: CacheNamespace (infrastructure/cache/tiered_cache.py)
+
+Tracing ID: EVICTION_ENGINE_20250127_001
+Data: 2025-01-27
+Versão: 1.0
+"""
+
+import math
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+
+class FrequencySketch:
+    """
+    Count-Min Sketch com envelhecimento para estimar a frequência de acesso (TinyLFU).
+
+    Usa 4 linhas de contadores de 1 byte (bytearray) saturados em 15. A cada `sample_size`
+    incrementos todos os contadores são divididos por 2, então o histórico
+    antigo perde peso e chaves que deixaram de ser populares podem ser
+    substituídas.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+    _MASK64 = (1 << 64) - 1
+    _HALVE = bytes(count >> 1 for count in range(256))
+
+    def __init__(self, capacity: int):
+        self._bits = max(4, math.ceil(math.log2(max(capacity, 1) * 4)))
+        self.width = 1 << self._bits
+        self.table = [bytearray(self.width) for _ in range(self.DEPTH)]
+        self.sample_size = max(10 * capacity, 32)
+        self.additions = 0
+        self.resets = 0
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        h = hash(key) & self._MASK64
+        shift = 64 - self._bits
+        return [((h * seed) & self._MASK64) >> shift for seed in self._SEEDS]
+
+    def increment(self, key: Hashable) -> None:
+        """Registra um acesso."""
+        added = False
+        for row, index in zip(self.table, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+
+    def estimate(self, key: Hashable) -> int:
+        """Frequência estimada (limite superior) da chave."""
+        return min(row[index] for row, index in zip(self.table, self._indexes(key)))
+
+    def _reset(self) -> None:
+        self.table = [row.translate(self._HALVE) for row in self.table]
+        self.additions //= 2
+        self.resets += 1
+
+
+class LRUIndex:
+    """Ordem de recência com operações O(1)."""
+
+    def __init__(self):
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._order
+
+    def add(self, key: Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key: Hashable) -> None:
+        self._order.move_to_end(key)
+
+    def remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[Hashable]:
+        """Chave menos recentemente usada."""
+        return next(iter(self._order), None)
+
+
+class LFUIndex:
+    """
+    LFU O(1) com buckets de frequência.
+
+    Cada frequência mantém suas chaves em ordem de recência; a vítima é a
+    chave mais antiga do bucket de menor frequência (empate resolvido por LRU).
+    """
+
+    def __init__(self):
+        self._freq: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = defaultdict(OrderedDict)
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._freq)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._freq
+
+    def add(self, key: Hashable, freq: int = 1) -> None:
+        if key in self._freq:
+            self.remove(key)
+        freq = max(freq, 1)
+        self._freq[key] = freq
+        self._buckets[freq][key] = None
+        if len(self._freq) == 1 or freq < self._min_freq:
+            self._min_freq = freq
+
+    def touch(self, key: Hashable) -> None:
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets[freq + 1][key] = None
+
+    def remove(self, key: Hashable) -> None:
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                # Remoção arbitrária (invalidação/expiração) pode esvaziar o bucket
+                # mínimo; o próximo mínimo é recalculado sobre os buckets existentes
+                self._min_freq = min(self._buckets) if self._buckets else 0
+
+    def victim(self) -> Optional[Hashable]:
+        """Chave menos frequente (mais antiga em caso de empate)."""
+        if not self._freq:
+            return None
+        return next(iter(self._buckets[self._min_freq]))
+
+
+class TimerWheel:
+    """
+    Timer wheel hashed para expiração de TTL.
+
+    Cada slot cobre `tick` segundos; `advance` visita apenas os slots entre
+    o último avanço e agora, então o custo é proporcional ao tempo decorrido
+    e às chaves que vencem, não ao tamanho do cache. Chaves com prazo além de
+    uma volta completa permanecem no slot até a volta correta.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: List[Dict[Hashable, float]] = [dict() for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current_tick = int(time.time() / tick)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: Hashable, expire_at: float) -> None:
+        self.cancel(key)
+        # Prazos já vencidos vão para o slot atual, visitado no próximo avanço
+        slot = max(int(expire_at / self.tick), self._current_tick) % self.slots
+        self._wheel[slot][key] = expire_at
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            self._wheel[slot].pop(key, None)
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """Remove e retorna as chaves vencidas até `now`."""
+        now = time.time() if now is None else now
+        target_tick = int(now / self.tick)
+        if target_tick < self._current_tick:
+            return []
+
+        expired = []
+        steps = min(target_tick - self._current_tick + 1, self.slots)
+        for offset in range(steps):
+            slot = (target_tick - offset) % self.slots
+            bucket = self._wheel[slot]
+            if not bucket:
+                continue
+            for key, expire_at in list(bucket.items()):
+                if expire_at <= now:
+                    del bucket[key]
+                    del self._slot_of[key]
+                    expired.append(key)
+        # O slot atual pode receber novos prazos ainda neste tick: ele é revisitado no próximo avanço
+        self._current_tick = target_tick
+        return expired
+
+
+class EvictionEngine:
+    """
+    Política de residência do L1: decide quem entra e quem sai.
+
+    O motor guarda apenas metadados das chaves (tamanho, prazo, tags); os
+    valores ficam no dicionário do cache. Com `policy="lru"` a eviction é
+    LRU pura. Com `policy="w-tinylfu"` novas chaves entram numa janela LRU
+    (`window_fraction` da capacidade) e, ao sair dela, só são admitidas no
+    segmento principal (LFU O(1)) se a frequência estimada pelo sketch
+    superar a da vítima principal. Os limites de quantidade
+    (`max_entries`) e de bytes (`max_bytes`) valem para o total.
+
+    Não é thread-safe: o chamador serializa o acesso (cada CacheNamespace
+    usa um lock próprio).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        policy: str = "w-tinylfu",
+        window_fraction: float = 0.01,
+        timer_tick: float = 1.0
+    ):
+        if policy not in ("lru", "w-tinylfu"):
+            raise ValueError(f"Política de eviction inválida: {policy}")
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+        if policy == "lru":
+            self.window_max = self.max_entries
+            self.sketch = None
+        else:
+            self.window_max = max(1, int(self.max_entries * window_fraction))
+            self.sketch = FrequencySketch(self.max_entries)
+        self.main_max = self.max_entries - self.window_max
+
+        self.window = LRUIndex()
+        self.main = LFUIndex()
+        self.timers = TimerWheel(tick=timer_tick)
+        self.sizes: Dict[Hashable, int] = {}
+        self.tags: Dict[Hashable, List[str]] = {}
+        self.tag_index: Dict[str, Set[Hashable]] = defaultdict(set)
+        self.total_bytes = 0
+
+        self.evictions = 0
+        self.admission_rejections = 0
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.sizes
+
+    def record_access(self, key: Hashable) -> None:
+        """Registra um acesso (hit ou miss) e atualiza a recência/frequência da chave."""
+        if self.sketch is not None:
+            self.sketch.increment(key)
+        if key in self.window:
+            self.window.touch(key)
+        elif key in self.main:
+            self.main.touch(key)
+
+    def insert(
+        self,
+        key: Hashable,
+        size: int,
+        expire_at: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> List[Hashable]:
+        """
+        Insere (ou substitui) uma chave e aplica os limites.
+
+        Returns:
+            Chaves removidas do L1, que o chamador deve apagar. Pode incluir
+            a própria chave quando ela é rejeitada pela admissão ou não cabe
+            no orçamento de bytes.
+        """
+        if key in self.sizes:
+            self.remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.admission_rejections += 1
+            return [key]
+
+        self.sizes[key] = size
+        self.total_bytes += size
+        self.tags[key] = list(tags or [])
+        for tag in self.tags[key]:
+            self.tag_index[tag].add(key)
+        if expire_at is not None:
+            self.timers.schedule(key, expire_at)
+        if self.sketch is not None:
+            self.sketch.increment(key)
+        self.window.add(key)
+
+        return self._enforce_limits()
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove os metadados de uma chave. Retorna False se não existia."""
+        size = self.sizes.pop(key, None)
+        if size is None:
+            return False
+        self.total_bytes -= size
+        self.window.remove(key)
+        self.main.remove(key)
+        self.timers.cancel(key)
+        for tag in self.tags.pop(key, []):
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+        return True
+
+    def keys_for_tag(self, tag: str) -> List[Hashable]:
+        """Chaves associadas a uma tag (índice secundário, sem varrer o L1)."""
+        return list(self.tag_index.get(tag, ()))
+
+    def expire(self, now: Optional[float] = None) -> List[Hashable]:
+        """Remove e retorna as chaves cujo TTL venceu."""
+        expired = self.timers.advance(now)
+        for key in expired:
+            self.remove(key)
+        return expired
+
+    def clear(self) -> None:
+        """Remove todas as chaves, preservando a configuração e os contadores."""
+        self.window = LRUIndex()
+        self.main = LFUIndex()
+        self.timers = TimerWheel(tick=self.timers.tick, slots=self.timers.slots)
+        self.sizes.clear()
+        self.tags.clear()
+        self.tag_index.clear()
+        self.total_bytes = 0
+        if self.sketch is not None:
+            self.sketch = FrequencySketch(self.max_entries)
+
+    def _over_limits(self) -> bool:
+        if len(self.sizes) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes
+
+    def _evict(self, key: Hashable, evicted: List[Hashable]) -> None:
+        self.remove(key)
+        evicted.append(key)
+        self.evictions += 1
+
+    def _enforce_limits(self) -> List[Hashable]:
+        evicted: List[Hashable] = []
+
+        if self.policy == "lru":
+            while self._over_limits():
+                self._evict(self.window.victim(), evicted)
+            return evicted
+
+        # Janela cheia: candidato sai da janela e disputa o segmento principal
+        while len(self.window) > self.window_max:
+            candidate = self.window.victim()
+            self.window.remove(candidate)
+            if len(self.main) < self.main_max:
+                self.main.add(candidate, self.sketch.estimate(candidate))
+                continue
+            victim = self.main.victim()
+            if victim is not None and self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+                self._evict(victim, evicted)
+                self.main.add(candidate, self.sketch.estimate(candidate))
+            else:
+                self.admission_rejections += 1
+                self._evict(candidate, evicted)
+
+        # Orçamento de bytes: remove vítimas do principal, depois da janela
+        while self._over_limits():
+            victim = self.main.victim()
+            if victim is None:
+                victim = self.window.victim()
+            self._evict(victim, evicted)
+        return evicted
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "policy": self.policy,
+            "entries": len(self.sizes),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "window_entries": len(self.window),
+            "main_entries": len(self.main),
+            "scheduled_timers": len(self.timers),
+            "tags": len(self.tag_index),
+            "evictions": self.evictions,
+            "admission_rejections": self.admission_rejections
+        }
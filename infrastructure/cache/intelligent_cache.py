@@ -26,9 +26,15 @@ import gzip
 import pickle
 from typing import Tuple
 
+from infrastructure.cache.codec import BinaryCodec, CompressionPolicy
+from infrastructure.cache.local_store import connect_redis
+from infrastructure.cache.tiered_cache import estimate_size, get_tiered_cache
+
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class CacheStrategy(Enum):
     """Estratégias de cache disponíveis"""
     LRU = "lru"
@@ -90,6 +96,7 @@ class CacheEntry:
     compression_type: CompressionType = CompressionType.NONE
     size_bytes: int = 0
     metadata: Dict[str, Any] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
     
     def is_expired(self) -> bool:
         """Verificar se entrada expirou."""
@@ -140,19 +147,35 @@ class IntelligentCache:
         self.compression_threshold = compression_threshold
         self.enable_compression = enable_compression
         
-        # Cache local (L1)
-        self.l1_cache: OrderedDict = OrderedDict()
-        
-        # Cache distribuído (L2)
-        try:
-            self.redis_client = redis.from_url(redis_url)
-            self.redis_client.ping()
-            self.l2_enabled = True
-            logger.info("✅ Redis conectado com sucesso")
-        except Exception as e:
-            logger.warning(f"⚠️ Redis não disponível: {e}")
-            self.l2_enabled = False
-            self.redis_client = None
+        # Codec dos valores no Redis
+        self.codec = BinaryCodec(CompressionPolicy(
+            min_bytes=compression_threshold,
+            enabled=enable_compression
+        ))
+        
+        # Cache local (L1): namespace do cache em camadas do processo, com os
+        # limites desta instância e métricas visíveis no registro global
+        self.l1_cache = get_tiered_cache().namespace(
+            prefix="intelligent_cache",
+            max_entries=max_size,
+            max_bytes=int(max_memory_mb * 1024 * 1024) if max_memory_mb else None,
+            policy="lru" if strategy == CacheStrategy.LRU else "w-tinylfu"
+        )
+        # Protege as métricas; o L1 tem lock próprio no namespace
+        self._lock = threading.RLock()
+        
+        # Cache distribuído (L2); redis_url vazio desativa o L2
+        self.l2_enabled = False
+        self.redis_client = None
+        if redis_url:
+            try:
+                # Sem Redis, usa o store local (CACHE_LOCAL_STORE_PATH) se configurado
+                self.redis_client = connect_redis(redis_url, factory=redis.from_url)
+                self.l2_enabled = True
+                logger.info("✅ Redis conectado com sucesso")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis não disponível: {e}")
+                self.redis_client = None
         
         # Métricas
         self.metrics = CacheMetrics()
@@ -200,17 +223,17 @@ class IntelligentCache:
         key_str = json.dumps(key, sort_keys=True, default=str)
         return f"cache:{hashlib.md5(key_str.encode()).hexdigest()}"
     
-    def _serialize_value(self, value: Any) -> str:
-        """Serializa valor para armazenamento"""
-        return json.dumps(value, default=str)
+    def _serialize_value(self, value: Any) -> bytes:
+        """Serializa valor para armazenamento (formato binário do cache)"""
+        return self.codec.encode(value)
     
-    def _deserialize_value(self, value: str) -> Any:
-        """Deserializa valor do armazenamento"""
-        return json.loads(value)
+    def _deserialize_value(self, value: Union[str, bytes]) -> Any:
+        """Deserializa valor do armazenamento (aceita valores legados em JSON)"""
+        return self.codec.decode(value)
     
     def _calculate_size(self, value: Any) -> int:
         """Calcula tamanho aproximado do valor"""
-        return len(self._serialize_value(value))
+        return estimate_size(value)
     
     def _adjust_ttl(self, key: str, access_pattern: Dict) -> int:
         """Ajusta TTL baseado no padrão de acesso"""
@@ -237,13 +260,10 @@ class IntelligentCache:
         start_time = time.time()
         
         # Tentativa L1 (cache local)
-        if cache_key in self.l1_cache:
-            item = self.l1_cache[cache_key]
-            if not item.is_expired():
-                item.update_access()
-                self.l1_cache.move_to_end(cache_key)
-                self._update_metrics(hit=True, response_time=time.time() - start_time)
-                return item.value
+        value = self.l1_cache.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            self._update_metrics(hit=True, response_time=time.time() - start_time)
+            return value
         
         # Tentativa L2 (Redis)
         if self.l2_enabled:
@@ -297,65 +317,39 @@ class IntelligentCache:
         return success_l1 or success_l2
     
     def _set_l1(self, key: str, value: Any, ttl: Optional[int] = None, tags: List[str] = None) -> bool:
-        """Armazena valor no cache L1 (local)"""
+        """
+        Armazena valor no cache L1 (local).
+        
+        Returns:
+            False se o valor não foi admitido (maior que o orçamento de memória
+            ou rejeitado pela admissão W-TinyLFU)
+        """
         try:
-            # Remove item existente se necessário
-            if key in self.l1_cache:
-                del self.l1_cache[key]
-            
-            # Verifica limite de tamanho
-            if len(self.l1_cache) >= self.max_size:
-                self._evict_item()
-            
-            # Cria novo item
-            item = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.now(),
-                accessed_at=datetime.now(),
-                ttl=ttl,
-                size_bytes=self._calculate_size(value),
-                metadata=tags or {}
-            )
-            
-            self.l1_cache[key] = item
-            return True
-            
+            return self.l1_cache.set(key, value, ttl=ttl, tags=tags, size=self._calculate_size(value))
         except Exception as e:
             logger.error(f"Erro ao armazenar no L1: {e}")
             return False
     
+    @property
+    def _eviction(self):
+        """Motor de eviction do namespace L1 desta instância."""
+        return self.l1_cache.engine
+    
     def _evict_item(self):
-        """Remove item do cache baseado na estratégia"""
-        if not self.l1_cache:
-            return
-        
-        if self.strategy == CacheStrategy.LRU:
-            # Remove o item menos recentemente usado
-            self.l1_cache.popitem(last=False)
-        elif self.strategy == CacheStrategy.LFU:
-            # Remove o item menos frequentemente usado
-            least_used = min(self.l1_cache.values(), key=lambda value: value.access_count)
-            del self.l1_cache[least_used.key]
-        else:
-            # Estratégia padrão: remove o primeiro
-            self.l1_cache.popitem(last=False)
-        
-        self.metrics.evictions += 1
+        """Remove a vítima atual da política de eviction (LRU ou LFU)"""
+        with self.l1_cache._lock:
+            victim = self._eviction.main.victim() or self._eviction.window.victim()
+            if victim is None:
+                return
+            self.l1_cache._remove_l1(victim)
+            self._eviction.evictions += 1
     
     def invalidate_by_tag(self, tag: str) -> int:
         """Invalida todos os itens com uma tag específica"""
         invalidated_count = 0
         
-        # Invalida L1
-        keys_to_remove = []
-        for key, item in self.l1_cache.items():
-            if tag in item.tags:
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self.l1_cache[key]
-            invalidated_count += 1
+        # Invalida L1 pelo índice tag -> chaves
+        invalidated_count += self.l1_cache.invalidate_by_tag(tag)
         
         # Invalida L2
         if self.l2_enabled:
@@ -384,18 +378,11 @@ class IntelligentCache:
         self.metrics = CacheMetrics()
     
     def _cleanup_expired(self):
-        """Remove itens expirados do cache"""
-        expired_keys = []
-        
-        for key, item in self.l1_cache.items():
-            if item.is_expired():
-                expired_keys.append(key)
+        """Remove itens expirados do cache (timer wheel: só visita os prazos vencidos)"""
+        expired_count = self.l1_cache.expire()
         
-        for key in expired_keys:
-            del self.l1_cache[key]
-        
-        if expired_keys:
-            logger.info(f"Removidos {len(expired_keys)} itens expirados do cache")
+        if expired_count:
+            logger.info(f"Removidos {expired_count} itens expirados do cache")
     
     def _adjust_strategy(self):
         """Ajusta estratégia baseado nas métricas"""
@@ -431,19 +418,20 @@ class IntelligentCache:
         if not self.enable_metrics:
             return
         
-        self.metrics.total_requests += 1
-        
-        if hit:
-            self.metrics.hits += 1
-        else:
-            self.metrics.misses += 1
-        
-        # Atualiza tempo médio de resposta
-        current_avg = self.metrics.avg_response_time
-        total_requests = self.metrics.total_requests
-        self.metrics.avg_response_time = (current_avg * (total_requests - 1) + response_time) / total_requests
-        
-        self.metrics.last_updated = datetime.now()
+        with self._lock:
+            self.metrics.total_requests += 1
+            
+            if hit:
+                self.metrics.hits += 1
+            else:
+                self.metrics.misses += 1
+            
+            # Atualiza tempo médio de resposta
+            current_avg = self.metrics.avg_response_time
+            total_requests = self.metrics.total_requests
+            self.metrics.avg_response_time = (current_avg * (total_requests - 1) + response_time) / total_requests
+            
+            self.metrics.last_updated = datetime.now()
     
     def get_metrics(self) -> Dict:
         """Retorna métricas detalhadas do cache"""
@@ -453,9 +441,13 @@ class IntelligentCache:
             'total_requests': self.metrics.total_requests,
             'hits': self.metrics.hits,
             'misses': self.metrics.misses,
-            'evictions': self.metrics.evictions,
+            'evictions': self._eviction.evictions,
             'avg_response_time': self.metrics.avg_response_time,
             'l1_size': len(self.l1_cache),
+            'l1_bytes': self._eviction.total_bytes,
+            'max_bytes': self._eviction.max_bytes,
+            'admission_rejections': self._eviction.admission_rejections,
+            'eviction_policy': self._eviction.policy,
             'l2_enabled': self.l2_enabled,
             'strategy': self.strategy.value,
             'last_updated': self.metrics.last_updated.isoformat()
@@ -467,7 +459,9 @@ class IntelligentCache:
             'metrics': self.get_metrics(),
             'adaptive_config': self.adaptive_config,
             'max_size': self.max_size,
-            'current_size': len(self.l1_cache)
+            'current_size': len(self.l1_cache),
+            'eviction': self._eviction.get_stats(),
+            'namespace': self.l1_cache.name
         }
 
 # Decorator para cache automático
@@ -513,6 +507,63 @@ def cached(
         return wrapper
     return decorator
 
+def benchmark_eviction(
+    tamanhos: Tuple[int, ...] = (1_000, 10_000, 100_000),
+    operacoes: int = 20_000,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Mede o custo médio de set/get no L1 cheio, em tamanhos crescentes.
+    
+    Com o motor de eviction O(1) o custo por operação deve ficar estável
+    entre os tamanhos (a varredura `min()` anterior crescia linearmente).
+    Metade das chaves consultadas não está no cache, forçando eviction.
+    
+    Returns:
+        Custos em microssegundos por tamanho e a razão maior/menor tamanho
+    """
+    import random
+    
+    rng = random.Random(seed)
+    por_tamanho = {}
+    for tamanho in tamanhos:
+        cache = IntelligentCache(
+            redis_url="",
+            max_size=tamanho,
+            strategy=CacheStrategy.LFU,
+            auto_cleanup=False,
+            max_memory_mb=1024
+        )
+        for indice in range(tamanho):
+            cache.set(f"k{indice}", indice, ttl=3600)
+        chaves = [f"k{rng.randrange(tamanho * 2)}" for _ in range(operacoes)]
+        
+        inicio = time.perf_counter()
+        for chave in chaves:
+            cache.set(chave, 1, ttl=3600)
+        tempo_set = time.perf_counter() - inicio
+        
+        inicio = time.perf_counter()
+        for chave in chaves:
+            cache.get(chave)
+        tempo_get = time.perf_counter() - inicio
+        
+        por_tamanho[tamanho] = {
+            "set_us": tempo_set / operacoes * 1e6,
+            "get_us": tempo_get / operacoes * 1e6,
+            "evictions": cache.get_metrics()["evictions"],
+            "hit_ratio": cache.metrics.hit_ratio
+        }
+    
+    menor, maior = por_tamanho[min(tamanhos)], por_tamanho[max(tamanhos)]
+    resultado = {
+        "por_tamanho": por_tamanho,
+        "crescimento_set": maior["set_us"] / menor["set_us"],
+        "crescimento_get": maior["get_us"] / menor["get_us"]
+    }
+    logger.info(f"Benchmark de eviction: {resultado}")
+    return resultado
+
 # Testes unitários (não executar nesta fase)
 def test_intelligent_cache():
     """Teste básico do cache inteligente"""
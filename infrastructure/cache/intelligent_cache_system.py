@@ -32,11 +32,14 @@ import logging
 # Integração com observabilidade
 from infrastructure.observability.telemetry import TelemetryManager
 from infrastructure.observability.metrics import MetricsManager
+from infrastructure.cache.tiered_cache import get_tiered_cache
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 class CacheLevel(Enum):
     """Níveis de cache"""
@@ -252,9 +255,15 @@ class IntelligentCacheSystem:
         self.enable_l2 = enable_l2
         self.default_ttl = default_ttl
         
-        # Inicializar caches
-        self.l1_cache = LRUCache(l1_max_size) if enable_l1 else None
-        self.l2_cache = RedisCache(redis_host, redis_port) if enable_l2 else None
+        # Inicializar caches: namespaces do cache em camadas do processo
+        # (o "Redis" do L2 era simulado em memória)
+        tiered_cache = get_tiered_cache()
+        self.l1_cache = tiered_cache.namespace(
+            prefix="intelligent_cache_system.l1", max_entries=l1_max_size, policy="lru"
+        ) if enable_l1 else None
+        self.l2_cache = tiered_cache.namespace(
+            prefix="intelligent_cache_system.l2", policy="lru"
+        ) if enable_l2 else None
         
         # Configurar observabilidade
         self.telemetry = TelemetryManager()
@@ -287,27 +296,27 @@ class IntelligentCacheSystem:
         
         try:
             # Tentar L1 cache primeiro
-            if self.enable_l1 and self.l1_cache:
-                item = self.l1_cache.get(key)
-                if item:
+            if self.enable_l1 and self.l1_cache is not None:
+                value = self.l1_cache.get(key, _MISSING)
+                if value is not _MISSING:
                     self.stats.hits += 1
                     self.access_patterns[key] += 1
                     self._record_metrics('cache_hit', 'l1', time.time() - start_time)
-                    return item.value
+                    return value
             
             # Tentar L2 cache
-            if self.enable_l2 and self.l2_cache:
-                item = self.l2_cache.get(key)
-                if item:
+            if self.enable_l2 and self.l2_cache is not None:
+                value = self.l2_cache.get(key, _MISSING)
+                if value is not _MISSING:
                     self.stats.hits += 1
                     self.access_patterns[key] += 1
                     
-                    # Promover para L1 cache
-                    if self.enable_l1 and self.l1_cache:
-                        self.l1_cache.set(key, item.value, item.ttl, item.metadata)
+                    # Promover para L1 cache com o TTL restante
+                    if self.enable_l1 and self.l1_cache is not None:
+                        self.l1_cache.set(key, value, self.l2_cache.ttl_remaining(key))
                     
                     self._record_metrics('cache_hit', 'l2', time.time() - start_time)
-                    return item.value
+                    return value
             
             # Cache miss
             self.stats.misses += 1
@@ -329,15 +338,15 @@ class IntelligentCacheSystem:
             success = True
             
             # Definir no nível especificado
-            if level == CacheLevel.L1 and self.enable_l1 and self.l1_cache:
-                success &= self.l1_cache.set(key, value, ttl, metadata)
+            if level == CacheLevel.L1 and self.enable_l1 and self.l1_cache is not None:
+                success &= self.l1_cache.set(key, value, ttl)
             
-            if level == CacheLevel.L2 and self.enable_l2 and self.l2_cache:
-                success &= self.l2_cache.set(key, value, ttl, metadata)
+            if level == CacheLevel.L2 and self.enable_l2 and self.l2_cache is not None:
+                success &= self.l2_cache.set(key, value, ttl)
             
             # Definir em ambos os níveis se L1
-            if level == CacheLevel.L1 and self.enable_l2 and self.l2_cache:
-                self.l2_cache.set(key, value, ttl, metadata)
+            if level == CacheLevel.L1 and self.enable_l2 and self.l2_cache is not None:
+                self.l2_cache.set(key, value, ttl)
             
             if success:
                 self._record_metrics('cache_set', level.value, time.time() - start_time)
@@ -354,14 +363,14 @@ class IntelligentCacheSystem:
         try:
             success = True
             
-            if level == CacheLevel.L1 and self.enable_l1 and self.l1_cache:
+            if level == CacheLevel.L1 and self.enable_l1 and self.l1_cache is not None:
                 success &= self.l1_cache.delete(key)
             
-            if level == CacheLevel.L2 and self.enable_l2 and self.l2_cache:
+            if level == CacheLevel.L2 and self.enable_l2 and self.l2_cache is not None:
                 success &= self.l2_cache.delete(key)
             
             # Remover de ambos os níveis se L1
-            if level == CacheLevel.L1 and self.enable_l2 and self.l2_cache:
+            if level == CacheLevel.L1 and self.enable_l2 and self.l2_cache is not None:
                 self.l2_cache.delete(key)
             
             return success
@@ -374,11 +383,11 @@ class IntelligentCacheSystem:
         """Limpa cache"""
         try:
             if level is None or level == CacheLevel.L1:
-                if self.enable_l1 and self.l1_cache:
+                if self.enable_l1 and self.l1_cache is not None:
                     self.l1_cache.clear()
             
             if level is None or level == CacheLevel.L2:
-                if self.enable_l2 and self.l2_cache:
+                if self.enable_l2 and self.l2_cache is not None:
                     self.l2_cache.clear()
             
             logger.info(f"Cache limpo: {level.value if level else 'all'}")
@@ -418,10 +427,13 @@ class IntelligentCacheSystem:
     def invalidate_pattern(self, pattern: str, level: CacheLevel = CacheLevel.L1):
         """Invalida cache por padrão"""
         try:
-            # Implementar invalidação por padrão
-            # Por simplicidade, limpa todo o cache
-            self.clear(level)
-            logger.info(f"Cache invalidado por padrão: {pattern}")
+            # Padrão glob sobre as chaves (ex.: "keywords:*"); L1 também invalida o L2
+            removed = 0
+            if level == CacheLevel.L1 and self.enable_l1 and self.l1_cache is not None:
+                removed += self.l1_cache.invalidate_pattern(pattern)
+            if self.enable_l2 and self.l2_cache is not None:
+                removed += self.l2_cache.invalidate_pattern(pattern)
+            logger.info(f"Cache invalidado por padrão: {pattern} ({removed} chaves)")
             
         except Exception as e:
             logger.error(f"Erro na invalidação por padrão: {e}")
@@ -431,10 +443,10 @@ class IntelligentCacheSystem:
         stats = asdict(self.stats)
         
         # Adicionar estatísticas dos caches individuais
-        if self.enable_l1 and self.l1_cache:
+        if self.enable_l1 and self.l1_cache is not None:
             stats['l1_cache'] = self.l1_cache.get_stats()
         
-        if self.enable_l2 and self.l2_cache:
+        if self.enable_l2 and self.l2_cache is not None:
             stats['l2_cache'] = self.l2_cache.get_stats()
         
         # Adicionar padrões de acesso
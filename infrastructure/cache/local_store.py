@@ -0,0 +1,405 @@
+"""
+📄 Store Local Compartilhado (substituto do Redis em um único host)
+🎯 Objetivo: L2 persistente e compartilhado entre processos (workers do gunicorn)
+   sem serviço externo, para deploys de um nó e CI
+🔧 Integração: IntelligentCache, YouTubeQuotaManager, backend IntelligentCache,
+   TieredCache (nível L2 via CACHE_LOCAL_STORE_PATH)
+
+Tracing ID: CACHE_LOCAL_STORE_20250127_001
+Data: 2025-01-27
+Versão: 1.0
+
+Arquivo SQLite em modo WAL (leitores não bloqueiam o escritor) com TTL por
+chave, expondo o subconjunto de operações do redis-py usado pelos caches:
+get/set/setex/delete/exists/expire/ttl/incr/incrby/keys/scan_iter,
+conjuntos (sadd/srem/smembers), ping e flushdb.
+
+Uso:
+- redis_url = "sqlite:///caminho/cache.sqlite3" usa o store diretamente;
+- CACHE_LOCAL_STORE_PATH=<arquivo> ativa o store como fallback quando o
+  Redis configurado não responde.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from infrastructure.cache.tiered_cache import RedisTier
+
+try:
+    from redis.exceptions import RedisError as _ErroBase
+except ImportError:
+    _ErroBase = Exception
+
+logger = logging.getLogger(__name__)
+
+URL_PREFIX = "sqlite:///"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS kv ("
+    " key TEXT PRIMARY KEY, value BLOB NOT NULL, expire_at REAL)",
+    "CREATE INDEX IF NOT EXISTS kv_expire_at ON kv (expire_at)",
+    "CREATE TABLE IF NOT EXISTS sets ("
+    " key TEXT NOT NULL, member BLOB NOT NULL, expire_at REAL,"
+    " PRIMARY KEY (key, member))",
+    "CREATE INDEX IF NOT EXISTS sets_expire_at ON sets (expire_at)",
+)
+
+_VIVA = "(expire_at IS NULL OR expire_at > ?)"
+
+
+class LocalStoreError(_ErroBase):
+    """Erro do store local (subclasse de RedisError quando redis-py está instalado)."""
+
+
+def _segundos(tempo: Union[int, float, timedelta]) -> float:
+    return tempo.total_seconds() if isinstance(tempo, timedelta) else float(tempo)
+
+
+def _encode(valor: Any) -> bytes:
+    """Converte valores como o redis-py (str em UTF-8, números em texto)."""
+    if isinstance(valor, bytes):
+        return valor
+    if isinstance(valor, (bytearray, memoryview)):
+        return bytes(valor)
+    if isinstance(valor, str):
+        return valor.encode("utf-8")
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return repr(valor).encode("ascii")
+    raise LocalStoreError(f"Tipo de valor não suportado: {type(valor).__name__}")
+
+
+class LocalRedisStore:
+    """
+    Subconjunto do cliente redis-py sobre SQLite (WAL), compartilhável entre processos.
+
+    Cada thread (e cada processo, após fork) usa a própria conexão; operações
+    de leitura-e-escrita (incr, set com nx/xx) rodam em transação IMMEDIATE.
+    Chaves expiradas são ignoradas na leitura e removidas periodicamente.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        decode_responses: bool = False,
+        busy_timeout: float = 30.0,
+        purge_every: int = 1000
+    ):
+        self.path = path
+        self.decode_responses = decode_responses
+        self.busy_timeout = busy_timeout
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @classmethod
+    def from_url(cls, url: str, decode_responses: bool = False, **kwargs) -> "LocalRedisStore":
+        """Cria o store a partir de uma URL sqlite:///caminho."""
+        if not url.startswith(URL_PREFIX):
+            raise ValueError(f"URL do store local deve começar com {URL_PREFIX}: {url}")
+        return cls(url.replace(URL_PREFIX, "", 1), decode_responses=decode_responses, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if isinstance(e, sqlite3.Error):
+                raise LocalStoreError(str(e)) from e
+            raise
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        try:
+            return self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise LocalStoreError(str(e)) from e
+
+    def _decode(self, valor: Optional[bytes]) -> Any:
+        if valor is None or not self.decode_responses:
+            return valor
+        return valor.decode("utf-8")
+
+    def _decode_key(self, key: str) -> Any:
+        return key if self.decode_responses else key.encode("utf-8")
+
+    @staticmethod
+    def _key(name: Union[str, bytes]) -> str:
+        return name.decode("utf-8") if isinstance(name, bytes) else str(name)
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self.purge_every and self._writes % self.purge_every == 0:
+            self.purge_expired()
+
+    # Conexão
+
+    def ping(self) -> bool:
+        self._query("SELECT 1")
+        return True
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def purge_expired(self) -> int:
+        """Remove chaves expiradas; retorna quantas linhas foram removidas."""
+        now = time.time()
+        with self._transaction() as conn:
+            removed = conn.execute("DELETE FROM kv WHERE expire_at <= ?", (now,)).rowcount
+            removed += conn.execute("DELETE FROM sets WHERE expire_at <= ?", (now,)).rowcount
+        return removed
+
+    # Strings
+
+    def get(self, name: Union[str, bytes]) -> Any:
+        rows = self._query(f"SELECT value FROM kv WHERE key = ? AND {_VIVA}", (self._key(name), time.time()))
+        return self._decode(rows[0][0]) if rows else None
+
+    def set(
+        self,
+        name: Union[str, bytes],
+        value: Any,
+        ex: Optional[Union[int, timedelta]] = None,
+        px: Optional[Union[int, timedelta]] = None,
+        nx: bool = False,
+        xx: bool = False
+    ) -> Optional[bool]:
+        key = self._key(name)
+        data = _encode(value)
+        now = time.time()
+        if ex is not None:
+            expire_at = now + _segundos(ex)
+        elif px is not None:
+            expire_at = now + (px.total_seconds() if isinstance(px, timedelta) else px / 1000)
+        else:
+            expire_at = None
+
+        with self._transaction() as conn:
+            if nx or xx:
+                exists = conn.execute(f"SELECT 1 FROM kv WHERE key = ? AND {_VIVA}", (key, now)).fetchone()
+                if (nx and exists) or (xx and not exists):
+                    return None
+            conn.execute(
+                "INSERT INTO kv (key, value, expire_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expire_at = excluded.expire_at",
+                (key, data, expire_at)
+            )
+            conn.execute("DELETE FROM sets WHERE key = ?", (key,))
+        self._after_write()
+        return True
+
+    def setex(self, name: Union[str, bytes], time_: Union[int, timedelta], value: Any) -> bool:
+        return bool(self.set(name, value, ex=time_))
+
+    def incrby(self, name: Union[str, bytes], amount: int = 1) -> int:
+        key = self._key(name)
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT value, expire_at FROM kv WHERE key = ? AND {_VIVA}", (key, now)).fetchone()
+            try:
+                current = int(row[0]) if row else 0
+            except ValueError:
+                raise LocalStoreError("value is not an integer or out of range")
+            result = current + amount
+            conn.execute(
+                "INSERT INTO kv (key, value, expire_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expire_at = excluded.expire_at",
+                (key, str(result).encode("ascii"), row[1] if row else None)
+            )
+        self._after_write()
+        return result
+
+    def incr(self, name: Union[str, bytes], amount: int = 1) -> int:
+        return self.incrby(name, amount)
+
+    # Chaves
+
+    def delete(self, *names: Union[str, bytes]) -> int:
+        if not names:
+            return 0
+        keys = [self._key(name) for name in names]
+        marks = ",".join("?" * len(keys))
+        now = time.time()
+        with self._transaction() as conn:
+            removed = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT key FROM kv WHERE key IN ({marks}) AND {_VIVA} "
+                f"UNION SELECT key FROM sets WHERE key IN ({marks}) AND {_VIVA})",
+                (*keys, now, *keys, now)
+            ).fetchone()[0]
+            conn.execute(f"DELETE FROM kv WHERE key IN ({marks})", keys)
+            conn.execute(f"DELETE FROM sets WHERE key IN ({marks})", keys)
+        return removed
+
+    def exists(self, *names: Union[str, bytes]) -> int:
+        now = time.time()
+        total = 0
+        for name in names:
+            key = self._key(name)
+            rows = self._query(
+                f"SELECT 1 FROM kv WHERE key = ? AND {_VIVA} UNION SELECT 1 FROM sets WHERE key = ? AND {_VIVA} LIMIT 1",
+                (key, now, key, now)
+            )
+            total += bool(rows)
+        return total
+
+    def expire(self, name: Union[str, bytes], time_: Union[int, timedelta]) -> bool:
+        key = self._key(name)
+        now = time.time()
+        expire_at = now + _segundos(time_)
+        with self._transaction() as conn:
+            changed = conn.execute(f"UPDATE kv SET expire_at = ? WHERE key = ? AND {_VIVA}", (expire_at, key, now)).rowcount
+            changed += conn.execute(f"UPDATE sets SET expire_at = ? WHERE key = ? AND {_VIVA}", (expire_at, key, now)).rowcount
+        return changed > 0
+
+    def ttl(self, name: Union[str, bytes]) -> int:
+        """Segundos restantes; -1 sem expiração e -2 se a chave não existe (como no Redis)."""
+        key = self._key(name)
+        now = time.time()
+        rows = self._query(
+            f"SELECT expire_at FROM kv WHERE key = ? AND {_VIVA} UNION ALL SELECT expire_at FROM sets WHERE key = ? AND {_VIVA} LIMIT 1",
+            (key, now, key, now)
+        )
+        if not rows:
+            return -2
+        if rows[0][0] is None:
+            return -1
+        return max(int(round(rows[0][0] - now)), 0)
+
+    def keys(self, pattern: Union[str, bytes] = "*") -> List[Any]:
+        now = time.time()
+        rows = self._query(
+            f"SELECT key FROM kv WHERE key GLOB ? AND {_VIVA} UNION SELECT key FROM sets WHERE key GLOB ? AND {_VIVA}",
+            (self._key(pattern), now, self._key(pattern), now)
+        )
+        return [self._decode_key(row[0]) for row in rows]
+
+    def scan_iter(self, match: Optional[Union[str, bytes]] = None, count: Optional[int] = None, **kwargs) -> Iterator[Any]:
+        return iter(self.keys(match or "*"))
+
+    def flushdb(self, **kwargs) -> bool:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM kv")
+            conn.execute("DELETE FROM sets")
+        return True
+
+    # Conjuntos
+
+    def sadd(self, name: Union[str, bytes], *values: Any) -> int:
+        key = self._key(name)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sets WHERE key = ? AND expire_at <= ?", (key, now))
+            row = conn.execute("SELECT expire_at FROM sets WHERE key = ? LIMIT 1", (key,)).fetchone()
+            added = 0
+            for value in values:
+                added += conn.execute(
+                    "INSERT OR IGNORE INTO sets (key, member, expire_at) VALUES (?, ?, ?)",
+                    (key, _encode(value), row[0] if row else None)
+                ).rowcount
+        self._after_write()
+        return added
+
+    def srem(self, name: Union[str, bytes], *values: Any) -> int:
+        key = self._key(name)
+        with self._transaction() as conn:
+            return sum(
+                conn.execute("DELETE FROM sets WHERE key = ? AND member = ?", (key, _encode(value))).rowcount
+                for value in values
+            )
+
+    def smembers(self, name: Union[str, bytes]) -> set:
+        rows = self._query(f"SELECT member FROM sets WHERE key = ? AND {_VIVA}", (self._key(name), time.time()))
+        return {self._decode(row[0]) for row in rows}
+
+
+class LocalStoreTier(RedisTier):
+    """Nível do cache em camadas sobre o store local (compartilhado entre os processos do host)."""
+
+    name = "local"
+
+
+_stores: Dict[Tuple[str, bool], LocalRedisStore] = {}
+_stores_lock = threading.Lock()
+
+
+def local_store_fallback(decode_responses: bool = False) -> Optional[LocalRedisStore]:
+    """Store local configurado em CACHE_LOCAL_STORE_PATH (um por arquivo no processo), ou None."""
+    path = os.getenv("CACHE_LOCAL_STORE_PATH", "")
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get((path, decode_responses))
+        if store is None:
+            store = _stores[(path, decode_responses)] = LocalRedisStore(path, decode_responses=decode_responses)
+        return store
+
+
+def connect_redis(
+    redis_url: str,
+    decode_responses: bool = False,
+    factory: Optional[Callable[..., Any]] = None,
+    require_connection: bool = True
+) -> Any:
+    """
+    Conecta ao Redis, com o store local como alternativa.
+
+    Args:
+        redis_url: URL do Redis, ou sqlite:///caminho para usar o store local
+        decode_responses: Retornar str em vez de bytes
+        factory: Construtor do cliente (padrão redis.from_url)
+        require_connection: Se False, sem fallback configurado o cliente é
+            retornado mesmo sem responder ao ping (erros ficam para cada operação)
+
+    Returns:
+        Cliente Redis ou LocalRedisStore
+
+    Raises:
+        Exception: Erro de conexão, quando não há fallback configurado
+    """
+    if redis_url.startswith(URL_PREFIX):
+        return LocalRedisStore.from_url(redis_url, decode_responses=decode_responses)
+
+    client = None
+    try:
+        if factory is None:
+            import redis
+            factory = redis.from_url
+        client = factory(redis_url, decode_responses=decode_responses)
+        client.ping()
+        return client
+    except Exception as e:
+        fallback = local_store_fallback(decode_responses)
+        if fallback is not None:
+            logger.warning(f"⚠️ Redis indisponível ({e}); usando store local em {fallback.path}")
+            return fallback
+        if client is not None and not require_connection:
+            return client
+        raise
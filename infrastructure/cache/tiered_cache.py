@@ -0,0 +1,679 @@
+"""
+📄 Cache em Camadas Unificado
+🎯 Objetivo: Um único cache por processo (L1 em memória, L2 local opcional,
+   L3 Redis opcional) com registro central de namespaces e métricas
+🔧 Integração: IntelligentCache, AdvancedCaching, DistributedCache,
+   IntelligentCacheSystem e CacheInteligente usam namespaces deste cache
+
+Tracing ID: TIERED_CACHE_20250127_001
+Data: 2025-01-27
+Versão: 1.0
+"""
+
+import fnmatch
+import glob
+import logging
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from infrastructure.cache.codec import BinaryCodec
+from infrastructure.cache.eviction_engine import EvictionEngine
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho dos valores gravados em L2/L3: prazo absoluto (0.0 = sem prazo)
+_CABECALHO = struct.Struct("<d")
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Tamanho aproximado de um valor em bytes, usado no orçamento do L1.
+
+    Soma sys.getsizeof dos objetos alcançáveis por contêineres e atributos,
+    sem serializar o valor (cada objeto é contado uma vez).
+    """
+    total = 0
+    pending = [value]
+    seen = set()
+    while pending:
+        item = pending.pop()
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            total += len(item)
+            continue
+        if isinstance(item, str):
+            total += len(item.encode("utf-8", errors="ignore"))
+            continue
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            pending.append(vars(item))
+    return total
+
+
+class CacheTier:
+    """
+    Nível inferior do cache (L2 ou L3).
+
+    Armazena bytes já serializados sob chaves globais (`<namespace>:<chave>`).
+    Falhas devem ser tratadas internamente e reportadas como miss/False:
+    um nível indisponível nunca derruba a leitura do L1.
+    """
+
+    name = "tier"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        raise NotImplementedError
+
+    def delete_matching(self, pattern: str, predicate: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Remove as chaves que casam com o glob `pattern` (e com `predicate`, se dado); retorna as removidas."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"name": self.name}
+
+
+class RedisTier(CacheTier):
+    """Nível L3 sobre um cliente Redis síncrono (redis-py)."""
+
+    name = "redis"
+
+    def __init__(self, client: Any, key_prefix: str = "tiered"):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, redis_url: str, key_prefix: str = "tiered") -> Optional["RedisTier"]:
+        """Conecta ao Redis; retorna None se o pacote ou o servidor não estiverem disponíveis."""
+        try:
+            import redis
+            client = redis.from_url(redis_url)
+            client.ping()
+            return cls(client, key_prefix)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis indisponível para o cache em camadas: {e}")
+            return None
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            data = self.client.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao ler do Redis: {e}")
+            return None
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None) -> bool:
+        try:
+            if ttl:
+                return bool(self.client.setex(self._key(key), max(int(ttl), 1), data))
+            return bool(self.client.set(self._key(key), data))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao gravar no Redis: {e}")
+            return False
+
+    def delete(self, key: str) -> bool:
+        try:
+            return bool(self.client.delete(self._key(key)))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao remover do Redis: {e}")
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        try:
+            keys = list(self.client.scan_iter(match=f"{self._key(prefix)}*"))
+            if keys:
+                self.client.delete(*keys)
+            return len(keys)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao limpar prefixo no Redis: {e}")
+            return 0
+
+    def delete_matching(self, pattern: str, predicate: Optional[Callable[[str], bool]] = None) -> List[str]:
+        start = len(self.key_prefix) + 1
+        removed = []
+        try:
+            batch = []
+            for raw in self.client.scan_iter(match=self._key(pattern)):
+                key = (raw.decode("utf-8") if isinstance(raw, bytes) else raw)[start:]
+                if predicate is None or predicate(key):
+                    batch.append(raw)
+                    removed.append(key)
+            for offset in range(0, len(batch), 500):
+                self.client.delete(*batch[offset:offset + 500])
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao invalidar padrão no Redis: {e}")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors
+        }
+
+
+@dataclass
+class _L1Entry:
+    value: Any
+    expire_at: Optional[float]
+
+
+@dataclass
+class NamespaceMetrics:
+    """Contadores de um namespace; hits separados pelo nível que respondeu."""
+    hits: Dict[str, int] = field(default_factory=lambda: {"l1": 0, "l2": 0, "l3": 0})
+    misses: int = 0
+    sets: int = 0
+    deletes: int = 0
+
+    @property
+    def total_hits(self) -> int:
+        return sum(self.hits.values())
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.total_hits + self.misses
+        return self.total_hits / total if total else 0.0
+
+
+class CacheNamespace:
+    """
+    Visão de um namespace do cache em camadas.
+
+    O L1 de cada namespace tem limites próprios (quantidade, bytes e
+    política do EvictionEngine); os níveis inferiores são compartilhados e
+    as chaves neles recebem o prefixo do namespace. Namespaces anônimos
+    (criados sem nome) ficam apenas no L1, pois seus nomes gerados não são
+    estáveis entre processos.
+    """
+
+    def __init__(
+        self,
+        cache: "TieredCache",
+        name: str,
+        max_entries: int,
+        max_bytes: Optional[int],
+        policy: str,
+        use_lower_tiers: bool
+    ):
+        self.cache = cache
+        self.name = name
+        self.use_lower_tiers = use_lower_tiers
+        self.engine = EvictionEngine(max_entries=max_entries, max_bytes=max_bytes, policy=policy)
+        self.metrics = NamespaceMetrics()
+        self._entries: Dict[str, _L1Entry] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry, time.time())
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    @staticmethod
+    def _expired(entry: _L1Entry, now: float) -> bool:
+        return entry.expire_at is not None and entry.expire_at <= now
+
+    def _tiers(self) -> List[Tuple[str, CacheTier]]:
+        return self.cache.lower_tiers() if self.use_lower_tiers else []
+
+    def _global_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _store_l1(
+        self,
+        key: str,
+        value: Any,
+        expire_at: Optional[float],
+        size: int,
+        tags: Iterable[str] = ()
+    ) -> bool:
+        """Grava no L1 (chamador segura o lock). False se o motor rejeitou a chave."""
+        # Expirados liberam espaço antes de remover itens ainda válidos
+        for expired_key in self.engine.expire():
+            self._entries.pop(expired_key, None)
+
+        self._entries[key] = _L1Entry(value, expire_at)
+        evicted = self.engine.insert(key, size, expire_at=expire_at, tags=tags)
+        for evicted_key in evicted:
+            self._entries.pop(evicted_key, None)
+        return key not in evicted
+
+    def _remove_l1(self, key: str) -> bool:
+        """Remove uma chave do L1 (chamador segura o lock)."""
+        self.engine.remove(key)
+        return self._entries.pop(key, None) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Busca no L1 e, em caso de miss, nos níveis inferiores (promovendo ao L1)."""
+        now = time.time()
+        with self._lock:
+            # Misses também contam para a frequência usada na admissão (TinyLFU)
+            self.engine.record_access(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry, now):
+                    self.metrics.hits["l1"] += 1
+                    return entry.value
+                self._remove_l1(key)
+
+        for level, tier in self._tiers():
+            data = tier.get(self._global_key(key))
+            if data is None:
+                continue
+            try:
+                expire_at, value = self.cache.unpack(data)
+            except Exception as e:
+                logger.error(f"Valor inválido no nível {level} para {self.name}:{key}: {e}")
+                continue
+            if expire_at is not None and expire_at <= now:
+                continue
+            with self._lock:
+                self._store_l1(key, value, expire_at, len(data))
+                self.metrics.hits[level] += 1
+            return value
+
+        with self._lock:
+            self.metrics.misses += 1
+        return default
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None,
+        size: Optional[int] = None
+    ) -> bool:
+        """
+        Grava no L1 e, por write-through, nos níveis inferiores.
+
+        Args:
+            ttl: Segundos até expirar (None ou 0 = sem prazo)
+            tags: Tags para `invalidate_by_tag`
+            size: Tamanho contabilizado no orçamento do L1 (estimado se omitido)
+
+        Returns:
+            True se o valor ficou em pelo menos um nível
+        """
+        expire_at = time.time() + ttl if ttl else None
+        tiers = self._tiers()
+        data = None
+        if tiers:
+            try:
+                data = self.cache.pack(value, expire_at)
+            except TypeError as e:
+                # Valor sem representação no codec: fica só no L1 deste processo
+                logger.warning(f"Valor de '{self._global_key(key)}' não serializável, mantido apenas no L1: {e}")
+                tiers = []
+        if size is None:
+            size = len(data) - _CABECALHO.size if data is not None else estimate_size(value)
+
+        with self._lock:
+            stored = self._store_l1(key, value, expire_at, size, tags or ())
+            self.metrics.sets += 1
+
+        for _, tier in tiers:
+            stored = tier.set(self._global_key(key), data, ttl) or stored
+        return stored
+
+    def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> Any:
+        """Retorna o valor em cache ou calcula com `factory` e armazena (None não é armazenado)."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        value = factory()
+        if value is not None:
+            self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def delete(self, key: str) -> bool:
+        """Remove a chave de todos os níveis."""
+        with self._lock:
+            removed = self._remove_l1(key)
+            if removed:
+                self.metrics.deletes += 1
+        for _, tier in self._tiers():
+            removed = tier.delete(self._global_key(key)) or removed
+        return removed
+
+    def _invalidate(self, predicate: Callable[[str], bool], literal_prefix: str = "") -> int:
+        """
+        Remove de todos os níveis as chaves que satisfazem `predicate`.
+
+        Nos níveis inferiores a varredura é feita no próprio nível (scan_iter)
+        sobre as chaves do namespace que começam com `literal_prefix`, então
+        chaves gravadas por outros processos também são removidas.
+        """
+        with self._lock:
+            keys = {key for key in self._entries if predicate(key)}
+            for key in keys:
+                self._remove_l1(key)
+        prefix = self._global_key("")
+        pattern = glob.escape(prefix + literal_prefix) + "*"
+        for _, tier in self._tiers():
+            removed = tier.delete_matching(pattern, lambda key: predicate(key[len(prefix):]))
+            keys.update(key[len(prefix):] for key in removed)
+        return len(keys)
+
+    def invalidate(self, predicate: Callable[[str], bool]) -> int:
+        """Remove de todos os níveis as chaves que satisfazem `predicate`."""
+        return self._invalidate(predicate)
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Remove de todos os níveis as chaves que casam com um padrão glob (`keyword:*`)."""
+        # O trecho literal inicial do padrão restringe a varredura nos níveis inferiores
+        literal_prefix = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+        return self._invalidate(lambda key: fnmatch.fnmatchcase(key, pattern), literal_prefix)
+
+    def invalidate_by_tag(self, tag: str) -> int:
+        """Remove as chaves com a tag, pelo índice secundário do motor (sem varrer o L1)."""
+        with self._lock:
+            keys = self.engine.keys_for_tag(tag)
+            for key in keys:
+                self._remove_l1(key)
+        for _, tier in self._tiers():
+            for key in keys:
+                tier.delete(self._global_key(key))
+        return len(keys)
+
+    def expire(self) -> int:
+        """Remove do L1 as chaves vencidas (timer wheel: só visita os prazos vencidos)."""
+        with self._lock:
+            expired = self.engine.expire()
+            for key in expired:
+                self._entries.pop(key, None)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Esvazia o namespace em todos os níveis, preservando as métricas."""
+        with self._lock:
+            self._entries.clear()
+            self.engine.clear()
+        for _, tier in self._tiers():
+            tier.delete_prefix(f"{self.name}:")
+
+    def keys(self) -> List[str]:
+        """Chaves válidas no L1."""
+        now = time.time()
+        with self._lock:
+            return [key for key, entry in self._entries.items() if not self._expired(entry, now)]
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Segundos restantes da chave no L1 (None se não existe ou não expira)."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expire_at is None:
+            return None
+        return max(entry.expire_at - time.time(), 0.0)
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self.metrics = NamespaceMetrics()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": dict(self.metrics.hits),
+                "misses": self.metrics.misses,
+                "sets": self.metrics.sets,
+                "deletes": self.metrics.deletes,
+                "hit_ratio": self.metrics.hit_ratio,
+                "entries": len(self._entries),
+                "bytes": self.engine.total_bytes,
+                "max_entries": self.engine.max_entries,
+                "max_bytes": self.engine.max_bytes,
+                "policy": self.engine.policy,
+                "evictions": self.engine.evictions,
+                "admission_rejections": self.engine.admission_rejections,
+                "lower_tiers": [level for level, _ in self._tiers()]
+            }
+
+
+class TieredCache:
+    """
+    Cache em camadas do processo: registro de namespaces e métricas.
+
+    L1 é sempre em memória (um EvictionEngine por namespace); L2 (armazenamento
+    local compartilhado) e L3 (Redis) são opcionais e recebem os valores
+    serializados com o prazo absoluto no cabeçalho, então uma promoção para
+    o L1 preserva o TTL restante.
+    """
+
+    def __init__(
+        self,
+        l2: Optional[CacheTier] = None,
+        l3: Optional[CacheTier] = None,
+        default_max_entries: int = 10_000,
+        default_max_bytes: Optional[int] = 64 * 1024 * 1024,
+        default_policy: str = "w-tinylfu",
+        serializer: Optional[Callable[[Any], bytes]] = None,
+        deserializer: Optional[Callable[[bytes], Any]] = None
+    ):
+        self.l2 = l2
+        self.l3 = l3
+        self.default_max_entries = default_max_entries
+        self.default_max_bytes = default_max_bytes
+        self.default_policy = default_policy
+        codec = BinaryCodec()
+        self.serializer = serializer or codec.encode
+        self.deserializer = deserializer or codec.decode
+
+        self._named: Dict[str, CacheNamespace] = {}
+        self._anonymous: "weakref.WeakValueDictionary[str, CacheNamespace]" = weakref.WeakValueDictionary()
+        self._metric_sources: Dict[str, Callable[[], Optional[Callable[[], Dict[str, Any]]]]] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def lower_tiers(self) -> List[Tuple[str, CacheTier]]:
+        return [(level, tier) for level, tier in (("l2", self.l2), ("l3", self.l3)) if tier is not None]
+
+    def pack(self, value: Any, expire_at: Optional[float]) -> bytes:
+        return _CABECALHO.pack(expire_at or 0.0) + self.serializer(value)
+
+    def unpack(self, data: bytes) -> Tuple[Optional[float], Any]:
+        (expire_at,) = _CABECALHO.unpack_from(data)
+        return (expire_at or None), self.deserializer(bytes(data[_CABECALHO.size:]))
+
+    def _next_name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}#{self._counter}"
+
+    def namespace(
+        self,
+        name: Optional[str] = None,
+        *,
+        prefix: str = "anon",
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: Optional[str] = None,
+        use_lower_tiers: Optional[bool] = None
+    ) -> CacheNamespace:
+        """
+        Obtém (ou cria) um namespace.
+
+        Com `name`, o namespace é compartilhado: chamadas seguintes com o mesmo
+        nome recebem a mesma instância (os limites da primeira criação valem).
+        Sem `name`, cria um namespace anônimo `<prefix>#<n>`, exclusivo do
+        chamador, só em L1 e removido do registro quando deixa de ser usado.
+        """
+        with self._lock:
+            if name is not None and name in self._named:
+                return self._named[name]
+
+            anonymous = name is None
+            namespace = CacheNamespace(
+                self,
+                self._next_name(prefix) if anonymous else name,
+                max_entries=max_entries or self.default_max_entries,
+                max_bytes=max_bytes if max_bytes is not None else self.default_max_bytes,
+                policy=policy or self.default_policy,
+                use_lower_tiers=(not anonymous) if use_lower_tiers is None else use_lower_tiers
+            )
+            if anonymous:
+                self._anonymous[namespace.name] = namespace
+            else:
+                self._named[name] = namespace
+            return namespace
+
+    def namespaces(self) -> Dict[str, CacheNamespace]:
+        with self._lock:
+            registered = dict(self._named)
+            registered.update(self._anonymous.items())
+        return registered
+
+    def register_metrics_source(self, prefix: str, provider: Callable[[], Dict[str, Any]]) -> str:
+        """
+        Registra métricas de um cache que não guarda dados no L1 (ex.: só Redis).
+
+        Métodos ligados são mantidos por referência fraca, então registrar
+        `instancia.get_stats` não impede a coleta da instância.
+
+        Returns:
+            Nome gerado sob o qual as métricas aparecem em `get_stats()["external"]`
+        """
+        if hasattr(provider, "__self__"):
+            ref = weakref.WeakMethod(provider)
+        else:
+            ref = lambda: provider
+        with self._lock:
+            # Fontes coletadas saem do registro aqui e em get_stats
+            for dead in [name for name, source in self._metric_sources.items() if source() is None]:
+                del self._metric_sources[dead]
+            name = self._next_name(prefix)
+            self._metric_sources[name] = ref
+        return name
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas globais: por namespace, por nível, fontes externas e totais."""
+        namespaces = {name: ns.get_stats() for name, ns in self.namespaces().items()}
+
+        external = {}
+        with self._lock:
+            sources = list(self._metric_sources.items())
+        for name, ref in sources:
+            provider = ref()
+            if provider is None:
+                with self._lock:
+                    self._metric_sources.pop(name, None)
+                continue
+            try:
+                external[name] = provider()
+            except Exception as e:
+                logger.error(f"Erro ao coletar métricas de {name}: {e}")
+
+        hits = {"l1": 0, "l2": 0, "l3": 0}
+        misses = 0
+        for stats in namespaces.values():
+            for level, count in stats["hits"].items():
+                hits[level] += count
+            misses += stats["misses"]
+        total_hits = sum(hits.values())
+
+        return {
+            "namespaces": namespaces,
+            "external": external,
+            "tiers": {level: tier.get_stats() for level, tier in self.lower_tiers()},
+            "totals": {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": total_hits / (total_hits + misses) if total_hits + misses else 0.0,
+                "l1_entries": sum(stats["entries"] for stats in namespaces.values()),
+                "l1_bytes": sum(stats["bytes"] for stats in namespaces.values()),
+                "evictions": sum(stats["evictions"] for stats in namespaces.values())
+            }
+        }
+
+
+# Cache em camadas do processo (singleton)
+_tiered_cache: Optional[TieredCache] = None
+_tiered_cache_lock = threading.Lock()
+
+
+def create_tiered_cache_from_env() -> TieredCache:
+    """
+    Cria o cache a partir do ambiente.
+
+    CACHE_L1_MAX_ENTRIES / CACHE_L1_MAX_MB: limites padrão de cada namespace;
+    CACHE_LOCAL_STORE_PATH: ativa o L2 no store local compartilhado pelos
+    processos do host (vazio = desativado);
+    CACHE_REDIS_URL: ativa o L3 (vazio = desativado).
+    """
+    from infrastructure.cache.local_store import LocalStoreTier, local_store_fallback
+
+    local_store = local_store_fallback()
+    redis_url = os.getenv("CACHE_REDIS_URL", "")
+    return TieredCache(
+        l2=LocalStoreTier(local_store) if local_store is not None else None,
+        l3=RedisTier.from_url(redis_url) if redis_url else None,
+        default_max_entries=int(os.getenv("CACHE_L1_MAX_ENTRIES", "10000")),
+        default_max_bytes=int(float(os.getenv("CACHE_L1_MAX_MB", "64")) * 1024 * 1024)
+    )
+
+
+def get_tiered_cache() -> TieredCache:
+    """Obtém o cache em camadas do processo."""
+    global _tiered_cache
+    if _tiered_cache is None:
+        with _tiered_cache_lock:
+            if _tiered_cache is None:
+                _tiered_cache = create_tiered_cache_from_env()
+    return _tiered_cache
+
+
+def set_tiered_cache(cache: Optional[TieredCache]) -> None:
+    """
+    Define o cache em camadas do processo (configuração de L2/L3 na inicialização ou testes).
+
+    Com None, a próxima chamada de `get_tiered_cache` recria o cache a partir do ambiente.
+    """
+    global _tiered_cache
+    _tiered_cache = cache
@@ -2,7 +2,7 @@
 Classes base para implementação de coletores de palavras-chave.
 """
 from abc import abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from infrastructure.coleta.base import ColetorBase
 from domain.models import Keyword, IntencaoBusca
 from shared.config import (
@@ -11,8 +11,10 @@ from shared.config import (
     VALIDACAO_CONFIG
 )
 from infrastructure.coleta.utils.cache import CacheDistribuido
+from infrastructure.rate_limiting.adaptive_rate_limiter import AsyncTokenBucket, obter_token_bucket_compartilhado
 from shared.logger import logger
 import json
+import time
 import asyncio
 from datetime import datetime, timedelta
 
@@ -24,6 +26,9 @@ from infrastructure.observability.predictive_monitoring import PredictiveMonitor
 class KeywordColetorBase(ColetorBase):
     """Classe base para coletores especializados em palavras-chave."""
 
+    # (termos) servidos pelo cache em cada chamada de coletar_keywords
+    on_cache_hit: Optional[Callable[[List[str]], None]] = None
+
     def __init__(self, nome: str, config: Dict):
         """Inicializa o coletor com configurações específicas para keywords."""
         super().__init__(nome, config)
@@ -43,10 +48,27 @@ class KeywordColetorBase(ColetorBase):
         self.max_caracteres = VALIDACAO_CONFIG["max_caracteres"]
         self.caracteres_permitidos = VALIDACAO_CONFIG["caracteres_permitidos"]
         
+        # Motor de coleta concorrente: extrações limitadas por semáforo e
+        # cadenciadas por token bucket compartilhado entre instâncias
+        self.max_concorrencia = COLETA_CONFIG.get("max_concorrencia_termos", 5)
+        self.token_bucket = self._obter_token_bucket(
+            nome, self.rate_limit, COLETA_CONFIG.get("rajada_requisicoes", 1)
+        )
+        self.metricas_vazao: Dict[str, float] = {
+            "chamadas": 0,
+            "termos": 0,
+            "acertos_cache": 0,
+            "extracoes": 0,
+            "falhas": 0,
+            "tempo_total": 0.0,
+            "tempo_espera_token": 0.0
+        }
+        
         # Configuração de cache
         self.cache = CacheDistribuido(
             namespace=CACHE_CONFIG["namespaces"][nome],
-            ttl_padrao=CACHE_CONFIG["ttl_padrao"]
+            ttl_padrao=CACHE_CONFIG["ttl_padrao"],
+            janela_stale=CACHE_CONFIG["janela_stale"]
         )
 
     @abstractmethod
@@ -161,66 +183,55 @@ class KeywordColetorBase(ColetorBase):
                 if await self.validar_termo(termo):
                     termos_validos.append(termo)
             
-            # Coleta métricas para cada termo
-            keywords = []
-            for termo in termos_validos:
-                try:
-                    # Verifica cache
-                    cache_key = f"keyword:{termo}"
-                    cached = await self.cache.get(cache_key)
-                    if cached:
-                        keyword = Keyword(**cached)
-                        keywords.append(keyword)
+            # Termos repetidos são consultados/extraídos uma única vez
+            termos_unicos = list(dict.fromkeys(termos_validos))
+            inicio = time.monotonic()
+            
+            # Cache em lote: uma única consulta para todos os termos
+            chaves = {termo: f"keyword:{termo}" for termo in termos_unicos}
+            em_cache = await self.cache.get_many(list(chaves.values())) if termos_unicos else {}
+            
+            por_termo: Dict[str, Keyword] = {}
+            faltantes = []
+            for termo in termos_unicos:
+                cached = em_cache.get(chaves[termo])
+                if cached:
+                    try:
+                        por_termo[termo] = Keyword.from_dict(cached)
                         continue
-                    
-                    # Coleta métricas específicas
-                    metricas = await self.extrair_metricas_especificas(termo)
-                    
-                    # Valida métricas
-                    intencao = metricas["intencao"]
-                    if isinstance(intencao, str):
-                        try:
-                            intencao = IntencaoBusca(intencao)
-                        except Exception:
-                            intencao = IntencaoBusca.INFORMACIONAL
-                    if self._validar_metricas(metricas):
-                        keyword = Keyword(
-                            termo=termo,
-                            fonte=self.nome,
-                            volume_busca=metricas["volume"],
-                            cpc=metricas["cpc"],
-                            concorrencia=metricas["concorrencia"],
-                            intencao=intencao,
-                            metadados=metricas.get("metadados", {})
+                    except Exception as e:
+                        # Entrada de cache inválida é tratada como ausente
+                        self.registrar_erro(
+                            "Entrada de cache inválida",
+                            {"erro": str(e), "termo": termo}
                         )
-                        
-                        # Salva no cache
-                        await self.cache.set(
-                            cache_key,
-                            keyword.dict(),
-                            ttl=CACHE_CONFIG["ttl_keywords"]
-                        )
-                        
-                        keywords.append(keyword)
-                        
+                faltantes.append(termo)
+            
+            if self.on_cache_hit and por_termo:
+                try:
+                    self.on_cache_hit(list(por_termo))
                 except Exception as e:
-                    self.registrar_erro(
-                        "Erro ao coletar keyword",
-                        {"erro": str(e), "termo": termo}
-                    )
-                    continue
-                
-                # Respeita rate limit
-                await asyncio.sleep(60 / self.rate_limit)
-
-                logger.error({
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "event": "debug_termo_coleta",
-                    "status": "debug",
-                    "source": f"coletor.{self.nome}",
-                    "termo": termo,
-                    "tipo": str(type(termo))
-                })
+                    self.registrar_erro("Erro no callback de acerto de cache", {"erro": str(e)})
+            
+            # Faltantes extraídos em paralelo, limitados pelo semáforo e
+            # cadenciados pelo token bucket (acertos de cache não consomem tokens)
+            semaforo = asyncio.Semaphore(self.max_concorrencia)
+            resultados = await asyncio.gather(
+                *(self._coletar_termo(termo, chaves[termo], semaforo) for termo in faltantes)
+            )
+            for termo, keyword in zip(faltantes, resultados):
+                if keyword is not None:
+                    por_termo[termo] = keyword
+            
+            keywords = [por_termo[termo] for termo in termos_validos if termo in por_termo]
+            
+            self._registrar_vazao(
+                termos=len(termos_unicos),
+                acertos=len(termos_unicos) - len(faltantes),
+                extracoes=len(faltantes),
+                falhas=len(faltantes) - sum(1 for r in resultados if r is not None),
+                tempo=time.monotonic() - inicio
+            )
             
             self.registrar_sucesso("coleta_keywords", {
                 "total_termos": len(termos),
@@ -237,6 +248,98 @@ class KeywordColetorBase(ColetorBase):
             )
             return []
 
+    async def _coletar_termo(
+        self,
+        termo: str,
+        cache_key: str,
+        semaforo: asyncio.Semaphore
+    ) -> Optional[Keyword]:
+        """
+        Extrai as métricas de um termo fora do cache e grava o resultado.
+        
+        A extração passa pelo single-flight do cache: coletas simultâneas do
+        mesmo termo (outros nichos/instâncias) aguardam a mesma chamada ao
+        provedor em vez de consumir cota novamente.
+        """
+        async def extrair() -> Optional[Dict]:
+            async with semaforo:
+                espera = await self.token_bucket.acquire()
+                self.metricas_vazao["tempo_espera_token"] += espera
+                
+                # Coleta métricas específicas
+                metricas = await self.extrair_metricas_especificas(termo)
+            
+            # Valida métricas
+            intencao = metricas["intencao"]
+            if isinstance(intencao, str):
+                try:
+                    intencao = IntencaoBusca(intencao)
+                except Exception:
+                    intencao = IntencaoBusca.INFORMACIONAL
+            if not self._validar_metricas(metricas):
+                return None
+            
+            return Keyword(
+                termo=termo,
+                fonte=self.nome,
+                volume_busca=metricas["volume"],
+                cpc=metricas["cpc"],
+                concorrencia=metricas["concorrencia"],
+                intencao=intencao
+            ).to_dict()
+        
+        try:
+            dados = await self.cache.get_or_fetch(
+                cache_key,
+                extrair,
+                ttl=CACHE_CONFIG["ttl_keywords"]
+            )
+            return Keyword.from_dict(dados) if dados else None
+            
+        except Exception as e:
+            self.registrar_erro(
+                "Erro ao coletar keyword",
+                {"erro": str(e), "termo": termo}
+            )
+            return None
+
+    @staticmethod
+    def _obter_token_bucket(nome: str, rate_limit: float, rajada: float) -> AsyncTokenBucket:
+        """Token bucket compartilhado por todas as instâncias do mesmo coletor (cota é por fonte)."""
+        return obter_token_bucket_compartilhado(f"coletor.{nome}", rate_limit / 60, rajada)
+
+    def _registrar_vazao(self, termos: int, acertos: int, extracoes: int, falhas: int, tempo: float) -> None:
+        """Acumula os contadores de vazão da coleta."""
+        metricas = self.metricas_vazao
+        metricas["chamadas"] += 1
+        metricas["termos"] += termos
+        metricas["acertos_cache"] += acertos
+        metricas["extracoes"] += extracoes
+        metricas["falhas"] += falhas
+        metricas["tempo_total"] += tempo
+
+    def obter_metricas_vazao(self) -> Dict[str, Any]:
+        """
+        Contadores de vazão do coletor.
+        
+        Returns:
+            Totais acumulados, termos/s, extrações/s e uso da cota
+            (extrações/s em relação ao limite do provedor)
+        """
+        metricas = dict(self.metricas_vazao)
+        tempo = metricas["tempo_total"]
+        limite_por_segundo = self.rate_limit / 60
+        extracoes_por_segundo = metricas["extracoes"] / tempo if tempo else 0.0
+        metricas.update({
+            "termos_por_segundo": metricas["termos"] / tempo if tempo else 0.0,
+            "extracoes_por_segundo": extracoes_por_segundo,
+            "taxa_acerto_cache": metricas["acertos_cache"] / metricas["termos"] if metricas["termos"] else 0.0,
+            "uso_cota": extracoes_por_segundo / limite_por_segundo if limite_por_segundo else 0.0,
+            "max_concorrencia": self.max_concorrencia,
+            "token_bucket": self.token_bucket.get_metrics()
+        })
+        return metricas
+
     def _validar_metricas(self, metricas: Dict) -> bool:
         """
         Valida as métricas coletadas.
@@ -3,27 +3,62 @@ Cache distribuído para coletores de keywords.
 Utiliza o sistema de cache centralizado com Redis e fallback local.
 """
 import asyncio
-from typing import Any, Optional, Dict
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, Dict, List, Tuple
 from shared.cache import AsyncCache, get_cache, cached
 from shared.logger import logger
 
+# Marca valores gravados por get_or_fetch (com expiração lógica para stale-while-revalidate)
+_MARCA_ENVELOPE = "__cache_swr__"
+
+# Buscas em andamento compartilhadas por todas as instâncias: (namespace, chave, loop) -> tarefa
+_buscas_em_voo: Dict[Tuple[str, str, int], "asyncio.Task"] = {}
+_buscas_lock = threading.Lock()
+
+
+def _eh_envelope(valor: Any) -> bool:
+    return isinstance(valor, dict) and valor.get(_MARCA_ENVELOPE) is True
+
+
+def _valor_fresco(valor: Any, default: Any = None) -> Any:
+    """Desembrulha um envelope; envelopes expirados (apenas stale) contam como ausentes."""
+    if not _eh_envelope(valor):
+        return valor
+    if time.time() < valor["expira_em"]:
+        return valor["valor"]
+    return default
+
+
 class CacheDistribuido:
     """
     Cache distribuído especializado para coletores.
     Implementa cache de alta performance com TTL específico para keywords.
     """
     
-    def __init__(self, namespace: str = "keywords", ttl_padrao: int = 86400):
+    def __init__(self, namespace: str = "keywords", ttl_padrao: int = 86400, janela_stale: int = 0):
         """
         Inicializa cache distribuído.
         
         Args:
             namespace: Namespace do cache
             ttl_padrao: TTL padrão em segundos (24h para keywords)
+            janela_stale: Segundos após o TTL em que get_or_fetch ainda serve o
+                valor expirado enquanto revalida em segundo plano (0 = desativado)
         """
         self.namespace = namespace
         self.ttl_padrao = ttl_padrao
+        self.janela_stale = janela_stale
         self._cache: Optional[AsyncCache] = None
+        self._metricas_single_flight = {
+            "requisicoes": 0,
+            "acertos": 0,
+            "acertos_stale": 0,
+            "buscas": 0,
+            "coalescidas": 0,
+            "revalidacoes": 0,
+            "erros_busca": 0
+        }
     
     async def _get_cache(self) -> AsyncCache:
         """Obtém instância do cache."""
@@ -44,7 +79,7 @@ class CacheDistribuido:
         """
         try:
             cache = await self._get_cache()
-            return await cache.get(key, default)
+            return _valor_fresco(await cache.get(key, default), default)
         except Exception as e:
             logger.error({
                 "event": "cache_get_error",
@@ -54,6 +89,34 @@ class CacheDistribuido:
             })
             return default
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache em lote.
+        
+        Args:
+            keys: Chaves do cache
+            
+        Returns:
+            Dicionário chave -> valor apenas com as chaves encontradas
+        """
+        try:
+            cache = await self._get_cache()
+            valores = await cache.get_many(keys)
+            frescos = {}
+            for key, valor in valores.items():
+                valor = _valor_fresco(valor, _MARCA_ENVELOPE)
+                if valor is not _MARCA_ENVELOPE:
+                    frescos[key] = valor
+            return frescos
+        except Exception as e:
+            logger.error({
+                "event": "cache_get_many_error",
+                "status": "error",
+                "source": "CacheDistribuido.get_many",
+                "details": {"keys": len(keys), "error": str(e)}
+            })
+            return {}
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
         Define valor no cache.
@@ -81,6 +144,145 @@ class CacheDistribuido:
             })
             return False
     
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        janela_stale: Optional[int] = None
+    ) -> Any:
+        """
+        Obtém valor do cache ou executa `fetcher` uma única vez por chave.
+        
+        Misses concorrentes para a mesma chave aguardam a mesma busca em
+        andamento (single-flight), então o provedor externo é chamado uma
+        vez. Dentro da janela stale, o valor expirado é servido
+        imediatamente e uma única revalidação roda em segundo plano.
+        Resultados None não são armazenados.
+        
+        Args:
+            key: Chave do cache
+            fetcher: Corrotina sem argumentos que busca o valor na origem
+            ttl: Tempo de vida em segundos (None = TTL padrão)
+            janela_stale: Segundos de stale-while-revalidate (None = padrão da instância)
+            
+        Returns:
+            Valor do cache ou resultado da busca
+        """
+        ttl = self.ttl_padrao if ttl is None else ttl
+        janela_stale = self.janela_stale if janela_stale is None else janela_stale
+        metricas = self._metricas_single_flight
+        metricas["requisicoes"] += 1
+        
+        registro = await self._get_bruto(key)
+        if registro is not None:
+            if not _eh_envelope(registro):
+                metricas["acertos"] += 1
+                return registro
+            if time.time() < registro["expira_em"]:
+                metricas["acertos"] += 1
+                return registro["valor"]
+            metricas["acertos_stale"] += 1
+            self._iniciar_busca(key, fetcher, ttl, janela_stale, revalidacao=True)
+            return registro["valor"]
+        
+        tarefa, nova = self._iniciar_busca(key, fetcher, ttl, janela_stale)
+        if not nova:
+            metricas["coalescidas"] += 1
+        # shield: cancelar um dos aguardantes não cancela a busca compartilhada
+        return await asyncio.shield(tarefa)
+    
+    async def set_com_expiracao(self, key: str, value: Any, ttl: Optional[int] = None, janela_stale: Optional[int] = None) -> bool:
+        """
+        Define valor com expiração lógica `ttl`, mantido por mais `janela_stale` segundos.
+        
+        Returns:
+            True se sucesso, False caso contrário
+        """
+        ttl = self.ttl_padrao if ttl is None else ttl
+        janela_stale = self.janela_stale if janela_stale is None else janela_stale
+        envelope = {_MARCA_ENVELOPE: True, "valor": value, "expira_em": time.time() + ttl}
+        return await self.set(key, envelope, ttl + janela_stale)
+    
+    async def _get_bruto(self, key: str) -> Any:
+        """Obtém o valor armazenado sem desembrulhar envelopes."""
+        try:
+            cache = await self._get_cache()
+            return await cache.get(key)
+        except Exception as e:
+            logger.error({
+                "event": "cache_get_error",
+                "status": "error",
+                "source": "CacheDistribuido.get_or_fetch",
+                "details": {"key": key, "error": str(e)}
+            })
+            return None
+    
+    def _iniciar_busca(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl: int,
+        janela_stale: int,
+        revalidacao: bool = False
+    ) -> Tuple["asyncio.Task", bool]:
+        """Retorna a busca em andamento para a chave ou inicia uma nova."""
+        loop = asyncio.get_running_loop()
+        chave_voo = (self.namespace, key, id(loop))
+        with _buscas_lock:
+            tarefa = _buscas_em_voo.get(chave_voo)
+            if tarefa is not None:
+                return tarefa, False
+            tarefa = loop.create_task(self._buscar_e_armazenar(key, fetcher, ttl, janela_stale))
+            _buscas_em_voo[chave_voo] = tarefa
+        
+        tarefa.add_done_callback(lambda t: self._finalizar_busca(chave_voo, t, revalidacao))
+        if revalidacao:
+            self._metricas_single_flight["revalidacoes"] += 1
+        return tarefa, True
+    
+    async def _buscar_e_armazenar(self, key: str, fetcher: Callable[[], Awaitable[Any]], ttl: int, janela_stale: int) -> Any:
+        self._metricas_single_flight["buscas"] += 1
+        valor = await fetcher()
+        if valor is not None:
+            await self.set_com_expiracao(key, valor, ttl, janela_stale)
+        return valor
+    
+    def _finalizar_busca(self, chave_voo: Tuple[str, str, int], tarefa: "asyncio.Task", revalidacao: bool) -> None:
+        with _buscas_lock:
+            if _buscas_em_voo.get(chave_voo) is tarefa:
+                del _buscas_em_voo[chave_voo]
+        
+        if tarefa.cancelled():
+            return
+        erro = tarefa.exception()
+        if erro is not None:
+            self._metricas_single_flight["erros_busca"] += 1
+            logger.warning({
+                "event": "cache_fetch_error",
+                "status": "warning",
+                "source": "CacheDistribuido.get_or_fetch",
+                "details": {"key": chave_voo[1], "revalidacao": revalidacao, "error": str(erro)}
+            })
+    
+    def obter_metricas_single_flight(self) -> Dict[str, Any]:
+        """
+        Métricas de coalescência e stale-while-revalidate.
+        
+        Returns:
+            Contadores e taxas: coalescência (misses que reaproveitaram uma busca
+            em andamento) e stale (requisições servidas com valor expirado)
+        """
+        metricas = dict(self._metricas_single_flight)
+        requisicoes = metricas["requisicoes"]
+        misses = requisicoes - metricas["acertos"] - metricas["acertos_stale"]
+        metricas["taxa_coalescencia"] = metricas["coalescidas"] / misses if misses else 0.0
+        metricas["taxa_stale"] = metricas["acertos_stale"] / requisicoes if requisicoes else 0.0
+        metricas["taxa_acerto"] = (
+            (metricas["acertos"] + metricas["acertos_stale"]) / requisicoes if requisicoes else 0.0
+        )
+        return metricas
+    
     async def delete(self, key: str) -> bool:
         """
         Remove valor do cache.
@@ -131,7 +333,9 @@ class CacheDistribuido:
         """
         try:
             if self._cache:
-                return self._cache.get_metrics()
+                metricas = self._cache.get_metrics()
+                metricas["single_flight"] = self.obter_metricas_single_flight()
+                return metricas
             return {"error": "Cache não inicializado"}
         except Exception as e:
             logger.error({
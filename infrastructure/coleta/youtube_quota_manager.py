@@ -33,6 +33,8 @@ import threading
 import asyncio
 from enum import Enum
 
+from infrastructure.cache.local_store import connect_redis
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -165,7 +167,7 @@ class YouTubeQuotaManager:
         self.alert_callbacks = []
         
         # Lock para thread safety
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
         
         # Métricas
         self.metrics = {
@@ -181,8 +183,9 @@ class YouTubeQuotaManager:
     def _init_redis(self):
         """Inicializa conexão Redis."""
         try:
-            self.redis_client = redis.from_url(self.cache_config.redis_url)
-            self.redis_client.ping()
+            # Sem Redis, usa o store local (CACHE_LOCAL_STORE_PATH) se configurado,
+            # compartilhando cache e contador de quota entre os processos do host
+            self.redis_client = connect_redis(self.cache_config.redis_url, factory=redis.from_url)
             logger.info("[YouTubeQuotaManager] Redis conectado")
         except Exception as e:
             logger.warning(f"[YouTubeQuotaManager] Redis não disponível: {e}")
@@ -209,6 +212,7 @@ class YouTubeQuotaManager:
         """
         with self._lock:
             self._update_quota_usage()
+            self._sync_shared_quota()
             
             cost = self.quota_config.cost_per_request.get(operation, 1)
             available = self.quota_config.daily_limit - self.quota_usage.used_today
@@ -231,6 +235,7 @@ class YouTubeQuotaManager:
             
             cost = self.quota_config.cost_per_request.get(operation, 1)
             self.quota_usage.used_today += cost
+            self._sync_shared_quota(cost)
             self.quota_usage.used_this_hour += cost
             self.quota_usage.used_this_minute += cost
             self.quota_usage.last_request = datetime.now()
@@ -483,6 +488,37 @@ class YouTubeQuotaManager:
         if self._should_reset_minutely(now):
             self.quota_usage.used_this_minute = 0
     
+    def _shared_quota_key(self) -> str:
+        """Chave do contador diário compartilhado (uma por período entre resets)."""
+        reset_time = self._get_reset_time_today()
+        period_start = reset_time if datetime.now() >= reset_time else reset_time - timedelta(days=1)
+        return f"youtube_quota:used:{period_start:%Y%m%d%H%M}"
+    
+    def _sync_shared_quota(self, cost: int = 0):
+        """
+        Sincroniza o uso diário com o contador compartilhado no Redis/store local.
+        
+        Cada processo soma seu custo ao contador (incrby atômico) e adota o maior
+        valor entre o uso local e o compartilhado, de modo que workers do mesmo
+        host não ultrapassem juntos o limite diário.
+        """
+        if not self.redis_client:
+            return
+        try:
+            key = self._shared_quota_key()
+            if cost:
+                shared = self.redis_client.incrby(key, cost)
+                if shared == cost:
+                    ttl = self._get_next_reset_time() - datetime.now()
+                    self.redis_client.expire(key, int(ttl.total_seconds()) + 60)
+            else:
+                shared = self.redis_client.get(key)
+            # Redis devolve int (incrby) ou bytes/str (get); outros valores são ignorados
+            if isinstance(shared, (int, bytes, str)):
+                self.quota_usage.used_today = max(self.quota_usage.used_today, int(shared))
+        except Exception as e:
+            logger.warning(f"[YouTubeQuotaManager] Contador de quota compartilhado indisponível: {e}")
+    
     def _should_reset_daily(self, now: datetime) -> bool:
         """Verifica se deve fazer reset diário."""
         if not self.quota_usage.last_reset:
@@ -0,0 +1,294 @@
+"""
+Store persistente de embeddings endereçado por conteúdo
+Tracing ID: EMBEDDING_STORE_001
+
+Cada termo é identificado por sha1(modelo + termo normalizado). Os vetores
+ficam em uma matriz float32 append-only lida via memory-map e as chaves em um
+índice de largura fixa (uma linha por vetor), de modo que a linha de um termo
+no índice é a mesma linha da matriz. O store sobrevive a reinícios do processo
+e é compartilhado por todos os componentes semânticos do mesmo host.
+
+Layout em disco (um diretório por modelo):
+    meta.json     -> {"model_name": ..., "dim": ...}
+    chaves.idx    -> sha1 hexadecimal + "\\n" por linha
+    vetores.f32   -> float32 little-endian, dim valores por linha
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from shared.config import EMBEDDING_STORE_CONFIG
+from shared.logger import logger
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: apenas lock entre threads
+    FCNTL_AVAILABLE = False
+
+_TAMANHO_LINHA_CHAVE = 41  # 40 hex + "\n"
+_DTYPE = np.dtype("<f4")
+
+
+class EmbeddingStore:
+    """
+    Store de embeddings por termo para um único modelo.
+
+    Uso típico:
+        store = obter_store("paraphrase-multilingual-MiniLM-L12-v2")
+        matriz = store.obter_ou_gerar(termos, model.encode)
+    """
+
+    def __init__(self, model_name: str, base_dir: Optional[Union[str, Path]] = None):
+        self.model_name = model_name
+        base = Path(base_dir or EMBEDDING_STORE_CONFIG["dir"])
+        self.diretorio = base / re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._arquivo_meta = self.diretorio / "meta.json"
+        self._arquivo_chaves = self.diretorio / "chaves.idx"
+        self._arquivo_vetores = self.diretorio / "vetores.f32"
+        self._arquivo_chaves.touch(exist_ok=True)
+        self._arquivo_vetores.touch(exist_ok=True)
+        self._lock = threading.RLock()
+        self._indice: Dict[str, int] = {}
+        self._linhas_lidas = 0
+        self._dim: Optional[int] = None
+        self._mmap: Optional[np.memmap] = None
+        self._mmap_linhas = 0
+        self.metrics = {"hits": 0, "misses": 0, "termos_gerados": 0}
+        # (termos normalizados) encontrados em cada busca
+        self.on_cache_hit: Optional[Callable[[List[str]], None]] = None
+        self._carregar_meta()
+        self._sincronizar()
+
+    @staticmethod
+    def normalizar_termo(termo: str) -> str:
+        """Forma canônica usada na chave: NFC, espaços colapsados, casefold."""
+        return " ".join(unicodedata.normalize("NFC", termo).split()).casefold()
+
+    def chave(self, termo: str) -> str:
+        conteudo = f"{self.model_name}\x00{self.normalizar_termo(termo)}"
+        return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sincronizar()
+            return len(self._indice)
+
+    def __contains__(self, termo: str) -> bool:
+        with self._lock:
+            self._sincronizar()
+            return self.chave(termo) in self._indice
+
+    def _carregar_meta(self) -> None:
+        if self._arquivo_meta.exists():
+            with open(self._arquivo_meta, "r", encoding="utf-8") as f:
+                self._dim = int(json.load(f)["dim"])
+
+    def _gravar_meta(self, dim: int) -> None:
+        with open(self._arquivo_meta, "w", encoding="utf-8") as f:
+            json.dump({"model_name": self.model_name, "dim": dim}, f)
+        self._dim = dim
+
+    @contextmanager
+    def _lock_arquivo(self):
+        """Lock exclusivo entre processos (POSIX) durante a escrita."""
+        with open(self._arquivo_chaves, "a+b") as handle:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _sincronizar(self) -> None:
+        """Incorpora linhas anexadas por outros processos desde a última leitura."""
+        if self._dim is None:
+            self._carregar_meta()
+            if self._dim is None:
+                return
+        linhas_chaves = os.path.getsize(self._arquivo_chaves) // _TAMANHO_LINHA_CHAVE
+        linhas_vetores = os.path.getsize(self._arquivo_vetores) // (self._dim * _DTYPE.itemsize)
+        linhas = min(linhas_chaves, linhas_vetores)
+        if linhas <= self._linhas_lidas:
+            return
+        with open(self._arquivo_chaves, "rb") as f:
+            f.seek(self._linhas_lidas * _TAMANHO_LINHA_CHAVE)
+            bruto = f.read((linhas - self._linhas_lidas) * _TAMANHO_LINHA_CHAVE).decode("ascii")
+        for deslocamento, chave in enumerate(bruto.splitlines()):
+            self._indice.setdefault(chave, self._linhas_lidas + deslocamento)
+        self._linhas_lidas = linhas
+
+    def _matriz(self) -> np.ndarray:
+        if self._mmap is None or self._mmap_linhas != self._linhas_lidas:
+            self._mmap = np.memmap(
+                self._arquivo_vetores, dtype=_DTYPE, mode="r",
+                shape=(self._linhas_lidas, self._dim)
+            )
+            self._mmap_linhas = self._linhas_lidas
+        return self._mmap
+
+    def buscar(self, termos: Sequence[str]) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Retorna (matriz, encontrados). `matriz` tem uma linha por termo (zeros
+        para termos ausentes) e `encontrados` é a máscara booleana de hits.
+        """
+        with self._lock:
+            self._sincronizar()
+            linhas = np.array([self._indice.get(self.chave(termo), -1) for termo in termos], dtype=np.int64)
+            encontrados = linhas >= 0
+            self.metrics["hits"] += int(encontrados.sum())
+            self.metrics["misses"] += int((~encontrados).sum())
+            if self._dim is None or self._linhas_lidas == 0:
+                return None, encontrados
+            matriz = np.zeros((len(termos), self._dim), dtype=np.float32)
+            if encontrados.any():
+                matriz[encontrados] = self._matriz()[linhas[encontrados]]
+        if self.on_cache_hit and encontrados.any():
+            try:
+                self.on_cache_hit([self.normalizar_termo(termo) for termo, achado in zip(termos, encontrados) if achado])
+            except Exception as e:
+                logger.warning({
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "event": "embedding_store_callback_falhou",
+                    "status": "warning",
+                    "source": "ml.embedding_store.buscar",
+                    "details": {"erro": str(e)}
+                })
+        return matriz, encontrados
+
+    def adicionar(self, termos: Sequence[str], vetores: np.ndarray) -> int:
+        """Persiste vetores de termos ainda não armazenados. Retorna quantos foram gravados."""
+        vetores = np.asarray(vetores, dtype=_DTYPE)
+        if len(termos) == 0:
+            return 0
+        if vetores.ndim != 2 or vetores.shape[0] != len(termos):
+            raise ValueError("vetores deve ter uma linha por termo")
+        with self._lock, self._lock_arquivo():
+            if self._dim is None:
+                self._carregar_meta()
+            if self._dim is None:
+                self._gravar_meta(int(vetores.shape[1]))
+            elif vetores.shape[1] != self._dim:
+                raise ValueError(f"Dimensão {vetores.shape[1]} incompatível com o store ({self._dim})")
+            self._sincronizar()
+            novas_chaves: List[str] = []
+            novas_linhas: List[int] = []
+            vistas = set()
+            for posicao, termo in enumerate(termos):
+                chave = self.chave(termo)
+                if chave in self._indice or chave in vistas:
+                    continue
+                vistas.add(chave)
+                novas_chaves.append(chave)
+                novas_linhas.append(posicao)
+            if not novas_chaves:
+                return 0
+            # Vetores antes das chaves: uma chave no índice sempre tem vetor gravado
+            self._truncar_excedente()
+            with open(self._arquivo_vetores, "ab") as f:
+                f.write(np.ascontiguousarray(vetores[novas_linhas]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._arquivo_chaves, "ab") as f:
+                f.write("".join(f"{chave}\n" for chave in novas_chaves).encode("ascii"))
+                f.flush()
+            self._sincronizar()
+            return len(novas_chaves)
+
+    def _truncar_excedente(self) -> None:
+        """Descarta vetores órfãos (escrita interrompida antes de gravar as chaves)."""
+        tamanho_esperado = self._linhas_lidas * self._dim * _DTYPE.itemsize
+        if os.path.getsize(self._arquivo_vetores) > tamanho_esperado:
+            os.truncate(self._arquivo_vetores, tamanho_esperado)
+            self._mmap = None
+
+    def obter_ou_gerar(
+        self,
+        termos: Sequence[str],
+        func_encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Retorna a matriz de embeddings dos termos, codificando com `func_encode`
+        apenas os termos (normalizados e deduplicados) ainda não armazenados.
+        """
+        termos = list(termos)
+        matriz, encontrados = self.buscar(termos)
+        if encontrados.all():
+            return matriz
+        faltantes: Dict[str, str] = {}
+        for termo, achado in zip(termos, encontrados):
+            if not achado:
+                faltantes.setdefault(self.chave(termo), termo)
+        novos_termos = list(faltantes.values())
+        novos_vetores = np.asarray(func_encode(novos_termos), dtype=np.float32)
+        self.adicionar(novos_termos, novos_vetores)
+        self.metrics["termos_gerados"] += len(novos_termos)
+        por_chave = {chave: novos_vetores[posicao] for posicao, chave in enumerate(faltantes)}
+        if matriz is None:
+            matriz = np.zeros((len(termos), novos_vetores.shape[1]), dtype=np.float32)
+        for posicao, (termo, achado) in enumerate(zip(termos, encontrados)):
+            if not achado:
+                matriz[posicao] = por_chave[self.chave(termo)]
+        logger.info({
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": "embedding_store_atualizado",
+            "status": "success",
+            "source": "ml.embedding_store.obter_ou_gerar",
+            "details": {
+                "model_name": self.model_name,
+                "termos": len(termos),
+                "termos_gerados": len(novos_termos),
+                "total_store": self._linhas_lidas
+            }
+        })
+        return matriz
+
+    def get_metrics(self) -> Dict[str, Union[int, float, str]]:
+        consultas = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "model_name": self.model_name,
+            "total_termos": len(self),
+            "hit_rate": self.metrics["hits"] / consultas if consultas else 0.0,
+        }
+
+    def limpar(self) -> None:
+        """Remove todos os vetores e chaves do modelo."""
+        with self._lock, self._lock_arquivo():
+            self._mmap = None
+            for arquivo in (self._arquivo_vetores, self._arquivo_chaves):
+                os.truncate(arquivo, 0)
+            if self._arquivo_meta.exists():
+                self._arquivo_meta.unlink()
+            self._indice.clear()
+            self._linhas_lidas = 0
+            self._dim = None
+
+
+_stores: Dict[Tuple[str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def obter_store(model_name: str, base_dir: Optional[Union[str, Path]] = None) -> EmbeddingStore:
+    """Instância compartilhada do store por (diretório, modelo) no processo."""
+    chave = (str(base_dir or EMBEDDING_STORE_CONFIG["dir"]), model_name)
+    with _stores_lock:
+        if chave not in _stores:
+            _stores[chave] = EmbeddingStore(model_name, base_dir=base_dir)
+        return _stores[chave]
@@ -1,9 +1,11 @@
 import logging
-from typing import List, Union
+from typing import List, Optional, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from shared.config import EMBEDDING_STORE_CONFIG
 from shared.logger import logger
+from infrastructure.ml.embedding_store import obter_store
+from infrastructure.ml.kernels_similaridade import cosseno_um_para_muitos
 
 _model = None
 
@@ -19,21 +21,44 @@ def get_model(model_name: str = "paraphrase-multilingual-MiniLM-L12-v2") -> Sent
         })
     return _model
 
-def gerar_embeddings(termos: List[str], model_name: str = "paraphrase-multilingual-MiniLM-L12-v2") -> np.ndarray:
+def gerar_embeddings(
+    termos: List[str],
+    model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+    usar_store: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Gera embeddings dos termos. Com o store persistente habilitado
+    (EMBEDDING_STORE_CONFIG ou `usar_store=True`), apenas termos nunca vistos
+    para o modelo são codificados; os demais são lidos do store.
+    """
     model = get_model(model_name)
-    embeddings = model.encode(termos, show_progress_bar=False)
+    if usar_store is None:
+        usar_store = EMBEDDING_STORE_CONFIG["enabled"]
+    termos_gerados = len(termos)
+    if usar_store and termos:
+        store = obter_store(model_name)
+        gerados_antes = store.metrics["termos_gerados"]
+        embeddings = store.obter_ou_gerar(
+            termos,
+            lambda faltantes: model.encode(faltantes, show_progress_bar=False)
+        )
+        termos_gerados = store.metrics["termos_gerados"] - gerados_antes
+    else:
+        embeddings = model.encode(termos, show_progress_bar=False)
     logger.info({
         "event": "embeddings_gerados",
         "status": "success",
         "source": "ml.embeddings.gerar_embeddings",
-        "details": {"num_termos": len(termos)}
+        "details": {"num_termos": len(termos), "termos_codificados": termos_gerados}
     })
     return embeddings
 
 def similaridade_cosseno(v1: Union[np.ndarray, List[float]], v2: Union[np.ndarray, List[float]]) -> float:
-    v1 = np.array(v1).reshape(1, -1)
-    v2 = np.array(v2).reshape(1, -1)
-    sim = float(cosine_similarity(v1, v2)[0][0])
+    # Caminho por par mantido por compatibilidade; para muitos pares use
+    # os kernels em lote de infrastructure.ml.kernels_similaridade
+    sim = float(cosseno_um_para_muitos(
+        np.asarray(v1, dtype=np.float32), np.asarray(v2, dtype=np.float32), registrar_log=False
+    )[0])
     logger.info({
         "event": "similaridade_cosseno_calculada",
         "status": "success",
@@ -0,0 +1,290 @@
+"""
+Índices de vizinhos mais próximos para embeddings semânticos
+Tracing ID: INDICE_VIZINHOS_001
+
+Backends plugáveis usados pelo ClusterizadorSemantico para obter apenas os
+top-k vizinhos de cada head, sem materializar a matriz N×N de similaridade:
+
+- IndiceExatoBlocado: busca exata, processando as consultas em blocos
+  (memória O(bloco × N)).
+- IndiceIVF: índice aproximado em NumPy puro (k-means grosseiro + listas
+  invertidas), com busca restrita às `n_probe` listas mais próximas.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple, Any
+import time
+
+import numpy as np
+
+from infrastructure.ml.kernels_similaridade import (
+    normalizar_linhas,
+    top_k_cosseno,
+    top_k_linha as _top_k_linha,
+)
+from shared.logger import logger
+
+
+class IndiceVizinhos(ABC):
+    """Interface comum dos backends de vizinhança."""
+
+    nome = "base"
+
+    def __init__(self):
+        self.embeddings: Optional[np.ndarray] = None
+        self.tempo_construcao = 0.0
+
+    @property
+    def tamanho(self) -> int:
+        return 0 if self.embeddings is None else int(self.embeddings.shape[0])
+
+    @abstractmethod
+    def construir(self, embeddings: np.ndarray) -> "IndiceVizinhos":
+        """Indexa a matriz de embeddings (uma linha por termo)."""
+
+    @abstractmethod
+    def buscar(
+        self,
+        indice_consulta: int,
+        k: int,
+        excluir: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna (similaridades, índices) dos k vizinhos do item `indice_consulta`,
+        ignorando o próprio item e as posições marcadas em `excluir` (máscara booleana).
+        """
+
+    def buscar_lote(self, indices_consulta: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k de várias consultas. Linhas com menos de k vizinhos são completadas
+        com índice -1 e similaridade -inf.
+        """
+        indices_consulta = np.asarray(indices_consulta, dtype=np.int64)
+        sims = np.full((len(indices_consulta), k), -np.inf, dtype=np.float32)
+        idxs = np.full((len(indices_consulta), k), -1, dtype=np.int64)
+        for linha, consulta in enumerate(indices_consulta):
+            s, i = self.buscar(int(consulta), k)
+            sims[linha, :len(s)] = s
+            idxs[linha, :len(i)] = i
+        return sims, idxs
+
+
+class IndiceExatoBlocado(IndiceVizinhos):
+    """
+    Busca exata de top-k. Com a similaridade de cosseno padrão usa produto
+    interno de embeddings normalizados; aceita `func_similaridade` customizada
+    com a mesma assinatura de `sklearn.metrics.pairwise.cosine_similarity`.
+    """
+
+    nome = "exato"
+
+    def __init__(
+        self,
+        func_similaridade: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+        tamanho_bloco: int = 1024
+    ):
+        super().__init__()
+        self.func_similaridade = func_similaridade
+        self.tamanho_bloco = max(1, tamanho_bloco)
+        self._brutos: Optional[np.ndarray] = None
+
+    def construir(self, embeddings: np.ndarray) -> "IndiceExatoBlocado":
+        inicio = time.time()
+        self._brutos = np.asarray(embeddings)
+        self.embeddings = self._brutos if self.func_similaridade else normalizar_linhas(self._brutos)
+        self.tempo_construcao = time.time() - inicio
+        return self
+
+    def _similaridades(self, consultas: np.ndarray) -> np.ndarray:
+        if self.func_similaridade:
+            return np.asarray(self.func_similaridade(self._brutos[consultas], self._brutos), dtype=np.float32)
+        return self.embeddings[consultas] @ self.embeddings.T
+
+    def buscar(
+        self,
+        indice_consulta: int,
+        k: int,
+        excluir: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        scores = np.array(self._similaridades(np.array([indice_consulta]))[0], dtype=np.float32)
+        scores[indice_consulta] = -np.inf
+        if excluir is not None:
+            scores[excluir] = -np.inf
+        disponiveis = int(np.isfinite(scores).sum())
+        top = _top_k_linha(scores, min(k, disponiveis))
+        return scores[top], top
+
+    def buscar_lote(self, indices_consulta: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        indices_consulta = np.asarray(indices_consulta, dtype=np.int64)
+        k_efetivo = min(k, max(self.tamanho - 1, 0))
+        sims = np.full((len(indices_consulta), k), -np.inf, dtype=np.float32)
+        idxs = np.full((len(indices_consulta), k), -1, dtype=np.int64)
+        if k_efetivo == 0:
+            return sims, idxs
+        if not self.func_similaridade:
+            sims[:, :k_efetivo], idxs[:, :k_efetivo] = top_k_cosseno(
+                self.embeddings[indices_consulta], self.embeddings, k_efetivo,
+                normalizados=True, tamanho_bloco=self.tamanho_bloco,
+                excluir_indices=indices_consulta
+            )
+            return sims, idxs
+        for inicio in range(0, len(indices_consulta), self.tamanho_bloco):
+            bloco = indices_consulta[inicio:inicio + self.tamanho_bloco]
+            scores = np.array(self._similaridades(bloco), dtype=np.float32)
+            scores[np.arange(len(bloco)), bloco] = -np.inf
+            parcial = np.argpartition(-scores, k_efetivo - 1, axis=1)[:, :k_efetivo]
+            parciais_scores = np.take_along_axis(scores, parcial, axis=1)
+            ordem = np.argsort(-parciais_scores, axis=1, kind="stable")
+            sims[inicio:inicio + len(bloco), :k_efetivo] = np.take_along_axis(parciais_scores, ordem, axis=1)
+            idxs[inicio:inicio + len(bloco), :k_efetivo] = np.take_along_axis(parcial, ordem, axis=1)
+        return sims, idxs
+
+
+class IndiceIVF(IndiceVizinhos):
+    """
+    Índice aproximado por arquivo invertido (IVF) em NumPy puro.
+
+    Os embeddings normalizados são particionados por k-means esférico em
+    `n_listas` centróides; cada consulta pontua apenas os itens das `n_probe`
+    listas mais próximas. Quando a exclusão esvazia as listas sondadas, a
+    sondagem é ampliada progressivamente até cobrir todo o índice.
+    """
+
+    nome = "ann"
+
+    def __init__(
+        self,
+        n_listas: Optional[int] = None,
+        n_probe: int = 8,
+        iteracoes_kmeans: int = 10,
+        amostra_treino: int = 20000,
+        seed: int = 42
+    ):
+        super().__init__()
+        self.n_listas = n_listas
+        self.n_probe = max(1, n_probe)
+        self.iteracoes_kmeans = iteracoes_kmeans
+        self.amostra_treino = amostra_treino
+        self.seed = seed
+        self.centroides: Optional[np.ndarray] = None
+        self.listas: list = []
+        self._ordem_listas: Optional[np.ndarray] = None
+
+    def _treinar_centroides(self, dados: np.ndarray, n_listas: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        if dados.shape[0] > self.amostra_treino:
+            dados = dados[rng.choice(dados.shape[0], self.amostra_treino, replace=False)]
+        centroides = dados[rng.choice(dados.shape[0], n_listas, replace=False)].copy()
+        for _ in range(self.iteracoes_kmeans):
+            atribuicao = np.argmax(dados @ centroides.T, axis=1)
+            somas = np.zeros_like(centroides)
+            np.add.at(somas, atribuicao, dados)
+            vazios = np.bincount(atribuicao, minlength=n_listas) == 0
+            # Centróides sem membros são reiniciados em pontos aleatórios
+            if vazios.any():
+                somas[vazios] = dados[rng.choice(dados.shape[0], int(vazios.sum()), replace=False)]
+            centroides = normalizar_linhas(somas)
+        return centroides
+
+    def construir(self, embeddings: np.ndarray) -> "IndiceIVF":
+        inicio = time.time()
+        self.embeddings = normalizar_linhas(embeddings)
+        total = self.embeddings.shape[0]
+        n_listas = self.n_listas or max(1, int(np.sqrt(total)))
+        n_listas = max(1, min(n_listas, total))
+        self.centroides = self._treinar_centroides(self.embeddings, n_listas)
+        atribuicao = np.empty(total, dtype=np.int64)
+        for bloco in range(0, total, 4096):
+            atribuicao[bloco:bloco + 4096] = np.argmax(
+                self.embeddings[bloco:bloco + 4096] @ self.centroides.T, axis=1
+            )
+        self.listas = [np.flatnonzero(atribuicao == lista) for lista in range(n_listas)]
+        self._ordem_listas = None
+        self.tempo_construcao = time.time() - inicio
+        return self
+
+    def buscar(
+        self,
+        indice_consulta: int,
+        k: int,
+        excluir: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        consulta = self.embeddings[indice_consulta]
+        ordem_listas = np.argsort(-(self.centroides @ consulta), kind="stable")
+        n_probe = min(self.n_probe, len(self.listas))
+        while True:
+            candidatos = np.concatenate([self.listas[lista] for lista in ordem_listas[:n_probe]])
+            candidatos = candidatos[candidatos != indice_consulta]
+            if excluir is not None:
+                candidatos = candidatos[~excluir[candidatos]]
+            if len(candidatos) >= k or n_probe >= len(self.listas):
+                break
+            n_probe = min(n_probe * 2, len(self.listas))
+        scores = self.embeddings[candidatos] @ consulta
+        top = _top_k_linha(scores, k)
+        return scores[top], candidatos[top]
+
+
+BACKENDS_VIZINHOS = {
+    IndiceExatoBlocado.nome: IndiceExatoBlocado,
+    IndiceIVF.nome: IndiceIVF,
+}
+
+
+def criar_indice(
+    backend: str,
+    total_itens: int,
+    limiar_ann: int = 20000,
+    func_similaridade: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+    **kwargs: Any
+) -> IndiceVizinhos:
+    """
+    Instancia o backend de vizinhança. Com `backend="auto"` usa busca exata até
+    `limiar_ann` itens e IVF acima disso. Similaridades customizadas só são
+    suportadas pelo backend exato.
+    """
+    if backend == "auto":
+        backend = IndiceIVF.nome if total_itens > limiar_ann and func_similaridade is None else IndiceExatoBlocado.nome
+    if backend not in BACKENDS_VIZINHOS:
+        raise ValueError(f"Backend de vizinhos inválido: {backend}")
+    if backend == IndiceExatoBlocado.nome:
+        return IndiceExatoBlocado(func_similaridade=func_similaridade, **kwargs)
+    if func_similaridade is not None:
+        raise ValueError("func_similaridade customizada exige o backend 'exato'")
+    return IndiceIVF(**kwargs)
+
+
+def comparar_indices(embeddings: np.ndarray, k: int, **kwargs_ann: Any) -> Dict[str, Any]:
+    """
+    Compara o backend exato e o IVF no mesmo conjunto: tempo de construção,
+    tempo de busca top-k para todos os itens e recall@k do IVF.
+    """
+    total = int(np.asarray(embeddings).shape[0])
+    indices = np.arange(total)
+    resultado: Dict[str, Any] = {"total_itens": total, "k": k}
+    vizinhos = {}
+    for indice in (IndiceExatoBlocado(), IndiceIVF(**kwargs_ann)):
+        inicio = time.time()
+        indice.construir(embeddings)
+        _, idxs = indice.buscar_lote(indices, k)
+        vizinhos[indice.nome] = idxs
+        resultado[indice.nome] = {
+            "tempo_construcao": round(indice.tempo_construcao, 4),
+            "tempo_total": round(time.time() - inicio, 4),
+        }
+    acertos = 0
+    esperados = 0
+    for exatos, aproximados in zip(vizinhos[IndiceExatoBlocado.nome], vizinhos[IndiceIVF.nome]):
+        exatos = exatos[exatos >= 0]
+        acertos += len(np.intersect1d(exatos, aproximados[aproximados >= 0]))
+        esperados += len(exatos)
+    resultado["recall_ann"] = round(acertos / esperados, 4) if esperados else 1.0
+    logger.info({
+        "timestamp": datetime.utcnow().isoformat(),
+        "event": "benchmark_indices_vizinhos",
+        "status": "success",
+        "source": "ml.indice_vizinhos.comparar_indices",
+        "details": resultado
+    })
+    return resultado
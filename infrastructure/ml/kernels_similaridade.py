@@ -0,0 +1,286 @@
+"""
+Kernels vetorizados de similaridade de cosseno sobre matrizes de embeddings
+Tracing ID: KERNELS_SIMILARIDADE_001
+
+Funções sobre matrizes float32 com linhas de norma unitária (ou brutas, com
+`normalizados=False`): cosseno um-para-muitos e muitos-para-muitos, top-k
+exato em blocos com memória limitada e armazenamento compacto em float16.
+Blocos float16 são convertidos para float32 apenas durante o produto.
+Cada chamada gera uma única linha de log, nunca uma por par.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import time
+
+import numpy as np
+
+from shared.logger import logger
+
+
+def normalizar_linhas(matriz: np.ndarray) -> np.ndarray:
+    """Retorna cópia float32 com linhas de norma L2 unitária (linhas nulas permanecem nulas)."""
+    matriz = np.asarray(matriz, dtype=np.float32)
+    if matriz.ndim == 1:
+        matriz = matriz.reshape(1, -1)
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return matriz / normas
+
+
+def compactar_float16(matriz: np.ndarray, normalizados: bool = False) -> np.ndarray:
+    """Normaliza (se necessário) e armazena os embeddings em float16 (metade da memória)."""
+    base = np.asarray(matriz, dtype=np.float32) if normalizados else normalizar_linhas(matriz)
+    return base.astype(np.float16)
+
+
+def _preparar(matriz: np.ndarray, normalizados: bool) -> np.ndarray:
+    if normalizados:
+        matriz = np.asarray(matriz)
+        return matriz.reshape(1, -1) if matriz.ndim == 1 else matriz
+    return normalizar_linhas(matriz)
+
+
+def _produto(consultas: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Produto interno em float32, convertendo blocos float16 sob demanda."""
+    if consultas.dtype != np.float32:
+        consultas = consultas.astype(np.float32)
+    if base.dtype != np.float32:
+        base = base.astype(np.float32)
+    return consultas @ base.T
+
+
+def _registrar(evento: str, inicio: float, detalhes: Dict[str, Any]) -> None:
+    detalhes["tempo"] = round(time.time() - inicio, 6)
+    logger.info({
+        "timestamp": datetime.utcnow().isoformat(),
+        "event": evento,
+        "status": "success",
+        "source": f"ml.kernels_similaridade.{evento}",
+        "details": detalhes
+    })
+
+
+def cosseno_um_para_muitos(
+    consulta: np.ndarray,
+    base: np.ndarray,
+    normalizados: bool = False,
+    registrar_log: bool = True
+) -> np.ndarray:
+    """
+    Similaridade de cosseno entre um vetor e todas as linhas de `base`.
+
+    Returns:
+        Vetor float32 com N similaridades
+    """
+    inicio = time.time()
+    consulta = _preparar(consulta, normalizados)
+    base = _preparar(base, normalizados)
+    sims = _produto(consulta, base)[0]
+    if registrar_log:
+        _registrar("cosseno_um_para_muitos", inicio, {"n_base": int(base.shape[0])})
+    return sims
+
+
+def cosseno_muitos_para_muitos(
+    consultas: np.ndarray,
+    base: np.ndarray,
+    normalizados: bool = False,
+    tamanho_bloco: Optional[int] = None,
+    registrar_log: bool = True
+) -> np.ndarray:
+    """
+    Matriz M×N de similaridades de cosseno entre as linhas de `consultas` e `base`.
+
+    Com `tamanho_bloco`, as consultas são processadas em blocos (útil quando
+    a base está em float16 e não se quer convertê-la inteira de uma vez).
+    """
+    inicio = time.time()
+    consultas = _preparar(consultas, normalizados)
+    base = _preparar(base, normalizados)
+    if tamanho_bloco is None or tamanho_bloco >= consultas.shape[0]:
+        sims = _produto(consultas, base)
+    else:
+        sims = np.empty((consultas.shape[0], base.shape[0]), dtype=np.float32)
+        for bloco in range(0, consultas.shape[0], tamanho_bloco):
+            sims[bloco:bloco + tamanho_bloco] = _produto(consultas[bloco:bloco + tamanho_bloco], base)
+    if registrar_log:
+        _registrar("cosseno_muitos_para_muitos", inicio, {
+            "n_consultas": int(consultas.shape[0]),
+            "n_base": int(base.shape[0])
+        })
+    return sims
+
+
+def top_k_linha(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices dos k maiores valores de um vetor, em ordem decrescente de score."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        parcial = np.argpartition(-scores, k - 1)[:k]
+    else:
+        parcial = np.arange(scores.shape[0])
+    # Ordenação estável por (-score, índice) para resultados determinísticos
+    return parcial[np.lexsort((parcial, -scores[parcial]))]
+
+
+def top_k_por_linha(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k de cada linha de uma matriz de scores.
+
+    Returns:
+        (similaridades, índices), ambos M×k, em ordem decrescente de score
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return (np.empty((scores.shape[0], 0), dtype=np.float32),
+                np.empty((scores.shape[0], 0), dtype=np.int64))
+    if k < scores.shape[1]:
+        parcial = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        parcial = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    parciais_scores = np.take_along_axis(scores, parcial, axis=1)
+    ordem = np.lexsort((parcial, -parciais_scores), axis=1)
+    return np.take_along_axis(parciais_scores, ordem, axis=1), np.take_along_axis(parcial, ordem, axis=1)
+
+
+def top_k_cosseno(
+    consultas: np.ndarray,
+    base: np.ndarray,
+    k: int,
+    normalizados: bool = False,
+    tamanho_bloco: int = 1024,
+    tamanho_bloco_base: Optional[int] = None,
+    excluir_indices: Optional[np.ndarray] = None,
+    registrar_log: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k exato por cosseno, em blocos.
+
+    Memória O(tamanho_bloco × (tamanho_bloco_base + k)): as consultas são
+    processadas em blocos e, com `tamanho_bloco_base`, a base também é
+    percorrida em fatias cujo top-k parcial é mesclado ao acumulado.
+
+    Args:
+        consultas: Matriz M×D
+        base: Matriz N×D (float32 ou float16)
+        k: Vizinhos por consulta
+        excluir_indices: Para cada consulta, índice da base a ignorar (ex.: a
+            própria consulta quando consultas ⊂ base); -1 não exclui nada
+
+    Returns:
+        (similaridades M×k float32, índices M×k int64); posições sem vizinho
+        ficam com -inf / -1
+    """
+    inicio = time.time()
+    consultas = _preparar(consultas, normalizados)
+    base = _preparar(base, normalizados)
+    m, n = consultas.shape[0], base.shape[0]
+    sims = np.full((m, k), -np.inf, dtype=np.float32)
+    idxs = np.full((m, k), -1, dtype=np.int64)
+    if k <= 0 or n == 0:
+        return sims, idxs
+    fatia_base = tamanho_bloco_base or n
+    tamanho_bloco = max(1, tamanho_bloco)
+
+    for bloco in range(0, m, tamanho_bloco):
+        q = consultas[bloco:bloco + tamanho_bloco]
+        linhas = np.arange(q.shape[0])
+        excluir = None if excluir_indices is None else np.asarray(excluir_indices[bloco:bloco + tamanho_bloco])
+        melhores_sims = np.full((q.shape[0], 0), -np.inf, dtype=np.float32)
+        melhores_idxs = np.full((q.shape[0], 0), -1, dtype=np.int64)
+        for inicio_base in range(0, n, fatia_base):
+            scores = _produto(q, base[inicio_base:inicio_base + fatia_base])
+            if excluir is not None:
+                locais = excluir - inicio_base
+                validos = (locais >= 0) & (locais < scores.shape[1])
+                scores[linhas[validos], locais[validos]] = -np.inf
+            parciais_sims, parciais_idxs = top_k_por_linha(scores, k)
+            candidatos_sims = np.concatenate([melhores_sims, parciais_sims], axis=1)
+            candidatos_idxs = np.concatenate([melhores_idxs, parciais_idxs + inicio_base], axis=1)
+            selecao_sims, selecao = top_k_por_linha(candidatos_sims, k)
+            melhores_sims = selecao_sims
+            melhores_idxs = np.take_along_axis(candidatos_idxs, selecao, axis=1)
+        largura = melhores_sims.shape[1]
+        finitos = np.isfinite(melhores_sims)
+        sims[bloco:bloco + q.shape[0], :largura] = melhores_sims
+        idxs[bloco:bloco + q.shape[0], :largura] = np.where(finitos, melhores_idxs, -1)
+
+    if registrar_log:
+        _registrar("top_k_cosseno", inicio, {
+            "n_consultas": int(m),
+            "n_base": int(n),
+            "k": int(k),
+            "tamanho_bloco": int(tamanho_bloco),
+            "dtype_base": str(base.dtype)
+        })
+    return sims, idxs
+
+
+def benchmark_cosseno(
+    n_consultas: int = 200,
+    n_base: int = 5000,
+    dim: int = 384,
+    k: int = 10,
+    pares_amostra: int = 2000,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Micro-benchmark: caminho por par (sklearn `cosine_similarity` em vetores
+    1×D, como em `similaridade_cosseno`) contra os kernels em lote.
+
+    O caminho por par é medido em `pares_amostra` pares e extrapolado para a
+    matriz completa.
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    rng = np.random.default_rng(seed)
+    consultas = rng.standard_normal((n_consultas, dim)).astype(np.float32)
+    base = rng.standard_normal((n_base, dim)).astype(np.float32)
+
+    inicio = time.perf_counter()
+    amostra = min(pares_amostra, n_consultas * n_base)
+    for par in range(amostra):
+        i, j = divmod(par, n_base)
+        float(cosine_similarity(consultas[i].reshape(1, -1), base[j].reshape(1, -1))[0][0])
+    tempo_por_par = (time.perf_counter() - inicio) / max(amostra, 1)
+    tempo_por_par_total = tempo_por_par * n_consultas * n_base
+
+    base_norm = normalizar_linhas(base)
+    consultas_norm = normalizar_linhas(consultas)
+    inicio = time.perf_counter()
+    matriz = cosseno_muitos_para_muitos(consultas_norm, base_norm, normalizados=True, registrar_log=False)
+    tempo_matriz = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    top_k_cosseno(consultas_norm, base_norm, k, normalizados=True, tamanho_bloco=64, registrar_log=False)
+    tempo_top_k = time.perf_counter() - inicio
+
+    base_f16 = compactar_float16(base_norm, normalizados=True)
+    inicio = time.perf_counter()
+    sims_f16, _ = top_k_cosseno(consultas_norm, base_f16, k, normalizados=True, tamanho_bloco=64, registrar_log=False)
+    tempo_top_k_f16 = time.perf_counter() - inicio
+    erro_f16 = float(np.max(np.abs(np.sort(matriz, axis=1)[:, ::-1][:, :k] - sims_f16)))
+
+    resultado = {
+        "n_consultas": n_consultas,
+        "n_base": n_base,
+        "dim": dim,
+        "tempo_por_par_extrapolado": round(tempo_por_par_total, 4),
+        "tempo_matriz": round(tempo_matriz, 4),
+        "tempo_top_k": round(tempo_top_k, 4),
+        "tempo_top_k_float16": round(tempo_top_k_f16, 4),
+        "speedup_matriz": round(tempo_por_par_total / tempo_matriz, 1) if tempo_matriz else None,
+        "memoria_base_float32_bytes": int(base_norm.nbytes),
+        "memoria_base_float16_bytes": int(base_f16.nbytes),
+        "erro_max_float16": erro_f16
+    }
+    logger.info({
+        "timestamp": datetime.utcnow().isoformat(),
+        "event": "benchmark_cosseno",
+        "status": "success",
+        "source": "ml.kernels_similaridade.benchmark_cosseno",
+        "details": resultado
+    })
+    return resultado
@@ -27,14 +27,16 @@ except ImportError:
     logging.warning("SentenceTransformer não disponível. Usando fallback.")
 
 from shared.logger import logger
-from shared.config import BASE_DIR
+from shared.config import BASE_DIR, EMBEDDING_STORE_CONFIG
+from infrastructure.ml.embedding_store import EmbeddingStore, obter_store
 
 class SemanticEmbeddingService:
     """
     Serviço de embeddings semânticos para validação de documentação.
     
     Implementa padrões enterprise com:
-    - Cache inteligente para performance
+    - Cache inteligente para performance (store de embeddings compartilhado
+      para o modelo real; cache JSON por texto apenas no modo fallback)
     - Validação de qualidade
     - Fallback para ambientes sem GPU
     - Logs estruturados
@@ -45,7 +47,8 @@ class SemanticEmbeddingService:
                  model_name: str = 'all-MiniLM-L6-v2',
                  cache_dir: Optional[str] = None,
                  threshold: float = 0.85,
-                 max_length: int = 512):
+                 max_length: int = 512,
+                 embedding_store: Optional[EmbeddingStore] = None):
         """
         Inicializa o serviço de embeddings semânticos.
         
@@ -54,6 +57,7 @@ class SemanticEmbeddingService:
             cache_dir: Diretório para cache de embeddings
             threshold: Threshold de similaridade (0.85 padrão)
             max_length: Comprimento máximo de tokens
+            embedding_store: Store persistente compartilhado (padrão: obter_store(model_name))
         """
         self.model_name = model_name
         self.threshold = threshold
@@ -61,6 +65,9 @@ class SemanticEmbeddingService:
         self.cache_dir = cache_dir or str(BASE_DIR / "infrastructure" / "cache" / "embeddings")
         self.model = None
         self.cache = {}
+        self.embedding_store = embedding_store
+        if self.embedding_store is None and EMBEDDING_STORE_CONFIG["enabled"]:
+            self.embedding_store = obter_store(model_name)
         self.metrics = {
             'embeddings_generated': 0,
             'cache_hits': 0,
@@ -226,8 +233,15 @@ class SemanticEmbeddingService:
         start_time = datetime.utcnow()
         cache_key = self._generate_cache_key(text)
         
-        # Tentar carregar do cache primeiro
-        cached_embedding = self._load_from_cache(cache_key)
+        usar_store = self.model is not None and self.embedding_store is not None
+        
+        # Tentar carregar do cache primeiro (store compartilhado para o modelo real)
+        if usar_store:
+            matriz, encontrados = self.embedding_store.buscar([text])
+            cached_embedding = matriz[0].tolist() if encontrados[0] else None
+            self.metrics['cache_hits' if cached_embedding else 'cache_misses'] += 1
+        else:
+            cached_embedding = self._load_from_cache(cache_key)
         if cached_embedding:
             return cached_embedding
         
@@ -252,14 +266,18 @@ class SemanticEmbeddingService:
                         "error": str(e)
                     }
                 })
-                # Fallback para embedding simples
+                # Fallback para embedding simples (não persiste no store do modelo)
                 embedding = self._generate_fallback_embedding(text)
+                usar_store = False
         else:
             # Fallback para embedding simples
             embedding = self._generate_fallback_embedding(text)
         
         # Salvar no cache
-        self._save_to_cache(cache_key, embedding)
+        if usar_store:
+            self.embedding_store.adicionar([text], np.array([embedding], dtype=np.float32))
+        else:
+            self._save_to_cache(cache_key, embedding)
         
         # Atualizar métricas
         self.metrics['embeddings_generated'] += 1
@@ -165,6 +165,18 @@ class OrchestratorConfig:
     
     # Configurações de performance
     max_nichos_concorrentes: int = 1  # Processamento sequencial
+    max_processamento_concorrente: int = 0  # Etapas CPU-bound simultâneas (0 = os.cpu_count())
+    
+    # Configurações do modo pipeline (etapas como workers ligados por filas)
+    modo_pipeline: bool = False
+    concorrencia_por_etapa: Dict[str, int] = field(default_factory=lambda: {
+        "coleta": 2,
+        "validacao": 1,
+        "processamento": 1,
+        "preenchimento": 1,
+        "exportacao": 1
+    })
+    tamanho_fila_pipeline: int = 2  # Nichos aguardando entre duas etapas
     timeout_total_minutos: int = 120
     max_memoria_mb: int = 2048
     
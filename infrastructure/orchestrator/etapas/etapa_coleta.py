@@ -22,8 +22,9 @@ Status: ✅ ADAPTADO PARA NOVA ARQUITETURA
 """
 
 import time
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import sys
@@ -63,7 +64,8 @@ class EtapaColeta:
     Etapa responsável pela coleta de keywords de múltiplas fontes.
     
     Integra com todos os coletores disponíveis e aplica rate limiting
-    inteligente para evitar bloqueios.
+    inteligente para evitar bloqueios. As fontes são coletadas em paralelo,
+    de modo que o tempo total tende ao da fonte mais lenta.
     """
     
     def __init__(self, config: Dict[str, Any]):
@@ -75,6 +77,9 @@ class EtapaColeta:
         """
         self.config = config
         
+        # Semáforos de concorrência por fonte (criados sob demanda)
+        self._semaforos: Dict[str, asyncio.Semaphore] = {}
+        
         # Inicializar coletores disponíveis
         self.coletores = self._inicializar_coletores()
         
@@ -187,6 +192,11 @@ class EtapaColeta:
         """
         Executa a etapa de coleta para um nicho específico.
         
+        Todas as fontes são disparadas concorrentemente (fan-out), cada uma
+        limitada pelo seu semáforo de concorrência; os resultados entram no
+        conjunto deduplicado à medida que chegam. Fontes que não terminam até
+        o prazo `timeout_coleta` são canceladas e marcadas como 'timeout'.
+        
         Args:
             nicho: Nome do nicho
             keywords_semente: Keywords iniciais para expandir
@@ -198,41 +208,52 @@ class EtapaColeta:
         logger.info(f"Iniciando coleta para nicho: {nicho}")
         
         try:
-            # Executar coleta real
-            keywords_coletadas = []
+            # Termos únicos em ordem de chegada
+            termos_unicos: Dict[str, None] = {}
             fontes_utilizadas = []
+            latencia_por_fonte: Dict[str, float] = {}
+            status_por_fonte: Dict[str, str] = {}
             
             # Usar keywords semente se fornecidas
             if keywords_semente is None:
                 keywords_semente = self.config.get('keywords_semente', []) or []
             
-            # Coletar de cada fonte disponível
-            for nome_coletor, coletor in self.coletores.items():
-                try:
-                    logger.info(f"Coletando de {nome_coletor} para nicho: {nicho}")
-                    
-                    # Aplicar rate limiting
-                    self._aplicar_rate_limiting(nome_coletor)
-                    
-                    # Executar coleta - usar método correto do coletor
-                    keywords_fonte = await coletor.coletar_keywords(keywords_semente or [])
-                    
-                    if keywords_fonte:
-                        # Extrair termos das keywords
-                        termos_fonte = [kw.termo for kw in keywords_fonte if hasattr(kw, 'termo')]
-                        keywords_coletadas.extend(termos_fonte)
+            tarefas = {
+                asyncio.ensure_future(self._coletar_fonte(nome_coletor, coletor, nicho, keywords_semente)): nome_coletor
+                for nome_coletor, coletor in self.coletores.items()
+            }
+            timeout_coleta = self.config.get('timeout_coleta')
+            prazo = inicio_tempo + timeout_coleta if timeout_coleta else None
+            pendentes = set(tarefas)
+            
+            while pendentes:
+                restante = None if prazo is None else prazo - time.time()
+                if restante is not None and restante <= 0:
+                    break
+                concluidas, pendentes = await asyncio.wait(
+                    pendentes, timeout=restante, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarefa in concluidas:
+                    nome_coletor = tarefas[tarefa]
+                    termos_fonte, status, latencia = tarefa.result()
+                    latencia_por_fonte[nome_coletor] = latencia
+                    status_por_fonte[nome_coletor] = status
+                    if termos_fonte:
+                        termos_unicos.update(dict.fromkeys(termos_fonte))
                         fontes_utilizadas.append(nome_coletor)
-                        logger.info(f"Coletadas {len(termos_fonte)} keywords de {nome_coletor}")
-                    
-                except Exception as e:
-                    logger.error(f"Erro na coleta de {nome_coletor}: {e}")
-                    continue
             
-            # Remover duplicatas
-            keywords_coletadas = list(set(keywords_coletadas))
+            # Fontes que estouraram o prazo global
+            for tarefa in pendentes:
+                tarefa.cancel()
+                nome_coletor = tarefas[tarefa]
+                latencia_por_fonte[nome_coletor] = time.time() - inicio_tempo
+                status_por_fonte[nome_coletor] = 'timeout'
+                logger.warning(f"Coleta de {nome_coletor} cancelada: prazo de {timeout_coleta}string_data excedido")
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
             
             # Aplicar filtros de qualidade
-            keywords_coletadas = self._aplicar_filtros_qualidade(keywords_coletadas, nicho)
+            keywords_coletadas = self._aplicar_filtros_qualidade(list(termos_unicos), nicho)
             
             tempo_execucao = time.time() - inicio_tempo
             
@@ -244,7 +265,10 @@ class EtapaColeta:
                 metadados={
                     'nicho': nicho,
                     'keywords_semente': keywords_semente,
-                    'config_utilizada': self.config
+                    'config_utilizada': self.config,
+                    'latencia_por_fonte': latencia_por_fonte,
+                    'status_por_fonte': status_por_fonte,
+                    'tempo_soma_fontes': sum(latencia_por_fonte.values())
                 }
             )
             
@@ -255,16 +279,77 @@ class EtapaColeta:
             logger.error(f"Erro na etapa de coleta para nicho {nicho}: {e}")
             raise
     
-    def _aplicar_rate_limiting(self, nome_coletor: str):
-        """Aplica rate limiting para evitar bloqueios."""
+    async def _coletar_fonte(
+        self,
+        nome_coletor: str,
+        coletor: KeywordColetorBase,
+        nicho: str,
+        keywords_semente: List[str]
+    ) -> Tuple[List[str], str, float]:
+        """
+        Coleta de uma fonte, dividindo as sementes em lotes quando
+        `lote_sementes_por_fonte` está configurado. Os lotes concorrem entre
+        si limitados pelo semáforo da fonte.
+        
+        Returns:
+            (termos coletados, status, latência em segundos)
+        """
+        inicio = time.time()
+        tamanho_lote = self.config.get('lote_sementes_por_fonte')
+        if tamanho_lote and len(keywords_semente) > tamanho_lote:
+            lotes = [keywords_semente[i:i + tamanho_lote] for i in range(0, len(keywords_semente), tamanho_lote)]
+        else:
+            lotes = [keywords_semente]
+        
+        semaforo = self._obter_semaforo(nome_coletor)
+        
+        async def coletar_lote(sementes: List[str]) -> List[str]:
+            async with semaforo:
+                await self._aguardar_rate_limiting(nome_coletor)
+                # Executar coleta - usar método correto do coletor
+                keywords_fonte = await coletor.coletar_keywords(sementes)
+            # Extrair termos das keywords
+            return [kw.termo for kw in keywords_fonte or [] if hasattr(kw, 'termo')]
+        
+        logger.info(f"Coletando de {nome_coletor} para nicho: {nicho}")
+        resultados = await asyncio.gather(*(coletar_lote(lote) for lote in lotes), return_exceptions=True)
+        erros = [r for r in resultados if isinstance(r, BaseException)]
+        for erro in erros:
+            logger.error(f"Erro na coleta de {nome_coletor}: {erro}")
+        if len(erros) == len(resultados):
+            return [], 'erro', time.time() - inicio
+        
+        termos_fonte = [termo for termos_lote in resultados if not isinstance(termos_lote, BaseException) for termo in termos_lote]
+        status = 'parcial' if erros else 'sucesso'
+        latencia = time.time() - inicio
+        logger.info(f"Coletadas {len(termos_fonte)} keywords de {nome_coletor} em {latencia:.2f}string_data")
+        return termos_fonte, status, latencia
+    
+    def _obter_semaforo(self, nome_coletor: str) -> asyncio.Semaphore:
+        """Semáforo de concorrência da fonte, compartilhado entre execuções."""
+        if nome_coletor not in self._semaforos:
+            limites = self.config.get('concorrencia_por_coletor', {})
+            limite = limites.get(nome_coletor, self.config.get('max_concorrencia_por_fonte', 1))
+            self._semaforos[nome_coletor] = asyncio.Semaphore(max(1, limite))
+        return self._semaforos[nome_coletor]
+    
+    def _obter_delay(self, nome_coletor: str) -> float:
+        """Delay configurado para o coletor."""
         delay = self.config.get('delay_entre_requests', 1.0)
         
         # Delay específico por coletor
         delays_especificos = self.config.get('delays_por_coletor', {})
         if nome_coletor in delays_especificos:
             delay = delays_especificos[nome_coletor]
-        
-        time.sleep(delay)
+        return delay
+    
+    async def _aguardar_rate_limiting(self, nome_coletor: str):
+        """Rate limiting sem bloquear o event loop: só a fonte em questão espera."""
+        await asyncio.sleep(self._obter_delay(nome_coletor))
+    
+    def _aplicar_rate_limiting(self, nome_coletor: str):
+        """Aplica rate limiting para evitar bloqueios."""
+        time.sleep(self._obter_delay(nome_coletor))
     
     def _aplicar_filtros_qualidade(self, keywords: List[str], nicho: str) -> List[str]:
         """Aplica filtros de qualidade nas keywords coletadas."""
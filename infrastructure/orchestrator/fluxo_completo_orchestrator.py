@@ -9,9 +9,12 @@ Versão: 1.0
 Autor: IA-Cursor
 """
 
+import os
 import time
+import queue
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass, field
 from enum import Enum
@@ -22,6 +25,7 @@ from pathlib import Path
 from .config import OrchestratorConfig, obter_config
 from .progress_tracker import ProgressTracker, obter_progress_tracker
 from .error_handler import ErrorHandler, obter_error_handler, ErrorType, ErrorSeverity
+from infrastructure.rate_limiting.adaptive_rate_limiter import obter_metricas_token_buckets
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,54 @@ class FluxoContext:
     inicio_timestamp: float = field(default_factory=time.time)
     config: OrchestratorConfig = field(default_factory=obter_config)
     metadados: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def duracao_segundos(self) -> float:
+        """Duração da execução em segundos."""
+        return time.time() - self.inicio_timestamp
+
+
+@dataclass
+class MetricasEtapa:
+    """Métricas de um estágio do pipeline."""
+    etapa: str
+    workers: int
+    fila: "queue.Queue"
+    # Nichos pausados separados do estágio; voltam à fila ao serem liberados
+    pausados: List[str] = field(default_factory=list)
+    ocupados: int = 0
+    itens_processados: int = 0
+    falhas: int = 0
+    tempo_ocupado: float = 0.0
+    inicio_timestamp: float = field(default_factory=time.time)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot das métricas; utilização = tempo ocupado / capacidade dos workers."""
+        decorrido = max(time.time() - self.inicio_timestamp, 1e-9)
+        return {
+            "workers": self.workers,
+            "ocupados": self.ocupados,
+            "profundidade_fila": self.fila.qsize(),
+            "pausados": len(self.pausados),
+            "itens_processados": self.itens_processados,
+            "falhas": self.falhas,
+            "tempo_ocupado": self.tempo_ocupado,
+            "utilizacao": min(self.tempo_ocupado / (self.workers * decorrido), 1.0)
+        }
+
+
+# Ordem das etapas do fluxo; cada uma corresponde a `_executar_etapa_<nome>`
+ETAPAS_FLUXO = ["coleta", "validacao", "processamento", "preenchimento", "exportacao"]
+
+# Sinaliza fim da fila para os workers de um estágio
+_FIM_PIPELINE = object()
+
+
+def _limite_positivo(valor: Any, padrao: int) -> int:
+    """Retorna `valor` se for um inteiro positivo, senão `padrao`."""
+    if isinstance(valor, int) and not isinstance(valor, bool) and valor > 0:
+        return valor
+    return padrao
 
 
 class FluxoCompletoOrchestrator:
@@ -64,6 +116,24 @@ class FluxoCompletoOrchestrator:
         self.status = FluxoStatus.INICIANDO
         self.context: Optional[FluxoContext] = None
         self.lock = threading.Lock()
+        # Notificado quando um nicho pausado no pipeline volta à fila do estágio
+        self._pipeline_retomado = threading.Condition(self.lock)
+        
+        # Nichos em execução simultânea -> etapa atual de cada um
+        self.nichos_em_execucao: Dict[str, Optional[str]] = {}
+        
+        # Liberado (set) enquanto o fluxo não estiver pausado
+        self._fluxo_liberado = threading.Event()
+        self._fluxo_liberado.set()
+        
+        # Limita etapas CPU-bound simultâneas entre os nichos
+        max_processamento = _limite_positivo(
+            getattr(self.config, "max_processamento_concorrente", 0), os.cpu_count() or 1
+        )
+        self._semaforo_processamento = threading.BoundedSemaphore(max_processamento)
+        
+        # Métricas por estágio do modo pipeline (vazio fora dele)
+        self.metricas_pipeline: Dict[str, MetricasEtapa] = {}
         
         # Callbacks para notificações
         self.on_progress: Optional[Callable] = None
@@ -119,6 +189,8 @@ class FluxoCompletoOrchestrator:
                 self.progress_tracker.adicionar_nicho(nicho)
             
             self.status = FluxoStatus.EM_EXECUCAO
+            self.nichos_em_execucao.clear()
+            self._fluxo_liberado.set()
             
             logger.info(f"Fluxo iniciado - Sessão: {sessao_id}, Nichos: {nichos}")
             
@@ -133,29 +205,29 @@ class FluxoCompletoOrchestrator:
             return sessao_id
     
     def _executar_fluxo(self, nichos: List[str]):
-        """Executa o fluxo completo em thread separada."""
+        """
+        Executa o fluxo completo em thread separada.
+        
+        Até `max_nichos_concorrentes` nichos são processados em paralelo; os
+        coletores compartilham os mesmos token buckets, então o orçamento de
+        requisições por provedor vale para todos os nichos juntos.
+        """
         try:
-            for nicho in nichos:
-                if self.status == FluxoStatus.CANCELADO:
-                    logger.info("Fluxo cancelado pelo usuário")
-                    break
-                
-                self.context.nicho_atual = nicho
-                logger.info(f"Iniciando processamento do nicho: {nicho}")
-                
-                sucesso = self._processar_nicho(nicho)
-                
-                if not sucesso:
-                    logger.error(f"Falha no processamento do nicho: {nicho}")
-                    if self.on_error:
-                        self.on_error(nicho, "Falha no processamento")
-                    continue
-                
-                logger.info(f"Nicho processado com sucesso: {nicho}")
+            if getattr(self.config, "modo_pipeline", False) is True:
+                self._executar_pipeline(nichos)
+            else:
+                self._executar_nichos_paralelos(nichos)
             
             # Finalizar fluxo
-            self.status = FluxoStatus.CONCLUIDO
-            self.context = None
+            with self.lock:
+                cancelado = self.status == FluxoStatus.CANCELADO
+                if not cancelado:
+                    self.status = FluxoStatus.CONCLUIDO
+                self.context = None
+            
+            if cancelado:
+                logger.info("Fluxo cancelado pelo usuário")
+                return
             
             if self.on_complete:
                 self.on_complete()
@@ -176,6 +248,271 @@ class FluxoCompletoOrchestrator:
             
             logger.error(f"Erro fatal no fluxo: {e}")
     
+    def _executar_nichos_paralelos(self, nichos: List[str]):
+        """Executa cada nicho por todas as etapas, até N nichos simultâneos."""
+        max_workers = min(_limite_positivo(self.config.max_nichos_concorrentes, 1), len(nichos))
+        logger.info(f"Processando {len(nichos)} nichos com {max_workers} workers")
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nicho") as executor:
+            futuros = {executor.submit(self._executar_nicho, nicho): nicho for nicho in nichos}
+            
+            for futuro in as_completed(futuros):
+                nicho = futuros[futuro]
+                sucesso = futuro.result()
+                
+                if sucesso is None:
+                    continue
+                
+                if not sucesso:
+                    logger.error(f"Falha no processamento do nicho: {nicho}")
+                    if self.on_error:
+                        self.on_error(nicho, "Falha no processamento")
+                    continue
+                
+                logger.info(f"Nicho processado com sucesso: {nicho}")
+    
+    def _executar_pipeline(self, nichos: List[str]):
+        """
+        Executa as etapas como estágios independentes ligados por filas limitadas.
+        
+        Enquanto um nicho está em processamento, o próximo já pode estar em
+        coleta. Cada estágio tem seus próprios workers
+        (`concorrencia_por_etapa`) e a fila de entrada de cada estágio após
+        o primeiro é limitada por `tamanho_fila_pipeline`, aplicando
+        backpressure aos estágios anteriores.
+        """
+        concorrencia = getattr(self.config, "concorrencia_por_etapa", None) or {}
+        tamanho_fila = _limite_positivo(getattr(self.config, "tamanho_fila_pipeline", 0), 1)
+        
+        metricas = {}
+        for indice, etapa in enumerate(ETAPAS_FLUXO):
+            fila = queue.Queue() if indice == 0 else queue.Queue(maxsize=tamanho_fila)
+            metricas[etapa] = MetricasEtapa(
+                etapa=etapa,
+                workers=_limite_positivo(concorrencia.get(etapa), 1),
+                fila=fila
+            )
+        with self.lock:
+            self.metricas_pipeline = metricas
+        
+        logger.info(
+            f"Pipeline iniciado com {len(nichos)} nichos - workers por etapa: "
+            f"{ {etapa: m.workers for etapa, m in metricas.items()} }"
+        )
+        
+        workers_por_etapa = []
+        for indice, etapa in enumerate(ETAPAS_FLUXO):
+            proxima = metricas[ETAPAS_FLUXO[indice + 1]].fila if indice + 1 < len(ETAPAS_FLUXO) else None
+            threads = [
+                threading.Thread(
+                    target=self._worker_etapa,
+                    args=(etapa, metricas[etapa], proxima),
+                    name=f"pipeline-{etapa}-{numero}",
+                    daemon=True
+                )
+                for numero in range(metricas[etapa].workers)
+            ]
+            for thread in threads:
+                thread.start()
+            workers_por_etapa.append(threads)
+        
+        primeira = metricas[ETAPAS_FLUXO[0]]
+        for nicho in nichos:
+            primeira.fila.put(nicho)
+        
+        # Encerra os estágios em ordem: quando todos os workers de um estágio
+        # terminam e ele não tem nichos pausados, o próximo recebe um sinal de
+        # fim por worker
+        for indice, threads in enumerate(workers_por_etapa):
+            fila = metricas[ETAPAS_FLUXO[indice]].fila
+            self._aguardar_estagio_vazio(metricas[ETAPAS_FLUXO[indice]])
+            for _ in threads:
+                fila.put(_FIM_PIPELINE)
+            for thread in threads:
+                thread.join()
+        
+        logger.info(f"Pipeline finalizado - métricas: {self.obter_metricas_pipeline()}")
+    
+    def _worker_etapa(self, etapa: str, metricas: MetricasEtapa, proxima_fila: Optional["queue.Queue"]):
+        """Consome nichos da fila do estágio até receber o sinal de fim."""
+        while True:
+            nicho = metricas.fila.get()
+            if nicho is _FIM_PIPELINE:
+                metricas.fila.task_done()
+                return
+            
+            try:
+                self._executar_etapa_pipeline(etapa, nicho, metricas, proxima_fila)
+            except Exception as e:
+                # Um worker nunca pode morrer: o encerramento do pipeline depende dele
+                logger.error(f"Erro no worker da etapa {etapa} para nicho {nicho}: {e}")
+            finally:
+                metricas.fila.task_done()
+    
+    def _aguardar_estagio_vazio(self, metricas: MetricasEtapa):
+        """
+        Aguarda o estágio consumir a fila e não ter nichos pausados separados.
+        
+        Um nicho retomado volta à fila antes de sair de `pausados`, então o
+        estágio só está vazio quando as duas condições valem ao mesmo tempo.
+        Com o fluxo cancelado, nichos ainda pausados são descartados.
+        """
+        while True:
+            metricas.fila.join()
+            with self._pipeline_retomado:
+                while metricas.pausados and self.status != FluxoStatus.CANCELADO:
+                    self._pipeline_retomado.wait(timeout=0.5)
+                if self.status == FluxoStatus.CANCELADO:
+                    for nicho in metricas.pausados:
+                        self.nichos_em_execucao.pop(nicho, None)
+                    metricas.pausados.clear()
+                if metricas.fila.unfinished_tasks == 0:
+                    return
+    
+    def _separar_nicho_pausado(self, etapa: str, nicho: str, metricas: MetricasEtapa) -> bool:
+        """
+        Separa um nicho pausado do estágio em vez de bloquear o worker.
+        
+        Returns:
+            True se o nicho está pausado e foi separado; volta à fila do
+            estágio quando for retomado ou cancelado
+        """
+        with self.lock:
+            metricas.pausados.append(nicho)
+        if self.progress_tracker.ao_liberar_nicho(nicho, lambda: self._reenfileirar_nicho(nicho, metricas)):
+            logger.info(f"Nicho pausado separado da etapa {etapa}: {nicho}")
+            return True
+        with self.lock:
+            metricas.pausados.remove(nicho)
+        return False
+    
+    def _reenfileirar_nicho(self, nicho: str, metricas: MetricasEtapa):
+        """Devolve um nicho liberado à fila do estágio (sem bloquear quem retomou)."""
+        def reenfileirar():
+            # Bloqueia se a fila estiver cheia; só sai de `pausados` depois de enfileirado
+            metricas.fila.put(nicho)
+            with self._pipeline_retomado:
+                if nicho in metricas.pausados:
+                    metricas.pausados.remove(nicho)
+                self._pipeline_retomado.notify_all()
+        
+        threading.Thread(target=reenfileirar, name=f"pipeline-retomar-{nicho}", daemon=True).start()
+    
+    def _executar_etapa_pipeline(
+        self,
+        etapa: str,
+        nicho: str,
+        metricas: MetricasEtapa,
+        proxima_fila: Optional["queue.Queue"]
+    ):
+        """Executa uma etapa para um nicho e encaminha o nicho ao próximo estágio."""
+        # Pausa do fluxo inteiro segura todos os estágios; pausa de um nicho
+        # só o separa, e o worker segue consumindo a fila
+        self._fluxo_liberado.wait()
+        if self.status != FluxoStatus.CANCELADO and self._separar_nicho_pausado(etapa, nicho, metricas):
+            return
+        if not self._aguardar_liberacao(nicho):
+            logger.info(f"Nicho cancelado no pipeline: {nicho} (etapa {etapa})")
+            with self.lock:
+                self.nichos_em_execucao.pop(nicho, None)
+            return
+        
+        executar_etapa = getattr(self, f"_executar_etapa_{etapa}")
+        with self.lock:
+            metricas.ocupados += 1
+        inicio = time.time()
+        try:
+            config_nicho = self.config.obter_config_nicho(nicho)
+            if etapa == "processamento":
+                with self._semaforo_processamento:
+                    sucesso = executar_etapa(nicho, config_nicho)
+            else:
+                sucesso = executar_etapa(nicho, config_nicho)
+        except Exception as e:
+            self.error_handler.handle_error(
+                e,
+                ErrorType.PROCESSING,
+                ErrorSeverity.HIGH,
+                {"nicho": nicho, "etapa": etapa}
+            )
+            sucesso = False
+        finally:
+            with self.lock:
+                metricas.ocupados -= 1
+                metricas.itens_processados += 1
+                metricas.tempo_ocupado += time.time() - inicio
+        
+        if not sucesso:
+            with self.lock:
+                metricas.falhas += 1
+                self.nichos_em_execucao.pop(nicho, None)
+            self.progress_tracker.concluir_nicho(nicho, False)
+            logger.error(f"Falha no processamento do nicho: {nicho} (etapa {etapa})")
+            if self.on_error:
+                self.on_error(nicho, "Falha no processamento")
+            return
+        
+        if proxima_fila is not None:
+            # Bloqueia quando a fila do próximo estágio está cheia (backpressure)
+            proxima_fila.put(nicho)
+            return
+        
+        with self.lock:
+            self.nichos_em_execucao.pop(nicho, None)
+        self.progress_tracker.concluir_nicho(nicho, True)
+        logger.info(f"Nicho processado com sucesso: {nicho}")
+    
+    def obter_metricas_pipeline(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Profundidade de fila e utilização de cada estágio do pipeline.
+        
+        O estágio com utilização próxima de 1.0 e fila de entrada cheia é o
+        gargalo; filas vazias com baixa utilização indicam workers ociosos.
+        """
+        with self.lock:
+            return {etapa: metricas.to_dict() for etapa, metricas in self.metricas_pipeline.items()}
+    
+    def _executar_nicho(self, nicho: str) -> Optional[bool]:
+        """
+        Executa um nicho dentro do pool de workers.
+        
+        Returns:
+            Resultado de `_processar_nicho`, ou None se o nicho foi cancelado
+            antes de iniciar
+        """
+        if not self._aguardar_liberacao(nicho):
+            logger.info(f"Nicho cancelado antes de iniciar: {nicho}")
+            return None
+        
+        logger.info(f"Iniciando processamento do nicho: {nicho}")
+        self._marcar_etapa(nicho, None)
+        try:
+            return self._processar_nicho(nicho)
+        finally:
+            with self.lock:
+                self.nichos_em_execucao.pop(nicho, None)
+    
+    def _marcar_etapa(self, nicho: str, etapa: Optional[str]):
+        """Registra a etapa atual de um nicho em execução."""
+        with self.lock:
+            self.nichos_em_execucao[nicho] = etapa
+            if self.context:
+                self.context.nicho_atual = nicho
+                self.context.etapa_atual = etapa
+    
+    def _aguardar_liberacao(self, nicho: str) -> bool:
+        """
+        Ponto de controle entre etapas: bloqueia enquanto o fluxo ou o nicho
+        estiverem pausados.
+        
+        Returns:
+            False se o fluxo ou o nicho foram cancelados
+        """
+        self._fluxo_liberado.wait()
+        if self.status == FluxoStatus.CANCELADO:
+            return False
+        return bool(self.progress_tracker.aguardar_liberacao_nicho(nicho))
+    
     def _processar_nicho(self, nicho: str) -> bool:
         """
         Processa um nicho específico através de todas as etapas.
@@ -190,22 +527,33 @@ class FluxoCompletoOrchestrator:
             config_nicho = self.config.obter_config_nicho(nicho)
             
             # Etapa 1: Coleta
+            if not self._aguardar_liberacao(nicho):
+                return False
             if not self._executar_etapa_coleta(nicho, config_nicho):
                 return False
             
             # Etapa 2: Validação
+            if not self._aguardar_liberacao(nicho):
+                return False
             if not self._executar_etapa_validacao(nicho, config_nicho):
                 return False
             
-            # Etapa 3: Processamento
-            if not self._executar_etapa_processamento(nicho, config_nicho):
+            # Etapa 3: Processamento (CPU-bound, limitado entre nichos)
+            if not self._aguardar_liberacao(nicho):
                 return False
+            with self._semaforo_processamento:
+                if not self._executar_etapa_processamento(nicho, config_nicho):
+                    return False
             
             # Etapa 4: Preenchimento
+            if not self._aguardar_liberacao(nicho):
+                return False
             if not self._executar_etapa_preenchimento(nicho, config_nicho):
                 return False
             
             # Etapa 5: Exportação
+            if not self._aguardar_liberacao(nicho):
+                return False
             if not self._executar_etapa_exportacao(nicho, config_nicho):
                 return False
             
@@ -227,7 +575,7 @@ class FluxoCompletoOrchestrator:
     def _executar_etapa_coleta(self, nicho: str, config_nicho) -> bool:
         """Executa a etapa de coleta usando Integration Bridge."""
         etapa_nome = "coleta"
-        self.context.etapa_atual = etapa_nome
+        self._marcar_etapa(nicho, etapa_nome)
         
         try:
             logger.info(f"Iniciando coleta para nicho: {nicho}")
@@ -283,7 +631,7 @@ class FluxoCompletoOrchestrator:
     def _executar_etapa_validacao(self, nicho: str, config_nicho) -> bool:
         """Executa a etapa de validação."""
         etapa_nome = "validacao"
-        self.context.etapa_atual = etapa_nome
+        self._marcar_etapa(nicho, etapa_nome)
         
         try:
             logger.info(f"Iniciando validação para nicho: {nicho}")
@@ -323,7 +671,7 @@ class FluxoCompletoOrchestrator:
     def _executar_etapa_processamento(self, nicho: str, config_nicho) -> bool:
         """Executa a etapa de processamento usando Integration Bridge."""
         etapa_nome = "processamento"
-        self.context.etapa_atual = etapa_nome
+        self._marcar_etapa(nicho, etapa_nome)
         
         try:
             logger.info(f"Iniciando processamento para nicho: {nicho}")
@@ -380,7 +728,7 @@ class FluxoCompletoOrchestrator:
     def _executar_etapa_preenchimento(self, nicho: str, config_nicho) -> bool:
         """Executa a etapa de preenchimento."""
         etapa_nome = "preenchimento"
-        self.context.etapa_atual = etapa_nome
+        self._marcar_etapa(nicho, etapa_nome)
         
         try:
             logger.info(f"Iniciando preenchimento para nicho: {nicho}")
@@ -420,7 +768,7 @@ class FluxoCompletoOrchestrator:
     def _executar_etapa_exportacao(self, nicho: str, config_nicho) -> bool:
         """Executa a etapa de exportação usando Integration Bridge."""
         etapa_nome = "exportacao"
-        self.context.etapa_atual = etapa_nome
+        self._marcar_etapa(nicho, etapa_nome)
         
         try:
             logger.info(f"Iniciando exportação para nicho: {nicho}")
@@ -509,6 +857,7 @@ class FluxoCompletoOrchestrator:
         with self.lock:
             if self.status == FluxoStatus.EM_EXECUCAO:
                 self.status = FluxoStatus.PAUSADO
+                self._fluxo_liberado.clear()
                 logger.info("Fluxo pausado")
     
     def retomar_fluxo(self):
@@ -516,14 +865,28 @@ class FluxoCompletoOrchestrator:
         with self.lock:
             if self.status == FluxoStatus.PAUSADO:
                 self.status = FluxoStatus.EM_EXECUCAO
+                self._fluxo_liberado.set()
                 logger.info("Fluxo retomado")
     
     def cancelar_fluxo(self):
         """Cancela o fluxo de processamento."""
         with self.lock:
             self.status = FluxoStatus.CANCELADO
+            self._fluxo_liberado.set()
             logger.info("Fluxo cancelado")
     
+    def pausar_nicho(self, nicho: str) -> bool:
+        """Pausa um nicho no próximo ponto de controle entre etapas."""
+        return self.progress_tracker.pausar_nicho(nicho)
+    
+    def retomar_nicho(self, nicho: str) -> bool:
+        """Retoma um nicho pausado."""
+        return self.progress_tracker.retomar_nicho(nicho)
+    
+    def cancelar_nicho(self, nicho: str) -> bool:
+        """Cancela um nicho sem interromper os demais."""
+        return self.progress_tracker.cancelar_nicho(nicho)
+    
     def obter_status(self) -> Dict[str, Any]:
         """Obtém status atual do fluxo."""
         with self.lock:
@@ -533,7 +896,11 @@ class FluxoCompletoOrchestrator:
                 "nicho_atual": self.context.nicho_atual if self.context else None,
                 "etapa_atual": self.context.etapa_atual if self.context else None,
                 "inicio_timestamp": self.context.inicio_timestamp if self.context else None,
-                "duracao_segundos": self.context.duracao_segundos if self.context else None
+                "duracao_segundos": self.context.duracao_segundos if self.context else None,
+                "nichos_em_execucao": dict(self.nichos_em_execucao),
+                "max_nichos_concorrentes": self.config.max_nichos_concorrentes,
+                "orcamentos_coleta": obter_metricas_token_buckets(),
+                "pipeline": {etapa: metricas.to_dict() for etapa, metricas in self.metricas_pipeline.items()}
             }
             
             # Adicionar progresso se disponível
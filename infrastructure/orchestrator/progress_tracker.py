@@ -13,7 +13,7 @@ Autor: IA-Cursor
 import json
 import time
 import os
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 import logging
@@ -126,6 +126,11 @@ class NichoProgress:
             return self.fim_timestamp - self.inicio_timestamp
         return time.time() - self.inicio_timestamp
     
+    @property
+    def foi_concluida(self) -> bool:
+        """Verifica se o nicho foi concluído com sucesso."""
+        return self.status == EtapaStatus.CONCLUIDA
+    
     @property
     def percentual_geral(self) -> float:
         """Calcula percentual geral de progresso."""
@@ -215,6 +220,13 @@ class ProgressTracker:
         self.sessao_atual: Optional[SessaoProgress] = None
         self.lock = threading.Lock()
         
+        # Controle por nicho: evento liberado (set) quando o nicho pode prosseguir
+        self._liberacao_nichos: Dict[str, threading.Event] = {}
+        self._status_antes_pausa: Dict[str, EtapaStatus] = {}
+        self._nichos_cancelados: set = set()
+        # Callbacks disparados quando um nicho pausado é retomado ou cancelado
+        self._callbacks_liberacao: Dict[str, List[Callable[[], None]]] = {}
+        
         logger.info(f"ProgressTracker inicializado em: {self.diretorio_persistencia}")
     
     def iniciar_sessao(self, sessao_id: str, config: Dict[str, Any]) -> SessaoProgress:
@@ -233,6 +245,10 @@ class ProgressTracker:
                 sessao_id=sessao_id,
                 config=config
             )
+            self._liberacao_nichos.clear()
+            self._status_antes_pausa.clear()
+            self._nichos_cancelados.clear()
+            self._callbacks_liberacao.clear()
             
             logger.info(f"Sessão iniciada: {sessao_id}")
             self._persistir_sessao()
@@ -255,6 +271,10 @@ class ProgressTracker:
         with self.lock:
             nicho_progress = NichoProgress(nome_nicho=nome_nicho)
             self.sessao_atual.nichos[nome_nicho] = nicho_progress
+            liberacao = threading.Event()
+            liberacao.set()
+            self._liberacao_nichos[nome_nicho] = liberacao
+            self._nichos_cancelados.discard(nome_nicho)
             
             logger.info(f"Nicho adicionado à sessão: {nome_nicho}")
             self._persistir_sessao()
@@ -287,6 +307,8 @@ class ProgressTracker:
             etapa.status = EtapaStatus.EM_EXECUCAO
             etapa.inicio_timestamp = time.time()
             etapa.mensagem = "Etapa iniciada"
+            if nicho.status == EtapaStatus.PENDENTE:
+                nicho.status = EtapaStatus.EM_EXECUCAO
             
             logger.info(f"Etapa iniciada: {nome_nicho}.{nome_etapa}")
             self._persistir_sessao()
@@ -413,6 +435,122 @@ class ProgressTracker:
             
             return nicho
     
+    def pausar_nicho(self, nome_nicho: str) -> bool:
+        """
+        Pausa um nicho: o processamento para no próximo ponto de controle
+        (entre etapas) até `retomar_nicho` ou `cancelar_nicho`.
+        
+        Returns:
+            True se o nicho foi pausado
+        """
+        with self.lock:
+            nicho = self._obter_nicho(nome_nicho)
+            if nicho.status in (EtapaStatus.CONCLUIDA, EtapaStatus.FALHOU, EtapaStatus.CANCELADA):
+                return False
+            if nicho.status != EtapaStatus.PAUSADA:
+                self._status_antes_pausa[nome_nicho] = nicho.status
+                nicho.status = EtapaStatus.PAUSADA
+            self._liberacao_nichos[nome_nicho].clear()
+            
+            logger.info(f"Nicho pausado: {nome_nicho}")
+            self._persistir_sessao()
+            return True
+    
+    def retomar_nicho(self, nome_nicho: str) -> bool:
+        """
+        Retoma um nicho pausado.
+        
+        Returns:
+            True se o nicho estava pausado e foi retomado
+        """
+        with self.lock:
+            nicho = self._obter_nicho(nome_nicho)
+            if nicho.status != EtapaStatus.PAUSADA:
+                return False
+            nicho.status = self._status_antes_pausa.pop(nome_nicho, EtapaStatus.PENDENTE)
+            self._liberacao_nichos[nome_nicho].set()
+            callbacks = self._callbacks_liberacao.pop(nome_nicho, [])
+            
+            logger.info(f"Nicho retomado: {nome_nicho}")
+            self._persistir_sessao()
+        self._disparar_callbacks(callbacks)
+        return True
+    
+    def cancelar_nicho(self, nome_nicho: str) -> bool:
+        """
+        Cancela um nicho; etapas em andamento terminam e as seguintes não são executadas.
+        
+        Returns:
+            True se o nicho foi cancelado
+        """
+        with self.lock:
+            nicho = self._obter_nicho(nome_nicho)
+            if nicho.status in (EtapaStatus.CONCLUIDA, EtapaStatus.FALHOU, EtapaStatus.CANCELADA):
+                return False
+            nicho.status = EtapaStatus.CANCELADA
+            nicho.fim_timestamp = time.time()
+            for etapa in nicho.etapas.values():
+                if etapa.status == EtapaStatus.PENDENTE:
+                    etapa.status = EtapaStatus.CANCELADA
+            self._nichos_cancelados.add(nome_nicho)
+            self._status_antes_pausa.pop(nome_nicho, None)
+            # Acorda quem estiver aguardando a liberação
+            self._liberacao_nichos[nome_nicho].set()
+            callbacks = self._callbacks_liberacao.pop(nome_nicho, [])
+            
+            logger.info(f"Nicho cancelado: {nome_nicho}")
+            self._persistir_sessao()
+        self._disparar_callbacks(callbacks)
+        return True
+    
+    def nicho_cancelado(self, nome_nicho: str) -> bool:
+        """Verifica se o nicho foi cancelado."""
+        return nome_nicho in self._nichos_cancelados
+    
+    def aguardar_liberacao_nicho(self, nome_nicho: str, timeout: Optional[float] = None) -> bool:
+        """
+        Ponto de controle: bloqueia enquanto o nicho estiver pausado.
+        
+        Returns:
+            True se o nicho pode prosseguir, False se foi cancelado (ou o timeout expirou)
+        """
+        liberacao = self._liberacao_nichos.get(nome_nicho)
+        if liberacao is not None and not liberacao.wait(timeout):
+            return False
+        return not self.nicho_cancelado(nome_nicho)
+    
+    def ao_liberar_nicho(self, nome_nicho: str, callback: Callable[[], None]) -> bool:
+        """
+        Registra `callback` para quando o nicho pausado for retomado ou
+        cancelado, sem bloquear quem chama.
+        
+        Returns:
+            True se o nicho está pausado e o callback foi registrado; False se
+            o nicho já pode prosseguir (o callback não é registrado)
+        """
+        with self.lock:
+            liberacao = self._liberacao_nichos.get(nome_nicho)
+            if liberacao is None or liberacao.is_set():
+                return False
+            self._callbacks_liberacao.setdefault(nome_nicho, []).append(callback)
+            return True
+    
+    def _disparar_callbacks(self, callbacks: List[Callable[[], None]]):
+        """Executa callbacks de liberação fora do lock."""
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Erro em callback de liberação de nicho: {e}")
+    
+    def _obter_nicho(self, nome_nicho: str) -> NichoProgress:
+        if not self.sessao_atual:
+            raise RuntimeError("Nenhuma sessão ativa")
+        nicho = self.sessao_atual.nichos.get(nome_nicho)
+        if not nicho:
+            raise ValueError(f"Nicho '{nome_nicho}' não encontrado")
+        return nicho
+    
     def concluir_sessao(self, sucesso: bool = True) -> SessaoProgress:
         """
         Conclui a sessão atual.
@@ -7,10 +7,13 @@ from datetime import datetime
 import uuid
 from sklearn.metrics.pairwise import cosine_similarity
 import time
-import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import asyncio
-from functools import lru_cache
+from infrastructure.ml.kernels_similaridade import cosseno_muitos_para_muitos
+from infrastructure.ml.indice_vizinhos import IndiceVizinhos, criar_indice, comparar_indices
+
+# Limite de keywords por cluster imposto por domain.models.Cluster
+MAX_KEYWORDS_CLUSTER = 8
 
 class ClusterizadorConfig:
     """Configuração avançada para o ClusterizadorSemantico."""
@@ -26,7 +29,11 @@ class ClusterizadorConfig:
         criterio_diversidade: bool = True,
         func_similaridade: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
         idioma: str = "pt",
-        monitoramento_hook: Optional[Callable[[Dict[str, Any]], None]] = None
+        monitoramento_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+        backend_vizinhos: Literal["auto", "exato", "ann"] = "auto",
+        limiar_ann: int = 20000,
+        incluir_heatmap: bool = False,
+        limiar_drift: float = 0.3
     ):
         self.modelo_embeddings = modelo_embeddings
         self.tamanho_cluster = tamanho_cluster
@@ -39,6 +46,10 @@ class ClusterizadorConfig:
         self.func_similaridade = func_similaridade or cosine_similarity
         self.idioma = idioma
         self.monitoramento_hook = monitoramento_hook
+        self.backend_vizinhos = backend_vizinhos
+        self.limiar_ann = limiar_ann
+        self.incluir_heatmap = incluir_heatmap
+        self.limiar_drift = limiar_drift
 
 class ClusterizadorSemantico:
     """
@@ -58,13 +69,20 @@ class ClusterizadorSemantico:
         criterio_diversidade: bool = True,
         func_similaridade: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
         idioma: str = "pt",
-        monitoramento_hook: Optional[Callable[[Dict[str, Any]], None]] = None
+        monitoramento_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+        backend_vizinhos: Literal["auto", "exato", "ann"] = "auto",
+        limiar_ann: int = 20000,
+        incluir_heatmap: bool = False,
+        limiar_drift: float = 0.3
     ):
         """
         Inicializa o clusterizador com configuração avançada ou parâmetros individuais.
         Args:
             ...
             paralelizar: se True, ativa paralelização da montagem de clusters usando múltiplas threads (recomendado para grandes volumes; limitado por MAX_WORKERS e GIL do Python; ganhos marginais para listas pequenas)
+            backend_vizinhos: "exato" (top-k blocado), "ann" (IVF aproximado) ou "auto" (ann acima de limiar_ann termos)
+            incluir_heatmap: se True, calcula a matriz N×N completa para o relatório (apenas para listas pequenas)
+            limiar_drift: fração de keywords novas não absorvidas pelos clusters existentes acima da qual gerar_clusters_incremental refaz a clusterização completa
             ...
         """
         if config:
@@ -79,6 +97,10 @@ class ClusterizadorSemantico:
             self.func_similaridade = getattr(config, 'func_similaridade', cosine_similarity)
             self.idioma = getattr(config, 'idioma', "pt")
             self.monitoramento_hook = getattr(config, 'monitoramento_hook', None)
+            self.backend_vizinhos = getattr(config, 'backend_vizinhos', "auto")
+            self.limiar_ann = getattr(config, 'limiar_ann', 20000)
+            self.incluir_heatmap = getattr(config, 'incluir_heatmap', False)
+            self.limiar_drift = getattr(config, 'limiar_drift', 0.3)
         else:
             self.modelo_embeddings = modelo_embeddings
             self.tamanho_cluster = tamanho_cluster
@@ -91,6 +113,10 @@ class ClusterizadorSemantico:
             self.func_similaridade = func_similaridade or cosine_similarity
             self.idioma = idioma
             self.monitoramento_hook = monitoramento_hook
+            self.backend_vizinhos = backend_vizinhos
+            self.limiar_ann = limiar_ann
+            self.incluir_heatmap = incluir_heatmap
+            self.limiar_drift = limiar_drift
         # Validação de dependências
         try:
             import sklearn
@@ -99,7 +125,6 @@ class ClusterizadorSemantico:
             raise RuntimeError(f"Dependência obrigatória ausente: {e}")
         self._exec_id = str(uuid.uuid4())[:12]
         self._clusters_termos = set()  # Para critério de diversidade
-        self._embeddings_cache = {}
 
     def _validar_keywords(self, keywords: List[Keyword]) -> List[Keyword]:
         """Filtra e retorna apenas keywords válidas."""
@@ -118,30 +143,30 @@ class ClusterizadorSemantico:
             validas.append(kw)
         return validas
 
-    @lru_cache(maxsize=128)
-    def _cache_embeddings(self, termos_hash: str, modelo: str) -> np.ndarray:
-        return self._gerar_embeddings_nocache(termos_hash, modelo)
-
-    def _gerar_embeddings_nocache(self, termos_hash: str, modelo: str) -> np.ndarray:
-        # Função interna para cache
-        termos = json.loads(termos_hash)
+    def _gerar_embeddings(self, termos: List[str]) -> np.ndarray:
+        # Reuso entre execuções fica a cargo do store por termo de
+        # infrastructure.ml.embeddings (EMBEDDING_STORE_CONFIG)
         if self.func_gerar_embeddings:
-            return self.func_gerar_embeddings(termos, modelo)
+            return self.func_gerar_embeddings(termos, self.modelo_embeddings)
         from infrastructure.ml.embeddings import gerar_embeddings
-        return gerar_embeddings(termos, model_name=modelo)
-
-    def _gerar_embeddings(self, termos: List[str]) -> np.ndarray:
-        termos_hash = json.dumps(termos, sort_keys=True)
-        key = (termos_hash, self.modelo_embeddings)
-        if key in self._embeddings_cache:
-            return self._embeddings_cache[key]
-        emb = self._gerar_embeddings_nocache(termos_hash, self.modelo_embeddings)
-        self._embeddings_cache[key] = emb
-        return emb
+        return gerar_embeddings(termos, model_name=self.modelo_embeddings)
 
     def _calcular_similaridade(self, emb1: np.ndarray, emb2: np.ndarray) -> np.ndarray:
+        if self.func_similaridade is cosine_similarity:
+            return cosseno_muitos_para_muitos(emb1, emb2)
         return self.func_similaridade(emb1, emb2)
 
+    def _criar_indice_vizinhos(self, embeddings: np.ndarray) -> IndiceVizinhos:
+        """Constrói o backend de vizinhança configurado sobre os embeddings."""
+        func_customizada = None if self.func_similaridade is cosine_similarity else self.func_similaridade
+        indice = criar_indice(
+            self.backend_vizinhos,
+            total_itens=len(embeddings),
+            limiar_ann=self.limiar_ann,
+            func_similaridade=func_customizada
+        )
+        return indice.construir(embeddings)
+
     def _criar_cluster(self, keywords: List[Keyword], similares: List[float], categoria: str, blog_dominio: str) -> Optional[Cluster]:
         """Cria um cluster se a similaridade média for suficiente e respeitar diversidade."""
         similaridade_media = float(np.mean(similares)) if similares else 1.0
@@ -261,35 +286,39 @@ class ClusterizadorSemantico:
             })
             resultado["tempo_execucao"] = round(time.time() - inicio, 3)
             return resultado
-        usados = set()
         total = len(keywords_sorted)
+        usados = np.zeros(total, dtype=bool)
+        total_usados = 0
         clusters_gerados = 0
-        heatmap = self._calcular_similaridade(embeddings, embeddings)
+        k_vizinhos = self.tamanho_cluster - 1
+        heatmap = self._calcular_similaridade(embeddings, embeddings) if self.incluir_heatmap else None
+        indice = self._criar_indice_vizinhos(embeddings)
         # Paralelização real do cálculo de clusters
-        def montar_cluster(head_idx):
+        def montar_cluster(head_idx, vizinhos=None):
             head = keywords_sorted[head_idx]
-            head_emb = embeddings[head_idx]
-            sim_matrix = self._calcular_similaridade(np.array([head_emb]), embeddings)[0]
-            similares = [
-                (sim_matrix[counter], counter, keywords_sorted[counter])
-                for counter in range(total)
-                if counter != head_idx and counter not in usados
-            ]
-            similares = sorted(similares, key=lambda value: value[0], reverse=True)[:self.tamanho_cluster-1]
-            if len(similares) < self.tamanho_cluster-1:
-                return None, {"head": head.termo, "motivo": "similares insuficientes"}
-            cluster_keywords = [head] + [key for _, _, key in similares]
-            cluster = self._criar_cluster(cluster_keywords, [string_data[0] for string_data in similares], categoria, blog_dominio)
+            if vizinhos is None:
+                vizinhos = indice.buscar(head_idx, k_vizinhos, excluir=usados)
+            sims, idxs = vizinhos
+            validos = idxs >= 0
+            sims, idxs = sims[validos], idxs[validos]
+            if len(idxs) < k_vizinhos:
+                return None, {"head": head.termo, "motivo": "similares insuficientes"}, idxs
+            cluster_keywords = [head] + [keywords_sorted[counter] for counter in idxs]
+            cluster = self._criar_cluster(cluster_keywords, [float(sim) for sim in sims], categoria, blog_dominio)
             if cluster:
-                return cluster, None
+                return cluster, None, idxs
             else:
-                return None, {"head": head.termo, "motivo": "similaridade/ diversidade baixa"}
-        indices_heads = [index for index in range(total) if index not in usados]
+                return None, {"head": head.termo, "motivo": "similaridade/ diversidade baixa"}, idxs
         if self.paralelizar:
+            # Top-k de todos os heads calculado em blocos antes de distribuir a montagem
+            sims_lote, idxs_lote = indice.buscar_lote(np.arange(total), k_vizinhos)
             with ThreadPoolExecutor() as executor:
-                futures = {executor.submit(montar_cluster, idx): idx for idx in indices_heads}
+                futures = {
+                    executor.submit(montar_cluster, idx, (sims_lote[idx], idxs_lote[idx])): idx
+                    for idx in range(total)
+                }
                 for future in as_completed(futures):
-                    cluster, descarte = future.result()
+                    cluster, descarte, _ = future.result()
                     if cluster:
                         resultado["clusters"].append(cluster)
                         clusters_gerados += 1
@@ -310,13 +339,15 @@ class ClusterizadorSemantico:
                     elif descarte:
                         resultado["descartados"].append(descarte)
         else:
-            while len(usados) + self.tamanho_cluster <= total:
+            head_idx = 0
+            while total_usados + self.tamanho_cluster <= total:
                 if self.max_clusters and clusters_gerados >= self.max_clusters:
                     break
-                head_idx = next((index for index in range(total) if index not in usados), None)
-                if head_idx is None:
+                while head_idx < total and usados[head_idx]:
+                    head_idx += 1
+                if head_idx >= total:
                     break
-                cluster, descarte = montar_cluster(head_idx)
+                cluster, descarte, vizinhos_idx = montar_cluster(head_idx)
                 if cluster:
                     resultado["clusters"].append(cluster)
                     clusters_gerados += 1
@@ -334,15 +365,12 @@ class ClusterizadorSemantico:
                             })
                 elif descarte:
                     resultado["descartados"].append(descarte)
-                usados.add(head_idx)
-                for _, counter, _ in sorted([
-                    (heatmap[head_idx, counter], counter, keywords_sorted[counter])
-                    for counter in range(total)
-                    if counter != head_idx and counter not in usados
-                ], key=lambda value: value[0], reverse=True)[:self.tamanho_cluster-1]:
-                    usados.add(counter)
+                usados[head_idx] = True
+                usados[vizinhos_idx] = True
+                total_usados += 1 + len(vizinhos_idx)
         resultado["tempo_execucao"] = round(time.time() - inicio, 3)
         resultado["relatorio"] = self._gerar_relatorio(resultado["clusters"], resultado["descartados"], heatmap)
+        resultado["relatorio"]["backend_vizinhos"] = indice.nome
         if self.monitoramento_hook:
             try:
                 self.monitoramento_hook(resultado)
@@ -373,6 +401,158 @@ class ClusterizadorSemantico:
             }
         return resultado
 
+    def gerar_clusters_incremental(
+        self,
+        clusters_anteriores: List[Cluster],
+        novas_keywords: List[Keyword],
+        embeddings_anteriores: Optional[np.ndarray] = None,
+        categoria: Optional[str] = "",
+        blog_dominio: Optional[str] = "",
+        limiar_drift: Optional[float] = None,
+        formato_retorno: Literal["objeto", "json"] = "objeto"
+    ) -> Dict[str, Any]:
+        """
+        Atualiza clusters existentes com keywords novas sem reclusterizar o nicho inteiro.
+
+        Cada keyword nova (em ordem de volume) entra no cluster de centróide mais
+        similar que ainda tenha vaga (até MAX_KEYWORDS_CLUSTER) e similaridade
+        >= min_similaridade; as que sobram formam clusters novos via gerar_clusters.
+        Se a fração de keywords novas não absorvidas sobre o total (drift) passar
+        de `limiar_drift`, todos os clusters são refeitos do zero.
+
+        Args:
+            clusters_anteriores: clusters da execução anterior (atualizados in-place)
+            novas_keywords: keywords coletadas nesta execução
+            embeddings_anteriores: embeddings das keywords dos clusters anteriores,
+                na ordem em que aparecem (cluster a cluster); gerados se None
+            limiar_drift: sobrescreve self.limiar_drift
+
+        Returns:
+            Mesmo formato de gerar_clusters, com `relatorio` contendo modo
+            ("incremental" ou "rebuild"), drift e clusters_tocados. No formato
+            "objeto", `embeddings` traz a matriz alinhada às keywords dos clusters
+            retornados, pronta para a próxima execução incremental.
+        """
+        inicio = time.time()
+        limiar_drift = self.limiar_drift if limiar_drift is None else limiar_drift
+        keywords_anteriores = [kw for cluster in clusters_anteriores for kw in cluster.keywords]
+        vistos = {kw.termo.lower() for kw in keywords_anteriores}
+        novas = []
+        for kw in self._validar_keywords(novas_keywords):
+            if kw.termo.lower() not in vistos:
+                vistos.add(kw.termo.lower())
+                novas.append(kw)
+        novas.sort(key=lambda key: key.volume_busca, reverse=True)
+
+        if embeddings_anteriores is None and keywords_anteriores:
+            embeddings_anteriores = self._gerar_embeddings([kw.termo for kw in keywords_anteriores])
+        embeddings_anteriores = np.asarray(embeddings_anteriores if keywords_anteriores else [], dtype=np.float64)
+        if keywords_anteriores and len(embeddings_anteriores) != len(keywords_anteriores):
+            raise ValueError("embeddings_anteriores deve ter uma linha por keyword dos clusters anteriores")
+        embeddings_novas = self._gerar_embeddings([kw.termo for kw in novas]) if novas else np.empty((0, 0))
+        vetores = {kw.termo.lower(): vetor for kw, vetor in zip(keywords_anteriores, embeddings_anteriores)}
+        vetores.update({kw.termo.lower(): vetor for kw, vetor in zip(novas, embeddings_novas)})
+
+        # Plano de atribuição: nada é alterado antes de decidir entre incremental e rebuild
+        atribuicoes: List[tuple] = []
+        if clusters_anteriores and novas:
+            tamanhos = [len(cluster.keywords) for cluster in clusters_anteriores]
+            grupos = np.split(embeddings_anteriores, np.cumsum(tamanhos)[:-1])
+            centroides = np.vstack([grupo.mean(axis=0) for grupo in grupos])
+            heads = np.vstack([grupo[0] for grupo in grupos])
+            sims_centroides = np.asarray(self._calcular_similaridade(embeddings_novas, centroides))
+            sims_heads = np.asarray(self._calcular_similaridade(embeddings_novas, heads))
+            vagas = MAX_KEYWORDS_CLUSTER - np.asarray(tamanhos)
+            for idx_nova in range(len(novas)):
+                candidatos = np.flatnonzero((sims_centroides[idx_nova] >= self.min_similaridade) & (vagas > 0))
+                if len(candidatos):
+                    idx_cluster = candidatos[np.argmax(sims_centroides[idx_nova, candidatos])]
+                    vagas[idx_cluster] -= 1
+                    atribuicoes.append((idx_nova, idx_cluster, float(sims_heads[idx_nova, idx_cluster])))
+
+        total_keywords = len(keywords_anteriores) + len(novas)
+        nao_atribuidas = len(novas) - len(atribuicoes)
+        drift = nao_atribuidas / total_keywords if total_keywords else 0.0
+
+        if not clusters_anteriores or drift > limiar_drift:
+            # Rebuild completo sobre o nicho inteiro
+            self._clusters_termos = set()
+            resultado = self.gerar_clusters(keywords_anteriores + novas, categoria, blog_dominio)
+            resultado.setdefault("relatorio", self._gerar_relatorio(resultado["clusters"], resultado["descartados"]))
+            resultado["relatorio"].update({
+                "modo": "rebuild",
+                "drift": round(drift, 4),
+                "limiar_drift": limiar_drift,
+                "keywords_novas": len(novas),
+                "keywords_atribuidas": 0,
+                "clusters_novos": len(resultado["clusters"]),
+                "clusters_tocados": len(resultado["clusters"])
+            })
+        else:
+            tocados = set()
+            for idx_nova, idx_cluster, sim_head in atribuicoes:
+                cluster = clusters_anteriores[idx_cluster]
+                kw = novas[idx_nova]
+                posicao = len(cluster.keywords)
+                if posicao < len(FUNNEL_STAGES):
+                    kw.fase_funil = FUNNEL_STAGES[posicao]
+                kw.ordem_no_cluster = posicao
+                kw.nome_artigo = f"Artigo{posicao+1}"
+                # similaridade_media é a média da similaridade dos membros com o head
+                membros = posicao - 1
+                media = (cluster.similaridade_media * membros + sim_head) / (membros + 1)
+                cluster.similaridade_media = min(1.0, max(0.0, media))
+                cluster.keywords.append(kw)
+                tocados.add(idx_cluster)
+            atribuidas = {idx_nova for idx_nova, _, _ in atribuicoes}
+            restantes = [kw for idx, kw in enumerate(novas) if idx not in atribuidas]
+
+            self._clusters_termos = {kw.termo.lower() for cluster in clusters_anteriores for kw in cluster.keywords}
+            resultado_novos = self.gerar_clusters(restantes, categoria, blog_dominio)
+            resultado = {
+                "clusters": list(clusters_anteriores) + resultado_novos["clusters"],
+                "descartados": resultado_novos["descartados"],
+                "exec_id": self._exec_id
+            }
+            resultado["relatorio"] = self._gerar_relatorio(resultado["clusters"], resultado["descartados"])
+            resultado["relatorio"].update({
+                "modo": "incremental",
+                "drift": round(drift, 4),
+                "limiar_drift": limiar_drift,
+                "keywords_novas": len(novas),
+                "keywords_atribuidas": len(atribuicoes),
+                "clusters_novos": len(resultado_novos["clusters"]),
+                "clusters_tocados": len(tocados) + len(resultado_novos["clusters"])
+            })
+        resultado["tempo_execucao"] = round(time.time() - inicio, 3)
+        logger.info({
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": "clusters_semanticos_incrementais",
+            "status": "success",
+            "source": "clusterizador_semantico.gerar_clusters_incremental",
+            "exec_id": self._exec_id,
+            "details": {
+                "modo": resultado["relatorio"]["modo"],
+                "drift": resultado["relatorio"]["drift"],
+                "clusters_tocados": resultado["relatorio"]["clusters_tocados"],
+                "total_clusters": len(resultado["clusters"]),
+                "tempo_execucao": resultado["tempo_execucao"]
+            }
+        })
+        if formato_retorno == "json":
+            return {
+                "clusters": self._serializar_clusters(resultado["clusters"]),
+                "descartados": self._serializar_descartes(resultado["descartados"]),
+                "exec_id": self._exec_id,
+                "tempo_execucao": resultado["tempo_execucao"],
+                "relatorio": resultado["relatorio"]
+            }
+        termos_clusters = [kw.termo.lower() for cluster in resultado["clusters"] for kw in cluster.keywords]
+        resultado["embeddings"] = (
+            np.vstack([vetores[termo] for termo in termos_clusters]) if termos_clusters else np.empty((0, 0))
+        )
+        return resultado
+
     def gerar_clusters_semanticos(
         self,
         keywords: List[Keyword],
@@ -394,15 +574,26 @@ class ClusterizadorSemantico:
     def benchmark(
         self,
         keywords: List[Keyword],
-        n_execucoes: int = 3
+        n_execucoes: int = 3,
+        comparar_backends: bool = True
     ) -> Dict[str, Any]:
+        """
+        Mede o tempo de gerar_clusters e, opcionalmente, compara os backends de
+        vizinhança (exato vs. ANN) em recall@k e tempo sobre os mesmos embeddings.
+        """
         tempos = []
         for _ in range(n_execucoes):
             inicio = time.time()
             self.gerar_clusters(keywords)
             tempos.append(time.time() - inicio)
-        return {
+        resultado = {
             "media_tempo": np.mean(tempos),
             "desvio_padrao": np.std(tempos),
             "execucoes": n_execucoes
-        } 
\ No newline at end of file
+        }
+        keywords_validas = self._validar_keywords(keywords)
+        if comparar_backends and len(keywords_validas) > self.tamanho_cluster:
+            keywords_sorted = sorted(keywords_validas, key=lambda key: key.volume_busca, reverse=True)
+            embeddings = self._gerar_embeddings([key.termo for key in keywords_sorted])
+            resultado["backends_vizinhos"] = comparar_indices(embeddings, self.tamanho_cluster - 1)
+        return resultado 
\ No newline at end of file
@@ -36,6 +36,7 @@ from .placeholder_unification_system_imp001 import (
     PlaceholderType,
     ValidationResult
 )
+from .template_compilado import assinatura_padroes, obter_template_compilado
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -148,6 +149,10 @@ class RegexLacunaDetector:
         """
         Detecta lacunas usando regex otimizado.
         
+        O texto é compilado uma vez (cache por hash do conteúdo); chamadas
+        seguintes com o mesmo template reaproveitam lacunas, contexto e
+        confiança já calculados.
+        
         Args:
             text: Texto para análise
             
@@ -157,44 +162,19 @@ class RegexLacunaDetector:
         start_time = time.time()
         
         try:
-            detected_gaps = []
+            template = obter_template_compilado(text)
+            prototipos = template.memo(
+                (type(self), assinatura_padroes(self.compiled_patterns), self.context_window_size),
+                lambda: self._compilar_lacunas(template)
+            )
             
-            for placeholder_type, pattern in self.compiled_patterns.items():
-                matches = pattern.finditer(text)
-                
-                for match in matches:
-                    # Extrair nome do placeholder
-                    if placeholder_type == PlaceholderType.CUSTOM:
-                        placeholder_name = match.group(1)
-                    else:
-                        placeholder_name = placeholder_type.value
-                    
-                    # Extrair contexto otimizado
-                    context = self._extract_context_optimized(text, match.start(), match.end())
-                    
-                    # Calcular confiança baseada no contexto
-                    confidence = self._calculate_regex_confidence_advanced(context, placeholder_type, match)
-                    
-                    gap = DetectedGap(
-                        placeholder_type=placeholder_type,
-                        placeholder_name=placeholder_name,
-                        start_pos=match.start(),
-                        end_pos=match.end(),
-                        context=context,
-                        confidence=confidence,
-                        detection_method=DetectionMethod.REGEX,
-                        validation_level=ValidationLevel.BASIC,
-                        metadata={
-                            "pattern_used": self.placeholder_patterns[placeholder_type],
-                            "match_length": match.end() - match.start(),
-                            "match_text": match.group(0),
-                            "line_number": self._get_line_number(text, match.start()),
-                            "column_number": self._get_column_number(text, match.start())
-                        }
-                    )
-                    
-                    detected_gaps.append(gap)
-                    self.metrics["pattern_usage"][placeholder_type.value] += 1
+            # DetectedGap é mutável (o detector híbrido completa os campos): cópias por chamada
+            detected_gaps = [
+                DetectedGap(**{**prototipo, "metadata": dict(prototipo["metadata"])})
+                for prototipo in prototipos
+            ]
+            for gap in detected_gaps:
+                self.metrics["pattern_usage"][gap.placeholder_type.value] += 1
             
             # Atualizar métricas
             detection_time = time.time() - start_time
@@ -208,6 +188,33 @@ class RegexLacunaDetector:
             self.metrics["failed_detections"] += 1
             return []
     
+    def _compilar_lacunas(self, template) -> List[Dict[str, Any]]:
+        """Campos de cada DetectedGap do template (calculados uma vez por template)."""
+        prototipos = []
+        for lacuna in template.lacunas(self.compiled_patterns):
+            # Extrair contexto otimizado
+            context = self._extract_context_optimized(template.texto, lacuna.start_pos, lacuna.end_pos)
+            
+            prototipos.append({
+                "placeholder_type": lacuna.placeholder_type,
+                "placeholder_name": lacuna.placeholder_name,
+                "start_pos": lacuna.start_pos,
+                "end_pos": lacuna.end_pos,
+                "context": context,
+                # Confiança baseada no contexto
+                "confidence": self._calculate_regex_confidence_advanced(context, lacuna.placeholder_type, lacuna.match),
+                "detection_method": DetectionMethod.REGEX,
+                "validation_level": ValidationLevel.BASIC,
+                "metadata": {
+                    "pattern_used": self.placeholder_patterns[lacuna.placeholder_type],
+                    "match_length": lacuna.end_pos - lacuna.start_pos,
+                    "match_text": lacuna.match.group(0),
+                    "line_number": lacuna.line_number,
+                    "column_number": lacuna.column_number
+                }
+            })
+        return prototipos
+    
     def _extract_context_optimized(self, text: str, start: int, end: int) -> str:
         """Extrai contexto otimizado ao redor da lacuna."""
         context_start = max(0, start - self.context_window_size)
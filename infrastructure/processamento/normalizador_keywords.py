@@ -2,11 +2,13 @@
 Módulo de normalização de palavras-chave.
 Responsável por normalizar termos, remover duplicatas e aplicar regras de formatação.
 """
-from typing import List, Set, Optional
+from typing import List, Set, Optional, Tuple
 from domain.models import Keyword
+from domain.keyword_batch import KeywordBatch
 from shared.logger import logger
+from shared.utils.motor_normalizacao import PADRAO_CARACTERES_PERMITIDOS, MotorNormalizacao, obter_motor
 import re
-import unicodedata
+import numpy as np
 from datetime import datetime
 
 class NormalizadorKeywords:
@@ -29,7 +31,7 @@ class NormalizadorKeywords:
         self,
         remover_acentos: bool = False,
         case_sensitive: bool = False,
-        caracteres_permitidos: str = r'^[\w\string_data\-.,?!]+$'
+        caracteres_permitidos: str = PADRAO_CARACTERES_PERMITIDOS
     ):
         """
         Inicializa o normalizador com configurações.
@@ -42,6 +44,20 @@ class NormalizadorKeywords:
         self.remover_acentos = remover_acentos
         self.case_sensitive = case_sensitive
         self.caracteres_permitidos = caracteres_permitidos
+        self._motor: Optional[MotorNormalizacao] = None
+        self._config_motor: Optional[Tuple] = None
+    
+    @property
+    def motor(self) -> MotorNormalizacao:
+        """
+        Motor de normalização compartilhado para a configuração atual.
+        Resolvido uma vez e reaproveitado enquanto a configuração não mudar.
+        """
+        config = (self.remover_acentos, self.case_sensitive, self.caracteres_permitidos)
+        if config != self._config_motor:
+            self._motor = obter_motor(*config)
+            self._config_motor = config
+        return self._motor
         
     def normalizar_termo(self, termo: str) -> str:
         """
@@ -62,24 +78,7 @@ class NormalizadorKeywords:
         """
         if not termo:
             return ""
-            
-        # Aplicar normalizações básicas
-        termo = termo.strip()
-        termo = re.sub(r'\string_data+', ' ', termo)
-        
-        # Conversão de case
-        if not self.case_sensitive:
-            termo = termo.lower()
-            
-        # Remoção de acentos
-        if self.remover_acentos:
-            termo = unicodedata.normalize('NFKD', termo).encode('ASCII', 'ignore').decode('ASCII')
-            
-        # Validação de caracteres permitidos
-        if not re.fullmatch(self.caracteres_permitidos, termo):
-            return ""
-            
-        return termo
+        return self.motor.normalizar(termo)
     
     def normalizar_lista(self, keywords: List[Keyword]) -> List[Keyword]:
         """
@@ -100,12 +99,13 @@ class NormalizadorKeywords:
         """
         termos_vistos: Set[str] = set()
         keywords_normalizadas: List[Keyword] = []
+        normalizar = self.motor.normalizar
         
         for kw in keywords:
             if not kw.termo:
                 continue
                 
-            termo_norm = self.normalizar_termo(kw.termo)
+            termo_norm = normalizar(kw.termo)
             if not termo_norm:
                 continue
                 
@@ -143,6 +143,59 @@ class NormalizadorKeywords:
         
         return keywords_normalizadas
     
+    def normalizar_batch(self, batch: KeywordBatch) -> KeywordBatch:
+        """
+        Versão colunar de normalizar_lista.
+        
+        Termos repetidos são resolvidos pelo cache do motor; deduplicação mantém a
+        primeira ocorrência e os campos numéricos são ajustados na coluna
+        inteira. Produz o mesmo resultado de normalizar_lista.
+        
+        Args:
+            batch: Lote colunar de keywords
+            
+        Returns:
+            Novo KeywordBatch normalizado e sem duplicatas
+        """
+        normalizar = self.motor.normalizar
+        termos_vistos: Set[str] = set()
+        indices = []
+        termos_norm = []
+        for posicao, termo in enumerate(batch.termo):
+            if not termo:
+                continue
+            termo_norm = normalizar(termo)
+            if termo_norm and termo_norm not in termos_vistos:
+                termos_vistos.add(termo_norm)
+                indices.append(posicao)
+                termos_norm.append(termo_norm.strip())
+        
+        indices = np.asarray(indices, dtype=np.int64)
+        resultado = batch[indices]
+        resultado.termo[:] = termos_norm
+        np.maximum(resultado.volume_busca, 0, out=resultado.volume_busca)
+        np.maximum(resultado.cpc, 0, out=resultado.cpc)
+        np.clip(resultado.concorrencia, 0, 1, out=resultado.concorrencia)
+        # Campos de cluster voltam ao padrão, como na criação de novas Keyword
+        resultado.ordem_no_cluster[:] = -1
+        resultado.fase_funil[:] = ""
+        resultado.nome_artigo[:] = ""
+        
+        logger.info({
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": "normalizacao_keywords",
+            "status": "success",
+            "source": "normalizador_keywords.normalizar_batch",
+            "details": {
+                "total_entrada": len(batch),
+                "total_normalizadas": len(resultado),
+                "remover_acentos": self.remover_acentos,
+                "case_sensitive": self.case_sensitive
+            }
+        })
+        
+        return resultado
+    
     def validar_configuracao(self) -> bool:
         """
         Valida se a configuração do normalizador é válida.
@@ -23,13 +23,15 @@ from enum import Enum
 
 # Cache e otimização
 import redis
-from cachetools import TTLCache, LRUCache
+from cachetools import LRUCache
 import psutil
 import gc
 
 # Logging estruturado
 from shared.logger import logger
 
+from infrastructure.cache.tiered_cache import get_tiered_cache
+
 class TipoOtimizacao(Enum):
     """Tipos de otimização disponíveis."""
     CACHE = "cache"
@@ -94,9 +96,11 @@ class CacheInteligente:
     
     def __init__(self, config: ConfiguracaoOtimizacao):
         self.config = config
-        self.cache = TTLCache(
-            maxsize=config.cache_max_size,
-            ttl=config.cache_ttl_segundos
+        # Namespace do cache em camadas do processo (LRU com TTL por item)
+        self.cache = get_tiered_cache().namespace(
+            prefix="otimizador_performance",
+            max_entries=config.cache_max_size,
+            policy="lru"
         )
         self.cache_stats = {"hits": 0, "misses": 0}
         self.lock = threading.Lock()
@@ -123,8 +127,7 @@ class CacheInteligente:
         """Define valor no cache."""
         try:
             ttl = ttl or self.config.cache_ttl_segundos
-            self.cache[key] = value
-            return True
+            return self.cache.set(key, value, ttl=ttl)
         except Exception as e:
             logger.error({
                 "event": "erro_cache_set",
@@ -136,10 +139,7 @@ class CacheInteligente:
     def invalidate(self, pattern: str) -> int:
         """Invalida cache por padrão."""
         try:
-            keys_to_remove = [key for key in self.cache.keys() if pattern in key]
-            for key in keys_to_remove:
-                del self.cache[key]
-            return len(keys_to_remove)
+            return self.cache.invalidate(lambda key: pattern in key)
         except Exception as e:
             logger.error({
                 "event": "erro_cache_invalidate",
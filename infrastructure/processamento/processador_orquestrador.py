@@ -8,10 +8,13 @@ Versão: 1.0
 Status: EM IMPLEMENTAÇÃO
 """
 
-from typing import List, Dict, Optional, Tuple, Any, Callable
+from typing import List, Dict, Optional, Tuple, Any, Callable, Iterable, Iterator, AsyncIterator, Sized
+from itertools import islice
 from domain.models import Keyword
 from shared.logger import logger
 from datetime import datetime
+import asyncio
+import math
 import time
 import uuid
 
@@ -24,9 +27,10 @@ from .auditor_final_processor import AuditorFinalProcessor
 
 # Integração com padrões de resiliência da Fase 1
 from infrastructure.resilience.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, circuit_breaker
-from infrastructure.resilience.retry_strategy import RetryConfig, RetryStrategy, retry
+from infrastructure.resilience.retry_strategy import RetryConfig, RetryStrategy, RetryExecutor, retry
 from infrastructure.resilience.bulkhead import BulkheadConfig, bulkhead
-from infrastructure.resilience.timeout_manager import TimeoutConfig, timeout
+from infrastructure.resilience.timeout_manager import TimeoutConfig, TimeoutManager, timeout
+from infrastructure.resilience.timeout_manager import TimeoutError as ChunkTimeoutError
 
 class ProcessadorOrquestrador:
     """
@@ -58,8 +62,12 @@ class ProcessadorOrquestrador:
             "tempo_por_processador": {},
             "total_keywords_inicial": 0,
             "total_keywords_final": 0,
-            "erros_processamento": 0
+            "erros_processamento": 0,
+            "chunks_processados": 0,
+            "tentativas_chunks": 0
         }
+        self.tamanho_chunk = 500
+        self.ultimo_relatorio: Dict[str, Any] = {}
         
         self._log_inicializacao()
         
@@ -99,104 +107,141 @@ class ProcessadorOrquestrador:
             timeout_seconds=120.0,
             name="processing_orchestrator"
         )
+        
+        # Retry e timeout aplicados a cada chunk do pipeline em streaming;
+        # o timeout de um chunk também é retentável
+        self._chunk_retry = RetryExecutor(RetryConfig(
+            max_attempts=self.retry_config.max_attempts,
+            base_delay=self.retry_config.base_delay,
+            max_delay=self.retry_config.max_delay,
+            strategy=self.retry_config.strategy,
+            retryable_exceptions=self.retry_config.retryable_exceptions + [ChunkTimeoutError]
+        ))
+        self._chunk_timeout = TimeoutManager(self.timeout_config)
 
     def _fallback_processing_error(self, *args, **kwargs):
         """Fallback quando processamento falha"""
         logger.warning("Processamento falhou, usando fallback")
         return [], {"error": "Processamento indisponível", "fallback": True}
     
-    @retry(max_attempts=3, base_delay=1.0, max_delay=10.0)
     @bulkhead(max_concurrent_calls=15, max_wait_duration=10.0)
-    @timeout(timeout_seconds=120.0)
     def processar_keywords(
         self,
         keywords: List[Keyword],
         nicho: Optional[str] = None,
         idioma: str = "pt",
-        callback_progresso: Optional[Callable[[str, int, int], None]] = None
+        callback_progresso: Optional[Callable[[str, int, int], None]] = None,
+        tamanho_chunk: Optional[int] = None
     ) -> Tuple[List[Keyword], Dict[str, Any]]:
         """
         Processa keywords usando processadores especializados.
         
+        O processamento é feito em chunks (ver processar_keywords_stream):
+        retry e timeout valem por chunk, não para a execução inteira.
+        
         Args:
             keywords: Lista de keywords a processar
             nicho: Nicho específico para configuração
             idioma: Idioma para processamento
-            callback_progresso: Callback para progresso
+            callback_progresso: Callback para progresso (chamado por chunk)
+            tamanho_chunk: Keywords por chunk (padrão: self.tamanho_chunk)
             
         Returns:
             Tupla (keywords processadas, relatório completo)
         """
+        keywords_finais: List[Keyword] = []
+        for chunk in self.processar_keywords_stream(
+            keywords, nicho, idioma, callback_progresso, tamanho_chunk
+        ):
+            keywords_finais.extend(chunk)
+        return keywords_finais, self.ultimo_relatorio
+
+    def processar_keywords_stream(
+        self,
+        keywords: Iterable[Keyword],
+        nicho: Optional[str] = None,
+        idioma: str = "pt",
+        callback_progresso: Optional[Callable[[str, int, int], None]] = None,
+        tamanho_chunk: Optional[int] = None
+    ) -> Iterator[List[Keyword]]:
+        """
+        Pipeline em streaming: cada chunk passa por análise semântica →
+        scores → validação → ML → auditoria e é entregue antes de o próximo
+        ser lido da entrada.
+        
+        A entrada é consumida sob demanda (o gerador só avança quando o
+        consumidor pede o próximo chunk), então o pico de memória é
+        proporcional a `tamanho_chunk`. Cada chunk tem retry e timeout
+        próprios; uma falha definitiva interrompe o stream com a exceção.
+        Ao final, o relatório fica em `self.ultimo_relatorio`.
+        
+        Args:
+            keywords: Iterável (lista, gerador) de keywords
+            nicho: Nicho específico para configuração
+            idioma: Idioma para processamento
+            callback_progresso: Callback (etapa, chunk atual, total de chunks);
+                total é 0 quando a entrada não tem tamanho conhecido
+            tamanho_chunk: Keywords por chunk (padrão: self.tamanho_chunk)
+            
+        Yields:
+            Lista de keywords processadas de cada chunk
+        """
+        tamanho_chunk = tamanho_chunk or self.tamanho_chunk
+        if tamanho_chunk <= 0:
+            raise ValueError("tamanho_chunk deve ser positivo")
+        total_entrada = len(keywords) if isinstance(keywords, Sized) else None
+        total_chunks = math.ceil(total_entrada / tamanho_chunk) if total_entrada is not None else 0
+
+        self._resetar_metricas_execucao()
         self.metricas["tempo_inicio"] = time.time()
-        self.metricas["total_keywords_inicial"] = len(keywords)
         
         logger.info({
             "timestamp": datetime.utcnow().isoformat(),
             "event": "iniciando_processamento_orquestrado",
             "status": "info",
-            "source": "ProcessadorOrquestrador.processar_keywords",
+            "source": "ProcessadorOrquestrador.processar_keywords_stream",
             "tracing_id": self.tracing_id,
             "details": {
-                "total_keywords": len(keywords),
+                "total_keywords": total_entrada,
+                "tamanho_chunk": tamanho_chunk,
+                "total_chunks": total_chunks,
                 "nicho": nicho,
                 "idioma": idioma
             }
         })
         
+        config_nicho: Dict[str, Any] = {}
         try:
-            # 1. Configurar nicho
             if callback_progresso:
-                callback_progresso("Configurando nicho", 1, 6)
+                callback_progresso("Configurando nicho", 0, total_chunks)
             
             config_nicho = self.configurador.configurar(nicho, idioma)
             
-            # 2. Análise semântica
-            if callback_progresso:
-                callback_progresso("Análise semântica", 2, 6)
-            
-            keywords_analisadas = self.analisador_semantico.processar(
-                keywords, config_nicho
-            )
-            
-            # 3. Cálculo de scores
-            if callback_progresso:
-                callback_progresso("Cálculo de scores", 3, 6)
-            
-            keywords_scores = self.calculador_scores.processar(
-                keywords_analisadas
-            )
-            
-            # 4. Validação avançada
-            if callback_progresso:
-                callback_progresso("Validação avançada", 4, 6)
-            
-            keywords_validadas = self.validador_avancado.processar(
-                keywords_scores, config_nicho
-            )
-            
-            # 5. Aplicar ML
-            if callback_progresso:
-                callback_progresso("Aplicando ML", 5, 6)
-            
-            keywords_ml = self.aplicador_ml.processar(keywords_validadas)
-            
-            # 6. Auditoria final
-            if callback_progresso:
-                callback_progresso("Auditoria final", 6, 6)
-            
-            keywords_finais = self.auditor_final.processar(keywords_ml)
+            iterador = iter(keywords)
+            numero_chunk = 0
+            while True:
+                chunk = list(islice(iterador, tamanho_chunk))
+                if not chunk:
+                    break
+                numero_chunk += 1
+                self.metricas["total_keywords_inicial"] += len(chunk)
+                
+                chunk_processado = self._chunk_retry.execute_sync(
+                    self._chunk_timeout.execute_sync, self._processar_chunk, chunk, config_nicho
+                )
+                
+                self.metricas["chunks_processados"] += 1
+                self.metricas["total_keywords_final"] += len(chunk_processado)
+                
+                if callback_progresso:
+                    callback_progresso(f"Chunk {numero_chunk} processado", numero_chunk, total_chunks)
+                
+                yield chunk_processado
             
             # Finalizar métricas
             self.metricas["tempo_fim"] = time.time()
-            self.metricas["total_keywords_final"] = len(keywords_finais)
-            
-            # Gerar relatório
-            relatorio = self._gerar_relatorio(keywords_finais, config_nicho)
-            
-            # Log de conclusão
-            self._log_conclusao(keywords_finais, relatorio)
-            
-            return keywords_finais, relatorio
+            self.ultimo_relatorio = self._gerar_relatorio(self.metricas["total_keywords_final"], config_nicho)
+            self._log_conclusao(self.metricas["total_keywords_final"], self.ultimo_relatorio)
             
         except Exception as e:
             self.metricas["erros_processamento"] += 1
@@ -206,14 +251,66 @@ class ProcessadorOrquestrador:
                 "timestamp": datetime.utcnow().isoformat(),
                 "event": "erro_processamento_orquestrado",
                 "status": "error",
-                "source": "ProcessadorOrquestrador.processar_keywords",
+                "source": "ProcessadorOrquestrador.processar_keywords_stream",
                 "tracing_id": self.tracing_id,
                 "details": {
                     "erro": str(e),
-                    "total_keywords": len(keywords)
+                    "chunks_processados": self.metricas["chunks_processados"],
+                    "total_keywords": self.metricas["total_keywords_inicial"]
                 }
             })
             raise
+
+    async def processar_keywords_async(
+        self,
+        keywords: Iterable[Keyword],
+        nicho: Optional[str] = None,
+        idioma: str = "pt",
+        callback_progresso: Optional[Callable[[str, int, int], None]] = None,
+        tamanho_chunk: Optional[int] = None
+    ) -> AsyncIterator[List[Keyword]]:
+        """
+        Versão async-iterator de processar_keywords_stream: cada chunk é
+        processado em thread, sem bloquear o event loop. O próximo chunk só é
+        processado quando o consumidor pede (backpressure).
+        """
+        stream = self.processar_keywords_stream(keywords, nicho, idioma, callback_progresso, tamanho_chunk)
+        fim = object()
+        while True:
+            chunk = await asyncio.to_thread(next, stream, fim)
+            if chunk is fim:
+                break
+            yield chunk
+
+    def _processar_chunk(self, chunk: List[Keyword], config_nicho: Dict[str, Any]) -> List[Keyword]:
+        """Executa as etapas de processamento sobre um chunk."""
+        self.metricas["tentativas_chunks"] += 1
+        etapas = [
+            ("analisador_semantico", lambda kws: self.analisador_semantico.processar(kws, config_nicho)),
+            ("calculador_scores", self.calculador_scores.processar),
+            ("validador_avancado", lambda kws: self.validador_avancado.processar(kws, config_nicho)),
+            ("aplicador_ml", self.aplicador_ml.processar),
+            ("auditor_final", self.auditor_final.processar),
+        ]
+        resultado = chunk
+        for nome, etapa in etapas:
+            inicio = time.time()
+            resultado = etapa(resultado)
+            tempos = self.metricas["tempo_por_processador"]
+            tempos[nome] = tempos.get(nome, 0.0) + (time.time() - inicio)
+        return resultado
+
+    def _resetar_metricas_execucao(self):
+        """Zera as métricas acumuladas por execução."""
+        self.metricas.update({
+            "tempo_inicio": None,
+            "tempo_fim": None,
+            "tempo_por_processador": {},
+            "total_keywords_inicial": 0,
+            "total_keywords_final": 0,
+            "chunks_processados": 0,
+            "tentativas_chunks": 0
+        })
     
     def _log_inicializacao(self):
         """Registra inicialização do orquestrador."""
@@ -237,7 +334,7 @@ class ProcessadorOrquestrador:
     
     def _gerar_relatorio(
         self, 
-        keywords: List[Keyword], 
+        total_final: int, 
         config: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Gera relatório completo do processamento."""
@@ -248,9 +345,11 @@ class ProcessadorOrquestrador:
                 "tempo_total": tempo_total,
                 "total_keywords_inicial": self.metricas["total_keywords_inicial"],
                 "total_keywords_final": self.metricas["total_keywords_final"],
-                "keywords_aprovadas": len(keywords),
-                "keywords_rejeitadas": self.metricas["total_keywords_inicial"] - len(keywords),
-                "erros_processamento": self.metricas["erros_processamento"]
+                "keywords_aprovadas": total_final,
+                "keywords_rejeitadas": self.metricas["total_keywords_inicial"] - total_final,
+                "erros_processamento": self.metricas["erros_processamento"],
+                "chunks_processados": self.metricas["chunks_processados"],
+                "tentativas_chunks": self.metricas["tentativas_chunks"]
             },
             "tempo_por_processador": self.metricas["tempo_por_processador"],
             "configuracao": config,
@@ -258,7 +357,7 @@ class ProcessadorOrquestrador:
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    def _log_conclusao(self, keywords: List[Keyword], relatorio: Dict[str, Any]):
+    def _log_conclusao(self, total_final: int, relatorio: Dict[str, Any]):
         """Registra conclusão do processamento."""
         logger.info({
             "timestamp": datetime.utcnow().isoformat(),
@@ -267,7 +366,7 @@ class ProcessadorOrquestrador:
             "source": "ProcessadorOrquestrador._log_conclusao",
             "tracing_id": self.tracing_id,
             "details": {
-                "keywords_processadas": len(keywords),
+                "keywords_processadas": total_final,
                 "tempo_total": relatorio["processamento"]["tempo_total"],
                 "erros": relatorio["processamento"]["erros_processamento"]
             }
@@ -11,11 +11,13 @@ Responsável: Sistema de Cauda Longa
 """
 
 import math
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from typing import Dict, List, Optional, Sequence, Tuple, NamedTuple
 from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
 from shared.logger import logger
+from infrastructure.processamento.score_vetorizado import ResultadoScoreLote
 
 
 class NivelCompetitividade(Enum):
@@ -481,6 +483,116 @@ class CalculadorScoreCompetitivo:
                 metadados={"erro": str(e)}
             )
     
+    def calcular_scores_lote(
+        self,
+        keywords: Sequence[str],
+        volumes: Sequence[int],
+        cpcs: Sequence[float],
+        concorrencias: Sequence[float]
+    ) -> ResultadoScoreLote:
+        """
+        Versão em lote de calcular_score: detecção de nicho uma vez por termo
+        distinto e normalização/score/classificação em arrays NumPy.
+
+        Args:
+            keywords: Keywords para análise
+            volumes: Volumes de busca
+            cpcs: CPCs
+            concorrencias: Concorrências
+
+        Returns:
+            ResultadoScoreLote com `scores`, `classificacoes` (NivelCompetitividade)
+            e componentes normalizados; justificativas montadas sob demanda
+        """
+        inicio_calculo = datetime.utcnow()
+        volumes = np.asarray(volumes, dtype=np.float64)
+        cpcs = np.asarray(cpcs, dtype=np.float64)
+        concorrencias = np.asarray(concorrencias, dtype=np.float64)
+
+        # Nicho por termo distinto; configurações como colunas indexadas pelo código do nicho
+        nichos_por_termo: Dict[str, int] = {}
+        nomes_nicho: List[str] = []
+        codigos_nicho = np.empty(len(keywords), dtype=np.int32)
+        for linha, keyword in enumerate(keywords):
+            codigo = nichos_por_termo.get(keyword)
+            if codigo is None:
+                nicho = self.detectar_nicho(keyword)
+                if nicho not in nomes_nicho:
+                    nomes_nicho.append(nicho)
+                codigo = nichos_por_termo[keyword] = nomes_nicho.index(nicho)
+            codigos_nicho[linha] = codigo
+        configuracoes = [self.obter_configuracao_nicho(nicho) for nicho in nomes_nicho]
+
+        def coluna(chave: str) -> np.ndarray:
+            return np.array([config[chave] for config in configuracoes], dtype=np.float64)[codigos_nicho]
+
+        # Normalizações (mesmas regras de normalizar_volume/cpc/concorrencia)
+        volume_norm = np.zeros(len(volumes))
+        positivos = volumes > 0
+        volume_norm[positivos] = np.minimum(
+            1.0, np.log(volumes[positivos] + 1) / np.log(coluna("max_volume")[positivos] + 1)
+        )
+        cpc_norm = np.where(cpcs > 0, np.minimum(1.0, cpcs / coluna("max_cpc")), 0.0)
+        concorrencia_norm = np.where(
+            concorrencias > 0, np.minimum(1.0, concorrencias / coluna("max_concorrencia")), 0.0
+        )
+        concorrencia_invertida = 1 - concorrencia_norm
+
+        scores = np.clip(
+            volume_norm * coluna("peso_volume") +
+            cpc_norm * coluna("peso_cpc") +
+            concorrencia_invertida * coluna("peso_concorrencia"),
+            0.0, 1.0
+        )
+        # Thresholds por linha: equivalente à cadeia de classificar_competitividade
+        codigos_nivel = (
+            (scores >= coluna("threshold_baixa")).astype(np.int8) +
+            (scores >= coluna("threshold_media")) +
+            (scores >= coluna("threshold_alta"))
+        )
+        classificacoes = np.asarray(list(NivelCompetitividade), dtype=object)[codigos_nivel]
+
+        def formatador(linha: int) -> str:
+            config = configuracoes[codigos_nicho[linha]]
+            return (
+                f"Score = {config['peso_volume']}*volume({volume_norm[linha]:.4f}) + "
+                f"{config['peso_cpc']}*cpc({cpc_norm[linha]:.4f}) + "
+                f"{config['peso_concorrencia']}*concorrencia_invertida({concorrencia_invertida[linha]:.4f}) "
+                f"= {scores[linha]:.4f} [{nomes_nicho[codigos_nicho[linha]]}]"
+            )
+
+        tempo_calculo = (datetime.utcnow() - inicio_calculo).total_seconds()
+        self.metricas["total_calculos"] += 1
+        self.metricas["total_keywords_processadas"] += len(keywords)
+        self.metricas["tempo_total_calculo"] += tempo_calculo
+        self.metricas["ultimo_calculo"] = datetime.utcnow().isoformat()
+
+        logger.info({
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": "calculo_score_competitivo_lote",
+            "status": "success",
+            "source": "CalculadorScoreCompetitivo.calcular_scores_lote",
+            "details": {
+                "total_keywords": len(keywords),
+                "termos_distintos": len(nichos_por_termo),
+                "nichos": nomes_nicho,
+                "tempo_calculo": tempo_calculo
+            }
+        })
+
+        return ResultadoScoreLote(
+            scores=scores,
+            classificacoes=classificacoes,
+            componentes={
+                "nicho": np.asarray(nomes_nicho, dtype=object)[codigos_nicho] if nomes_nicho else np.empty(0, dtype=object),
+                "volume_normalizado": volume_norm,
+                "cpc_normalizado": cpc_norm,
+                "concorrencia_normalizada": concorrencia_norm,
+                "concorrencia_invertida": concorrencia_invertida
+            },
+            _formatador=formatador
+        )
+
     def priorizar_keywords(self, keywords_scores: List[ScoreCompetitivo]) -> List[ScoreCompetitivo]:
         """
         Prioriza keywords baseado no score competitivo.
@@ -11,12 +11,16 @@ a qualidade de keywords de cauda longa de forma inteligente e adaptativa.
 
 import json
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 from dataclasses import dataclass
 from datetime import datetime
 import numpy as np
 from enum import Enum
 
+from infrastructure.processamento.score_vetorizado import (
+    ResultadoScoreLote, arredondar_como_python, classificar_por_faixas
+)
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -513,6 +517,142 @@ class ScoreCompostoInteligente:
             logger.error(f"[{self.tracing_id}] Erro no cálculo do score composto: {e}")
             raise
     
+    def calcular_scores_compostos_lote(
+        self,
+        keywords: Sequence[str],
+        volumes: Optional[Sequence[int]] = None,
+        cpcs: Optional[Sequence[float]] = None,
+        concorrencias: Optional[Sequence[float]] = None,
+        dados_tendencia: Optional[Dict[str, Any]] = None,
+        nicho: Optional[str] = None
+    ) -> ResultadoScoreLote:
+        """
+        Versão em lote de calcular_score_composto.
+
+        Componentes de texto (complexidade, especificidade) são calculados uma
+        vez por termo distinto; competitivo, tendência, score final,
+        classificação e confiança são calculados em arrays NumPy. Os valores
+        são idênticos aos do caminho escalar com os mesmos dados.
+
+        Args:
+            keywords: Keywords a serem analisadas
+            volumes, cpcs, concorrencias: Dados de mercado por keyword
+                (None usa os mesmos padrões de calcular_score_composto)
+            dados_tendencia: Dados de tendência; cada valor pode ser escalar
+                ou uma sequência com um valor por keyword
+            nicho: Nicho de mercado
+
+        Returns:
+            ResultadoScoreLote com scores, classificações, componentes e
+            confiança (em `componentes`); justificativas sob demanda
+        """
+        total = len(keywords)
+        logger.info(f"[{self.tracing_id}] Calculando score composto em lote para {total} keywords")
+
+        def coluna(valores, padrao) -> np.ndarray:
+            if valores is None:
+                return np.full(total, padrao, dtype=np.float64)
+            return np.broadcast_to(np.asarray(valores, dtype=np.float64), (total,))
+
+        # Componentes de texto: cache por termo distinto
+        componentes_texto: Dict[str, Tuple[float, float, bool]] = {}
+        complexidade = np.empty(total)
+        especificidade = np.empty(total)
+        # round() sobre np.float64 usa o arredondamento do NumPy; marca as linhas
+        # cujo score escalar seria np.float64 para arredondar do mesmo jeito
+        soma_numpy = np.zeros(total, dtype=bool)
+        for linha, keyword in enumerate(keywords):
+            valores = componentes_texto.get(keyword)
+            if valores is None:
+                valor_complexidade = self.calcular_score_complexidade(keyword).valor
+                valor_especificidade = self.calcular_score_especificidade(keyword, nicho).valor
+                valores = componentes_texto[keyword] = (
+                    valor_complexidade,
+                    valor_especificidade,
+                    isinstance(valor_complexidade, np.floating) or isinstance(valor_especificidade, np.floating)
+                )
+            complexidade[linha], especificidade[linha], soma_numpy[linha] = valores
+
+        # Competitivo (mesmas faixas de calcular_score_competitivo)
+        volume = coluna(volumes, 500)
+        cpc = coluna(cpcs, 2.5)
+        concorrencia = coluna(concorrencias, 0.6)
+        score_volume = np.select(
+            [volume == 0, (volume >= 100) & (volume <= 1000), volume < 100],
+            [0.0, 1.0, volume / 100],
+            np.maximum(0.5, 1.0 - (volume - 1000) / 10000)
+        )
+        score_cpc = np.select(
+            [cpc == 0, (cpc >= 1) & (cpc <= 5), cpc < 1],
+            [0.5, 1.0, 0.7],
+            np.maximum(0.3, 1.0 - (cpc - 5) / 10)
+        )
+        competitivo = score_volume * 0.4 + score_cpc * 0.4 + (1.0 - concorrencia) * 0.2
+
+        # Tendência
+        tendencia_padrao = {'crescimento_volume': 10, 'sazonalidade': 0.3, 'tendencia_mercado': 0.7, 'novidade': 0.6}
+        dados_tendencia = dados_tendencia or tendencia_padrao
+        crescimento = coluna(dados_tendencia.get('crescimento_volume', 0), 0)
+        sazonalidade = coluna(dados_tendencia.get('sazonalidade', 0.5), 0.5)
+        tendencia_mercado = coluna(dados_tendencia.get('tendencia_mercado', 0.5), 0.5)
+        novidade = coluna(dados_tendencia.get('novidade', 0.5), 0.5)
+        tendencia = (
+            np.minimum(1.0, np.maximum(0, crescimento / 100)) * 0.4 +
+            novidade * 0.3 +
+            tendencia_mercado * 0.2 +
+            sazonalidade * 0.1
+        )
+        # Os componentes escalares já saem arredondados: uma passada para os dois
+        competitivo, tendencia = arredondar_como_python(np.stack([competitivo, tendencia]), 3)
+
+        # Score final com os pesos do nicho (ou padrão)
+        pesos = self.config["pesos_por_nicho"].get(nicho, self.pesos_padrao) if nicho else self.pesos_padrao
+        score_bruto = (
+            complexidade * pesos["complexidade"] +
+            especificidade * pesos["especificidade"] +
+            competitivo * pesos["competitivo"] +
+            tendencia * pesos["tendencia"]
+        )
+        thresholds = self.classificacoes
+        classificacoes = classificar_por_faixas(
+            score_bruto,
+            [thresholds["regular"], thresholds["bom"], thresholds["muito_bom"], thresholds["excelente"]],
+            ["ruim", "regular", "bom", "muito_bom", "excelente"]
+        )
+
+        # Confiança: 1 - coeficiente de variação dos componentes (mínimo 0.1)
+        matriz = np.column_stack([complexidade, especificidade, competitivo, tendencia])
+        media = matriz.mean(axis=1)
+        desvio = matriz.std(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confianca = np.where(media == 0, 0.5, np.maximum(0.1, 1.0 - desvio / media))
+
+        scores = arredondar_como_python(score_bruto, 3, manter_numpy=soma_numpy)
+
+        def formatador(linha: int) -> str:
+            return (
+                f"Score = {pesos['complexidade']}*complexidade({complexidade[linha]}) + "
+                f"{pesos['especificidade']}*especificidade({especificidade[linha]}) + "
+                f"{pesos['competitivo']}*competitivo({competitivo[linha]}) + "
+                f"{pesos['tendencia']}*tendencia({tendencia[linha]}) = {scores[linha]} "
+                f"({classificacoes[linha]})"
+            )
+
+        logger.info(f"[{self.tracing_id}] Score composto em lote calculado: {total} keywords, "
+                    f"{len(componentes_texto)} termos distintos")
+        return ResultadoScoreLote(
+            scores=scores,
+            classificacoes=classificacoes,
+            componentes={
+                "complexidade": complexidade,
+                "especificidade": especificidade,
+                "competitivo": competitivo,
+                "tendencia": tendencia,
+                "confianca": np.round(confianca, 3)
+            },
+            _formatador=formatador
+        )
+
     def _classificar_score(self, score: float) -> str:
         """Classifica o score final em categorias de qualidade."""
         thresholds = self.classificacoes
@@ -0,0 +1,192 @@
+"""
+Motor de score vetorizado
+Tracing ID: SCORE_VETORIZADO_001
+
+Estruturas e utilitários compartilhados pelas versões em lote dos scorers
+(Keyword.calcular_score, CalculadorScoreCompetitivo, ScoreCompostoInteligente):
+scores e classificações são arrays NumPy calculados em uma única passada;
+justificativas textuais só são montadas quando solicitadas.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from domain.keyword_batch import calcular_scores_lote, justificativa_score
+from shared.logger import logger
+
+
+@dataclass
+class ResultadoScoreLote:
+    """
+    Resultado de um cálculo de score em lote.
+
+    `classificacoes` é um array de rótulos (dtype object); `componentes`
+    guarda arrays auxiliares (ex.: fatores normalizados) por nome.
+    """
+    scores: np.ndarray
+    classificacoes: Optional[np.ndarray] = None
+    componentes: Dict[str, np.ndarray] = field(default_factory=dict)
+    _formatador: Optional[Callable[[int], str]] = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def justificativa(self, indice: int) -> str:
+        """Monta a justificativa de uma única linha sob demanda."""
+        if self._formatador is None:
+            return ""
+        return self._formatador(indice)
+
+    def justificativas(self, indices: Optional[Sequence[int]] = None) -> List[str]:
+        linhas = range(len(self)) if indices is None else indices
+        return [self.justificativa(linha) for linha in linhas]
+
+
+def classificar_por_faixas(
+    scores: np.ndarray,
+    limites: Sequence[float],
+    rotulos: Sequence[str]
+) -> np.ndarray:
+    """
+    Classifica scores em faixas crescentes.
+
+    `limites` tem len(rotulos) - 1 valores crescentes e o score cai na faixa i
+    quando limites[i-1] <= score < limites[i] — equivalente às cadeias
+    `if score >= limite` / `elif ...` usadas nos scorers escalares.
+    """
+    if len(limites) != len(rotulos) - 1:
+        raise ValueError("limites deve ter um elemento a menos que rotulos")
+    # searchsorted(side="right") conta quantos limites são <= score
+    codigos = np.searchsorted(np.asarray(limites, dtype=np.float64), scores, side="right")
+    return np.asarray(rotulos, dtype=object)[codigos]
+
+
+def calcular_scores_keywords(
+    volume_busca: np.ndarray,
+    cpc: np.ndarray,
+    concorrencia: np.ndarray,
+    intencao: np.ndarray,
+    weights: Dict[str, float],
+    limites_classificacao: Optional[Sequence[float]] = None,
+    rotulos_classificacao: Optional[Sequence[str]] = None
+) -> ResultadoScoreLote:
+    """
+    Score de Keyword.calcular_score em lote, com classificação opcional por faixas.
+
+    Args:
+        volume_busca, cpc, concorrencia: arrays numéricos
+        intencao: códigos inteiros (domain.keyword_batch.CODIGO_INTENCAO)
+        weights: mesmo dicionário de pesos aceito por Keyword.calcular_score
+        limites_classificacao / rotulos_classificacao: faixas para classificar os scores
+    """
+    scores = calcular_scores_lote(volume_busca, cpc, concorrencia, intencao, weights)
+    classificacoes = None
+    if limites_classificacao is not None and rotulos_classificacao is not None:
+        classificacoes = classificar_por_faixas(scores, limites_classificacao, rotulos_classificacao)
+
+    def formatador(linha: int) -> str:
+        return justificativa_score(
+            int(volume_busca[linha]), float(cpc[linha]), float(concorrencia[linha]),
+            int(intencao[linha]), float(scores[linha]), weights
+        )
+
+    return ResultadoScoreLote(scores=scores, classificacoes=classificacoes, _formatador=formatador)
+
+
+def _dividir(valores: np.ndarray):
+    """Divisão de Veltkamp: valores = alto + baixo, cada parte com até 26 bits de mantissa."""
+    c = 134217729.0 * valores  # 2**27 + 1
+    alto = c - (c - valores)
+    return alto, valores - alto
+
+
+def _erro_produto(a: np.ndarray, b: float, produto: np.ndarray) -> np.ndarray:
+    """Erro exato de produto = fl(a * b) (TwoProduct de Dekker): a * b == produto + erro."""
+    a_alto, a_baixo = _dividir(a)
+    b_alto, b_baixo = _dividir(np.float64(b))
+    return ((a_alto * b_alto - produto) + a_alto * b_baixo + a_baixo * b_alto) + a_baixo * b_baixo
+
+
+def arredondar_como_python(
+    valores: np.ndarray,
+    casas: int,
+    manter_numpy: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Arredonda como round() do Python (meio para o par, sobre o valor decimal
+    exato) numa passada vetorizada.
+
+    np.round calcula rint(valor * 10**casas) / 10**casas. O produto só leva
+    ao inteiro errado quando cai exatamente num meio (k + 0.5) e o valor
+    exato está um pouco acima ou abaixo dele; essas linhas são corrigidas
+    pelo sinal do erro do produto. Linhas em `manter_numpy` ficam com o
+    resultado de np.round (o round() escalar sobre np.float64 usa o NumPy).
+    """
+    if not 0 <= casas <= 22:
+        raise ValueError("casas deve estar entre 0 e 22 (10**casas exato em float64)")
+    valores = np.asarray(valores, dtype=np.float64)
+    escala = 10.0 ** casas
+    with np.errstate(invalid="ignore", over="ignore"):
+        produto = valores * escala
+        inteiros = np.rint(produto)
+        fracao = produto - inteiros
+        erro = _erro_produto(valores, escala, produto)
+    sentido = np.sign(fracao)
+    corrigir = (np.abs(fracao) == 0.5) & (np.sign(erro) == sentido)
+    # Valores com mais dígitos inteiros que a mantissa comporta já estão arredondados
+    inalterados = ~(np.abs(produto) < 2.0 ** 52)
+    if manter_numpy is not None:
+        corrigir &= ~manter_numpy
+        inalterados &= ~manter_numpy
+    resultado = np.where(corrigir, inteiros + sentido, inteiros) / escala
+    return np.where(inalterados, valores, resultado)
+
+
+def benchmark_scores(total: int = 1_000_000, seed: int = 42) -> Dict[str, float]:
+    """
+    Compara o caminho escalar (Keyword.calcular_score) com o vetorizado.
+    O escalar é medido numa amostra e extrapolado para `total`.
+    """
+    from domain.keyword_batch import INTENCOES
+    from domain.models import Keyword
+
+    rng = np.random.default_rng(seed)
+    volume = rng.integers(0, 100000, total)
+    cpc = rng.random(total) * 10
+    concorrencia = rng.random(total)
+    intencao = rng.integers(0, len(INTENCOES), total).astype(np.int8)
+    weights = {"volume": 0.4, "cpc": 0.3, "intencao": 0.2, "concorrencia": 0.1}
+
+    inicio = time.perf_counter()
+    resultado = calcular_scores_keywords(volume, cpc, concorrencia, intencao, weights)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    amostra = min(total, 10000)
+    keywords = [
+        Keyword(termo=f"kw {linha}", volume_busca=int(volume[linha]), cpc=float(cpc[linha]),
+                concorrencia=float(concorrencia[linha]), intencao=INTENCOES[intencao[linha]])
+        for linha in range(amostra)
+    ]
+    inicio = time.perf_counter()
+    escalares = [kw.calcular_score(weights) for kw in keywords]
+    tempo_escalar = (time.perf_counter() - inicio) * total / amostra
+
+    relatorio = {
+        "total": total,
+        "tempo_vetorizado": round(tempo_vetorizado, 4),
+        "tempo_escalar_estimado": round(tempo_escalar, 4),
+        "speedup": round(tempo_escalar / tempo_vetorizado, 1) if tempo_vetorizado else float("inf"),
+        "identico": bool(np.array_equal(resultado.scores[:amostra], np.asarray(escalares)))
+    }
+    logger.info({
+        "timestamp": datetime.utcnow().isoformat(),
+        "event": "benchmark_score_vetorizado",
+        "status": "success",
+        "source": "score_vetorizado.benchmark_scores",
+        "details": relatorio
+    })
+    return relatorio
@@ -46,6 +46,7 @@ from .placeholder_unification_system_imp001 import (
     PlaceholderType,
     PlaceholderUnificationSystem
 )
+from .template_compilado import obter_template_compilado
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -230,49 +231,24 @@ class SemanticAnalyzer:
         start_time = time.time()
         
         try:
-            # Extrair texto ao redor da lacuna
+            # Janela ao redor da lacuna; a análise de cada janela é calculada
+            # uma vez por template (cache pelo hash do conteúdo)
             start = max(0, gap_position - self.context_window_size)
             end = min(len(text), gap_position + self.context_window_size)
-            surrounding_text = text[start:end]
-            
-            # Detectar tópico
-            topic = self._detect_topic(surrounding_text)
-            
-            # Detectar intenção
-            intent = self._detect_intent(surrounding_text)
-            
-            # Detectar entidades
-            entities = self._detect_entities(surrounding_text)
-            
-            # Analisar sentimento
-            sentiment = self._analyze_sentiment(surrounding_text)
-            
-            # Extrair palavras-chave
-            keywords = self._extract_keywords(surrounding_text)
-            
-            # Detectar tipo de conteúdo
-            content_type = self._detect_content_type(surrounding_text)
-            
-            # Detectar audiência
-            target_audience = self._detect_target_audience(surrounding_text)
-            
-            # Detectar tom
-            tone = self._detect_tone(surrounding_text)
-            
-            # Detectar complexidade
-            complexity_level = self._detect_complexity(surrounding_text)
+            template = obter_template_compilado(text)
+            analise = template.memo((type(self), "janela", start, end), lambda: self._analyze_window(text[start:end]))
             
             context = SemanticContext(
-                surrounding_text=surrounding_text,
-                topic=topic,
-                intent=intent,
-                entities=entities,
-                sentiment=sentiment,
-                keywords=keywords,
-                content_type=content_type,
-                target_audience=target_audience,
-                tone=tone,
-                complexity_level=complexity_level,
+                surrounding_text=analise["surrounding_text"],
+                topic=analise["topic"],
+                intent=analise["intent"],
+                entities=list(analise["entities"]),
+                sentiment=analise["sentiment"],
+                keywords=list(analise["keywords"]),
+                content_type=analise["content_type"],
+                target_audience=analise["target_audience"],
+                tone=analise["tone"],
+                complexity_level=analise["complexity_level"],
                 metadata={
                     "context_window_size": self.context_window_size,
                     "analysis_time": time.time() - start_time
@@ -303,6 +279,21 @@ class SemanticAnalyzer:
                 complexity_level="médio"
             )
     
+    def _analyze_window(self, surrounding_text: str) -> Dict[str, Any]:
+        """Análise semântica de uma janela de texto."""
+        return {
+            "surrounding_text": surrounding_text,
+            "topic": self._detect_topic(surrounding_text),
+            "intent": self._detect_intent(surrounding_text),
+            "entities": self._detect_entities(surrounding_text),
+            "sentiment": self._analyze_sentiment(surrounding_text),
+            "keywords": self._extract_keywords(surrounding_text),
+            "content_type": self._detect_content_type(surrounding_text),
+            "target_audience": self._detect_target_audience(surrounding_text),
+            "tone": self._detect_tone(surrounding_text),
+            "complexity_level": self._detect_complexity(surrounding_text)
+        }
+    
     def _detect_topic(self, text: str) -> str:
         """Detecta o tópico principal do texto."""
         text_lower = text.lower()
@@ -26,15 +26,18 @@ from typing import Dict, List, Any, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import statistics
 
+import numpy as np
+from scipy import sparse
+
+from infrastructure.ml.kernels_similaridade import cosseno_muitos_para_muitos
+
 # Importar dependências NLP
 try:
     import spacy
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
     NLP_AVAILABLE = True
 except ImportError:
     NLP_AVAILABLE = False
@@ -106,6 +109,11 @@ class SemanticMatcher:
         self.max_candidates = 10
         self.context_window_size = 200
         
+        # Matching em lote: cache de features por texto e tamanho do bloco de vocabulário
+        self.feature_cache_size = 10000
+        self.batch_block_size = 256
+        self._text_features: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
         # Filtros de matching
         self.matching_filters = self._create_matching_filters()
         
@@ -124,7 +132,10 @@ class SemanticMatcher:
             "avg_similarity_score": 0.0,
             "similarity_scores": deque(maxlen=1000),
             "cache_hits": 0,
-            "cache_misses": 0
+            "cache_misses": 0,
+            "feature_cache_hits": 0,
+            "feature_cache_misses": 0,
+            "batch_pairs_scored": 0
         }
         
         logger.info("SemanticMatcher inicializado")
@@ -207,10 +218,10 @@ class SemanticMatcher:
                     warnings=[]
                 )
             
-            # 1. Aplicar filtros iniciais
-            filtered_candidates = self._apply_initial_filters(gap, candidates)
+            # 1-4. Filtros, scores vetorizados e ordenação (lote de uma lacuna)
+            matches = self._score_batch([gap], candidates)[0]
             
-            if not filtered_candidates:
+            if not matches:
                 return MatchingResult(
                     best_match=None,
                     all_matches=[],
@@ -221,48 +232,7 @@ class SemanticMatcher:
                     warnings=[]
                 )
             
-            # 2. Calcular scores de similaridade
-            matches = []
-            
-            for candidate in filtered_candidates:
-                # Matching semântico
-                semantic_score = self._calculate_semantic_similarity(gap, candidate)
-                
-                # Matching contextual
-                contextual_score = self._calculate_contextual_similarity(gap, candidate)
-                
-                # Matching por keywords
-                keyword_score = self._calculate_keyword_similarity(gap, candidate)
-                
-                # Score híbrido
-                hybrid_score = self._calculate_hybrid_score(semantic_score, contextual_score, keyword_score)
-                
-                # Determinar estratégia usada
-                strategy = self._determine_strategy(semantic_score, contextual_score, keyword_score)
-                
-                # Calcular confiança
-                confidence = self._calculate_confidence(hybrid_score, strategy)
-                
-                match = MatchResult(
-                    candidate=candidate,
-                    similarity_score=hybrid_score,
-                    confidence=confidence,
-                    strategy_used=strategy,
-                    metadata={
-                        "semantic_score": semantic_score,
-                        "contextual_score": contextual_score,
-                        "keyword_score": keyword_score,
-                        "passed_filters": True
-                    }
-                )
-                
-                matches.append(match)
-            
-            # 3. Ordenar por score
-            matches.sort(key=lambda x: x.similarity_score, reverse=True)
-            
-            # 4. Selecionar melhor match
-            best_match = matches[0] if matches and matches[0].similarity_score >= self.similarity_threshold else None
+            best_match = matches[0] if matches[0].similarity_score >= self.similarity_threshold else None
             
             # 5. Criar resultado
             matching_time = time.time() - start_time
@@ -309,6 +279,388 @@ class SemanticMatcher:
                 warnings=[]
             )
     
+    def find_best_matches(
+        self,
+        gaps: List[DetectedGap],
+        candidates: List[str],
+        top_k: Optional[int] = None
+    ) -> List[MatchingResult]:
+        """
+        Matching em lote: pontua a matriz lacunas × candidatos de uma vez.
+        
+        Contextos e candidatos são codificados uma única vez, as features de
+        cada candidato vêm do cache por texto e os scores (filtros, semântico,
+        contextual e por keywords) são calculados de forma vetorizada. Os
+        scores são os mesmos de find_best_match, lacuna a lacuna.
+        
+        Args:
+            gaps: Lacunas detectadas
+            candidates: Candidatos compartilhados por todas as lacunas
+            top_k: Se informado, mantém apenas os k melhores matches por lacuna
+            
+        Returns:
+            Um MatchingResult por lacuna, na ordem de entrada
+        """
+        start_time = time.time()
+        if not gaps:
+            return []
+        if not candidates:
+            return [
+                MatchingResult(
+                    best_match=None,
+                    all_matches=[],
+                    total_candidates=0,
+                    matching_time=0.0,
+                    success=False,
+                    errors=["Nenhum candidato fornecido"],
+                    warnings=[]
+                )
+                for _ in gaps
+            ]
+        
+        try:
+            matches_por_gap = self._score_batch(gaps, candidates, top_k)
+        except Exception as e:
+            error_msg = f"Erro no matching semântico em lote: {str(e)}"
+            logger.error(error_msg)
+            return [
+                MatchingResult(
+                    best_match=None,
+                    all_matches=[],
+                    total_candidates=len(candidates),
+                    matching_time=time.time() - start_time,
+                    success=False,
+                    errors=[error_msg],
+                    warnings=[]
+                )
+                for _ in gaps
+            ]
+        
+        tempo_por_gap = (time.time() - start_time) / len(gaps)
+        results = []
+        for gap, matches in zip(gaps, matches_por_gap):
+            if not matches:
+                result = MatchingResult(
+                    best_match=None,
+                    all_matches=[],
+                    total_candidates=len(candidates),
+                    matching_time=tempo_por_gap,
+                    success=False,
+                    errors=["Nenhum candidato passou pelos filtros iniciais"],
+                    warnings=[]
+                )
+            else:
+                best_match = matches[0] if matches[0].similarity_score >= self.similarity_threshold else None
+                result = MatchingResult(
+                    best_match=best_match,
+                    all_matches=matches,
+                    total_candidates=len(candidates),
+                    matching_time=tempo_por_gap,
+                    success=best_match is not None,
+                    errors=[],
+                    warnings=[],
+                    metadata={
+                        "gap_type": gap.placeholder_type.value,
+                        "candidates_analyzed": len(matches),
+                        "similarity_threshold": self.similarity_threshold,
+                        "best_score": best_match.similarity_score if best_match else 0.0,
+                        "top_k": top_k
+                    }
+                )
+            self._update_metrics(result)
+            results.append(result)
+        
+        logger.info(
+            f"Matching em lote concluído: {len(gaps)} lacunas x {len(candidates)} candidatos "
+            f"em {time.time() - start_time:.3f}s"
+        )
+        return results
+    
+    def _get_text_features(self, text: str) -> Dict[str, Any]:
+        """Features de um texto (keywords, pesos, filtro de qualidade), com cache LRU."""
+        features = self._text_features.get(text)
+        if features is not None:
+            self._text_features.move_to_end(text)
+            self.metrics["feature_cache_hits"] += 1
+            return features
+        
+        self.metrics["feature_cache_misses"] += 1
+        features = {
+            "keywords": set(self._extract_keywords(text)),
+            "important_keywords": self._extract_important_keywords(text),
+            "passes_quality": self._passes_quality_filter(text),
+            "length": len(text)
+        }
+        self._text_features[text] = features
+        if len(self._text_features) > self.feature_cache_size:
+            self._text_features.popitem(last=False)
+        return features
+    
+    def _score_batch(
+        self,
+        gaps: List[DetectedGap],
+        candidates: List[str],
+        top_k: Optional[int] = None
+    ) -> List[List[MatchResult]]:
+        """Calcula os matches ordenados de cada lacuna sobre a matriz lacunas × candidatos."""
+        # Candidatos distintos e não vazios (o resultado é remapeado para a lista original)
+        distinct: Dict[str, int] = {}
+        column_of_position = []
+        for candidate in candidates:
+            if candidate and candidate.strip():
+                column_of_position.append(distinct.setdefault(candidate, len(distinct)))
+        if not column_of_position:
+            return [[] for _ in gaps]
+        
+        unique_candidates = list(distinct)
+        candidate_features = [self._get_text_features(candidate) for candidate in unique_candidates]
+        contexts = [gap.context or "" for gap in gaps]
+        context_features = [self._get_text_features(context) if context else None for context in contexts]
+        has_context = np.array([bool(context) for context in contexts])
+        
+        contextual = self._batch_jaccard(context_features, candidate_features)
+        keyword = self._batch_keyword_similarity(context_features, candidate_features)
+        semantic = self._batch_semantic_similarity(contexts, unique_candidates)
+        
+        # Filtros iniciais como máscara lacunas × candidatos
+        passes = np.ones(contextual.shape, dtype=bool)
+        candidate_lengths = np.array([f["length"] for f in candidate_features], dtype=np.float64)
+        if self.matching_filters["length_filter"]["enabled"]:
+            context_lengths = np.array([len(context) for context in contexts], dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = candidate_lengths[None, :] / context_lengths[:, None]
+            in_range = (
+                (self.matching_filters["length_filter"]["min_ratio"] <= ratio) &
+                (ratio <= self.matching_filters["length_filter"]["max_ratio"])
+            )
+            passes &= in_range | (context_lengths == 0)[:, None]
+        if self.matching_filters["keyword_filter"]["enabled"]:
+            # Sem keywords em um dos lados, _batch_jaccard devolve o neutro 0.5 e o filtro deixa passar
+            overlap_ok = contextual >= self.matching_filters["keyword_filter"]["min_keyword_match"]
+            passes &= overlap_ok | self._neutral_mask(context_features, candidate_features)
+        if self.matching_filters["domain_filter"]["enabled"]:
+            passes &= np.array([
+                [self._passes_domain_filter(gap, candidate) for candidate in unique_candidates]
+                for gap in gaps
+            ], dtype=bool).reshape(passes.shape)
+        if self.matching_filters["quality_filter"]["enabled"]:
+            passes &= np.array([f["passes_quality"] for f in candidate_features], dtype=bool)[None, :]
+        
+        # Sem contexto os três scores são neutros
+        contextual[~has_context] = 0.5
+        keyword[~has_context] = 0.5
+        semantic[~has_context] = 0.5
+        
+        hybrid = np.clip(semantic * 0.4 + contextual * 0.35 + keyword * 0.25, 0.0, 1.0)
+        strategy_index = np.select(
+            [
+                semantic > 0.8,
+                contextual > 0.7,
+                keyword > 0.6,
+                np.maximum(np.maximum(semantic, contextual), keyword) > 0.5
+            ],
+            [0, 1, 2, 3],
+            default=4
+        )
+        strategies = [
+            MatchingStrategy.SEMANTIC_SIMILARITY,
+            MatchingStrategy.CONTEXTUAL_MATCHING,
+            MatchingStrategy.KEYWORD_MATCHING,
+            MatchingStrategy.HYBRID_MATCHING,
+            MatchingStrategy.FALLBACK_MATCHING
+        ]
+        
+        column_of_position = np.array(column_of_position, dtype=np.int64)
+        
+        results = []
+        for row in range(len(gaps)):
+            # Colunas na ordem original dos candidatos (duplicatas incluídas)
+            columns = column_of_position[passes[row, column_of_position]]
+            if columns.size == 0:
+                results.append([])
+                continue
+            scores = hybrid[row, columns]
+            order = np.argsort(-scores, kind="stable")
+            if top_k is not None:
+                order = order[:top_k]
+            matches = []
+            for column in columns[order]:
+                strategy = strategies[strategy_index[row, column]]
+                hybrid_score = float(hybrid[row, column])
+                matches.append(MatchResult(
+                    candidate=unique_candidates[column],
+                    similarity_score=hybrid_score,
+                    confidence=self._calculate_confidence(hybrid_score, strategy),
+                    strategy_used=strategy,
+                    metadata={
+                        "semantic_score": float(semantic[row, column]),
+                        "contextual_score": float(contextual[row, column]),
+                        "keyword_score": float(keyword[row, column]),
+                        "passed_filters": True
+                    }
+                ))
+            results.append(matches)
+        
+        self.metrics["batch_pairs_scored"] += int(hybrid.size)
+        return results
+    
+    @staticmethod
+    def _neutral_mask(context_features: List[Optional[Dict[str, Any]]], candidate_features: List[Dict[str, Any]]) -> np.ndarray:
+        """Pares em que um dos lados não tem keywords (score neutro)."""
+        context_empty = np.array([not f or not f["keywords"] for f in context_features], dtype=bool)
+        candidate_empty = np.array([not f["keywords"] for f in candidate_features], dtype=bool)
+        return context_empty[:, None] | candidate_empty[None, :]
+    
+    def _batch_jaccard(
+        self,
+        context_features: List[Optional[Dict[str, Any]]],
+        candidate_features: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """Jaccard entre conjuntos de keywords (contexto × candidato); neutro 0.5 sem keywords."""
+        vocabulary: Dict[str, int] = {}
+        context_sets = [f["keywords"] if f else set() for f in context_features]
+        candidate_sets = [f["keywords"] for f in candidate_features]
+        context_matrix = self._incidence_matrix(context_sets, vocabulary)
+        candidate_matrix = self._incidence_matrix(candidate_sets, vocabulary)
+        context_matrix.resize((context_matrix.shape[0], len(vocabulary)))
+        candidate_matrix.resize((candidate_matrix.shape[0], len(vocabulary)))
+        
+        intersection = (context_matrix @ candidate_matrix.T).toarray()
+        context_sizes = np.array([len(k) for k in context_sets], dtype=np.float64)
+        candidate_sizes = np.array([len(k) for k in candidate_sets], dtype=np.float64)
+        union = context_sizes[:, None] + candidate_sizes[None, :] - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jaccard = intersection / union
+        jaccard[self._neutral_mask(context_features, candidate_features)] = 0.5
+        return jaccard
+    
+    @staticmethod
+    def _incidence_matrix(sets: List[Set[str]], vocabulary: Dict[str, int]) -> "sparse.csr_matrix":
+        rows, columns = [], []
+        for row, keywords in enumerate(sets):
+            for keyword in keywords:
+                rows.append(row)
+                columns.append(vocabulary.setdefault(keyword, len(vocabulary)))
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, columns)),
+            shape=(len(sets), max(len(vocabulary), 1))
+        )
+    
+    def _batch_keyword_similarity(
+        self,
+        context_features: List[Optional[Dict[str, Any]]],
+        candidate_features: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        Similaridade ponderada por keywords (contexto × candidato).
+        
+        Σ sim(kc, kk)·wc·wk / Σ wc·wk vira Wc · S · Wkᵀ / (Σwc ⊗ Σwk), com S a
+        similaridade entre os vocabulários distintos, calculada em blocos.
+        """
+        context_vocab: Dict[str, int] = {}
+        candidate_vocab: Dict[str, int] = {}
+        context_weights = self._weight_matrix(
+            [f["important_keywords"] if f else {} for f in context_features], context_vocab
+        )
+        candidate_weights = self._weight_matrix(
+            [f["important_keywords"] for f in candidate_features], candidate_vocab
+        )
+        
+        numerator = np.zeros((len(context_features), len(candidate_features)))
+        if context_vocab and candidate_vocab:
+            context_words = list(context_vocab)
+            candidate_words = list(candidate_vocab)
+            for start in range(0, len(context_words), self.batch_block_size):
+                block = self._keyword_similarity_matrix(
+                    context_words[start:start + self.batch_block_size], candidate_words
+                )
+                partial = context_weights[:, start:start + self.batch_block_size] @ block
+                numerator += candidate_weights.dot(partial.T).T
+        
+        context_totals = np.asarray(context_weights.sum(axis=1)).ravel()
+        candidate_totals = np.asarray(candidate_weights.sum(axis=1)).ravel()
+        total_weight = context_totals[:, None] * candidate_totals[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = numerator / total_weight
+        similarity[total_weight == 0] = 0.5
+        return similarity
+    
+    @staticmethod
+    def _weight_matrix(weights: List[Dict[str, float]], vocabulary: Dict[str, int]) -> "sparse.csr_matrix":
+        rows, columns, values = [], [], []
+        for row, keyword_weights in enumerate(weights):
+            for keyword, weight in keyword_weights.items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(keyword, len(vocabulary)))
+                values.append(weight)
+        return sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), (rows, columns)),
+            shape=(len(weights), max(len(vocabulary), 1))
+        )
+    
+    @staticmethod
+    def _keyword_similarity_matrix(words_a: List[str], words_b: List[str]) -> np.ndarray:
+        """Versão vetorizada de _calculate_keyword_similarity_score para dois vocabulários."""
+        width = max(max(map(len, words_a)), max(map(len, words_b)))
+        
+        def encode(words):
+            codes = np.zeros((len(words), width), dtype=np.int32)
+            for row, word in enumerate(words):
+                codes[row, :len(word)] = [ord(char) for char in word]
+            return codes, np.array([len(word) for word in words], dtype=np.int64)
+        
+        codes_a, lengths_a = encode(words_a)
+        codes_b, lengths_b = encode(words_b)
+        shorter = np.minimum(lengths_a[:, None], lengths_b[None, :])
+        longer = np.maximum(lengths_a[:, None], lengths_b[None, :])
+        
+        # Prefixo comum: posições iguais consecutivas desde o início
+        common_prefix = np.zeros(shorter.shape, dtype=np.int64)
+        still_equal = np.ones(shorter.shape, dtype=bool)
+        for position in range(width):
+            still_equal &= codes_a[:, position][:, None] == codes_b[:, position][None, :]
+            common_prefix += still_equal
+        is_prefix = common_prefix >= shorter
+        
+        # Jaccard de caracteres
+        alphabet: Dict[str, int] = {}
+        indices_a = [[alphabet.setdefault(char, len(alphabet)) for char in set(word)] for word in words_a]
+        indices_b = [[alphabet.setdefault(char, len(alphabet)) for char in set(word)] for word in words_b]
+        chars_a = np.zeros((len(words_a), len(alphabet)))
+        chars_b = np.zeros((len(words_b), len(alphabet)))
+        for row, indices in enumerate(indices_a):
+            chars_a[row, indices] = 1.0
+        for row, indices in enumerate(indices_b):
+            chars_b[row, indices] = 1.0
+        common_chars = chars_a @ chars_b.T
+        total_chars = chars_a.sum(axis=1)[:, None] + chars_b.sum(axis=1)[None, :] - common_chars
+        
+        length_similarity = 1.0 - (np.abs(lengths_a[:, None] - lengths_b[None, :]) / longer)
+        char_similarity = common_chars / total_chars
+        combined = np.clip((length_similarity + char_similarity) / 2.0, 0.0, 1.0)
+        return np.where(is_prefix, np.where(lengths_a[:, None] == lengths_b[None, :], 1.0, 0.8), combined)
+    
+    def _batch_semantic_similarity(self, contexts: List[str], candidates: List[str]) -> np.ndarray:
+        """Cosseno entre embeddings de contextos e candidatos, cada texto codificado uma vez."""
+        neutral = np.full((len(contexts), len(candidates)), 0.5)
+        if not self.embedding_model:
+            return neutral
+        try:
+            unique_contexts = list(dict.fromkeys(context for context in contexts if context))
+            if not unique_contexts:
+                return neutral
+            context_embeddings = np.asarray(self.embedding_model.encode(unique_contexts))
+            candidate_embeddings = np.asarray(self.embedding_model.encode(candidates))
+            similarity = cosseno_muitos_para_muitos(context_embeddings, candidate_embeddings).astype(np.float64)
+            row_of_context = {context: row for row, context in enumerate(unique_contexts)}
+            for row, context in enumerate(contexts):
+                if context:
+                    neutral[row] = similarity[row_of_context[context]]
+            return neutral
+        except Exception as e:
+            logger.warning(f"Erro no cálculo de similaridade semântica em lote: {e}")
+            return np.full((len(contexts), len(candidates)), 0.5)
+    
     def _apply_initial_filters(self, gap: DetectedGap, candidates: List[str]) -> List[str]:
         """Aplica filtros iniciais aos candidatos."""
         filtered_candidates = []
@@ -417,8 +769,10 @@ class SemanticMatcher:
             context_embedding = self.embedding_model.encode([gap.context])
             candidate_embedding = self.embedding_model.encode([candidate])
             
-            # Calcular similaridade cosseno
-            similarity = cosine_similarity(context_embedding, candidate_embedding)[0][0]
+            # Mesmo kernel do caminho em lote, para os dois darem o mesmo score
+            similarity = cosseno_muitos_para_muitos(
+                np.asarray(context_embedding), np.asarray(candidate_embedding), registrar_log=False
+            )[0][0]
             
             return float(similarity)
             
@@ -667,6 +1021,8 @@ class SemanticMatcher:
             "avg_similarity_score": self.metrics["avg_similarity_score"],
             "strategy_usage": dict(self.metrics["strategy_usage"]),
             "cache_hit_rate": self.metrics["cache_hits"] / (self.metrics["cache_hits"] + self.metrics["cache_misses"]) if (self.metrics["cache_hits"] + self.metrics["cache_misses"]) > 0 else 0.0,
+            "feature_cache_hit_rate": self.metrics["feature_cache_hits"] / (self.metrics["feature_cache_hits"] + self.metrics["feature_cache_misses"]) if (self.metrics["feature_cache_hits"] + self.metrics["feature_cache_misses"]) > 0 else 0.0,
+            "batch_pairs_scored": self.metrics["batch_pairs_scored"],
             "nlp_available": self.nlp_model is not None,
             "embedding_available": self.embedding_model is not None
         }
@@ -679,6 +1035,12 @@ def find_best_match(gap: DetectedGap, candidates: List[str]) -> MatchingResult:
     return matcher.find_best_match(gap, candidates)
 
 
+def find_best_matches(gaps: List[DetectedGap], candidates: List[str], top_k: Optional[int] = None) -> List[MatchingResult]:
+    """Encontra as melhores correspondências para várias lacunas de uma vez."""
+    matcher = SemanticMatcher()
+    return matcher.find_best_matches(gaps, candidates, top_k)
+
+
 def get_semantic_matching_stats() -> Dict[str, Any]:
     """Obtém estatísticas de matching semântico."""
     matcher = SemanticMatcher()
@@ -24,6 +24,8 @@ import statistics
 import threading
 from datetime import datetime, timedelta
 
+from .template_compilado import obter_template_compilado
+
 # Dependências opcionais
 try:
     import spacy
@@ -126,28 +128,33 @@ class RegexLacunaDetector:
         }
     
     def detect_gaps(self, text: str) -> List[DetectedGap]:
-        """Detecta lacunas usando regex."""
+        """Detecta lacunas usando regex (sobre o template compilado, em cache por conteúdo)."""
         detected_gaps = []
         
-        for placeholder_type, pattern in self.compiled_patterns.items():
-            matches = pattern.finditer(text)
+        for lacuna in obter_template_compilado(text).lacunas(self.compiled_patterns):
+            gap = DetectedGap(
+                placeholder_type=lacuna.placeholder_type,
+                placeholder_name=lacuna.placeholder_name,
+                start_pos=lacuna.start_pos,
+                end_pos=lacuna.end_pos,
+                context=self._extract_context(text, lacuna.start_pos, lacuna.end_pos),
+                confidence=0.95,  # Alta confiança para regex
+                detection_method=DetectionMethod.REGEX,
+                validation_level=ValidationLevel.BASIC
+            )
             
-            for match in matches:
-                gap = DetectedGap(
-                    placeholder_type=placeholder_type,
-                    placeholder_name=match.group(1) if placeholder_type == PlaceholderType.CUSTOM else placeholder_type.value,
-                    start_pos=match.start(),
-                    end_pos=match.end(),
-                    context=self._extract_context(text, match.start(), match.end()),
-                    confidence=0.95,  # Alta confiança para regex
-                    detection_method=DetectionMethod.REGEX,
-                    validation_level=ValidationLevel.BASIC
-                )
-                
-                detected_gaps.append(gap)
+            detected_gaps.append(gap)
         
         return detected_gaps
     
+    def fill_gaps(self, text: str, values: Dict[str, str]) -> str:
+        """
+        Preenche as lacunas com os valores (por nome do placeholder), usando
+        os segmentos pré-calculados do template compilado; placeholders sem
+        valor são mantidos.
+        """
+        return obter_template_compilado(text).preencher(self.compiled_patterns, values)
+    
     def _extract_context(self, text: str, start: int, end: int, context_size: int = 50) -> str:
         """Extrai contexto ao redor da lacuna."""
         context_start = max(0, start - context_size)
@@ -592,6 +599,14 @@ class SistemaLacunasPreciso:
                     "quality_ok": quality_ok
                 })
             
+            # Texto preenchido: o primeiro valor de cada placeholder vence
+            # (o tipo específico vem antes do CUSTOM no mesmo trecho)
+            values = {}
+            for gap in filled_gaps:
+                if gap.detection_method == DetectionMethod.REGEX:
+                    values.setdefault(gap.placeholder_name, gap.suggested_value)
+            filled_text = self.regex_detector.fill_gaps(text, values)
+            
             # 3. Calcular métricas
             execution_time = time.time() - start_time
             self._update_metrics(len(all_gaps), len(filled_gaps), execution_time)
@@ -604,6 +619,7 @@ class SistemaLacunasPreciso:
                 "execution_time": execution_time,
                 "avg_confidence": statistics.mean([g.confidence for g in filled_gaps]) if filled_gaps else 0.0,
                 "gaps": [asdict(gap) for gap in filled_gaps],
+                "filled_text": filled_text,
                 "validation_results": validation_results,
                 "metrics": dict(self.metrics)
             }
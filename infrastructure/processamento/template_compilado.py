@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Templates de Prompt Compilados
+==============================
+
+Um template é tokenizado uma única vez em uma AST (segmentos literais
+intercalados com lacunas tipadas, com linha/coluna e janelas de contexto
+pré-calculadas) e guardado em cache pelo hash do conteúdo. Detecção e
+preenchimento trabalham sobre a AST em vez de varrer o texto a cada chamada.
+
+Usado pelos RegexLacunaDetector (hybrid_lacuna_detector_imp001 e
+sistema_lacunas_preciso) e por SemanticAnalyzer (semantic_lacuna_detector_imp002).
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from .placeholder_unification_system_imp001 import PlaceholderType
+
+
+@dataclass(frozen=True)
+class LacunaCompilada:
+    """Lacuna encontrada no template (nó tipado da AST)."""
+    placeholder_type: PlaceholderType
+    placeholder_name: str
+    start_pos: int
+    end_pos: int
+    match: re.Match
+    pattern: str
+    line_number: int
+    column_number: int
+
+
+class TemplateCompilado:
+    """
+    AST de um template de prompt.
+
+    As lacunas são calculadas por conjunto de padrões (cada detector tem os
+    seus) e memorizadas; o mesmo vale para análises derivadas do texto,
+    registradas com ``memo``.
+    """
+
+    def __init__(self, texto: str, chave: str):
+        self.texto = texto
+        self.chave = chave
+        # Offset de início de cada linha, para linha/coluna por busca binária
+        self.inicios_linha = [0] + [m.end() for m in re.finditer('\n', texto)]
+        self._lacunas: Dict[Tuple, List[LacunaCompilada]] = {}
+        self._segmentos: Dict[Tuple, List[Any]] = {}
+        self._memo: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    def linha_coluna(self, posicao: int) -> Tuple[int, int]:
+        """Linha e coluna (base 1) de uma posição do texto."""
+        indice = bisect.bisect_right(self.inicios_linha, posicao) - 1
+        return indice + 1, posicao - self.inicios_linha[indice] + 1
+
+    def lacunas(self, padroes: Dict[PlaceholderType, re.Pattern]) -> List[LacunaCompilada]:
+        """
+        Lacunas do template para os padrões informados, na ordem dos padrões
+        e, dentro de cada um, na ordem do texto (mesma ordem de uma varredura
+        padrão a padrão).
+        """
+        assinatura = assinatura_padroes(padroes)
+        lacunas = self._lacunas.get(assinatura)
+        if lacunas is None:
+            lacunas = []
+            for placeholder_type, pattern in padroes.items():
+                for match in pattern.finditer(self.texto):
+                    linha, coluna = self.linha_coluna(match.start())
+                    lacunas.append(LacunaCompilada(
+                        placeholder_type=placeholder_type,
+                        # Comparação pelo valor: cada sistema de lacunas tem o próprio enum de tipos
+                        placeholder_name=match.group(1) if placeholder_type.value == PlaceholderType.CUSTOM.value else placeholder_type.value,
+                        start_pos=match.start(),
+                        end_pos=match.end(),
+                        match=match,
+                        pattern=pattern.pattern,
+                        line_number=linha,
+                        column_number=coluna
+                    ))
+            self._lacunas[assinatura] = lacunas
+        return lacunas
+
+    def segmentos(self, padroes: Dict[PlaceholderType, re.Pattern]) -> List[Any]:
+        """
+        Segmentos para preenchimento: strings literais e lacunas, sem
+        sobreposição (a primeira lacuna de cada trecho vence, como o tipo
+        específico sobre o CUSTOM no mesmo placeholder).
+        """
+        assinatura = assinatura_padroes(padroes)
+        segmentos = self._segmentos.get(assinatura)
+        if segmentos is None:
+            segmentos = []
+            cursor = 0
+            for lacuna in sorted(self.lacunas(padroes), key=lambda l: l.start_pos):
+                if lacuna.start_pos < cursor:
+                    continue
+                segmentos.append(self.texto[cursor:lacuna.start_pos])
+                segmentos.append(lacuna)
+                cursor = lacuna.end_pos
+            segmentos.append(self.texto[cursor:])
+            self._segmentos[assinatura] = segmentos
+        return segmentos
+
+    def preencher(self, padroes: Dict[PlaceholderType, re.Pattern], valores: Dict[str, str]) -> str:
+        """Substitui as lacunas pelos valores (por nome); lacunas sem valor ficam como estão."""
+        partes = []
+        for segmento in self.segmentos(padroes):
+            if isinstance(segmento, str):
+                partes.append(segmento)
+            else:
+                valor = valores.get(segmento.placeholder_name)
+                partes.append(segmento.match.group(0) if valor is None else str(valor))
+        return ''.join(partes)
+
+    def memo(self, chave: Any, calcular: Callable[[], Any]) -> Any:
+        """Resultado memorizado de uma análise derivada do texto do template."""
+        try:
+            return self._memo[chave]
+        except KeyError:
+            pass
+        valor = calcular()
+        with self._lock:
+            return self._memo.setdefault(chave, valor)
+
+
+def assinatura_padroes(padroes: Dict[PlaceholderType, re.Pattern]) -> Tuple:
+    """Identifica um conjunto de padrões (tipo, regex e flags), para chaves de cache."""
+    return tuple((tipo.value, p.pattern, p.flags) for tipo, p in padroes.items())
+
+
+class CacheTemplates:
+    """Cache LRU de templates compilados, indexado pelo hash do conteúdo."""
+
+    def __init__(self, max_templates: int = 512):
+        self.max_templates = max_templates
+        self._templates: "OrderedDict[str, TemplateCompilado]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, texto: str) -> TemplateCompilado:
+        """Retorna o template compilado para o texto, compilando-o na primeira vez."""
+        chave = hashlib.sha1(texto.encode('utf-8', 'surrogatepass')).hexdigest()
+        with self._lock:
+            template = self._templates.get(chave)
+            if template is not None:
+                self._templates.move_to_end(chave)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        template = TemplateCompilado(texto, chave)
+        with self._lock:
+            template = self._templates.setdefault(chave, template)
+            self._templates.move_to_end(chave)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "templates": len(self._templates),
+            "max_templates": self.max_templates,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# Cache compartilhado pelos detectores
+template_cache = CacheTemplates()
+
+
+def obter_template_compilado(texto: str) -> TemplateCompilado:
+    """Template compilado (do cache compartilhado) para o texto."""
+    return template_cache.obter(texto)
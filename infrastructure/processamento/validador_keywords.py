@@ -11,10 +11,12 @@ Ruleset: enterprise_control_layer.yaml
 
 from typing import List, Dict, Optional, Tuple, Set
 from domain.models import Keyword
+from domain.keyword_batch import KeywordBatch
 from shared.logger import logger
 from datetime import datetime
 from infrastructure.processamento.validador_semantico_avancado import ValidadorSemanticoAvancado
-import re
+from shared.utils.motor_normalizacao import compilar_padrao
+import numpy as np
 
 class ValidadorKeywords:
     """
@@ -86,6 +88,19 @@ class ValidadorKeywords:
                 logger.warning("Validador semântico não disponível. Validação semântica desabilitada.")
                 self.enable_semantic_validation = False
         
+    def _preparar_regras(self) -> Dict:
+        """
+        Pré-processa as regras de texto uma vez por chamada de validação:
+        regex compilada (cache compartilhado do motor de normalização) e
+        listas em lowercase.
+        """
+        return {
+            "padrao": compilar_padrao(self.regex_termo) if self.regex_termo else None,
+            "obrigatorias": [(palavra, palavra.lower()) for palavra in self.palavras_obrigatorias],
+            "blacklist": {termo.lower() for termo in self.blacklist},
+            "whitelist": {termo.lower() for termo in self.whitelist}
+        }
+        
     def validar_keyword(self, kw: Keyword) -> Tuple[bool, Dict]:
         """
         Valida uma keyword individual conforme as regras configuradas.
@@ -96,6 +111,9 @@ class ValidadorKeywords:
         Returns:
             Tupla (é_válida, detalhes_validação)
         """
+        return self._validar_keyword(kw, self._preparar_regras())
+        
+    def _validar_keyword(self, kw: Keyword, regras: Dict) -> Tuple[bool, Dict]:
         detalhes = {
             "termo": kw.termo,
             "regras_verificadas": [],
@@ -123,17 +141,17 @@ class ValidadorKeywords:
             detalhes["regras_verificadas"].append("num_palavras")
             
         # Validação de regex
-        if self.regex_termo and not re.search(self.regex_termo, kw.termo):
+        if regras["padrao"] is not None and not regras["padrao"].search(kw.termo):
             detalhes["violacoes"].append("regex_termo")
-        elif self.regex_termo:
+        elif regras["padrao"] is not None:
             detalhes["regras_verificadas"].append("regex")
             
         # Validação de palavras obrigatórias
-        if self.palavras_obrigatorias:
-            termo_lower = kw.termo.lower()
+        termo_lower = kw.termo.lower()
+        if regras["obrigatorias"]:
             palavras_faltantes = [
-                palavra for palavra in self.palavras_obrigatorias 
-                if palavra.lower() not in termo_lower
+                palavra for palavra, palavra_lower in regras["obrigatorias"]
+                if palavra_lower not in termo_lower
             ]
             if palavras_faltantes:
                 detalhes["violacoes"].append(f"palavras_obrigatorias_faltantes_{palavras_faltantes}")
@@ -141,14 +159,14 @@ class ValidadorKeywords:
                 detalhes["regras_verificadas"].append("palavras_obrigatorias")
                 
         # Validação de blacklist
-        if kw.termo.lower() in {termo.lower() for termo in self.blacklist}:
+        if termo_lower in regras["blacklist"]:
             detalhes["violacoes"].append("blacklist")
         else:
             detalhes["regras_verificadas"].append("blacklist")
             
         # Validação de whitelist (se configurada)
-        if self.whitelist:
-            if kw.termo.lower() not in {termo.lower() for termo in self.whitelist}:
+        if regras["whitelist"]:
+            if termo_lower not in regras["whitelist"]:
                 detalhes["violacoes"].append("whitelist")
             else:
                 detalhes["regras_verificadas"].append("whitelist")
@@ -249,8 +267,9 @@ class ValidadorKeywords:
             "regras_mais_violadas": {}
         }
         
+        regras = self._preparar_regras()
         for kw in keywords:
-            is_valida, detalhes = self.validar_keyword(kw)
+            is_valida, detalhes = self._validar_keyword(kw, regras)
             
             if is_valida:
                 keywords_aprovadas.append(kw)
@@ -292,6 +311,124 @@ class ValidadorKeywords:
         
         return keywords_aprovadas, keywords_rejeitadas, relatorio_final
         
+    def validar_batch(
+        self,
+        batch: KeywordBatch,
+        relatorio: bool = False
+    ) -> Tuple[KeywordBatch, KeywordBatch, Optional[Dict]]:
+        """
+        Versão colunar de validar_lista.
+        
+        Cada regra produz uma máscara booleana sobre o lote inteiro; regras
+        numéricas são comparações vetorizadas e regras de texto percorrem a
+        coluna de termos uma única vez. Aprovadas, rejeitadas e estatísticas
+        são idênticas às de validar_lista.
+        
+        Args:
+            batch: Lote colunar de keywords
+            relatorio: Se True, gera relatório detalhado
+            
+        Returns:
+            Tupla (batch_aprovadas, batch_rejeitadas, relatorio)
+        """
+        termos = batch.termo
+        total = len(batch)
+        vazio = np.fromiter((not termo or not termo.strip() for termo in termos), dtype=bool, count=total)
+        tamanhos = np.fromiter((len(termo) if termo else 0 for termo in termos), dtype=np.int64, count=total)
+        num_palavras = np.fromiter((len(termo.split()) if termo else 0 for termo in termos), dtype=np.int64, count=total)
+        termos_lower = [termo.lower() if termo else "" for termo in termos]
+        
+        # (nome_da_violação | None, máscara) na mesma ordem de validar_keyword
+        regras: List[Tuple[Optional[str], np.ndarray]] = [
+            (f"tamanho_minimo_{self.tamanho_min}", tamanhos < self.tamanho_min),
+            (f"tamanho_maximo_{self.tamanho_max}", (tamanhos >= self.tamanho_min) & (tamanhos > self.tamanho_max)),
+            (f"min_palavras_{self.min_palavras}", num_palavras < self.min_palavras),
+        ]
+        preparadas = self._preparar_regras()
+        if preparadas["padrao"] is not None:
+            padrao = preparadas["padrao"]
+            regras.append(("regex_termo", np.fromiter(
+                (not padrao.search(termo) if termo else True for termo in termos), dtype=bool, count=total
+            )))
+        
+        faltantes_por_linha: Dict[int, str] = {}
+        if self.palavras_obrigatorias:
+            obrigatorias = preparadas["obrigatorias"]
+            for linha, termo_lower in enumerate(termos_lower):
+                faltantes = [palavra for palavra, palavra_lower in obrigatorias if palavra_lower not in termo_lower]
+                if faltantes:
+                    faltantes_por_linha[linha] = f"palavras_obrigatorias_faltantes_{faltantes}"
+            mascara_obrigatorias = np.zeros(total, dtype=bool)
+            mascara_obrigatorias[list(faltantes_por_linha)] = True
+            regras.append((None, mascara_obrigatorias))
+        
+        blacklist = preparadas["blacklist"]
+        regras.append(("blacklist", np.fromiter((termo in blacklist for termo in termos_lower), dtype=bool, count=total)))
+        if self.whitelist:
+            whitelist = preparadas["whitelist"]
+            regras.append(("whitelist", np.fromiter((termo not in whitelist for termo in termos_lower), dtype=bool, count=total)))
+        regras.extend([
+            (f"volume_min_{self.volume_min}", batch.volume_busca < self.volume_min),
+            (f"cpc_min_{self.cpc_min}", batch.cpc < self.cpc_min),
+            (f"concorrencia_max_{self.concorrencia_max}", batch.concorrencia > self.concorrencia_max),
+            (f"score_min_{self.score_minimo}", batch.score < self.score_minimo),
+        ])
+        
+        # Termo vazio encerra a validação da linha com uma única violação
+        rejeitadas = vazio.copy()
+        ocorrencias = []  # (primeira_linha, ordem_regra, violacao, contagem)
+        if vazio.any():
+            ocorrencias.append((int(np.argmax(vazio)), -1, "termo_vazio", int(vazio.sum())))
+        for ordem, (violacao, mascara) in enumerate(regras):
+            mascara = mascara & ~vazio
+            rejeitadas |= mascara
+            if not mascara.any():
+                continue
+            if violacao is None:
+                contagem: Dict[str, List[int]] = {}
+                for linha in np.flatnonzero(mascara):
+                    contagem.setdefault(faltantes_por_linha[int(linha)], []).append(int(linha))
+                for nome, linhas in contagem.items():
+                    ocorrencias.append((linhas[0], ordem, nome, len(linhas)))
+            else:
+                ocorrencias.append((int(np.argmax(mascara)), ordem, violacao, int(mascara.sum())))
+        
+        estatisticas = {
+            "total": total,
+            "aprovadas": int(total - rejeitadas.sum()),
+            "rejeitadas": int(rejeitadas.sum()),
+            "violacoes_por_tipo": {},
+            "regras_mais_violadas": {}
+        }
+        # Ordem de inserção igual à de validar_lista (primeira linha, depois ordem da regra)
+        for _, _, violacao, contagem in sorted(ocorrencias, key=lambda value: (value[0], value[1])):
+            estatisticas["violacoes_por_tipo"][violacao] = contagem
+        if estatisticas["violacoes_por_tipo"]:
+            estatisticas["regras_mais_violadas"] = dict(
+                sorted(
+                    estatisticas["violacoes_por_tipo"].items(),
+                    key=lambda value: value[1],
+                    reverse=True
+                )[:5]
+            )
+        
+        logger.info({
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": "validacao_keywords",
+            "status": "success",
+            "source": "validador_keywords.validar_batch",
+            "details": {
+                "total": estatisticas["total"],
+                "aprovadas": estatisticas["aprovadas"],
+                "rejeitadas": estatisticas["rejeitadas"],
+                "taxa_aprovacao": estatisticas["aprovadas"] / estatisticas["total"] if estatisticas["total"] > 0 else 0
+            }
+        })
+        
+        relatorio_final = estatisticas if relatorio else None
+        
+        return batch[~rejeitadas], batch[rejeitadas], relatorio_final
+        
     def validar_avancado(
         self,
         keywords: List[Keyword],
@@ -11,6 +11,7 @@ Versão: 1.0.0
 import time
 import asyncio
 import random
+import threading
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -400,6 +401,96 @@ class TokenBucketRateLimiter:
         self.tokens = min(self.capacity, self.tokens + tokens_to_add)
         self.last_refill = now
 
+class AsyncTokenBucket:
+    """
+    Token bucket assíncrono: `acquire` aguarda (sem bloquear o event loop)
+    até haver token disponível. Cada chamada reserva seu token sob um lock
+    de thread e só então dorme pelo tempo devido, de modo que consumidores
+    concorrentes - inclusive em threads e event loops distintos - são
+    atendidos em ordem de chegada e a taxa agregada nunca excede `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Inicializar token bucket assíncrono.
+
+        Args:
+            rate: Tokens por segundo
+            capacity: Rajada máxima (tokens acumuláveis)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.total_acquired = 0
+        self.total_wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def _refill_tokens(self):
+        """Reabastecer tokens (saldo negativo representa reservas pendentes)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consome tokens se disponíveis, sem esperar."""
+        with self._lock:
+            self._refill_tokens()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                self.total_acquired += 1
+                return True
+            return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Aguarda até consumir `tokens`.
+
+        Returns:
+            Tempo esperado em segundos
+        """
+        with self._lock:
+            self._refill_tokens()
+            self.tokens -= tokens
+            espera = max(0.0, -self.tokens / self.rate)
+            self.total_acquired += 1
+            self.total_wait_time += espera
+        if espera:
+            await asyncio.sleep(espera)
+        return espera
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métricas do bucket."""
+        with self._lock:
+            self._refill_tokens()
+            return {
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "tokens_disponiveis": self.tokens,
+                "total_acquired": self.total_acquired,
+                "total_wait_time": self.total_wait_time
+            }
+
+# Buckets compartilhados por nome (ex.: cota de um provedor usada por
+# vários coletores/nichos em paralelo no mesmo processo)
+_token_buckets_compartilhados: Dict[str, AsyncTokenBucket] = {}
+_token_buckets_lock = threading.Lock()
+
+def obter_token_bucket_compartilhado(nome: str, rate: float, capacity: float = 1.0) -> AsyncTokenBucket:
+    """Obtém (ou cria) o token bucket compartilhado identificado por `nome`."""
+    with _token_buckets_lock:
+        bucket = _token_buckets_compartilhados.get(nome)
+        if bucket is None:
+            bucket = AsyncTokenBucket(rate=rate, capacity=capacity)
+            _token_buckets_compartilhados[nome] = bucket
+        return bucket
+
+def obter_metricas_token_buckets() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos os token buckets compartilhados."""
+    with _token_buckets_lock:
+        buckets = dict(_token_buckets_compartilhados)
+    return {nome: bucket.get_metrics() for nome, bucket in buckets.items()}
+
 class LeakyBucketRateLimiter:
     """Implementação do algoritmo Leaky Bucket."""
     
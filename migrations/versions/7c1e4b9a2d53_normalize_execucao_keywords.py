@@ -0,0 +1,125 @@
+"""Normalize execucao keywords
+
+Revision ID: 7c1e4b9a2d53
+Revises: ff9e42cc1fd4
+Create Date: 2025-06-20 10:12:41.318204
+
+"""
+import json
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2d53'
+down_revision: Union[str, None] = 'ff9e42cc1fd4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+execucoes = sa.table(
+    'execucoes',
+    sa.column('id', sa.Integer),
+    sa.column('palavras_chave', sa.Text),
+)
+termos = sa.table(
+    'termos',
+    sa.column('id', sa.Integer),
+    sa.column('termo', sa.String),
+    sa.column('data_criacao', sa.DateTime),
+)
+execucao_keywords = sa.table(
+    'execucao_keywords',
+    sa.column('execucao_id', sa.Integer),
+    sa.column('termo_id', sa.Integer),
+    sa.column('posicao', sa.Integer),
+)
+
+
+def _normalizar(texto) -> str:
+    # Mesma regra de backend/app/services/keyword_index_service.normalizar_termo
+    return re.sub(r'\s+', ' ', str(texto)).strip().lower()[:255]
+
+
+def _backfill() -> None:
+    """Copia o JSON de execucoes.palavras_chave para as tabelas normalizadas, em lotes por id."""
+    bind = op.get_bind()
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.select(execucoes.c.id, execucoes.c.palavras_chave)
+            .where(execucoes.c.id > ultimo_id)
+            .order_by(execucoes.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not linhas:
+            break
+        ultimo_id = linhas[-1][0]
+
+        vinculos = {}
+        for execucao_id, bruto in linhas:
+            try:
+                palavras = json.loads(bruto) if bruto else []
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(palavras, list):
+                continue
+            posicoes = {}
+            for posicao, texto in enumerate(palavras):
+                termo = _normalizar(texto)
+                if termo and termo not in posicoes:
+                    posicoes[termo] = posicao
+            vinculos[execucao_id] = posicoes
+
+        novos = set().union(*vinculos.values()) if vinculos else set()
+        if not novos:
+            continue
+        ids = dict(bind.execute(sa.select(termos.c.termo, termos.c.id).where(termos.c.termo.in_(novos))).fetchall())
+        faltantes = sorted(novos - ids.keys())
+        if faltantes:
+            bind.execute(termos.insert().values(data_criacao=sa.func.now()), [{'termo': t} for t in faltantes])
+            ids.update(bind.execute(
+                sa.select(termos.c.termo, termos.c.id).where(termos.c.termo.in_(faltantes))
+            ).fetchall())
+
+        bind.execute(execucao_keywords.insert(), [
+            {'execucao_id': execucao_id, 'termo_id': ids[termo], 'posicao': posicao}
+            for execucao_id, posicoes in vinculos.items()
+            for termo, posicao in posicoes.items()
+        ])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('termos',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('termo', sa.String(length=255), nullable=False),
+    sa.Column('data_criacao', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_termos_termo', 'termos', ['termo'], unique=True)
+    op.create_table('execucao_keywords',
+    sa.Column('execucao_id', sa.Integer(), nullable=False),
+    sa.Column('termo_id', sa.Integer(), nullable=False),
+    sa.Column('posicao', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['execucao_id'], ['execucoes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['termo_id'], ['termos.id'], ),
+    sa.PrimaryKeyConstraint('execucao_id', 'termo_id')
+    )
+    op.create_index('ix_execucao_keywords_termo_execucao', 'execucao_keywords', ['termo_id', 'execucao_id'])
+    op.create_index('ix_execucoes_categoria_data', 'execucoes', ['id_categoria', 'data_execucao'])
+
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_execucoes_categoria_data', table_name='execucoes')
+    op.drop_index('ix_execucao_keywords_termo_execucao', table_name='execucao_keywords')
+    op.drop_table('execucao_keywords')
+    op.drop_index('ix_termos_termo', table_name='termos')
+    op.drop_table('termos')
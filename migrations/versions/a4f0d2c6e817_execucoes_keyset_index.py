@@ -0,0 +1,29 @@
+"""Execucoes keyset index
+
+Revision ID: a4f0d2c6e817
+Revises: 7c1e4b9a2d53
+Create Date: 2025-06-23 09:41:05.772631
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f0d2c6e817'
+down_revision: Union[str, None] = '7c1e4b9a2d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice da paginação por cursor de GET /api/execucoes (ordem data_execucao, id)
+    op.create_index('ix_execucoes_data_id', 'execucoes', ['data_execucao', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_execucoes_data_id', table_name='execucoes')
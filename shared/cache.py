@@ -66,6 +66,21 @@ class LocalCache:
                     del self._cache[key]
             return None
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Obtém vários valores do cache local sob um único lock."""
+        resultado = {}
+        async with self._lock:
+            agora = datetime.now()
+            for key in keys:
+                item = self._cache.get(key)
+                if item is None:
+                    continue
+                if agora < item['expires_at']:
+                    resultado[key] = item['value']
+                else:
+                    del self._cache[key]
+        return resultado
+    
     async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Define valor no cache local."""
         async with self._lock:
@@ -276,6 +291,64 @@ class AsyncCache:
         })
         return default
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores em uma única ida ao Redis (MGET); chaves
+        ausentes são buscadas no cache local.
+        
+        Args:
+            keys: Chaves do cache
+            
+        Returns:
+            Dicionário chave -> valor apenas com as chaves encontradas
+        """
+        keys = list(dict.fromkeys(keys))
+        encontrados: Dict[str, Any] = {}
+        
+        # Tenta Redis primeiro
+        if keys and self._redis_client and self._initialized:
+            try:
+                dados = await self._redis_client.mget([self._get_full_key(key) for key in keys])
+                for key, data in zip(keys, dados):
+                    if data is not None:
+                        encontrados[key] = self._deserialize_value(data)
+            except Exception as e:
+                self._metrics['errors'] += 1
+                logger.warning({
+                    "event": "redis_mget_error",
+                    "status": "warning",
+                    "source": "cache.get_many",
+                    "details": {"error": str(e), "keys": len(keys)}
+                })
+        
+        # Fallback para cache local
+        restantes = [key for key in keys if key not in encontrados]
+        if restantes and self._local_cache:
+            try:
+                locais = await self._local_cache.get_many([self._get_full_key(key) for key in restantes])
+                for key in restantes:
+                    valor = locais.get(self._get_full_key(key))
+                    if valor is not None:
+                        encontrados[key] = valor
+            except Exception as e:
+                self._metrics['errors'] += 1
+                logger.error({
+                    "event": "local_cache_error",
+                    "status": "error",
+                    "source": "cache.get_many",
+                    "details": {"error": str(e), "keys": len(restantes)}
+                })
+        
+        self._metrics['hits'] += len(encontrados)
+        self._metrics['misses'] += len(keys) - len(encontrados)
+        logger.debug({
+            "event": "cache_get_many",
+            "status": "success",
+            "source": "cache.get_many",
+            "details": {"keys": len(keys), "hits": len(encontrados), "namespace": self.namespace}
+        })
+        return encontrados
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """
         Define valor no cache.
@@ -203,6 +203,13 @@ REDIS_CONFIG = {
     "password": os.getenv("REDIS_PASSWORD", None),
 }
 
+# Store persistente de embeddings por termo (infrastructure/ml/embedding_store.py).
+# Desligado por padrão; os arquivos ficam fora da árvore do pacote.
+EMBEDDING_STORE_CONFIG = {
+    "enabled": os.getenv("EMBEDDING_STORE_ENABLED", "false").lower() == "true",
+    "dir": os.getenv("EMBEDDING_STORE_DIR", str(Path.home() / ".cache" / "omni_keywords" / "embedding_store")),
+}
+
 # Configuração de cache para coletores
 CACHE_CONFIG = {
     "namespaces": {
@@ -223,7 +230,9 @@ CACHE_CONFIG = {
     "ttl_keywords": 7200,
     "ttl_metricas": 21600,
     "ttl_min": 60,
-    "ttl_max": 86400
+    "ttl_max": 86400,
+    # Segundos após o TTL em que o valor expirado é servido enquanto revalida
+    "janela_stale": int(os.getenv("CACHE_JANELA_STALE", 1800))
 }
 
 # Configurações de coleta centralizadas (migradas de infrastructure/coleta/config.py)
@@ -233,6 +242,8 @@ COLETA_CONFIG = {
     "janela_tendencias_dias": 90,
     "janela_sazonalidade_dias": 180,
     "limite_requisicoes_minuto": 60,
+    "max_concorrencia_termos": int(os.getenv("COLETA_MAX_CONCORRENCIA_TERMOS", 5)),
+    "rajada_requisicoes": int(os.getenv("COLETA_RAJADA_REQUISICOES", 1)),
     "user_agent": "OmniKeywordsFinder/1.0",
     "proxy_enabled": False,
     "proxy_config": {
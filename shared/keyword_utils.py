@@ -2,23 +2,26 @@
 Utilitários centralizados para normalização e validação de palavras-chave.
 Elimina duplicidade de lógica entre coletores, processadores e domínio.
 """
-import re
-import unicodedata
 from typing import Optional
 
+from shared.utils.motor_normalizacao import obter_motor
+
+# Motores de normalizar_termo, resolvidos uma vez por (remover_acentos, case_sensitive)
+_motores = {
+    (remover_acentos, case_sensitive): obter_motor(
+        remover_acentos=remover_acentos, case_sensitive=case_sensitive, caracteres_permitidos=None
+    )
+    for remover_acentos in (False, True)
+    for case_sensitive in (False, True)
+}
+
 def normalizar_termo(termo: str, remover_acentos: bool = False, case_sensitive: bool = False) -> str:
     """
     Normaliza um termo: strip, lower, remove acentos se configurado.
     """
     if not termo:
         return ""
-    termo_norm = termo.strip()
-    termo_norm = re.sub(r'\string_data+', ' ', termo_norm)
-    if not case_sensitive:
-        termo_norm = termo_norm.lower()
-    if remover_acentos:
-        termo_norm = unicodedata.normalize('NFKD', termo_norm).encode('ASCII', 'ignore').decode('ASCII')
-    return termo_norm
+    return _motores[bool(remover_acentos), bool(case_sensitive)].normalizar(termo)
 
 def validar_termo(termo: str, min_caracteres: int = 2, max_caracteres: int = 100, caracteres_permitidos: Optional[str] = None) -> bool:
     """
@@ -0,0 +1,217 @@
+"""
+Motor de normalização compartilhado.
+
+Padrões compilados uma única vez, formas normalizadas memoizadas em LRU
+limitado e API em lote com deduplicação. NormalizadorCentral (coletores),
+NormalizadorKeywords, ValidadorKeywords e shared.keyword_utils usam as
+mesmas instâncias via obter_motor().
+
+Contadores de vazão (termos processados, tempo) só são coletados com
+métricas habilitadas (NORMALIZACAO_METRICAS=true ou habilitar_metricas()),
+para que o caminho por termo não pague lock e relógio a cada chamada.
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, Optional, Pattern, Tuple
+
+from shared.logger import logger
+
+PADRAO_ESPACOS = r'\s+'
+PADRAO_CARACTERES_PERMITIDOS = r'^[\w\s\-.,?!]+$'
+
+TAMANHO_CACHE_PADRAO = 65536
+
+_metricas_habilitadas = os.getenv("NORMALIZACAO_METRICAS", "false").lower() == "true"
+
+
+@lru_cache(maxsize=256)
+def compilar_padrao(padrao: str) -> Pattern:
+    """Compila (uma vez por processo) um padrão regex."""
+    return re.compile(padrao)
+
+
+class MotorNormalizacao:
+    """
+    Normaliza termos com a mesma sequência usada no projeto: strip, colapso de
+    espaços, lowercase (se não case_sensitive), remoção de acentos (opcional),
+    limites de tamanho (opcionais) e validação de caracteres permitidos
+    (opcional, `caracteres_permitidos=None` desativa). `validacao_completa`
+    escolhe entre fullmatch (padrão) e match ancorado no início.
+
+    Termos inválidos resultam em string vazia. Resultados são memoizados por
+    termo original em um LRU de `tamanho_cache` entradas. Contadores de vazão
+    só são atualizados com `coletar_metricas` (padrão: configuração global).
+    """
+
+    def __init__(
+        self,
+        remover_acentos: bool = False,
+        case_sensitive: bool = False,
+        caracteres_permitidos: Optional[str] = PADRAO_CARACTERES_PERMITIDOS,
+        min_caracteres: Optional[int] = None,
+        max_caracteres: Optional[int] = None,
+        validacao_completa: bool = True,
+        tamanho_cache: int = TAMANHO_CACHE_PADRAO,
+        coletar_metricas: Optional[bool] = None
+    ):
+        self.remover_acentos = remover_acentos
+        self.case_sensitive = case_sensitive
+        self.caracteres_permitidos = caracteres_permitidos
+        self.min_caracteres = min_caracteres
+        self.max_caracteres = max_caracteres
+        self.validacao_completa = validacao_completa
+        self.tamanho_cache = tamanho_cache
+        self.coletar_metricas = _metricas_habilitadas if coletar_metricas is None else coletar_metricas
+
+        self._espacos = compilar_padrao(PADRAO_ESPACOS)
+        self._permitidos = None
+        if caracteres_permitidos:
+            padrao = compilar_padrao(caracteres_permitidos)
+            self._permitidos = padrao.fullmatch if validacao_completa else padrao.match
+        self._normalizar_cacheado = lru_cache(maxsize=tamanho_cache)(self._normalizar)
+
+        self._lock = threading.Lock()
+        self._termos_processados = 0
+        self._tempo_total = 0.0
+        self._duplicatas_removidas = 0
+
+    def _normalizar(self, termo: str) -> str:
+        termo_norm = self._espacos.sub(' ', termo.strip())
+        if not self.case_sensitive:
+            termo_norm = termo_norm.lower()
+        if self.remover_acentos:
+            termo_norm = unicodedata.normalize('NFKD', termo_norm).encode('ASCII', 'ignore').decode('ASCII')
+        if self.min_caracteres is not None and len(termo_norm) < self.min_caracteres:
+            return ""
+        if self.max_caracteres is not None and len(termo_norm) > self.max_caracteres:
+            return ""
+        if self._permitidos is not None and not self._permitidos(termo_norm):
+            return ""
+        return termo_norm
+
+    def normalizar(self, termo: str) -> str:
+        """Normaliza um termo (string vazia se inválido)."""
+        if not termo:
+            return ""
+        if not self.coletar_metricas:
+            return self._normalizar_cacheado(termo)
+        inicio = time.perf_counter()
+        resultado = self._normalizar_cacheado(termo)
+        with self._lock:
+            self._termos_processados += 1
+            self._tempo_total += time.perf_counter() - inicio
+        return resultado
+
+    def normalizar_em_lote(self, termos: Iterable[str], deduplicar: bool = True) -> Iterator[str]:
+        """
+        Normaliza um iterável de termos em streaming, descartando inválidos.
+
+        Com `deduplicar=True`, cada forma normalizada é emitida uma única vez
+        (primeira ocorrência).
+        """
+        vistos = set()
+        normalizar = self._normalizar_cacheado
+        medir = self.coletar_metricas
+        processados = 0
+        duplicatas = 0
+        inicio = time.perf_counter() if medir else 0.0
+        tempo_consumidor = 0.0
+        try:
+            for termo in termos:
+                processados += 1
+                if not termo:
+                    continue
+                termo_norm = normalizar(termo)
+                if not termo_norm:
+                    continue
+                if deduplicar:
+                    if termo_norm in vistos:
+                        duplicatas += 1
+                        continue
+                    vistos.add(termo_norm)
+                if not medir:
+                    yield termo_norm
+                    continue
+                pausa = time.perf_counter()
+                yield termo_norm
+                tempo_consumidor += time.perf_counter() - pausa
+        finally:
+            if medir:
+                with self._lock:
+                    self._termos_processados += processados
+                    self._tempo_total += time.perf_counter() - inicio - tempo_consumidor
+                    self._duplicatas_removidas += duplicatas
+
+    def obter_metricas(self) -> Dict[str, Any]:
+        """Contadores de vazão e de eficiência do cache."""
+        info = self._normalizar_cacheado.cache_info()
+        consultas = info.hits + info.misses
+        with self._lock:
+            return {
+                "metricas_habilitadas": self.coletar_metricas,
+                "termos_processados": self._termos_processados,
+                "tempo_total": round(self._tempo_total, 6),
+                "termos_por_segundo": round(self._termos_processados / self._tempo_total, 1) if self._tempo_total else 0.0,
+                "duplicatas_removidas": self._duplicatas_removidas,
+                "cache_hits": info.hits,
+                "cache_misses": info.misses,
+                "cache_tamanho": info.currsize,
+                "cache_capacidade": info.maxsize,
+                "taxa_acerto_cache": round(info.hits / consultas, 4) if consultas else 0.0
+            }
+
+    def limpar_cache(self):
+        self._normalizar_cacheado.cache_clear()
+
+
+_motores: Dict[Tuple, MotorNormalizacao] = {}
+_motores_lock = threading.Lock()
+
+
+def obter_motor(
+    remover_acentos: bool = False,
+    case_sensitive: bool = False,
+    caracteres_permitidos: Optional[str] = PADRAO_CARACTERES_PERMITIDOS,
+    min_caracteres: Optional[int] = None,
+    max_caracteres: Optional[int] = None,
+    validacao_completa: bool = True
+) -> MotorNormalizacao:
+    """Retorna o motor compartilhado para a configuração (um por combinação de opções)."""
+    chave = (remover_acentos, case_sensitive, caracteres_permitidos, min_caracteres, max_caracteres, validacao_completa)
+    # Leitura sem lock: motores nunca são removidos do registro
+    motor = _motores.get(chave)
+    if motor is not None:
+        return motor
+    with _motores_lock:
+        motor = _motores.get(chave)
+        if motor is None:
+            motor = _motores[chave] = MotorNormalizacao(*chave, coletar_metricas=_metricas_habilitadas)
+        return motor
+
+
+def habilitar_metricas(ativo: bool = True) -> None:
+    """Liga/desliga os contadores de vazão nos motores compartilhados (atuais e futuros)."""
+    global _metricas_habilitadas
+    with _motores_lock:
+        _metricas_habilitadas = ativo
+        for motor in _motores.values():
+            motor.coletar_metricas = ativo
+
+
+def obter_metricas_motores() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos os motores instanciados, indexadas pela configuração."""
+    with _motores_lock:
+        motores = list(_motores.items())
+    metricas = {str(chave): motor.obter_metricas() for chave, motor in motores}
+    logger.info({
+        "event": "metricas_motor_normalizacao",
+        "status": "success",
+        "source": "motor_normalizacao.obter_metricas_motores",
+        "details": {"total_motores": len(metricas)}
+    })
+    return metricas
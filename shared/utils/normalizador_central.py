@@ -9,10 +9,13 @@ Versão: 1.0.0
 """
 
 import re
-import unicodedata
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 from shared.logger import logger
+from shared.utils.motor_normalizacao import PADRAO_CARACTERES_PERMITIDOS, MotorNormalizacao, obter_motor
+
+# Motor de normalizar_para_busca, resolvido uma vez por processo
+_motor_busca = obter_motor(remover_acentos=True, case_sensitive=False, caracteres_permitidos=None)
 
 
 class NormalizadorCentral:
@@ -37,7 +40,7 @@ class NormalizadorCentral:
         self,
         remover_acentos: bool = False,
         case_sensitive: bool = False,
-        caracteres_permitidos: str = r'^[\w\string_data\-.,?!]+$',
+        caracteres_permitidos: str = PADRAO_CARACTERES_PERMITIDOS,
         min_caracteres: int = 2,
         max_caracteres: int = 100
     ):
@@ -56,6 +59,23 @@ class NormalizadorCentral:
         self.caracteres_permitidos = caracteres_permitidos
         self.min_caracteres = min_caracteres
         self.max_caracteres = max_caracteres
+        self._motor: Optional[MotorNormalizacao] = None
+        self._config_motor: Optional[Tuple] = None
+    
+    @property
+    def motor(self) -> MotorNormalizacao:
+        """
+        Motor de normalização compartilhado para a configuração atual.
+        Resolvido uma vez e reaproveitado enquanto a configuração não mudar.
+        """
+        config = (
+            self.remover_acentos, self.case_sensitive, self.caracteres_permitidos,
+            self.min_caracteres, self.max_caracteres
+        )
+        if config != self._config_motor:
+            self._motor = obter_motor(*config, validacao_completa=False)
+            self._config_motor = config
+        return self._motor
     
     def normalizar_termo(self, termo: str) -> str:
         """
@@ -78,29 +98,7 @@ class NormalizadorCentral:
             return ""
         
         try:
-            # Remove espaços extras
-            termo_norm = termo.strip()
-            
-            # Normaliza espaços internos
-            termo_norm = re.sub(r'\string_data+', ' ', termo_norm)
-            
-            # Converte para lowercase (se não case sensitive)
-            if not self.case_sensitive:
-                termo_norm = termo_norm.lower()
-            
-            # Remove acentos (se configurado)
-            if self.remover_acentos:
-                termo_norm = unicodedata.normalize('NFKD', termo_norm).encode('ASCII', 'ignore').decode('ASCII')
-            
-            # Valida tamanho
-            if not (self.min_caracteres <= len(termo_norm) <= self.max_caracteres):
-                return ""
-            
-            # Valida caracteres permitidos
-            if not re.match(self.caracteres_permitidos, termo_norm):
-                return ""
-            
-            return termo_norm
+            return self.motor.normalizar(termo)
             
         except Exception as e:
             logger.error({
@@ -141,14 +139,7 @@ class NormalizadorCentral:
         Returns:
             Lista de termos normalizados e únicos
         """
-        termos_vistos: Set[str] = set()
-        termos_normalizados: List[str] = []
-        
-        for termo in termos:
-            termo_norm = self.normalizar_termo(termo)
-            if termo_norm and termo_norm not in termos_vistos:
-                termos_vistos.add(termo_norm)
-                termos_normalizados.append(termo_norm)
+        termos_normalizados = list(self.motor.normalizar_em_lote(termos))
         
         logger.info({
             "timestamp": datetime.utcnow().isoformat(),
@@ -297,19 +288,8 @@ class NormalizadorCentral:
         if not termo:
             return ""
         
-        # Remove espaços extras
-        termo_norm = termo.strip()
-        
-        # Normaliza espaços internos
-        termo_norm = re.sub(r'\string_data+', ' ', termo_norm)
-        
-        # Converte para lowercase
-        termo_norm = termo_norm.lower()
-        
-        # Remove acentos
-        termo_norm = unicodedata.normalize('NFKD', termo_norm).encode('ASCII', 'ignore').decode('ASCII')
-        
-        return termo_norm
+        # Sem validação de caracteres/tamanho: strip, lowercase e remoção de acentos
+        return _motor_busca.normalizar(termo)
     
     def obter_estatisticas(self) -> Dict[str, Any]:
         """
@@ -324,6 +304,7 @@ class NormalizadorCentral:
             "caracteres_permitidos": self.caracteres_permitidos,
             "min_caracteres": self.min_caracteres,
             "max_caracteres": self.max_caracteres,
+            "motor": self.motor.obter_metricas(),
             "timestamp": datetime.utcnow().isoformat()
         }
 
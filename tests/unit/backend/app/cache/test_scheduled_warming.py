@@ -0,0 +1,198 @@
+"""
+Testes do pré-aquecimento de cache guiado pela agenda (ScheduledCacheWarmer).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from backend.app.cache.scheduled_warming import (
+    CollectorPrefetcher,
+    Prefetcher,
+    ScheduledCacheWarmer,
+    UpcomingRun,
+    WarmTask,
+    execucao_agendada_run_id,
+    upcoming_from_agendamento_service,
+)
+from infrastructure.rate_limiting.adaptive_rate_limiter import AsyncTokenBucket
+
+AGORA = datetime(2025, 1, 27, 12, 0, tzinfo=timezone.utc)
+
+
+class CacheColetor:
+    def __init__(self):
+        self.dados = {}
+
+    async def get_many(self, chaves):
+        return {chave: self.dados[chave] for chave in chaves if chave in self.dados}
+
+
+class ColetorFalso:
+    def __init__(self, nome, rate_por_segundo):
+        self.nome = nome
+        self.cache = CacheColetor()
+        self.token_bucket = AsyncTokenBucket(rate=rate_por_segundo)
+        self.coletados = []
+        self.on_cache_hit = None
+
+    async def coletar_keywords(self, termos):
+        acertos = [termo for termo in termos if f"keyword:{termo}" in self.cache.dados]
+        if acertos and self.on_cache_hit:
+            self.on_cache_hit(acertos)
+        for termo in termos:
+            if termo not in acertos:
+                await asyncio.sleep(0.01)
+                self.coletados.append(termo)
+                self.cache.dados[f"keyword:{termo}"] = {"termo": termo}
+        return termos
+
+
+class TemplateFalso(Prefetcher):
+    kind = "prompt_template"
+
+    def __init__(self):
+        self.cache = {}
+        self.on_hit = None
+
+    def watch(self, on_hit):
+        self.on_hit = on_hit
+
+    def ler(self, categoria_id):
+        chave = f"prompt:{categoria_id}"
+        if chave in self.cache:
+            self.on_hit(chave)
+        return self.cache.setdefault(chave, "prompt")
+
+    async def plan(self, run):
+        chave = f"prompt:{run.categoria_id}"
+        if chave in self.cache:
+            return []
+        return [WarmTask(key=chave, kind=self.kind, load=lambda: self.ler(run.categoria_id))]
+
+
+def _run(run_id, minutos, termos, categoria_id=1):
+    return UpcomingRun(run_id, AGORA + timedelta(minutes=minutos), categoria_id, termos)
+
+
+def test_aquece_apenas_execucoes_dentro_da_antecedencia():
+    coletor = ColetorFalso("teste_antecedencia", rate_por_segundo=100)
+    agenda = [_run("proxima", 5, ["a", "b"]), _run("distante", 60, ["c"])]
+    warmer = ScheduledCacheWarmer(
+        [CollectorPrefetcher(coletor), TemplateFalso()],
+        sources=[lambda now, horizonte: [r for r in agenda if r.scheduled_at <= now + horizonte]],
+        lead_time=timedelta(minutes=10)
+    )
+
+    resumo = asyncio.run(warmer.run_cycle(AGORA))
+    assert resumo["runs"] == 1
+    assert resumo["warmed"] == 3
+    assert sorted(coletor.coletados) == ["a", "b"]
+
+    # Segundo ciclo: tudo já está no cache, nada é recarregado
+    assert asyncio.run(warmer.run_cycle(AGORA))["warmed"] == 0
+    assert sorted(coletor.coletados) == ["a", "b"]
+
+
+def test_orcamento_do_provedor_adia_o_excedente():
+    # 0.05 tokens/s * fração 0.5 * 60 s = orçamento de 1 chamada por ciclo
+    coletor = ColetorFalso("teste_orcamento", rate_por_segundo=0.05)
+    agenda = [_run("r1", 2, ["a", "b", "c"])]
+    warmer = ScheduledCacheWarmer([CollectorPrefetcher(coletor, budget_fraction=0.5)], sources=[lambda now, h: agenda])
+
+    resumo = asyncio.run(warmer.run_cycle(AGORA))
+    assert resumo["warmed"] == 1
+    assert resumo["deferred"] == 2
+    assert warmer.get_stats()["tasks_deferred"] == 2
+
+
+def test_relatorio_de_latencia_economizada():
+    coletor = ColetorFalso("teste_relatorio", rate_por_segundo=100)
+    warmer = ScheduledCacheWarmer([CollectorPrefetcher(coletor)], sources=[lambda now, h: [_run("r1", 1, ["x"])]])
+    asyncio.run(warmer.run_cycle(AGORA))
+    asyncio.run(coletor.coletar_keywords(["x"]))  # a execução lê o termo aquecido
+
+    relatorio = warmer.record_run("r1", duration=0.5)
+    assert relatorio.warmed == 1
+    assert relatorio.hits == {"coletor.teste_relatorio:keyword:x"}
+    assert relatorio.latency_saved >= 0.01
+    assert 0 < relatorio.saved_fraction < 1
+    assert relatorio.to_dict()["latency_saved_by_kind"]["collector"] >= 0.01
+
+    stats = warmer.get_stats()
+    assert stats["completed_runs"] == 1
+    assert stats["latency_saved"] > 0
+    assert warmer.record_run("r1", duration=0.5) is None
+
+
+def test_integracao_com_agendamento_service():
+    execucao = SimpleNamespace(id="e1", categoria_id=7, palavras_chave=["termo"], cluster=None)
+    agendamento = SimpleNamespace(
+        id="ag1", status=SimpleNamespace(value="ativo"), proxima_execucao=AGORA + timedelta(minutes=3),
+        execucoes=[execucao]
+    )
+    servico = SimpleNamespace(agendamentos={"ag1": agendamento}, on_execucao_concluida=None)
+
+    runs = upcoming_from_agendamento_service(servico, AGORA, timedelta(minutes=10))
+    assert [(r.run_id, r.categoria_id) for r in runs] == [("agendamento:ag1:e1", 7)]
+
+    templates = TemplateFalso()
+    warmer = ScheduledCacheWarmer([templates], sources=[])
+    warmer.attach(servico)
+    asyncio.run(warmer.run_cycle(AGORA))
+    assert "prompt:7" in templates.cache
+
+    templates.ler(7)
+    servico.on_execucao_concluida(agendamento, execucao, 0.2)
+    assert warmer.get_stats()["recent_runs"][0]["run_id"] == "agendamento:ag1:e1"
+    assert warmer.get_stats()["recent_runs"][0]["hits"] == 1
+
+
+def test_entrada_aquecida_sem_leitura_nao_conta_como_economia():
+    coletor = ColetorFalso("teste_sem_leitura", rate_por_segundo=100)
+    warmer = ScheduledCacheWarmer([CollectorPrefetcher(coletor)], sources=[lambda now, h: [_run("r1", 1, ["x", "y"])]])
+    asyncio.run(warmer.run_cycle(AGORA))
+    asyncio.run(coletor.coletar_keywords(["y"]))
+
+    relatorio = warmer.record_run("r1", duration=0.5)
+    assert relatorio.warmed == 2
+    assert relatorio.hits == {"coletor.teste_sem_leitura:keyword:y"}
+    assert relatorio.latency_saved < relatorio.load_time
+
+    # Acertos depois do fim da execução não são atribuídos a ela
+    asyncio.run(coletor.coletar_keywords(["x"]))
+    assert len(relatorio.hits) == 1
+
+
+def test_execucoes_agendadas_concluidas_fecham_o_relatorio():
+    templates = TemplateFalso()
+    run_id = execucao_agendada_run_id(42)
+    warmer = ScheduledCacheWarmer([templates], sources=[lambda now, h: [UpcomingRun(run_id, AGORA, 3, ["a"])]])
+    servico = SimpleNamespace(on_execucao_agendada_concluida=None)
+    warmer.attach_execucao_service(servico)
+    asyncio.run(warmer.run_cycle(AGORA))
+    assert warmer.get_stats()["pending_runs"] == 1
+
+    templates.ler(3)
+    servico.on_execucao_agendada_concluida(SimpleNamespace(id=42), 0.3)
+    stats = warmer.get_stats()
+    assert stats["pending_runs"] == 0
+    assert stats["recent_runs"][0]["run_id"] == run_id
+    assert stats["recent_runs"][0]["hits"] == 1
+
+
+def test_relatorios_de_execucoes_que_nao_terminaram_expiram():
+    agenda = [_run("r1", 1, ["a"])]
+    warmer = ScheduledCacheWarmer([TemplateFalso()], sources=[lambda now, h: agenda], report_ttl=timedelta(hours=1))
+    asyncio.run(warmer.run_cycle(AGORA))
+    assert warmer.get_stats()["pending_runs"] == 1
+
+    agenda.clear()
+    asyncio.run(warmer.run_cycle(AGORA + timedelta(minutes=30)))
+    assert warmer.get_stats()["pending_runs"] == 1
+
+    asyncio.run(warmer.run_cycle(AGORA + timedelta(hours=2)))
+    stats = warmer.get_stats()
+    assert stats["pending_runs"] == 0
+    assert stats["reports_expired"] == 1
+    assert warmer.record_run("r1", duration=0.1) is None
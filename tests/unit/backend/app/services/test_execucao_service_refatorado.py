@@ -9,9 +9,12 @@ Data: 2024-12-19
 Versão: 1.0.0
 """
 
+import json
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, MagicMock
+from flask import Flask
+from backend.app.models import ExecucaoAgendada, db
 from backend.app.services.execucao_service import ExecucaoService
 from backend.app.services.lote_execucao_service import LoteExecucaoService
 from backend.app.services.agendamento_service import AgendamentoService
@@ -78,36 +81,41 @@ class TestExecucaoServiceRefatorado:
         assert resultado['qtd_executada'] == 0
         assert resultado['tempo_total'] == 0.0
     
-    @patch('backend.app.services.execucao_service.AgendamentoService.processar_agendamentos')
-    def test_processar_execucoes_agendadas_delega_para_servico(self, mock_processar_agendamentos):
-        """Testa se o processamento de agendamentos delega para serviço especializado."""
-        # Mock do processamento
-        resultado_esperado = {
-            'total_processadas': 2,
-            'logs_execucao': [{'agendamento_id': 1, 'status': 'ok'}],
-            'log_path': 'logs/exec_trace/agendadas.log',
-            'timestamp': '2024-12-19T12:00:00'
-        }
-        mock_processar_agendamentos.return_value = resultado_esperado
-        
-        # Executar teste
-        resultado = self.service.processar_execucoes_agendadas()
-        
-        # Verificações
-        mock_processar_agendamentos.assert_called_once()
-        assert resultado == resultado_esperado
-    
-    @patch('backend.app.services.execucao_service.AgendamentoService.processar_agendamentos')
-    def test_processar_execucoes_agendadas_sem_pendencias(self, mock_processar_agendamentos):
-        """Testa comportamento quando não há agendamentos pendentes."""
-        # Mock sem pendências
-        mock_processar_agendamentos.return_value = None
-        
-        # Executar teste
-        resultado = self.service.processar_execucoes_agendadas()
-        
-        # Verificações
-        assert resultado is None
+    def test_processar_execucoes_agendadas_executa_linhas_vencidas(self):
+        """Testa se as linhas vencidas de execucoes_agendadas são executadas e fechadas."""
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            passado = datetime.utcnow() - timedelta(minutes=1)
+            vencida = ExecucaoAgendada(categoria_id=1, palavras_chave=json.dumps(['seo']), data_agendada=passado)
+            invalida = ExecucaoAgendada(categoria_id=2, palavras_chave='seo', data_agendada=passado)
+            futura = ExecucaoAgendada(
+                categoria_id=3, palavras_chave=json.dumps(['ads']),
+                data_agendada=datetime.utcnow() + timedelta(hours=1)
+            )
+            db.session.add_all([vencida, invalida, futura])
+            db.session.commit()
+            
+            concluidas = []
+            self.service.on_execucao_agendada_concluida = (
+                lambda agendada, duracao: concluidas.append((agendada.id, agendada.status))
+            )
+            with patch.object(self.service, 'executar_prompt_individual',
+                              return_value={'execucao_id': 10}) as mock_executar:
+                resultado = self.service.processar_execucoes_agendadas()
+            
+            mock_executar.assert_called_once_with(1, ['seo'], None)
+            assert resultado['total_processadas'] == 2
+            assert concluidas == [(vencida.id, 'concluida'), (invalida.id, 'erro')]
+            assert db.session.get(ExecucaoAgendada, futura.id).status == 'pendente'
+            assert db.session.get(ExecucaoAgendada, vencida.id).executado_em is not None
+            
+            # Linhas já executadas não são reprocessadas
+            assert self.service.processar_execucoes_agendadas() is None
+            db.session.remove()
+            db.drop_all()
     
     @patch('backend.app.services.execucao_service.ValidacaoExecucaoService.validar_execucao_completa')
     @patch('backend.app.services.execucao_service.PromptService.processar_prompt_completo')
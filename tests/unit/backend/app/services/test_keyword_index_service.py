@@ -0,0 +1,116 @@
+"""
+Testes do índice normalizado de palavras-chave das execuções (termos / execucao_keywords).
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+
+from backend.app.models import Categoria, Execucao, ExecucaoKeyword, Nicho, Termo, db
+from backend.app.services.keyword_index_service import (
+    categorias_por_termo,
+    execucoes_por_termo,
+    indexar_palavras_chave,
+    normalizar_termo,
+    obter_ids_termos,
+    top_termos_por_nicho,
+)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _categoria(nicho, nome):
+    categoria = Categoria(nome=nome, nicho=nicho, perfil_cliente='pme', cluster='geral', prompt_path='p.txt')
+    db.session.add(categoria)
+    return categoria
+
+
+def _executar(categoria, palavras, data):
+    execucao = Execucao(
+        categoria=categoria, palavras_chave=json.dumps(palavras), cluster_usado='geral',
+        prompt_usado='p.txt', status='executado', data_execucao=data
+    )
+    db.session.add(execucao)
+    indexar_palavras_chave(execucao, palavras)
+    db.session.commit()
+    return execucao
+
+
+def test_termos_sao_normalizados_e_gravados_uma_vez(app):
+    assert normalizar_termo('  Marketing   Digital ') == 'marketing digital'
+
+    ids = obter_ids_termos(['SEO', 'seo ', 'ads'])
+    assert set(ids) == {'seo', 'ads'}
+    assert obter_ids_termos(['Ads']) == {'ads': ids['ads']}
+    assert Termo.query.count() == 2
+
+
+def test_busca_por_termo_e_top_termos_por_nicho(app):
+    saude, tech = Nicho(nome='saude'), Nicho(nome='tech')
+    nutricao, fitness, devops = _categoria(saude, 'nutricao'), _categoria(saude, 'fitness'), _categoria(tech, 'devops')
+
+    antiga = _executar(nutricao, ['Dieta', 'proteina'], datetime(2025, 1, 5))
+    _executar(nutricao, ['dieta', 'Dieta', 'jejum'], datetime(2025, 2, 1))
+    _executar(fitness, ['dieta', 'treino'], datetime(2025, 2, 10))
+    _executar(devops, ['kubernetes', 'treino'], datetime(2025, 2, 11))
+
+    assert [k.posicao for k in antiga.keywords] == [0, 1]
+    assert ExecucaoKeyword.query.count() == 8
+
+    execucoes = execucoes_por_termo('DIETA')
+    assert [e['id_categoria'] for e in execucoes] == [fitness.id, nutricao.id, nutricao.id]
+    assert execucoes_por_termo('dieta', data_inicio=datetime(2025, 2, 5))[0]['id_categoria'] == fitness.id
+    assert execucoes_por_termo('inexistente') == []
+
+    categorias = categorias_por_termo('treino')
+    assert {c['nome']: c['execucoes'] for c in categorias} == {'fitness': 1, 'devops': 1}
+
+    top = top_termos_por_nicho(saude.id, data_inicio=datetime(2025, 2, 1))
+    assert top == [
+        {'termo': 'dieta', 'execucoes': 2},
+        {'termo': 'jejum', 'execucoes': 1},
+        {'termo': 'treino', 'execucoes': 1},
+    ]
+    assert top_termos_por_nicho(saude.id, limit=1) == [{'termo': 'dieta', 'execucoes': 3}]
+
+
+def test_termo_criado_por_outro_processo_durante_insercao(tmp_path, monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'termos.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        outro_processo = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+        begin_nested = db.session.begin_nested
+        inseridos = []
+
+        def begin_nested_concorrente():
+            # Entre a leitura e a inserção, outro processo grava 'b' e faz commit
+            if not inseridos:
+                with outro_processo.begin() as conexao:
+                    conexao.execute(Termo.__table__.insert().values(termo='b'))
+                inseridos.append('b')
+            return begin_nested()
+
+        monkeypatch.setattr(db.session, 'begin_nested', begin_nested_concorrente)
+        try:
+            ids = obter_ids_termos(['a', 'b'])
+            assert set(ids) == {'a', 'b'}
+            assert Termo.query.count() == 2
+        finally:
+            db.session.remove()
+            db.drop_all()
+            outro_processo.dispose()
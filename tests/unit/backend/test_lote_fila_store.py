@@ -0,0 +1,191 @@
+"""
+Testes unitários para a fila durável de lotes (LoteFilaStore) e os workers
+do LoteExecucaoService.
+"""
+
+import contextlib
+import time
+
+import pytest
+
+from backend.app.services.lote_fila_store import LoteFilaStore
+from backend.app.services.lote_execucao_service import LoteExecucaoService
+
+
+ITENS = [
+    {'categoria_id': 1, 'palavras_chave': ['kw1'], 'cluster': 'A'},
+    {'categoria_id': 2, 'palavras_chave': ['kw2', 'kw3'], 'cluster': None},
+    {'categoria_id': 3, 'palavras_chave': ['kw4'], 'cluster': 'C'},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LoteFilaStore(str(tmp_path / 'fila.db'))
+
+
+def aguardar(condicao, timeout=5.0):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestLoteFilaStore:
+
+    def test_criar_lote_persiste_itens_pendentes(self, store, tmp_path):
+        id_lote = store.criar_lote(ITENS)
+        # Nova instância sobre o mesmo arquivo enxerga o lote (durabilidade)
+        status = LoteFilaStore(str(tmp_path / 'fila.db')).obter_status(id_lote)
+        assert status['total'] == 3
+        assert status['pendentes'] == 3
+        assert status['progresso'] == 0
+        assert [item['categoria_id'] for item in status['itens']] == [1, 2, 3]
+
+    def test_reserva_respeita_prioridade_e_ordem(self, store):
+        baixo = store.criar_lote(ITENS[:1], prioridade=1)
+        alto = store.criar_lote(ITENS[1:], prioridade=9)
+        ordem = [store.reservar_item('w')['id_lote'] for _ in range(3)]
+        assert ordem == [alto, alto, baixo]
+        assert store.reservar_item('w') is None
+
+    def test_reserva_respeita_max_concurrent_do_lote(self, store):
+        store.criar_lote(ITENS, max_concurrent=1)
+        primeiro = store.reservar_item('w1')
+        assert store.reservar_item('w2') is None
+        store.concluir_item(primeiro['id'], 'w1', execucao_id=10, tempo_real=0.1)
+        assert store.reservar_item('w2') is not None
+
+    def test_lease_expirado_volta_para_fila(self, store):
+        id_lote = store.criar_lote(ITENS[:1])
+        store.reservar_item('w1', lease_segundos=-1)
+        item = store.reservar_item('w2')
+        assert item is not None and item['id_lote'] == id_lote
+
+    def test_lease_expirado_conta_tentativa_ate_falhar(self, store):
+        id_lote = store.criar_lote(ITENS[:1], max_tentativas=2)
+        store.reservar_item('w1', lease_segundos=-1)
+        item = store.reservar_item('w2', lease_segundos=-1)
+        assert item['tentativas'] == 1
+        # Segundo lease expirado esgota as tentativas
+        assert store.reservar_item('w3') is None
+        status = store.obter_status(id_lote)
+        assert status['status'] == 'falhou'
+        assert status['itens'][0]['status'] == 'erro'
+        assert status['itens'][0]['tentativas'] == 2
+        assert 'Lease expirado' in status['itens'][0]['erro']
+
+    def test_worker_sem_lease_nao_sobrescreve_resultado(self, store):
+        id_lote = store.criar_lote(ITENS[:1])
+        lento = store.reservar_item('lento', lease_segundos=-1)
+        atual = store.reservar_item('atual')
+        assert atual['id'] == lento['id']
+
+        assert store.concluir_item(lento['id'], 'lento', execucao_id=1) is False
+        assert store.falhar_item(lento['id'], 'lento', 'timeout') is None
+        assert store.concluir_item(atual['id'], 'atual', execucao_id=2) is True
+        assert store.concluir_item(atual['id'], 'lento', execucao_id=1) is False
+
+        status = store.obter_status(id_lote)
+        assert status['status'] == 'concluido'
+        assert status['itens'][0]['execucao_id'] == 2
+        assert status['itens'][0]['tentativas'] == 1
+
+    def test_falha_reagenda_ate_esgotar_tentativas(self, store):
+        id_lote = store.criar_lote(ITENS[:1], max_tentativas=2)
+        item = store.reservar_item('w')
+        assert store.falhar_item(item['id'], 'w', 'timeout', retry_delay=0) is True
+        item = store.reservar_item('w')
+        assert store.falhar_item(item['id'], 'w', 'timeout', retry_delay=0) is False
+        status = store.obter_status(id_lote)
+        assert status['erros'] == 1
+        assert status['status'] == 'falhou'
+        assert status['itens'][0]['tentativas'] == 2
+
+    def test_lote_concluido_e_cancelamento(self, store):
+        id_lote = store.criar_lote(ITENS[:1])
+        item = store.reservar_item('w')
+        store.concluir_item(item['id'], 'w', execucao_id=7, tempo_real=0.5)
+        status = store.obter_status(id_lote)
+        assert status['status'] == 'concluido'
+        assert status['progresso'] == 100
+        assert status['itens'][0]['execucao_id'] == 7
+
+        cancelado = store.criar_lote(ITENS)
+        assert store.cancelar_lote(cancelado) is True
+        assert store.reservar_item('w') is None
+        assert store.obter_status(cancelado)['cancelados'] == 3
+
+    def test_lote_inexistente(self, store):
+        assert store.obter_status('nao-existe') is None
+
+
+class TestLoteExecucaoServiceFila:
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        executados = []
+
+        def executor(item):
+            executados.append(item['categoria_id'])
+            if item['categoria_id'] == 2:
+                return {'erro': 'categoria inválida'}
+            return {'execucao_id': 100 + item['categoria_id'], 'tempo_real': 0.01}
+
+        service = LoteExecucaoService({
+            'fila_db_path': str(tmp_path / 'fila.db'),
+            'workers_fila': 2,
+            'intervalo_polling': 0.01,
+            'retry_delay': 0,
+            'max_tentativas': 1,
+            'executor_item': executor
+        })
+        service.executados = executados
+        yield service
+        service.stop_processing()
+
+    def test_processar_lote_retorna_id_e_workers_concluem(self, service):
+        resposta = service.processar_lote(ITENS, prioridade=5, max_concurrent=2)
+        assert resposta['status'] == 'enfileirado'
+        assert resposta['total'] == 3
+
+        id_lote = resposta['id_lote']
+        assert aguardar(lambda: service.obter_status_fila(id_lote)['status'] in ('concluido', 'falhou'))
+        status = service.obter_status_fila(id_lote)
+        assert status['concluidos'] == 2
+        assert status['erros'] == 1
+        assert sorted(service.executados) == [1, 2, 3]
+        assert service.obter_estatisticas()['itens_fila_processados'] == 2
+
+    def test_sem_executor_itens_recuperados_aguardam_sem_gastar_tentativas(self, tmp_path):
+        caminho = str(tmp_path / 'fila.db')
+        id_lote = LoteFilaStore(caminho).criar_lote(ITENS[:1])
+
+        sem_executor = LoteExecucaoService({'fila_db_path': caminho, 'intervalo_polling': 0.01})
+        time.sleep(0.1)
+        sem_executor.stop_processing()
+        assert sem_executor.worker_threads == []
+        status = LoteFilaStore(caminho).obter_status(id_lote)
+        assert status['pendentes'] == 1
+        assert status['itens'][0]['tentativas'] == 0
+
+        contextos = []
+
+        class App:
+            def app_context(self):
+                contextos.append('app')
+                return contextlib.nullcontext()
+
+        service = LoteExecucaoService({
+            'fila_db_path': caminho,
+            'intervalo_polling': 0.01,
+            'executor_item': lambda item: {'execucao_id': 1, 'tempo_real': 0.01},
+            'app': App()
+        })
+        try:
+            assert aguardar(lambda: service.obter_status_fila(id_lote)['status'] == 'concluido')
+            assert contextos == ['app']
+        finally:
+            service.stop_processing()
@@ -0,0 +1,84 @@
+"""
+Testes Unitários: KeywordBatch (representação colunar)
+Tracing ID: TEST_KEYWORD_BATCH_001
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from domain.keyword_batch import KeywordBatch, CODIGO_INTENCAO
+from domain.models import Keyword, IntencaoBusca
+from infrastructure.processamento.normalizador_keywords import NormalizadorKeywords
+
+
+@pytest.fixture
+def keywords():
+    intencoes = list(IntencaoBusca)
+    return [
+        Keyword(
+            termo=termo,
+            volume_busca=volume,
+            cpc=1.5 + index,
+            concorrencia=0.1 * index,
+            intencao=intencoes[index % len(intencoes)],
+            score=0.2 * index,
+            justificativa=f"j{index}",
+            fonte="google",
+            data_coleta=datetime(2024, 1, 1 + index),
+            ordem_no_cluster=index - 1,
+            fase_funil="descoberta" if index else "",
+            nome_artigo=f"Artigo{index}" if index else ""
+        )
+        for index, (termo, volume) in enumerate([
+            ("Curso de Python", 100), ("curso de python", 50), ("  Marketing Digital ", 300),
+            ("como investir dinheiro", 0), ("SEO Local", 80)
+        ])
+    ]
+
+
+def test_conversao_ida_e_volta_sem_perda(keywords):
+    batch = KeywordBatch.from_keywords(keywords)
+    assert len(batch) == len(keywords)
+    assert batch.intencao.dtype == np.int8
+    assert batch.intencao[0] == CODIGO_INTENCAO[keywords[0].intencao]
+    for original, convertida in zip(keywords, batch.para_keywords()):
+        assert convertida.__dict__ == original.__dict__
+    for original, convertida in zip(keywords, batch.para_keywords(validar=False)):
+        assert convertida.__dict__ == original.__dict__
+
+
+def test_fatias_sao_views(keywords):
+    batch = KeywordBatch.from_keywords(keywords)
+    fatia = batch[1:3]
+    fatia.score[:] = 9.0
+    assert np.all(batch.score[1:3] == 9.0)
+    assert len(batch[np.array([True, False, True, False, True])]) == 3
+    assert len(KeywordBatch.concatenar([batch, fatia])) == 7
+
+
+def test_from_colunas_e_vazio():
+    batch = KeywordBatch.from_colunas(
+        termo=["a b c", "d e f"], volume_busca=[1, 2], cpc=[0.1, 0.2],
+        concorrencia=[0.3, 0.4], intencao=[IntencaoBusca.COMERCIAL, IntencaoBusca.INFORMACIONAL]
+    )
+    assert batch.intencoes() == [IntencaoBusca.COMERCIAL, IntencaoBusca.INFORMACIONAL]
+    assert len(KeywordBatch.vazio()) == 0
+    with pytest.raises(ValueError):
+        KeywordBatch(**{**batch.__dict__, "cpc": np.zeros(3)})
+
+
+def test_calcular_scores_igual_ao_escalar(keywords):
+    weights = {"volume": 0.5, "cpc": 0.2, "intencao": 0.2, "concorrencia": 0.1}
+    batch = KeywordBatch.from_keywords(keywords)
+    scores = batch.calcular_scores(weights)
+    assert scores.tolist() == [kw.calcular_score(weights) for kw in keywords]
+
+
+@pytest.mark.parametrize("config", [{}, {"remover_acentos": True}, {"case_sensitive": True}])
+def test_normalizar_batch_igual_a_normalizar_lista(keywords, config):
+    normalizador = NormalizadorKeywords(**config)
+    esperado = normalizador.normalizar_lista(keywords)
+    obtido = normalizador.normalizar_batch(KeywordBatch.from_keywords(keywords)).para_keywords()
+    assert [kw.__dict__ for kw in obtido] == [kw.__dict__ for kw in esperado]
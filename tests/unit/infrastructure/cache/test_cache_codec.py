@@ -0,0 +1,171 @@
+"""
+Testes do codec binário de valores do cache.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from domain.models import Cluster, IntencaoBusca, Keyword
+from infrastructure.cache.codec import (
+    COMPRESSAO_NENHUMA,
+    COMPRESSAO_ZLIB,
+    MAGIC,
+    TIPO_CLUSTERS,
+    TIPO_KEYWORDS,
+    TIPO_JSON,
+    VERSAO_FORMATO,
+    BinaryCodec,
+    CompressionPolicy,
+    JsonCodec,
+    benchmark_codecs,
+)
+from infrastructure.cache.intelligent_cache import IntelligentCache
+from infrastructure.cache.tiered_cache import TieredCache
+
+
+def _keywords(quantidade, data_coleta=None):
+    return [
+        Keyword(
+            termo=f"termo-{indice}",
+            volume_busca=indice * 10,
+            cpc=0.5 + indice,
+            concorrencia=0.3,
+            intencao=IntencaoBusca.TRANSACIONAL if indice % 2 else IntencaoBusca.INFORMACIONAL,
+            score=indice / 7,
+            justificativa="ação",
+            fonte="google_suggest",
+            data_coleta=data_coleta,
+            ordem_no_cluster=indice,
+            fase_funil="descoberta"
+        )
+        for indice in range(quantidade)
+    ]
+
+
+def test_lista_de_keywords_ida_e_volta():
+    codec = BinaryCodec()
+    keywords = _keywords(40, data_coleta=datetime(2025, 1, 27, 10, 30, 0, 123456))
+
+    dados = codec.encode(keywords)
+    assert dados[1] == VERSAO_FORMATO
+    assert dados[2] == TIPO_KEYWORDS
+    assert [keyword.__dict__ for keyword in codec.decode(dados)] == [keyword.__dict__ for keyword in keywords]
+    assert len(dados) < len(JsonCodec().encode(keywords)) / 4
+
+
+def test_clusters_ida_e_volta():
+    codec = BinaryCodec()
+    keywords = _keywords(8)
+    clusters = [
+        Cluster(id="c1", keywords=keywords[:4], similaridade_media=0.9, fase_funil="descoberta",
+                categoria="saude", blog_dominio="blog.exemplo.com"),
+        Cluster(id="c2", keywords=keywords[4:], similaridade_media=0.7, fase_funil="descoberta",
+                categoria="saude", blog_dominio="blog.exemplo.com", prompt_gerado="prompt")
+    ]
+
+    dados = codec.encode(clusters)
+    decodificados = codec.decode(dados)
+    assert dados[2] == TIPO_CLUSTERS
+    assert [c.id for c in decodificados] == ["c1", "c2"]
+    assert decodificados[0].prompt_gerado is None
+    assert decodificados[1].prompt_gerado == "prompt"
+    assert decodificados[0].data_criacao == clusters[0].data_criacao
+    assert [k.termo for k in decodificados[1].keywords] == [k.termo for k in keywords[4:]]
+
+
+def test_campos_de_texto_none_ida_e_volta():
+    codec = BinaryCodec()
+    keywords = _keywords(4)
+    for keyword in keywords:
+        keyword.justificativa = keyword.fonte = keyword.fase_funil = keyword.nome_artigo = None
+    cluster = Cluster(id="c1", keywords=keywords, similaridade_media=0.9, fase_funil="descoberta",
+                      categoria="saude", blog_dominio="blog.exemplo.com")
+    cluster.categoria = cluster.blog_dominio = cluster.status_geracao = None
+
+    assert [k.__dict__ for k in codec.decode(codec.encode(keywords))] == [k.__dict__ for k in keywords]
+    decodificado = codec.decode(codec.encode([cluster]))[0]
+    assert decodificado.categoria is None
+    assert decodificado.blog_dominio is None
+    assert decodificado.status_geracao is None
+    assert [k.__dict__ for k in decodificado.keywords] == [k.__dict__ for k in keywords]
+
+
+def test_array_numpy_preserva_dtype_shape_e_ordem_de_bytes():
+    codec = BinaryCodec()
+    embeddings = np.arange(24, dtype=">f4").reshape(2, 3, 4)
+
+    dados = codec.encode(embeddings)
+    decodificado = codec.decode(dados)
+    assert dados[3] == COMPRESSAO_NENHUMA
+    assert decodificado.shape == (2, 3, 4)
+    assert decodificado.dtype == np.dtype("<f4")
+    assert np.array_equal(decodificado, embeddings)
+    assert decodificado.flags.writeable
+
+
+def test_valores_fora_do_formato_usam_json():
+    codec = BinaryCodec()
+    com_fuso = _keywords(2, data_coleta=datetime(2025, 1, 27, tzinfo=timezone.utc))
+
+    assert codec.encode({"a": 1})[2] == TIPO_JSON
+    assert codec.decode(codec.encode({"a": [1, "b"]})) == {"a": [1, "b"]}
+    assert codec.encode(com_fuso)[2] == TIPO_JSON
+    assert codec.decode(codec.encode(com_fuso))[0].data_coleta == com_fuso[0].data_coleta
+
+
+def test_tipos_sem_representacao_sao_recusados():
+    class Qualquer:
+        pass
+
+    with pytest.raises(TypeError):
+        BinaryCodec().encode(Qualquer())
+    with pytest.raises(TypeError):
+        BinaryCodec().encode({"quando": datetime(2025, 1, 27)})
+
+
+def test_payload_pickle_nao_e_executado():
+    import pickle
+
+    dados = bytes([MAGIC, VERSAO_FORMATO, 0, COMPRESSAO_NENHUMA]) + pickle.dumps({"a": 1})
+    with pytest.raises(ValueError):
+        BinaryCodec().decode(dados)
+    with pytest.raises(ValueError):
+        BinaryCodec().decode(bytes([MAGIC, VERSAO_FORMATO + 1, TIPO_JSON, COMPRESSAO_NENHUMA]) + b"{}")
+
+
+def test_valores_legados_em_json_sao_lidos():
+    assert BinaryCodec().decode(json.dumps({"a": 1}).encode("utf-8")) == {"a": 1}
+
+
+def test_compressao_escolhida_pelo_tamanho():
+    codec = BinaryCodec(CompressionPolicy(min_bytes=256))
+
+    assert codec.encode("x" * 100)[3] == COMPRESSAO_NENHUMA
+    assert codec.encode("x" * 5000)[3] == COMPRESSAO_ZLIB
+    assert codec.decode(codec.encode("x" * 5000)) == "x" * 5000
+    assert BinaryCodec(CompressionPolicy(enabled=False)).encode("x" * 5000)[3] == COMPRESSAO_NENHUMA
+
+
+def test_cache_em_camadas_e_intelligent_cache_usam_o_codec():
+    cache = TieredCache()
+    keywords = _keywords(3)
+    _, valor = cache.unpack(cache.pack(keywords, None))
+    assert [k.termo for k in valor] == [k.termo for k in keywords]
+
+    inteligente = IntelligentCache(redis_url="", max_size=10, auto_cleanup=False)
+    assert BinaryCodec.is_encoded(inteligente._serialize_value({"a": 1}))
+    # Valores gravados no Redis antes do codec continuam legíveis
+    assert inteligente._deserialize_value(json.dumps({"a": 1})) == {"a": 1}
+
+
+def test_benchmark_reporta_bytes_por_keyword_e_vazao():
+    resultado = benchmark_codecs(n_keywords=50, n_embeddings=4, dimensao_embedding=8, repeticoes=1)
+
+    assert set(resultado) == {"keywords", "clusters", "embeddings"}
+    assert set(resultado["keywords"]) == {"json", "binary"}
+    binario = resultado["keywords"]["binary"]
+    assert binario["bytes_por_item"] < resultado["keywords"]["json"]["bytes_por_item"]
+    assert binario["encode_itens_s"] > 0 and binario["decode_mb_s"] > 0
@@ -0,0 +1,139 @@
+"""
+Testes do motor de eviction do IntelligentCache (LFU O(1), W-TinyLFU,
+orçamento em bytes, índice de tags e timer wheel).
+"""
+
+import threading
+import time
+
+import pytest
+
+from infrastructure.cache.eviction_engine import EvictionEngine, LFUIndex, TimerWheel
+from infrastructure.cache.intelligent_cache import (
+    CacheStrategy,
+    IntelligentCache,
+    benchmark_eviction
+)
+
+
+def _cache(**kwargs):
+    params = {"redis_url": "", "max_size": 100, "auto_cleanup": False}
+    params.update(kwargs)
+    return IntelligentCache(**params)
+
+
+def test_lfu_index_vitima_menor_frequencia_com_desempate_lru():
+    indice = LFUIndex()
+    for chave in ["a", "b", "c"]:
+        indice.add(chave)
+    indice.touch("a")
+    indice.touch("c")
+
+    assert indice.victim() == "b"
+    indice.remove("b")
+    assert indice.victim() == "a"  # a e c com frequência 2; a é o mais antigo
+
+
+def test_timer_wheel_expira_apenas_prazos_vencidos():
+    agora = time.time()
+    roda = TimerWheel(tick=1.0, slots=8)
+    roda.schedule("curto", agora + 1)
+    roda.schedule("longo", agora + 20)  # Mais de uma volta da roda
+
+    assert roda.advance(agora + 2) == ["curto"]
+    assert roda.advance(agora + 10) == []
+    assert roda.advance(agora + 21) == ["longo"]
+    assert len(roda) == 0
+
+
+def test_w_tinylfu_protege_chaves_frequentes_de_varredura():
+    motor = EvictionEngine(max_entries=100, policy="w-tinylfu")
+    for indice in range(100):
+        motor.insert(f"quente{indice}", 1)
+    for _ in range(5):
+        for indice in range(100):
+            motor.record_access(f"quente{indice}")
+
+    # Varredura de chaves acessadas uma única vez
+    for indice in range(1000):
+        motor.insert(f"frio{indice}", 1)
+
+    quentes = sum(1 for indice in range(100) if f"quente{indice}" in motor)
+    assert len(motor) == 100
+    assert quentes >= 95
+    assert motor.admission_rejections > 0
+
+
+def test_orcamento_em_bytes_respeita_max_memory_mb():
+    cache = _cache(max_size=1000, max_memory_mb=0.01, strategy=CacheStrategy.LRU)  # ~10 KB
+    valor = "x" * 1000
+
+    for indice in range(50):
+        cache.set(f"chave{indice}", valor, ttl=60)
+
+    metricas = cache.get_metrics()
+    assert metricas["l1_bytes"] <= metricas["max_bytes"]
+    assert metricas["l1_size"] < 50
+    assert cache.get("chave49") == valor
+    assert cache.get("chave0") is None
+    assert cache._set_l1("cache:enorme", "y" * 20000) is False
+
+
+def test_invalidate_by_tag_usa_indice_secundario():
+    cache = _cache()
+    cache.set("a", 1, ttl=60, tags=["nicho:saude"])
+    cache.set("b", 2, ttl=60, tags=["nicho:saude", "fonte:google"])
+    cache.set("c", 3, ttl=60, tags=["fonte:google"])
+
+    assert cache.invalidate_by_tag("nicho:saude") == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache._eviction.keys_for_tag("fonte:google") == ["cache:c"]
+
+
+def test_cleanup_expired_remove_itens_pelo_timer_wheel(monkeypatch):
+    cache = _cache()
+    cache.set("expira", 1, ttl=1)
+    cache.set("fica", 2, ttl=3600)
+
+    agora = time.time
+    monkeypatch.setattr(time, "time", lambda: agora() + 2)
+    cache._cleanup_expired()
+
+    assert "cache:expira" not in cache.l1_cache
+    assert cache.get("fica") == 2
+    assert cache.get_stats()["eviction"]["scheduled_timers"] == 1
+
+
+def test_acesso_concorrente_mantem_l1_e_motor_consistentes():
+    cache = _cache(max_size=50, strategy=CacheStrategy.LFU)
+    erros = []
+
+    def trabalhar(base):
+        try:
+            for indice in range(500):
+                cache.set(f"k{(base + indice) % 120}", indice, ttl=60, tags=[f"t{indice % 3}"])
+                cache.get(f"k{indice % 120}")
+                if indice % 100 == 0:
+                    cache.invalidate_by_tag("t1")
+                    cache._cleanup_expired()
+        except Exception as e:  # pragma: no cover - falha do teste
+            erros.append(e)
+
+    threads = [threading.Thread(target=trabalhar, args=(base,)) for base in range(0, 80, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    assert len(cache.l1_cache) == len(cache._eviction) <= 50
+    assert set(cache.l1_cache) == set(cache._eviction.sizes)
+
+
+def test_benchmark_eviction_custo_estavel():
+    resultado = benchmark_eviction(tamanhos=(500, 20_000), operacoes=2_000)
+
+    assert set(resultado["por_tamanho"]) == {500, 20_000}
+    assert resultado["crescimento_set"] < 5
+    assert resultado["crescimento_get"] < 5
@@ -0,0 +1,119 @@
+"""
+Testes do store local (substituto do Redis em um host) e da sua integração
+com os caches.
+"""
+
+import multiprocessing
+import time
+
+import pytest
+
+from infrastructure.cache.intelligent_cache import IntelligentCache
+from infrastructure.cache.local_store import (
+    LocalRedisStore,
+    LocalStoreError,
+    LocalStoreTier,
+    connect_redis,
+)
+from infrastructure.cache.tiered_cache import TieredCache
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalRedisStore(str(tmp_path / "cache.sqlite3"))
+
+
+def test_operacoes_de_string_com_ttl(store):
+    assert store.set("a", "valor")
+    assert store.get("a") == b"valor"
+    assert store.ttl("a") == -1
+    assert store.setex("b", 60, b"x")
+    assert 0 < store.ttl("b") <= 60
+    assert store.set("a", "outro", nx=True) is None
+    assert store.set("c", 1, xx=True) is None
+    assert store.exists("a", "b", "c") == 2
+    assert sorted(store.keys("*")) == [b"a", b"b"]
+    assert store.delete("a", "c") == 1
+    assert store.ttl("a") == -2
+
+
+def test_chave_expirada_some(store):
+    store.set("a", "valor", px=10)
+    time.sleep(0.05)
+    assert store.get("a") is None
+    assert store.keys() == []
+    assert store.purge_expired() == 1
+
+
+def test_incr_e_conjuntos(store):
+    assert store.incr("contador") == 1
+    assert store.incrby("contador", 5) == 6
+    assert store.get("contador") == b"6"
+    store.set("texto", "abc")
+    with pytest.raises(LocalStoreError):
+        store.incr("texto")
+
+    assert store.sadd("tags:x", "k1", "k2", "k1") == 2
+    assert store.smembers("tags:x") == {b"k1", b"k2"}
+    assert store.srem("tags:x", "k1") == 1
+    assert store.delete("tags:x") == 1
+
+
+def test_decode_responses(tmp_path):
+    store = LocalRedisStore.from_url(f"sqlite:///{tmp_path}/c.sqlite3", decode_responses=True)
+    store.set("chave", "ação")
+    assert store.get("chave") == "ação"
+    assert store.keys("ch*") == ["chave"]
+
+
+def _incrementar(path, vezes):
+    store = LocalRedisStore(path)
+    for _ in range(vezes):
+        store.incr("quota")
+
+
+def test_contador_compartilhado_entre_processos(store):
+    contexto = multiprocessing.get_context("fork")
+    processos = [contexto.Process(target=_incrementar, args=(store.path, 50)) for _ in range(4)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join(30)
+
+    assert all(processo.exitcode == 0 for processo in processos)
+    assert store.get("quota") == b"200"
+
+
+def test_fallback_quando_redis_nao_responde(tmp_path, monkeypatch):
+    def redis_fora(url, decode_responses=False):
+        raise ConnectionError("sem redis")
+
+    with pytest.raises(ConnectionError):
+        connect_redis("redis://localhost:1", factory=redis_fora)
+
+    monkeypatch.setenv("CACHE_LOCAL_STORE_PATH", str(tmp_path / "fallback.sqlite3"))
+    cliente = connect_redis("redis://localhost:1", factory=redis_fora)
+    assert isinstance(cliente, LocalRedisStore)
+    assert connect_redis("redis://localhost:1", factory=redis_fora) is cliente
+
+
+def test_caches_compartilham_o_l2_local(tmp_path):
+    url = f"sqlite:///{tmp_path}/l2.sqlite3"
+    primeiro = IntelligentCache(redis_url=url, max_size=10, auto_cleanup=False)
+    segundo = IntelligentCache(redis_url=url, max_size=10, auto_cleanup=False)
+    assert primeiro.l2_enabled and segundo.l2_enabled
+
+    primeiro.set("coleta", {"termos": ["a", "b"]}, ttl=60)
+    assert segundo.get("coleta") == {"termos": ["a", "b"]}
+
+    tier = LocalStoreTier(LocalRedisStore.from_url(url))
+    cache = TieredCache(l2=tier)
+    cache.namespace("coletores").set("x", [1, 2], ttl=60)
+    assert TieredCache(l2=tier).namespace("coletores").get("x") == [1, 2]
+    assert cache.namespace("coletores").invalidate_pattern("*") == 1
+    assert tier.client.keys("tiered:coletores:*") == []
+
+    # Chave gravada por outro processo (ausente deste L1) também sai do L2
+    TieredCache(l2=tier).namespace("coletores").set("kw:y", [3], ttl=60)
+    assert cache.namespace("coletores").invalidate_pattern("kw:*") == 1
+    assert tier.client.keys("tiered:coletores:*") == []
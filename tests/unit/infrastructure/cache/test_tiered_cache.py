@@ -0,0 +1,184 @@
+"""
+Testes do cache em camadas unificado (namespaces, níveis inferiores e
+registro global de métricas).
+"""
+
+import fnmatch
+import gc
+import time
+
+from infrastructure.cache.advanced_caching import AdvancedCaching, CacheConfig, CacheLevel
+from infrastructure.cache.intelligent_cache import IntelligentCache
+from infrastructure.cache.tiered_cache import CacheTier, TieredCache, set_tiered_cache
+
+
+class TierMemoria(CacheTier):
+    """Nível inferior em dicionário, com a interface de CacheTier."""
+
+    name = "memoria"
+
+    def __init__(self):
+        self.dados = {}
+
+    def get(self, key):
+        return self.dados.get(key)
+
+    def set(self, key, data, ttl=None):
+        self.dados[key] = data
+        return True
+
+    def delete(self, key):
+        return self.dados.pop(key, None) is not None
+
+    def delete_prefix(self, prefix):
+        chaves = [key for key in self.dados if key.startswith(prefix)]
+        for key in chaves:
+            del self.dados[key]
+        return len(chaves)
+
+    def delete_matching(self, pattern, predicate=None):
+        chaves = [
+            key for key in self.dados
+            if fnmatch.fnmatchcase(key, pattern) and (predicate is None or predicate(key))
+        ]
+        for key in chaves:
+            del self.dados[key]
+        return chaves
+
+
+def test_namespace_nomeado_e_compartilhado_e_grava_nos_niveis_inferiores():
+    l2 = TierMemoria()
+    cache = TieredCache(l2=l2)
+    keywords = cache.namespace("keywords")
+
+    assert cache.namespace("keywords") is keywords
+    assert keywords.set("python", {"volume": 100}, ttl=60)
+    assert "keywords:python" in l2.dados
+
+    # Outro processo (novo L1) lê do L2 e promove para o L1 com o TTL restante
+    outro = TieredCache(l2=l2).namespace("keywords")
+    assert outro.get("python") == {"volume": 100}
+    assert outro.get_stats()["hits"] == {"l1": 0, "l2": 1, "l3": 0}
+    assert 0 < outro.ttl_remaining("python") <= 60
+    assert outro.get("python") == {"volume": 100}
+    assert outro.get_stats()["hits"]["l1"] == 1
+
+
+def test_valor_expirado_no_nivel_inferior_e_miss():
+    l2 = TierMemoria()
+    cache = TieredCache(l2=l2)
+    cache.namespace("sessoes").set("a", 1, ttl=60)
+    l2.dados["sessoes:a"] = cache.pack(1, time.time() - 1)
+
+    assert TieredCache(l2=l2).namespace("sessoes").get("a", "ausente") == "ausente"
+
+
+def test_valor_sem_representacao_no_codec_fica_so_no_l1():
+    l2 = TierMemoria()
+    objetos = TieredCache(l2=l2).namespace("objetos")
+    valor = object()
+
+    assert objetos.set("a", valor)
+    assert objetos.get("a") is valor
+    assert l2.dados == {}
+
+
+def test_namespace_anonimo_fica_so_no_l1_e_sai_do_registro():
+    l2 = TierMemoria()
+    cache = TieredCache(l2=l2)
+    anonimo = cache.namespace(prefix="teste", max_entries=2, policy="lru")
+    anonimo.set("a", 1)
+    anonimo.set("b", 2)
+    anonimo.set("c", 3)
+
+    assert anonimo.name.startswith("teste#")
+    assert not l2.dados
+    assert anonimo.keys() == ["b", "c"]
+    assert anonimo.get_stats()["evictions"] == 1
+    assert anonimo.name in cache.namespaces()
+
+    nome = anonimo.name
+    del anonimo
+    gc.collect()
+    assert nome not in cache.namespaces()
+
+
+def test_invalidacao_por_tag_padrao_e_predicado():
+    cache = TieredCache(l2=TierMemoria())
+    ns = cache.namespace("consultas")
+    ns.set("kw:saude:1", 1, tags=["nicho:saude"])
+    ns.set("kw:saude:2", 2, tags=["nicho:saude"])
+    ns.set("kw:tech:1", 3)
+    ns.set("outro", 4)
+
+    assert ns.invalidate_by_tag("nicho:saude") == 2
+    assert ns.invalidate_pattern("kw:*") == 1
+    assert ns.invalidate(lambda key: "out" in key) == 1
+    assert len(ns) == 0
+    assert not cache.l2.dados
+
+
+def test_invalidacao_remove_chaves_gravadas_por_outro_processo():
+    l2 = TierMemoria()
+    TieredCache(l2=l2).namespace("consultas").set("kw:saude:1", 1)
+    TieredCache(l2=l2).namespace("consultas").set("kw:tech:1", 2)
+    TieredCache(l2=l2).namespace("outras").set("kw:saude:1", 3)
+
+    # O L1 deste processo não conhece as chaves; a invalidação varre o L2
+    ns = TieredCache(l2=l2).namespace("consultas")
+    assert ns.invalidate_pattern("kw:saude:*") == 1
+    assert ns.get("kw:saude:1") is None
+    assert ns.invalidate(lambda key: key.endswith(":1")) == 1
+    assert list(l2.dados) == ["outras:kw:saude:1"]
+
+
+def test_get_or_set_calcula_uma_vez():
+    ns = TieredCache().namespace("calculos")
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return 42
+
+    assert ns.get_or_set("x", calcular) == 42
+    assert ns.get_or_set("x", calcular) == 42
+    assert len(chamadas) == 1
+
+
+def test_adaptadores_aparecem_no_registro_global():
+    cache = TieredCache()
+    set_tiered_cache(cache)
+    try:
+        inteligente = IntelligentCache(redis_url="", max_size=10, auto_cleanup=False)
+        avancado = AdvancedCaching(CacheConfig(warming_enabled=False))
+        inteligente.set("a", 1, ttl=60)
+        inteligente.get("a")
+        inteligente.get("b")
+        avancado.set("c", {"valor": 2}, level=CacheLevel.L1)
+        assert avancado.get("c") == {"valor": 2}
+
+        stats = cache.get_stats()
+        nomes = set(stats["namespaces"])
+        assert inteligente.l1_cache.name in nomes
+        assert avancado.l1_cache.name in nomes
+        assert stats["totals"]["hits"]["l1"] == 2
+        assert stats["totals"]["l1_entries"] == 2
+        assert stats["totals"]["l1_bytes"] > 0
+    finally:
+        set_tiered_cache(None)
+
+
+def test_fonte_externa_de_metricas_e_removida_quando_coletada():
+    cache = TieredCache()
+
+    class SoRedis:
+        def get_stats(self):
+            return {"hits": 3}
+
+    instancia = SoRedis()
+    nome = cache.register_metrics_source("redis_only", instancia.get_stats)
+    assert cache.get_stats()["external"] == {nome: {"hits": 3}}
+
+    del instancia
+    gc.collect()
+    assert cache.get_stats()["external"] == {}
@@ -0,0 +1,153 @@
+"""
+Testes do motor de coleta concorrente de KeywordColetorBase.
+"""
+
+import asyncio
+
+import pytest
+
+from domain.models import IntencaoBusca, Keyword
+from infrastructure.coleta.base_keyword import KeywordColetorBase
+from infrastructure.rate_limiting.adaptive_rate_limiter import AsyncTokenBucket
+from shared.cache import AsyncCache
+
+
+class CacheMemoria:
+    """Cache em memória com a interface de CacheDistribuido."""
+
+    def __init__(self):
+        self.dados = {}
+        self.chamadas_get_many = 0
+
+    async def get_many(self, keys):
+        self.chamadas_get_many += 1
+        return {key: self.dados[key] for key in keys if key in self.dados}
+
+    async def set(self, key, value, ttl=None):
+        self.dados[key] = value
+        return True
+
+    async def get_or_fetch(self, key, fetcher, ttl=None):
+        if key not in self.dados:
+            valor = await fetcher()
+            if valor is None:
+                return None
+            self.dados[key] = valor
+        return self.dados[key]
+
+
+class ColetorFake(KeywordColetorBase):
+    """Coletor mínimo que registra concorrência das extrações."""
+
+    def __init__(self, max_concorrencia=3):
+        self.nome = "fake"
+        self.erros = []
+        self.rate_limit = 6000
+        self.min_caracteres = 1
+        self.max_caracteres = 100
+        self.caracteres_permitidos = "abcdefghijklmnopqrstuvwxyz0123456789 "
+        self.max_concorrencia = max_concorrencia
+        self.token_bucket = AsyncTokenBucket(rate=1000, capacity=max_concorrencia)
+        self.metricas_vazao = {
+            "chamadas": 0, "termos": 0, "acertos_cache": 0, "extracoes": 0,
+            "falhas": 0, "tempo_total": 0.0, "tempo_espera_token": 0.0
+        }
+        self.cache = CacheMemoria()
+        self.extraidos = []
+        self.ativos = 0
+        self.pico = 0
+
+    async def extrair_sugestoes(self, termo):
+        return []
+
+    async def extrair_metricas_especificas(self, termo):
+        self.extraidos.append(termo)
+        self.ativos += 1
+        self.pico = max(self.pico, self.ativos)
+        await asyncio.sleep(0.01)
+        self.ativos -= 1
+        if termo == "falha":
+            raise RuntimeError("erro do provedor")
+        return {"volume": 100, "cpc": 1.0, "concorrencia": 0.5, "intencao": "comercial"}
+
+    async def coletar(self, *args, **kwargs):
+        return []
+
+    async def classificar_intencao(self, *args, **kwargs):
+        return IntencaoBusca.INFORMACIONAL
+
+    async def extrair_metricas(self, *args, **kwargs):
+        return {}
+
+
+ColetorFake.__abstractmethods__ = frozenset()
+
+
+@pytest.mark.asyncio
+async def test_extracoes_concorrentes_limitadas_e_ordem_preservada():
+    coletor = ColetorFake(max_concorrencia=3)
+    termos = [f"termo {i}" for i in range(10)]
+
+    keywords = await coletor.coletar_keywords(termos)
+
+    assert [kw.termo for kw in keywords] == termos
+    assert coletor.pico == 3
+    assert coletor.cache.chamadas_get_many == 1
+
+
+@pytest.mark.asyncio
+async def test_acertos_de_cache_nao_consomem_tokens():
+    coletor = ColetorFake()
+    await coletor.coletar_keywords(["alfa", "beta"])
+    tokens_antes = coletor.token_bucket.total_acquired
+
+    keywords = await coletor.coletar_keywords(["alfa", "beta"])
+
+    assert [kw.termo for kw in keywords] == ["alfa", "beta"]
+    assert coletor.token_bucket.total_acquired == tokens_antes
+    assert coletor.extraidos == ["alfa", "beta"]
+    assert keywords[0].intencao == IntencaoBusca.COMERCIAL
+
+
+@pytest.mark.asyncio
+async def test_termos_repetidos_extraidos_uma_vez_e_falhas_isoladas():
+    coletor = ColetorFake()
+
+    keywords = await coletor.coletar_keywords(["gama", "falha", "gama"])
+
+    assert [kw.termo for kw in keywords] == ["gama", "gama"]
+    assert sorted(coletor.extraidos) == ["falha", "gama"]
+    metricas = coletor.obter_metricas_vazao()
+    assert metricas["termos"] == 2
+    assert metricas["extracoes"] == 2
+    assert metricas["falhas"] == 1
+    assert metricas["extracoes_por_segundo"] > 0
+    assert "uso_cota" in metricas
+
+
+def test_token_bucket_compartilhado_por_nome_de_coletor():
+    bucket = KeywordColetorBase._obter_token_bucket("coletor_teste", 60, 1)
+
+    assert KeywordColetorBase._obter_token_bucket("coletor_teste", 60, 1) is bucket
+    assert bucket.rate == 1
+
+
+@pytest.mark.asyncio
+async def test_async_cache_get_many_usa_cache_local():
+    cache = AsyncCache(namespace="teste_get_many")
+    await cache.set("a", {"termo": "a"})
+    await cache.set("b", 2)
+
+    assert await cache.get_many(["a", "b", "c"]) == {"a": {"termo": "a"}, "b": 2}
+    assert cache.get_metrics()["hits"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_acertos_de_cache_sao_reportados_ao_callback():
+    coletor = ColetorFake()
+    await coletor.coletar_keywords(["alfa"])
+    acertos = []
+    coletor.on_cache_hit = acertos.append
+
+    await coletor.coletar_keywords(["alfa", "beta"])
+    assert acertos == [["alfa"]]
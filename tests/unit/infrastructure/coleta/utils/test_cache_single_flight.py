@@ -0,0 +1,106 @@
+"""
+Testes do single-flight e stale-while-revalidate de CacheDistribuido.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from infrastructure.coleta.utils.cache import CacheDistribuido
+
+
+def _chave():
+    return f"teste_sf:{uuid.uuid4().hex}"
+
+
+class Origem:
+    """Fonte externa simulada que conta chamadas."""
+
+    def __init__(self, valor="v1", atraso=0.05, erro=None):
+        self.valor = valor
+        self.atraso = atraso
+        self.erro = erro
+        self.chamadas = 0
+
+    async def buscar(self):
+        self.chamadas += 1
+        await asyncio.sleep(self.atraso)
+        if self.erro:
+            raise self.erro
+        return self.valor
+
+
+@pytest.mark.asyncio
+async def test_misses_concorrentes_compartilham_uma_busca():
+    cache = CacheDistribuido(namespace="teste_sf")
+    origem = Origem()
+    chave = _chave()
+
+    resultados = await asyncio.gather(*(cache.get_or_fetch(chave, origem.buscar) for _ in range(10)))
+
+    assert resultados == ["v1"] * 10
+    assert origem.chamadas == 1
+    metricas = cache.obter_metricas_single_flight()
+    assert metricas["coalescidas"] == 9
+    assert metricas["taxa_coalescencia"] == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_coalescencia_entre_instancias_do_mesmo_namespace():
+    cache_a = CacheDistribuido(namespace="teste_sf")
+    cache_b = CacheDistribuido(namespace="teste_sf")
+    origem = Origem()
+    chave = _chave()
+
+    await asyncio.gather(cache_a.get_or_fetch(chave, origem.buscar), cache_b.get_or_fetch(chave, origem.buscar))
+
+    assert origem.chamadas == 1
+    assert await cache_b.get_or_fetch(chave, origem.buscar) == "v1"
+    assert origem.chamadas == 1
+
+
+@pytest.mark.asyncio
+async def test_erro_propagado_a_todos_e_nao_armazenado():
+    cache = CacheDistribuido(namespace="teste_sf")
+    origem = Origem(erro=RuntimeError("cota excedida"))
+    chave = _chave()
+
+    resultados = await asyncio.gather(
+        *(cache.get_or_fetch(chave, origem.buscar) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert origem.chamadas == 1
+    assert await cache.get(chave) is None
+    assert cache.obter_metricas_single_flight()["erros_busca"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serve_valor_expirado_e_revalida_uma_vez():
+    cache = CacheDistribuido(namespace="teste_sf", janela_stale=60)
+    chave = _chave()
+    await cache.set_com_expiracao(chave, "antigo", ttl=0)
+    origem = Origem(valor="novo")
+
+    resultados = await asyncio.gather(*(cache.get_or_fetch(chave, origem.buscar) for _ in range(5)))
+    assert resultados == ["antigo"] * 5
+    assert await cache.get(chave) is None  # Expirado não é servido por get simples
+
+    await asyncio.sleep(0.1)
+    assert origem.chamadas == 1
+    assert await cache.get_or_fetch(chave, origem.buscar) == "novo"
+    metricas = cache.obter_metricas_single_flight()
+    assert metricas["acertos_stale"] == 5
+    assert metricas["revalidacoes"] == 1
+    assert metricas["taxa_stale"] == pytest.approx(5 / 6)
+
+
+@pytest.mark.asyncio
+async def test_get_many_ignora_envelopes_expirados():
+    cache = CacheDistribuido(namespace="teste_sf", janela_stale=60)
+    fresca, expirada = _chave(), _chave()
+    await cache.set_com_expiracao(fresca, {"termo": "a"}, ttl=60)
+    await cache.set_com_expiracao(expirada, {"termo": "b"}, ttl=0)
+
+    assert await cache.get_many([fresca, expirada]) == {fresca: {"termo": "a"}}
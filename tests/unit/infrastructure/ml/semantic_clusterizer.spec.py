@@ -129,13 +129,20 @@ def test_validacao_consistencia(clusterizador):
     with pytest.raises(ValueError, match="duplicada|duplicidade|repetido|inconsistente"):
         clusterizador.gerar_clusters(kws, blog_dominio="meublog.com")
 
-def test_embeddings_cache(clusterizador):
+def test_embeddings_sem_cache_de_lista(clusterizador):
     kws = [make_keyword(f"kw{index}") for index in range(6)]
-    # Primeira chamada
+    chamadas = []
+
+    def gerar(termos, model_name=None):
+        chamadas.append(list(termos))
+        return mock_embeddings(termos)
+
+    clusterizador.func_gerar_embeddings = gerar
     clusterizador.gerar_clusters(kws, blog_dominio="meublog.com")
-    # Segunda chamada deve usar cache
     clusterizador.gerar_clusters(kws, blog_dominio="meublog.com")
-    assert (json.dumps([key.termo for key in kws], sort_keys=True), clusterizador.modelo_embeddings) in clusterizador._embeddings_cache
+    # Reuso entre chamadas é responsabilidade do store por termo, não do clusterizador
+    assert len(chamadas) == 2
+    assert not hasattr(clusterizador, "_embeddings_cache")
 
 def test_i18n_logs():
     c = ClusterizadorSemantico(func_gerar_embeddings=mock_embeddings, func_similaridade=mock_similaridade, idioma="en")
@@ -0,0 +1,94 @@
+"""
+Testes Unitários para o Store Persistente de Embeddings
+Tracing ID: TEST_EMBEDDING_STORE_001
+"""
+
+import numpy as np
+import pytest
+
+from infrastructure.ml.embedding_store import EmbeddingStore, obter_store
+
+
+class EncoderContador:
+    """Encoder determinístico que registra quantos termos codificou."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.codificados = []
+
+    def __call__(self, termos):
+        self.codificados.extend(termos)
+        return np.array([
+            np.random.default_rng(abs(hash(EmbeddingStore.normalizar_termo(termo))) % 2**32).normal(size=self.dim)
+            for termo in termos
+        ], dtype=np.float32)
+
+
+def test_apenas_termos_novos_sao_codificados(tmp_path):
+    store = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    encoder = EncoderContador()
+    termos = [f"termo {index}" for index in range(100)]
+    primeira = store.obter_ou_gerar(termos, encoder)
+    assert len(encoder.codificados) == 100
+
+    encoder.codificados.clear()
+    termos_novos = termos + [f"novo {index}" for index in range(5)]
+    segunda = store.obter_ou_gerar(termos_novos, encoder)
+    assert encoder.codificados == [f"novo {index}" for index in range(5)]
+    assert np.allclose(segunda[:100], primeira)
+
+
+def test_chave_normalizada_e_deduplicacao(tmp_path):
+    store = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    encoder = EncoderContador()
+    matriz = store.obter_ou_gerar(["Marketing  Digital", "marketing digital", " MARKETING DIGITAL "], encoder)
+    assert len(encoder.codificados) == 1
+    assert np.allclose(matriz[0], matriz[2])
+    assert "marketing digital" in store
+
+
+def test_store_sobrevive_reinicio(tmp_path):
+    encoder = EncoderContador()
+    original = EmbeddingStore("modelo-teste", base_dir=tmp_path).obter_ou_gerar(["a b", "c d"], encoder)
+    reaberto = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    matriz, encontrados = reaberto.buscar(["c d", "e f"])
+    assert encontrados.tolist() == [True, False]
+    assert np.allclose(matriz[0], original[1])
+    assert len(reaberto) == 2
+
+
+def test_modelos_isolados_e_dimensao_validada(tmp_path):
+    store_a = EmbeddingStore("modelo-a", base_dir=tmp_path)
+    store_b = EmbeddingStore("modelo-b", base_dir=tmp_path)
+    store_a.adicionar(["termo"], np.ones((1, 4)))
+    assert "termo" not in store_b
+    with pytest.raises(ValueError):
+        store_a.adicionar(["outro"], np.ones((1, 3)))
+
+
+def test_instancias_compartilhadas_enxergam_escritas(tmp_path):
+    escritor = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    leitor = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    escritor.adicionar(["x"], np.ones((1, 4)))
+    assert "x" in leitor
+    assert obter_store("modelo-teste", base_dir=tmp_path) is obter_store("modelo-teste", base_dir=tmp_path)
+
+
+def test_limpar_e_metricas(tmp_path):
+    store = EmbeddingStore("modelo-teste", base_dir=tmp_path)
+    store.obter_ou_gerar(["a", "b"], EncoderContador())
+    store.buscar(["a", "z"])
+    metricas = store.get_metrics()
+    assert metricas["hits"] == 1 and metricas["total_termos"] == 2
+    store.limpar()
+    assert len(store) == 0
+
+
+def test_acertos_sao_reportados_com_termo_normalizado(tmp_path):
+    store = EmbeddingStore("modelo-x", base_dir=tmp_path)
+    store.adicionar(["Marketing  Digital"], np.ones((1, 4), dtype=np.float32))
+    acertos = []
+    store.on_cache_hit = acertos.append
+
+    store.buscar(["marketing digital", "seo"])
+    assert acertos == [["marketing digital"]]
@@ -0,0 +1,90 @@
+"""
+Testes Unitários para Índices de Vizinhos
+Tracing ID: TEST_INDICE_VIZINHOS_001
+"""
+
+import pytest
+import numpy as np
+
+from infrastructure.ml.indice_vizinhos import (
+    IndiceExatoBlocado,
+    IndiceIVF,
+    criar_indice,
+    comparar_indices,
+)
+from infrastructure.processamento.clusterizador_semantico import ClusterizadorSemantico
+from domain.models import Keyword, IntencaoBusca
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(300, 16)).astype(np.float32)
+
+
+def _top_k_denso(embeddings, k):
+    normalizados = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    sims = normalizados @ normalizados.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1, kind="stable")[:, :k]
+
+
+def test_exato_blocado_igual_matriz_densa(embeddings):
+    indice = IndiceExatoBlocado(tamanho_bloco=37).construir(embeddings)
+    _, idxs = indice.buscar_lote(np.arange(len(embeddings)), 5)
+    esperado = _top_k_denso(embeddings, 5)
+    assert np.array_equal(np.sort(idxs, axis=1), np.sort(esperado, axis=1))
+
+
+def test_exato_respeita_exclusao(embeddings):
+    indice = IndiceExatoBlocado().construir(embeddings)
+    excluir = np.zeros(len(embeddings), dtype=bool)
+    excluir[::2] = True
+    _, idxs = indice.buscar(1, 5, excluir=excluir)
+    assert len(idxs) == 5
+    assert not excluir[idxs].any()
+    assert 1 not in idxs
+
+
+def test_ivf_recall_alto_e_exclusao(embeddings):
+    indice = IndiceIVF(n_listas=10, n_probe=4).construir(embeddings)
+    _, idxs = indice.buscar_lote(np.arange(len(embeddings)), 5)
+    esperado = _top_k_denso(embeddings, 5)
+    recall = np.mean([len(np.intersect1d(a, b)) / 5 for a, b in zip(idxs, esperado)])
+    assert recall > 0.7
+    excluir = np.ones(len(embeddings), dtype=bool)
+    excluir[:3] = False
+    _, idxs = indice.buscar(0, 5, excluir=excluir)
+    assert sorted(idxs.tolist()) == [1, 2]
+
+
+def test_criar_indice_auto():
+    assert criar_indice("auto", total_itens=10, limiar_ann=100).nome == "exato"
+    assert criar_indice("auto", total_itens=1000, limiar_ann=100).nome == "ann"
+    assert criar_indice("auto", total_itens=1000, limiar_ann=100, func_similaridade=np.dot).nome == "exato"
+    with pytest.raises(ValueError):
+        criar_indice("inexistente", total_itens=10)
+
+
+def test_comparar_indices(embeddings):
+    resultado = comparar_indices(embeddings, 5, n_listas=10, n_probe=10)
+    assert resultado["recall_ann"] == 1.0
+    assert "tempo_total" in resultado["exato"] and "tempo_total" in resultado["ann"]
+
+
+def test_clusterizador_sem_heatmap_com_backend_ann(embeddings):
+    kws = [
+        Keyword(termo=f"kw{index}", volume_busca=1000 - index, cpc=1.0, concorrencia=0.5, intencao=IntencaoBusca.INFORMACIONAL)
+        for index in range(len(embeddings))
+    ]
+    clusterizador = ClusterizadorSemantico(
+        func_gerar_embeddings=lambda termos, modelo: embeddings,
+        min_similaridade=-1.0,
+        backend_vizinhos="ann"
+    )
+    resultado = clusterizador.gerar_clusters(kws, blog_dominio="meublog.com")
+    assert resultado["relatorio"]["heatmap_similaridade"] is None
+    assert resultado["relatorio"]["backend_vizinhos"] == "ann"
+    termos = [kw.termo for cluster in resultado["clusters"] for kw in cluster.keywords]
+    assert len(resultado["clusters"]) == len(embeddings) // 6
+    assert len(termos) == len(set(termos))
@@ -0,0 +1,77 @@
+"""
+Testes Unitários para Kernels de Similaridade
+Tracing ID: TEST_KERNELS_SIMILARIDADE_001
+"""
+
+import pytest
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from infrastructure.ml.kernels_similaridade import (
+    normalizar_linhas,
+    compactar_float16,
+    cosseno_um_para_muitos,
+    cosseno_muitos_para_muitos,
+    top_k_cosseno,
+    benchmark_cosseno,
+)
+
+
+@pytest.fixture
+def matrizes():
+    rng = np.random.default_rng(1)
+    return rng.normal(size=(40, 24)), rng.normal(size=(250, 24))
+
+
+def test_normalizar_linhas_mantem_linhas_nulas():
+    normalizados = normalizar_linhas(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert normalizados.dtype == np.float32
+    np.testing.assert_allclose(normalizados, [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+
+
+def test_paridade_com_sklearn(matrizes):
+    consultas, base = matrizes
+    esperado = cosine_similarity(consultas, base)
+    np.testing.assert_allclose(cosseno_muitos_para_muitos(consultas, base), esperado, atol=1e-5)
+    np.testing.assert_allclose(
+        cosseno_muitos_para_muitos(consultas, base, tamanho_bloco=7), esperado, atol=1e-5
+    )
+    np.testing.assert_allclose(cosseno_um_para_muitos(consultas[3], base), esperado[3], atol=1e-5)
+
+
+@pytest.mark.parametrize("tamanho_bloco,tamanho_bloco_base", [(1024, None), (8, None), (8, 33)])
+def test_top_k_igual_a_ordenacao_densa(matrizes, tamanho_bloco, tamanho_bloco_base):
+    consultas, base = matrizes
+    densa = cosine_similarity(consultas, base)
+    sims, idxs = top_k_cosseno(
+        consultas, base, 5, tamanho_bloco=tamanho_bloco, tamanho_bloco_base=tamanho_bloco_base
+    )
+    np.testing.assert_array_equal(idxs, np.argsort(-densa, axis=1, kind="stable")[:, :5])
+    np.testing.assert_allclose(sims, np.take_along_axis(densa, idxs, axis=1), atol=1e-5)
+
+
+def test_top_k_exclui_indices_e_completa_com_marcadores(matrizes):
+    _, base = matrizes
+    consultas = np.arange(10)
+    sims, idxs = top_k_cosseno(base[consultas], base, 3, tamanho_bloco_base=50, excluir_indices=consultas)
+    assert not np.any(idxs == consultas[:, None])
+
+    sims, idxs = top_k_cosseno(base[:2], base[:3], 5, excluir_indices=np.array([0, 1]))
+    assert idxs.shape == (2, 5)
+    assert np.all(idxs[:, 2:] == -1)
+    assert np.all(np.isneginf(sims[:, 2:]))
+
+
+def test_base_float16_dentro_da_tolerancia(matrizes):
+    consultas, base = matrizes
+    base_f16 = compactar_float16(base)
+    assert base_f16.dtype == np.float16
+    sims, _ = top_k_cosseno(normalizar_linhas(consultas), base_f16, 5, normalizados=True)
+    esperado = np.sort(cosine_similarity(consultas, base), axis=1)[:, ::-1][:, :5]
+    np.testing.assert_allclose(sims, esperado, atol=1e-2)
+
+
+def test_benchmark_executa_em_tamanho_reduzido():
+    resultado = benchmark_cosseno(n_consultas=8, n_base=64, dim=16, k=3, pares_amostra=20)
+    assert resultado["memoria_base_float16_bytes"] * 2 == resultado["memoria_base_float32_bytes"]
+    assert resultado["erro_max_float16"] < 1e-2
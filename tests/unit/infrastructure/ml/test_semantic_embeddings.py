@@ -22,6 +22,14 @@ from datetime import datetime, timedelta
 # Importar o sistema a ser testado
 from infrastructure.ml.semantic_embeddings import SemanticEmbeddingService
 
+
+@pytest.fixture(autouse=True)
+def embedding_store_isolado(tmp_path, monkeypatch):
+    """Direciona o store persistente de embeddings para um diretório temporário por teste."""
+    from shared.config import EMBEDDING_STORE_CONFIG
+    monkeypatch.setitem(EMBEDDING_STORE_CONFIG, "dir", str(tmp_path / "embedding_store"))
+
+
 class TestSemanticEmbeddingService:
     """
     Testes para SemanticEmbeddingService.
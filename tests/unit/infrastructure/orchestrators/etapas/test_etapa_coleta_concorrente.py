@@ -0,0 +1,200 @@
+"""
+Testes da coleta concorrente entre fontes na EtapaColeta.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from domain.models import IntencaoBusca, Keyword
+from infrastructure.orchestrator.etapas.etapa_coleta import EtapaColeta
+
+
+@pytest.fixture
+def config_coleta():
+    return {
+        'usar_google_keyword_planner': True,
+        'usar_google_suggest': True,
+        'usar_google_trends': True,
+        'delay_entre_requests': 1.0,
+        'delays_por_coletor': {
+            'google_keyword_planner': 2.0,
+            'google_suggest': 0.5,
+            'google_trends': 1.5
+        },
+        'min_comprimento_keyword': 3,
+        'keywords_semente': ['python tutorial', 'javascript guide']
+    }
+
+
+@pytest.fixture
+def mock_coletores():
+    coletores = {}
+    for nome, termos in (
+        ('google_keyword_planner', ["python tutorial", "python course"]),
+        ('google_suggest', ["python tutorial", "python for beginners"]),
+        ('google_trends', ["python programming", "python development"]),
+    ):
+        coletor = Mock()
+        coletor.coletar_keywords = AsyncMock(return_value=[
+            Keyword(termo=termo, volume_busca=0, cpc=0.0, concorrencia=0.0,
+                    intencao=IntencaoBusca.INFORMACIONAL)
+            for termo in termos
+        ])
+        coletores[nome] = coletor
+    return coletores
+
+
+@pytest.fixture
+def etapa_coleta(config_coleta, mock_coletores):
+    with patch('infrastructure.orchestrator.etapas.etapa_coleta.EtapaColeta._inicializar_coletores', return_value=mock_coletores):
+        return EtapaColeta(config_coleta)
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste no lugar de time.time()"""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio():
+    relogio = RelogioFalso()
+    with patch('infrastructure.orchestrator.etapas.etapa_coleta.time', relogio):
+        yield relogio
+
+
+@pytest.fixture
+def esperas(etapa_coleta):
+    """Registra o delay de rate limiting de cada fonte sem dormir"""
+    esperas = {}
+
+    async def aguardar(nome_coletor):
+        esperas[nome_coletor] = etapa_coleta._obter_delay(nome_coletor)
+
+    etapa_coleta._aguardar_rate_limiting = aguardar
+    return esperas
+
+
+async def _ceder(vezes=20):
+    """Deixa as tarefas prontas avançarem sem tempo real"""
+    for _ in range(vezes):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_executar_coleta_fontes_em_paralelo(etapa_coleta, relogio, esperas):
+    """O tempo total acompanha a fonte mais lenta, não a soma dos delays"""
+    iniciadas = set()
+    liberar = {nome: asyncio.Event() for nome in etapa_coleta.coletores}
+
+    for nome, coletor in etapa_coleta.coletores.items():
+        keywords = coletor.coletar_keywords.return_value
+
+        async def coletar(sementes, nome=nome, keywords=keywords):
+            iniciadas.add(nome)
+            await liberar[nome].wait()
+            return keywords
+
+        coletor.coletar_keywords = AsyncMock(side_effect=coletar)
+
+    async def conduzir():
+        # Todas as fontes precisam estar em voo antes de qualquer uma terminar
+        while len(iniciadas) < len(liberar):
+            await asyncio.sleep(0)
+        for nome in sorted(esperas, key=esperas.get):
+            relogio.agora = esperas[nome]
+            liberar[nome].set()
+            await _ceder()
+
+    resultado, _ = await asyncio.wait_for(
+        asyncio.gather(etapa_coleta.executar("tecnologia"), conduzir()), timeout=5.0
+    )
+
+    assert esperas == {'google_keyword_planner': 2.0, 'google_suggest': 0.5, 'google_trends': 1.5}
+    assert resultado.tempo_execucao == 2.0  # Soma dos delays seria 4.0s
+    assert resultado.metadados["latencia_por_fonte"] == esperas
+    assert resultado.metadados["tempo_soma_fontes"] == 4.0
+    assert set(resultado.metadados["status_por_fonte"].values()) == {"sucesso"}
+
+
+@pytest.mark.asyncio
+async def test_executar_coleta_prazo_global(etapa_coleta, relogio, esperas):
+    """Fontes lentas são canceladas ao atingir o prazo"""
+    etapa_coleta.config['timeout_coleta'] = 1.0
+    canceladas = []
+    keywords_suggest = etapa_coleta.coletores['google_suggest'].coletar_keywords.return_value
+
+    async def coletar_rapido(sementes):
+        relogio.agora = 1.0  # A fonte rápida termina exatamente no prazo
+        return keywords_suggest
+
+    for nome in ('google_keyword_planner', 'google_trends'):
+        async def coletar_lento(sementes, nome=nome):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                canceladas.append(nome)
+                raise
+
+        etapa_coleta.coletores[nome].coletar_keywords = AsyncMock(side_effect=coletar_lento)
+    etapa_coleta.coletores['google_suggest'].coletar_keywords = AsyncMock(side_effect=coletar_rapido)
+
+    resultado = await asyncio.wait_for(etapa_coleta.executar("tecnologia"), timeout=5.0)
+
+    status = resultado.metadados["status_por_fonte"]
+    assert status == {
+        "google_suggest": "sucesso",
+        "google_keyword_planner": "timeout",
+        "google_trends": "timeout"
+    }
+    assert sorted(canceladas) == ["google_keyword_planner", "google_trends"]
+    assert resultado.fontes_utilizadas == ["google_suggest"]
+    assert resultado.metadados["latencia_por_fonte"]["google_trends"] == 1.0
+    assert resultado.tempo_execucao == 1.0
+
+
+@pytest.mark.asyncio
+async def test_executar_coleta_limite_concorrencia_por_fonte(etapa_coleta, esperas):
+    """Sementes divididas em lotes respeitando o limite por fonte"""
+    ativos = {"atual": 0, "pico": 0}
+    liberar = asyncio.Event()
+
+    async def coletar(sementes):
+        ativos["atual"] += 1
+        ativos["pico"] = max(ativos["pico"], ativos["atual"])
+        await liberar.wait()
+        ativos["atual"] -= 1
+        return [
+            Keyword(termo=f"{s} tecnologia", volume_busca=0, cpc=0.0, concorrencia=0.0,
+                    intencao=IntencaoBusca.INFORMACIONAL)
+            for s in sementes
+        ]
+
+    async def conduzir():
+        while ativos["atual"] < 2:
+            await asyncio.sleep(0)
+        await _ceder()
+        # O semáforo segura os outros dois lotes enquanto estes não terminam
+        assert ativos["atual"] == 2
+        liberar.set()
+
+    etapa_coleta.config.update({
+        'lote_sementes_por_fonte': 1,
+        'concorrencia_por_coletor': {'google_suggest': 2}
+    })
+    etapa_coleta.coletores['google_suggest'].coletar_keywords = AsyncMock(side_effect=coletar)
+
+    resultado, _ = await asyncio.wait_for(
+        asyncio.gather(etapa_coleta.executar("tecnologia", ["a1", "a2", "a3", "a4"]), conduzir()),
+        timeout=5.0
+    )
+
+    assert etapa_coleta.coletores['google_suggest'].coletar_keywords.await_count == 4
+    assert ativos["pico"] == 2
+    assert "a4 tecnologia" in resultado.keywords_coletadas
@@ -0,0 +1,214 @@
+"""
+Testes da execução concorrente de nichos no FluxoCompletoOrchestrator
+(nichos em paralelo e modo pipeline por etapa).
+"""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from infrastructure.orchestrator.config import OrchestratorConfig
+from infrastructure.orchestrator.fluxo_completo_orchestrator import (
+    FluxoCompletoOrchestrator,
+    FluxoStatus
+)
+from infrastructure.orchestrator.progress_tracker import ProgressTracker
+
+
+class TestFluxoCompletoOrchestratorConcorrencia:
+    """Testes da execução paralela de nichos"""
+    
+    @pytest.fixture
+    def orchestrator_paralelo(self, tmp_path):
+        """Orquestrador com progress tracker real e etapas simuladas"""
+        config = OrchestratorConfig(max_nichos_concorrentes=3, max_processamento_concorrente=1)
+        tracker = ProgressTracker(diretorio_persistencia=str(tmp_path))
+        with patch('infrastructure.orchestrator.fluxo_completo_orchestrator.obter_progress_tracker', return_value=tracker), \
+             patch('infrastructure.orchestrator.fluxo_completo_orchestrator.obter_error_handler', return_value=Mock()):
+            orchestrator = FluxoCompletoOrchestrator(config=config)
+        
+        orchestrator.ativos = {"atual": 0, "pico": 0, "processamento": 0, "pico_processamento": 0}
+        contador_lock = threading.Lock()
+        
+        def etapa(nome, duracao=0.1):
+            def executar(nicho, config_nicho):
+                orchestrator._marcar_etapa(nicho, nome)
+                chave = "processamento" if nome == "processamento" else "atual"
+                with contador_lock:
+                    orchestrator.ativos[chave] += 1
+                    pico = "pico_processamento" if chave == "processamento" else "pico"
+                    orchestrator.ativos[pico] = max(orchestrator.ativos[pico], orchestrator.ativos[chave])
+                time.sleep(duracao)
+                with contador_lock:
+                    orchestrator.ativos[chave] -= 1
+                return True
+            return executar
+        
+        for nome in ["coleta", "validacao", "processamento", "preenchimento", "exportacao"]:
+            setattr(orchestrator, f"_executar_etapa_{nome}", etapa(nome))
+        return orchestrator
+    
+    def _aguardar_fim(self, orchestrator, timeout=5.0):
+        limite = time.time() + timeout
+        while orchestrator.status == FluxoStatus.EM_EXECUCAO and time.time() < limite:
+            time.sleep(0.01)
+    
+    def test_nichos_executados_em_paralelo(self, orchestrator_paralelo):
+        """Testa que nichos rodam simultaneamente, respeitando o limite de CPU"""
+        # Act
+        inicio = time.time()
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas", "tecnologia"])
+        self._aguardar_fim(orchestrator_paralelo)
+        duracao = time.time() - inicio
+        
+        # Assert
+        progresso = orchestrator_paralelo.progress_tracker.obter_progresso_atual()
+        assert orchestrator_paralelo.status == FluxoStatus.CONCLUIDO
+        assert progresso.nichos_concluidos == 3
+        assert orchestrator_paralelo.ativos["pico"] > 1
+        assert orchestrator_paralelo.ativos["pico_processamento"] == 1
+        assert duracao < 1.5  # Sequencial levaria 3 x 0.5s
+    
+    def test_cancelar_nicho_nao_afeta_demais(self, orchestrator_paralelo):
+        """Testa cancelamento de um nicho durante a execução"""
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas", "tecnologia"])
+        time.sleep(0.05)
+        assert orchestrator_paralelo.cancelar_nicho("saude") is True
+        self._aguardar_fim(orchestrator_paralelo)
+        
+        # Assert
+        nichos = orchestrator_paralelo.progress_tracker.obter_progresso_atual().nichos
+        assert nichos["saude"].status.value == "cancelada"
+        assert nichos["saude"].etapas["exportacao"].status.value == "cancelada"
+        assert nichos["financas"].foi_concluida
+        assert nichos["tecnologia"].foi_concluida
+    
+    def test_pausar_e_retomar_nicho(self, orchestrator_paralelo):
+        """Testa pausa de um nicho no ponto de controle entre etapas"""
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas"])
+        time.sleep(0.05)
+        orchestrator_paralelo.pausar_nicho("saude")
+        time.sleep(0.8)
+        
+        # Assert
+        nichos = orchestrator_paralelo.progress_tracker.obter_progresso_atual().nichos
+        assert nichos["financas"].foi_concluida
+        assert nichos["saude"].status.value == "pausada"
+        assert orchestrator_paralelo.obter_status()["nichos_em_execucao"] == {"saude": "coleta"}
+        
+        orchestrator_paralelo.retomar_nicho("saude")
+        self._aguardar_fim(orchestrator_paralelo)
+        assert nichos["saude"].foi_concluida
+    
+    def test_cancelar_fluxo_mantem_status_cancelado(self, orchestrator_paralelo):
+        """Testa que o cancelamento global não é sobrescrito por concluído"""
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude"])
+        time.sleep(0.05)
+        orchestrator_paralelo.cancelar_fluxo()
+        time.sleep(0.3)
+        
+        # Assert
+        assert orchestrator_paralelo.status == FluxoStatus.CANCELADO
+        assert orchestrator_paralelo.nichos_em_execucao == {}
+    
+    def test_modo_pipeline_sobrepoe_etapas_entre_nichos(self, orchestrator_paralelo):
+        """Testa que etapas de nichos diferentes se sobrepõem no modo pipeline"""
+        # Arrange
+        orchestrator_paralelo.config.modo_pipeline = True
+        orchestrator_paralelo.config.concorrencia_por_etapa = {etapa: 1 for etapa in [
+            "coleta", "validacao", "processamento", "preenchimento", "exportacao"
+        ]}
+        
+        # Act
+        inicio = time.time()
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas", "tecnologia"])
+        self._aguardar_fim(orchestrator_paralelo)
+        duracao = time.time() - inicio
+        
+        # Assert
+        progresso = orchestrator_paralelo.progress_tracker.obter_progresso_atual()
+        assert orchestrator_paralelo.status == FluxoStatus.CONCLUIDO
+        assert progresso.nichos_concluidos == 3
+        assert orchestrator_paralelo.ativos["pico"] > 1  # Etapas diferentes ao mesmo tempo
+        assert duracao < 1.2  # Sem pipeline: 3 nichos x 5 etapas x 0.1s
+        
+        metricas = orchestrator_paralelo.obter_metricas_pipeline()
+        assert list(metricas) == ["coleta", "validacao", "processamento", "preenchimento", "exportacao"]
+        for etapa in metricas.values():
+            assert etapa["itens_processados"] == 3
+            assert etapa["falhas"] == 0
+            assert etapa["profundidade_fila"] == 0
+            assert 0 < etapa["utilizacao"] <= 1.0
+    
+    def test_modo_pipeline_falha_nao_avanca_nicho(self, orchestrator_paralelo):
+        """Testa que um nicho que falha numa etapa não segue para as próximas"""
+        # Arrange
+        orchestrator_paralelo.config.modo_pipeline = True
+        validacao = orchestrator_paralelo._executar_etapa_validacao
+        orchestrator_paralelo._executar_etapa_validacao = (
+            lambda nicho, config_nicho: nicho != "saude" and validacao(nicho, config_nicho)
+        )
+        
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas"])
+        self._aguardar_fim(orchestrator_paralelo)
+        
+        # Assert
+        metricas = orchestrator_paralelo.obter_metricas_pipeline()
+        nichos = orchestrator_paralelo.progress_tracker.obter_progresso_atual().nichos
+        assert metricas["validacao"]["falhas"] == 1
+        assert metricas["processamento"]["itens_processados"] == 1
+        assert nichos["financas"].foi_concluida
+        assert not nichos["saude"].foi_concluida
+    
+    def test_modo_pipeline_nicho_pausado_nao_bloqueia_estagio(self, orchestrator_paralelo):
+        """Testa que um nicho pausado é separado e os demais seguem pelo mesmo estágio"""
+        # Arrange
+        orchestrator_paralelo.config.modo_pipeline = True
+        orchestrator_paralelo.config.concorrencia_por_etapa = {etapa: 1 for etapa in [
+            "coleta", "validacao", "processamento", "preenchimento", "exportacao"
+        ]}
+        
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas"])
+        time.sleep(0.05)
+        assert orchestrator_paralelo.pausar_nicho("saude") is True
+        time.sleep(1.0)
+        
+        # Assert
+        nichos = orchestrator_paralelo.progress_tracker.obter_progresso_atual().nichos
+        assert nichos["financas"].foi_concluida
+        assert nichos["saude"].status.value == "pausada"
+        assert orchestrator_paralelo.status == FluxoStatus.EM_EXECUCAO
+        assert orchestrator_paralelo.obter_metricas_pipeline()["validacao"]["pausados"] == 1
+        
+        orchestrator_paralelo.retomar_nicho("saude")
+        self._aguardar_fim(orchestrator_paralelo)
+        assert orchestrator_paralelo.status == FluxoStatus.CONCLUIDO
+        assert nichos["saude"].foi_concluida
+        assert orchestrator_paralelo.obter_metricas_pipeline()["validacao"]["pausados"] == 0
+    
+    def test_modo_pipeline_cancelar_nicho_pausado(self, orchestrator_paralelo):
+        """Testa que cancelar um nicho separado por pausa libera o encerramento do pipeline"""
+        # Arrange
+        orchestrator_paralelo.config.modo_pipeline = True
+        
+        # Act
+        orchestrator_paralelo.iniciar_fluxo(["saude", "financas"])
+        time.sleep(0.05)
+        orchestrator_paralelo.pausar_nicho("saude")
+        time.sleep(0.3)
+        orchestrator_paralelo.cancelar_nicho("saude")
+        self._aguardar_fim(orchestrator_paralelo)
+        
+        # Assert
+        nichos = orchestrator_paralelo.progress_tracker.obter_progresso_atual().nichos
+        assert orchestrator_paralelo.status == FluxoStatus.CONCLUIDO
+        assert nichos["saude"].status.value == "cancelada"
+        assert nichos["financas"].foi_concluida
+        assert orchestrator_paralelo.nichos_em_execucao == {}
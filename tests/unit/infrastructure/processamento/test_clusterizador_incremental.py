@@ -0,0 +1,111 @@
+"""
+Testes Unitários: clusterização incremental
+Tracing ID: TEST_CLUSTERIZADOR_INCREMENTAL_001
+"""
+
+import numpy as np
+import pytest
+
+from domain.models import Keyword, IntencaoBusca
+from infrastructure.processamento.clusterizador_semantico import ClusterizadorSemantico, MAX_KEYWORDS_CLUSTER
+
+DIM = 32
+
+
+def _vetor(termo):
+    """Embedding determinístico: termos "t<grupo>_<n>" ficam próximos do eixo do grupo."""
+    grupo = int(termo.split("_")[0][1:])
+    ruido = np.random.default_rng(abs(hash(termo)) % 2**32).normal(scale=0.05, size=DIM)
+    base = np.zeros(DIM)
+    base[grupo] = 1.0
+    return base + ruido
+
+
+def _keywords(grupos, por_grupo, inicio=0):
+    return [
+        Keyword(termo=f"t{grupo}_{inicio + index}", volume_busca=1000 - index, cpc=1.0,
+                concorrencia=0.5, intencao=IntencaoBusca.INFORMACIONAL)
+        for grupo in grupos for index in range(por_grupo)
+    ]
+
+
+@pytest.fixture
+def encoder():
+    chamadas = []
+
+    def gerar(termos, modelo):
+        chamadas.append(list(termos))
+        return np.array([_vetor(termo) for termo in termos])
+
+    gerar.chamadas = chamadas
+    return gerar
+
+
+@pytest.fixture
+def base(encoder):
+    clusterizador = ClusterizadorSemantico(func_gerar_embeddings=encoder, min_similaridade=0.5)
+    resultado = clusterizador.gerar_clusters(_keywords(range(5), 6), blog_dominio="meublog.com")
+    assert len(resultado["clusters"]) == 5
+    return clusterizador, resultado["clusters"]
+
+
+def test_novas_keywords_entram_nos_clusters_existentes(base, encoder):
+    clusterizador, clusters = base
+    embeddings = np.array([_vetor(kw.termo) for cluster in clusters for kw in cluster.keywords])
+    encoder.chamadas.clear()
+
+    resultado = clusterizador.gerar_clusters_incremental(
+        clusters, _keywords([1, 3], 1, inicio=100), embeddings_anteriores=embeddings, blog_dominio="meublog.com"
+    )
+
+    relatorio = resultado["relatorio"]
+    assert relatorio["modo"] == "incremental"
+    assert relatorio["keywords_atribuidas"] == 2
+    assert relatorio["clusters_tocados"] == 2
+    assert len(resultado["clusters"]) == 5
+    # Apenas os termos novos são codificados
+    assert encoder.chamadas == [["t1_100", "t3_100"]]
+    for cluster in resultado["clusters"]:
+        grupos = {kw.termo.split("_")[0] for kw in cluster.keywords}
+        assert len(grupos) == 1
+        assert [kw.ordem_no_cluster for kw in cluster.keywords] == list(range(len(cluster.keywords)))
+    assert resultado["embeddings"].shape == (32, DIM)
+
+
+def test_grupo_novo_forma_cluster_novo_e_respeita_capacidade(base):
+    clusterizador, clusters = base
+    novas = _keywords([0], MAX_KEYWORDS_CLUSTER, inicio=100) + _keywords([7], 6)
+    resultado = clusterizador.gerar_clusters_incremental(clusters, novas, blog_dominio="meublog.com", limiar_drift=0.9)
+
+    relatorio = resultado["relatorio"]
+    assert relatorio["modo"] == "incremental"
+    assert relatorio["clusters_novos"] >= 1
+    assert all(len(cluster.keywords) <= MAX_KEYWORDS_CLUSTER for cluster in resultado["clusters"])
+    termos = [kw.termo for cluster in resultado["clusters"] for kw in cluster.keywords]
+    assert len(termos) == len(set(termos))
+    assert any(termo.startswith("t7_") for termo in termos)
+
+
+def test_drift_acima_do_limiar_refaz_tudo(base):
+    clusterizador, clusters = base
+    resultado = clusterizador.gerar_clusters_incremental(
+        clusters, _keywords([8, 9], 6), blog_dominio="meublog.com", limiar_drift=0.1
+    )
+    relatorio = resultado["relatorio"]
+    assert relatorio["modo"] == "rebuild"
+    assert relatorio["drift"] > 0.1
+    assert relatorio["clusters_tocados"] == len(resultado["clusters"]) == 7
+
+
+def test_termos_repetidos_sao_ignorados(base):
+    clusterizador, clusters = base
+    repetidas = [clusters[0].keywords[1]]
+    resultado = clusterizador.gerar_clusters_incremental(clusters, repetidas, blog_dominio="meublog.com")
+    assert resultado["relatorio"]["keywords_novas"] == 0
+    assert resultado["relatorio"]["clusters_tocados"] == 0
+
+
+def test_embeddings_desalinhados(base):
+    clusterizador, clusters = base
+    with pytest.raises(ValueError):
+        clusterizador.gerar_clusters_incremental(clusters, [], embeddings_anteriores=np.zeros((3, DIM)))
@@ -24,7 +24,7 @@ class TestNormalizadorKeywords:
         
         assert normalizador.remover_acentos is False
         assert normalizador.case_sensitive is False
-        assert normalizador.caracteres_permitidos == r'^[\w\string_data\-.,?!]+$'
+        assert normalizador.caracteres_permitidos == r'^[\w\s\-.,?!]+$'
         
     def test_inicializacao_customizada(self):
         """Testa inicialização com configurações customizadas."""
@@ -373,4 +373,37 @@ class TestCalculadorScoreCompetitivo:
         
         for score, nivel_esperado in zip(scores_teste, niveis_esperados):
             nivel = calculador.classificar_competitividade(score, config_padrao)
-            assert nivel == nivel_esperado, f"Score {score} deveria ser {nivel_esperado}, mas foi {nivel}" 
\ No newline at end of file
+            assert nivel == nivel_esperado, f"Score {score} deveria ser {nivel_esperado}, mas foi {nivel}" 
+
+class TestCalculadorScoreCompetitivoLote:
+    """Testes para calcular_scores_lote (caminho vetorizado)."""
+
+    @pytest.fixture
+    def calculador(self):
+        return CalculadorScoreCompetitivo()
+
+    def test_lote_igual_ao_escalar(self, calculador):
+        keywords = [
+            "comprar notebook barato", "tratamento para insônia", "curso de python online",
+            "investimento em renda fixa", "receita de bolo", "comprar notebook barato"
+        ]
+        volumes = [5000, 0, 80000, 120, 30, 999999]
+        cpcs = [2.5, 0.0, 70.0, 10.0, 0.3, 1.0]
+        concorrencias = [0.7, 0.0, 1.2, 0.5, 0.1, 0.95]
+
+        resultado = calculador.calcular_scores_lote(keywords, volumes, cpcs, concorrencias)
+        escalares = [
+            calculador.calcular_score(kw, volume, cpc, conc)
+            for kw, volume, cpc, conc in zip(keywords, volumes, cpcs, concorrencias)
+        ]
+
+        assert len(resultado) == len(keywords)
+        assert resultado.scores.tolist() == [s.score_final for s in escalares]
+        assert list(resultado.classificacoes) == [s.nivel_competitividade for s in escalares]
+        assert list(resultado.componentes["nicho"]) == [s.metadados["nicho_detectado"] for s in escalares]
+        assert "concorrencia_invertida" in resultado.justificativa(0)
+
+    def test_lote_vazio(self, calculador):
+        resultado = calculador.calcular_scores_lote([], [], [], [])
+        assert len(resultado) == 0
+        assert resultado.justificativas() == []
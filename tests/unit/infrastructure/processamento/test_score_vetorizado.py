@@ -0,0 +1,130 @@
+"""
+Testes Unitários: motor de score vetorizado
+Tracing ID: TEST_SCORE_VETORIZADO_001
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from domain.keyword_batch import CODIGO_INTENCAO, INTENCOES, KeywordBatch
+from domain.models import IntencaoBusca, Keyword
+from infrastructure.processamento.score_composto_inteligente import ScoreCompostoInteligente
+from infrastructure.processamento.score_vetorizado import (
+    arredondar_como_python, calcular_scores_keywords, classificar_por_faixas
+)
+
+WEIGHTS = {"volume": 0.4, "cpc": 0.3, "intencao": 0.2, "concorrencia": 0.1}
+
+
+def test_scores_e_justificativas_iguais_ao_escalar():
+    rng = np.random.default_rng(7)
+    keywords = [
+        Keyword(termo=f"termo {index}", volume_busca=int(rng.integers(0, 5000)), cpc=float(rng.random() * 5),
+                concorrencia=float(rng.random()), intencao=INTENCOES[index % len(INTENCOES)])
+        for index in range(200)
+    ]
+    batch = KeywordBatch.from_keywords(keywords)
+    resultado = calcular_scores_keywords(
+        batch.volume_busca, batch.cpc, batch.concorrencia, batch.intencao, WEIGHTS,
+        limites_classificacao=[50, 500], rotulos_classificacao=["baixo", "medio", "alto"]
+    )
+
+    escalares = [kw.calcular_score(WEIGHTS) for kw in keywords]
+    assert resultado.scores.tolist() == escalares
+    assert resultado.justificativas([0, 7]) == [keywords[0].justificativa, keywords[7].justificativa]
+    assert batch.calcular_scores(WEIGHTS).tolist() == escalares
+    assert batch.justificativas(WEIGHTS, [3]) == [keywords[3].justificativa]
+    assert set(resultado.classificacoes) <= {"baixo", "medio", "alto"}
+
+
+def test_classificar_por_faixas_limites_inclusivos():
+    rotulos = classificar_por_faixas(np.array([0.0, 0.5, 0.64, 0.65, 0.9]), [0.5, 0.65], ["ruim", "regular", "bom"])
+    assert rotulos.tolist() == ["ruim", "regular", "regular", "bom", "bom"]
+    with pytest.raises(ValueError):
+        classificar_por_faixas(np.zeros(1), [0.5], ["a"])
+
+
+def test_arredondar_como_python():
+    valores = np.array([0.0005, 0.1235, 2.675, 1.0005, -2.675, 1e20, np.inf, -0.0])
+    assert arredondar_como_python(valores, 3).tolist() == [round(valor, 3) for valor in valores.tolist()]
+
+
+@pytest.mark.parametrize("casas", [0, 2, 3])
+def test_arredondar_como_python_paridade_em_meios(casas):
+    rng = np.random.default_rng(7)
+    # Valores próximos de meios decimais, onde np.round diverge de round()
+    valores = np.concatenate([
+        rng.random(20000) * 10,
+        np.round(rng.random(20000) * 10, casas + 1),
+        (np.arange(-2000, 2000) + 0.5) / 10 ** casas
+    ])
+    esperado = [round(valor, casas) for valor in valores.tolist()]
+    assert not np.array_equal(np.round(valores, casas), esperado) or casas == 0
+    assert arredondar_como_python(valores, casas).tolist() == esperado
+
+
+def test_arredondar_como_python_mantem_linhas_numpy():
+    valores = np.array([2.675, 2.675])
+    resultado = arredondar_como_python(valores, 2, manter_numpy=np.array([False, True]))
+    assert resultado.tolist() == [round(2.675, 2), float(np.round(2.675, 2))]
+
+
+def test_um_milhao_de_keywords_abaixo_de_um_segundo():
+    total = 1_000_000
+    rng = np.random.default_rng(1)
+    intencao = rng.integers(0, len(INTENCOES), total).astype(np.int8)
+    inicio = time.perf_counter()
+    resultado = calcular_scores_keywords(
+        rng.integers(0, 100000, total), rng.random(total) * 10, rng.random(total), intencao, WEIGHTS
+    )
+    assert time.perf_counter() - inicio < 1.0
+    assert len(resultado) == total
+    forte = intencao == CODIGO_INTENCAO[IntencaoBusca.TRANSACIONAL]
+    assert forte.any()
+
+
+class TestScoreCompostoLote:
+    """Paridade de calcular_scores_compostos_lote com calcular_score_composto."""
+
+    KEYWORDS = [
+        "melhor preço notebook gaming 2024",
+        "como fazer backup automático windows 11",
+        "sintomas de diabetes tipo 2 em adultos",
+        "curso online marketing digital certificado",
+        "investimento em criptomoedas para iniciantes",
+        "produto",
+        "melhor preço notebook gaming 2024",
+    ]
+
+    @pytest.mark.parametrize("nicho", [None, "saude", "ecommerce", "inexistente"])
+    def test_lote_igual_ao_escalar(self, nicho):
+        sistema = ScoreCompostoInteligente()
+        volumes = [500, 0, 50, 20000, 1000, 100, 3000]
+        cpcs = [2.5, 0.0, 0.4, 12.0, 5.0, 1.0, 7.3]
+        concorrencias = [0.6, 0.1, 0.9, 0.3, 0.0, 0.5, 0.77]
+        tendencia = {"crescimento_volume": [10, 150, -5, 40, 0, 99, 10], "novidade": 0.6}
+
+        resultado = sistema.calcular_scores_compostos_lote(
+            self.KEYWORDS, volumes, cpcs, concorrencias, dados_tendencia=tendencia, nicho=nicho
+        )
+        for linha, keyword in enumerate(self.KEYWORDS):
+            escalar = sistema.calcular_score_composto(
+                keyword,
+                {"volume_busca": volumes[linha], "cpc": cpcs[linha], "concorrencia": concorrencias[linha]},
+                {"crescimento_volume": tendencia["crescimento_volume"][linha], "novidade": 0.6},
+                nicho
+            )
+            assert resultado.scores[linha] == escalar.score_final
+            assert resultado.classificacoes[linha] == escalar.classificacao
+            assert resultado.componentes["confianca"][linha] == escalar.confianca
+            for nome, componente in escalar.componentes.items():
+                assert resultado.componentes[nome][linha] == componente.valor
+
+    def test_dados_padrao(self):
+        sistema = ScoreCompostoInteligente()
+        resultado = sistema.calcular_scores_compostos_lote(self.KEYWORDS[:2])
+        escalar = sistema.calcular_score_composto(self.KEYWORDS[1])
+        assert resultado.scores[1] == escalar.score_final
+        assert resultado.justificativa(1).endswith(f"({escalar.classificacao})")
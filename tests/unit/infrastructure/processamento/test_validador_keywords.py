@@ -538,5 +538,41 @@ class TestValidadorKeywords:
         assert validador_real.violations_count == {}
 
 
+class TestValidadorKeywordsBatch:
+    """Paridade entre validar_batch (colunar) e validar_lista."""
+
+    @pytest.mark.parametrize("regras", [
+        {"enable_semantic_validation": False},
+        {
+            "min_palavras": 2, "tamanho_min": 10, "concorrencia_max": 0.8, "score_minimo": 0.3,
+            "volume_min": 100, "cpc_min": 0.1, "regex_termo": r"curso|python",
+            "palavras_obrigatorias": ["curso", "online"], "blacklist": {"Curso Fake Online"},
+            "whitelist": {"curso de python online", "curso fake online"}, "enable_semantic_validation": False
+        },
+    ])
+    def test_validar_batch_igual_validar_lista(self, regras):
+        from domain.keyword_batch import KeywordBatch
+        keywords = [
+            Keyword(termo=termo, volume_busca=volume, cpc=cpc, concorrencia=conc, intencao=IntencaoBusca.INFORMACIONAL, score=score)
+            for termo, volume, cpc, conc, score in [
+                ("curso de python online", 500, 1.0, 0.3, 0.5),
+                ("curso fake online", 50, 0.0, 0.9, 0.1),
+                ("python", 1000, 2.0, 0.2, 0.9),
+                ("marketing digital para iniciantes", 200, 0.5, 0.5, 0.4),
+                ("curso", 10, 0.05, 0.95, 0.0),
+            ]
+        ]
+        validador = ValidadorKeywords(**regras)
+        aprovadas, rejeitadas, relatorio = validador.validar_lista(keywords, relatorio=True)
+        batch_aprovadas, batch_rejeitadas, relatorio_batch = validador.validar_batch(
+            KeywordBatch.from_keywords(keywords), relatorio=True
+        )
+        assert [kw.termo for kw in batch_aprovadas.para_keywords()] == [kw.termo for kw in aprovadas]
+        assert [kw.termo for kw in batch_rejeitadas.para_keywords()] == [kw.termo for kw in rejeitadas]
+        assert relatorio_batch == relatorio
+        assert list(relatorio_batch["violacoes_por_tipo"]) == list(relatorio["violacoes_por_tipo"])
+        assert list(relatorio_batch["regras_mais_violadas"]) == list(relatorio["regras_mais_violadas"])
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"]) 
\ No newline at end of file
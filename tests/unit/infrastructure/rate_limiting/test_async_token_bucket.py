@@ -0,0 +1,42 @@
+"""
+Testes do AsyncTokenBucket usado no ritmo de requisições dos coletores.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from infrastructure.rate_limiting.adaptive_rate_limiter import AsyncTokenBucket
+
+
+class TestAsyncTokenBucket:
+    """Testes para AsyncTokenBucket."""
+    
+    @pytest.mark.asyncio
+    async def test_acquire_imediato_com_rajada(self):
+        """Testa que a rajada inicial não espera."""
+        bucket = AsyncTokenBucket(rate=1, capacity=3)
+        esperas = [await bucket.acquire() for _ in range(3)]
+        
+        assert max(esperas) < 0.05
+        assert bucket.total_acquired == 3
+    
+    @pytest.mark.asyncio
+    async def test_acquire_concorrente_respeita_taxa(self):
+        """Testa que consumidores concorrentes não excedem a taxa."""
+        bucket = AsyncTokenBucket(rate=20, capacity=1)
+        inicio = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+        
+        # 1 token imediato + 4 a 20 tokens/s
+        assert time.monotonic() - inicio >= 0.19
+        assert bucket.get_metrics()["total_acquired"] == 5
+        assert bucket.total_wait_time > 0
+    
+    def test_try_acquire_sem_esperar(self):
+        """Testa consumo não bloqueante."""
+        bucket = AsyncTokenBucket(rate=1, capacity=1)
+        
+        assert bucket.try_acquire() is True
+        assert bucket.try_acquire() is False
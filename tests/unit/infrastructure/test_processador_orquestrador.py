@@ -340,3 +340,83 @@ class TestProcessadorOrquestrador:
         assert orch.validador_avancado is not None
         assert orch.aplicador_ml is not None
         assert orch.auditor_final is not None
+
+
+class EtapaSincrona:
+    """Etapa síncrona que registra o tamanho de cada chunk recebido."""
+    
+    def __init__(self, falhas=0):
+        self.chunks = []
+        self.falhas = falhas
+    
+    def processar(self, keywords, config=None):
+        if self.falhas:
+            self.falhas -= 1
+            raise ConnectionError("falha transitória")
+        self.chunks.append(len(keywords))
+        return list(keywords)
+
+
+class TestProcessadorOrquestradorStreaming:
+    """Testes do pipeline em chunks (processar_keywords_stream)"""
+    
+    @pytest.fixture
+    def orch(self):
+        from infrastructure.processamento.processador_orquestrador import ProcessadorOrquestrador
+        from infrastructure.resilience.retry_strategy import RetryConfig, RetryExecutor
+        
+        with patch('infrastructure.processamento.processador_orquestrador.ConfiguradorNicho'), \
+             patch('infrastructure.processamento.processador_orquestrador.AnalisadorSemanticoProcessor'), \
+             patch('infrastructure.processamento.processador_orquestrador.CalculadorScoresProcessor'), \
+             patch('infrastructure.processamento.processador_orquestrador.ValidadorAvancadoProcessor'), \
+             patch('infrastructure.processamento.processador_orquestrador.AplicadorMLProcessor'), \
+             patch('infrastructure.processamento.processador_orquestrador.AuditorFinalProcessor'):
+            orch = ProcessadorOrquestrador()
+        orch.configurador.configurar.return_value = {"nicho": "teste"}
+        orch.analisador_semantico = EtapaSincrona()
+        orch.calculador_scores = EtapaSincrona()
+        orch.validador_avancado = EtapaSincrona()
+        orch.aplicador_ml = EtapaSincrona()
+        orch.auditor_final = EtapaSincrona()
+        orch._chunk_retry = RetryExecutor(RetryConfig(max_attempts=3, base_delay=0.001, max_delay=0.01))
+        return orch
+    
+    def test_processa_em_chunks_com_callback_por_chunk(self, orch):
+        progresso = []
+        keywords, relatorio = orch.processar_keywords(
+            list(range(25)), callback_progresso=lambda *args: progresso.append(args), tamanho_chunk=10
+        )
+        
+        assert keywords == list(range(25))
+        assert orch.auditor_final.chunks == [10, 10, 5]
+        assert [args[1:] for args in progresso] == [(0, 3), (1, 3), (2, 3), (3, 3)]
+        assert relatorio["processamento"]["chunks_processados"] == 3
+        assert set(relatorio["tempo_por_processador"]) == {
+            "analisador_semantico", "calculador_scores", "validador_avancado", "aplicador_ml", "auditor_final"
+        }
+    
+    def test_stream_consome_entrada_sob_demanda(self, orch):
+        lidos = []
+        
+        def entrada():
+            for valor in range(100):
+                lidos.append(valor)
+                yield valor
+        
+        stream = orch.processar_keywords_stream(entrada(), tamanho_chunk=10)
+        assert next(stream) == list(range(10))
+        assert len(lidos) == 10
+    
+    def test_retry_por_chunk(self, orch):
+        orch.validador_avancado.falhas = 1
+        keywords, relatorio = orch.processar_keywords(list(range(30)), tamanho_chunk=10)
+        
+        assert keywords == list(range(30))
+        # Apenas o chunk que falhou é reprocessado
+        assert orch.analisador_semantico.chunks == [10, 10, 10, 10]
+        assert relatorio["processamento"]["tentativas_chunks"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_iterador_assincrono(self, orch):
+        chunks = [chunk async for chunk in orch.processar_keywords_async(list(range(7)), tamanho_chunk=3)]
+        assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
@@ -0,0 +1,140 @@
+"""
+Testes do matching em lote do SemanticMatcher (semantic_matcher.py).
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+
+from infrastructure.processamento.semantic_matcher import SemanticMatcher, MatchingStrategy
+from infrastructure.processamento.hybrid_lacuna_detector_imp001 import (
+    DetectedGap,
+    DetectionMethod,
+    ValidationLevel
+)
+from infrastructure.processamento.placeholder_unification_system_imp001 import PlaceholderType
+
+
+class EmbeddingDeterministico:
+    """Modelo de embeddings fake: vetor derivado do hash do texto."""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def encode(self, textos):
+        self.chamadas += 1
+        vetores = []
+        for texto in textos:
+            semente = int(hashlib.md5(texto.encode("utf-8")).hexdigest()[:8], 16)
+            vetores.append(np.random.default_rng(semente).standard_normal(16).astype(np.float32))
+        return np.array(vetores)
+
+
+def criar_gap(contexto):
+    return DetectedGap(
+        placeholder_type=list(PlaceholderType)[0],
+        placeholder_name="primary_keyword",
+        start_pos=0,
+        end_pos=10,
+        context=contexto,
+        confidence=0.9,
+        detection_method=DetectionMethod.REGEX,
+        validation_level=ValidationLevel.BASIC
+    )
+
+
+CONTEXTOS = [
+    "Guia completo de marketing digital para pequenas empresas",
+    "Como melhorar o marketing de conteúdo com palavras-chave",
+    "",
+    "receitas rápidas saudáveis",
+]
+
+CANDIDATOS = [
+    "marketing digital",
+    "marketing de conteúdo para empresas",
+    "palavras-chave de cauda longa",
+    "receitas saudáveis rápidas para o jantar",
+    "marketing digital",
+    "   ",
+    "!!",
+    "guia completo de marketing digital para pequenas empresas locais",
+]
+
+
+def matches_escalares(matcher, gap, candidatos):
+    """Referência: scores calculados candidato a candidato com os métodos originais."""
+    resultado = []
+    for candidato in matcher._apply_initial_filters(gap, candidatos):
+        semantico = matcher._calculate_semantic_similarity(gap, candidato)
+        contextual = matcher._calculate_contextual_similarity(gap, candidato)
+        keyword = matcher._calculate_keyword_similarity(gap, candidato)
+        hibrido = matcher._calculate_hybrid_score(semantico, contextual, keyword)
+        estrategia = matcher._determine_strategy(semantico, contextual, keyword)
+        resultado.append((candidato, hibrido, estrategia, semantico, contextual, keyword))
+    resultado.sort(key=lambda item: item[1], reverse=True)
+    return resultado
+
+
+@pytest.fixture
+def matcher():
+    matcher = SemanticMatcher()
+    matcher.nlp_model = None
+    matcher.embedding_model = EmbeddingDeterministico()
+    return matcher
+
+
+class TestSemanticMatcherLote:
+
+    def test_paridade_com_calculo_por_candidato(self, matcher):
+        gaps = [criar_gap(contexto) for contexto in CONTEXTOS]
+        resultados = matcher.find_best_matches(gaps, CANDIDATOS)
+
+        assert len(resultados) == len(gaps)
+        for gap, resultado in zip(gaps, resultados):
+            esperado = matches_escalares(matcher, gap, CANDIDATOS)
+            assert [m.candidate for m in resultado.all_matches] == [item[0] for item in esperado]
+            for match, (_, hibrido, estrategia, semantico, contextual, keyword) in zip(resultado.all_matches, esperado):
+                assert match.similarity_score == pytest.approx(hibrido, abs=1e-6)
+                assert match.strategy_used == estrategia
+                assert match.metadata["semantic_score"] == pytest.approx(semantico, abs=1e-6)
+                assert match.metadata["contextual_score"] == pytest.approx(contextual, abs=1e-12)
+                assert match.metadata["keyword_score"] == pytest.approx(keyword, abs=1e-12)
+
+    def test_top_k_por_lacuna(self, matcher):
+        gaps = [criar_gap(CONTEXTOS[0]), criar_gap(CONTEXTOS[2])]
+        resultados = matcher.find_best_matches(gaps, CANDIDATOS, top_k=2)
+
+        completos = matcher.find_best_matches(gaps, CANDIDATOS)
+        for resultado, completo in zip(resultados, completos):
+            assert len(resultado.all_matches) <= 2
+            assert [m.candidate for m in resultado.all_matches] == [m.candidate for m in completo.all_matches[:2]]
+
+    def test_textos_codificados_uma_vez_e_features_em_cache(self, matcher):
+        gaps = [criar_gap(contexto) for contexto in CONTEXTOS]
+        matcher.find_best_matches(gaps, CANDIDATOS)
+        # Uma chamada para os contextos e outra para os candidatos
+        assert matcher.embedding_model.chamadas == 2
+
+        matcher.find_best_matches(gaps, CANDIDATOS)
+        estatisticas = matcher.get_matching_statistics()
+        assert estatisticas["feature_cache_hit_rate"] >= 0.5
+        assert estatisticas["batch_pairs_scored"] > 0
+
+    def test_find_best_match_usa_mesmo_caminho(self, matcher):
+        gap = criar_gap(CONTEXTOS[1])
+        individual = matcher.find_best_match(gap, CANDIDATOS)
+        lote = matcher.find_best_matches([gap], CANDIDATOS)[0]
+        assert [m.candidate for m in individual.all_matches] == [m.candidate for m in lote.all_matches]
+
+    def test_sem_candidatos(self, matcher):
+        resultados = matcher.find_best_matches([criar_gap(CONTEXTOS[0])], [])
+        assert resultados[0].success is False
+        assert resultados[0].errors == ["Nenhum candidato fornecido"]
+
+    def test_sem_modelo_de_embeddings_usa_score_neutro(self, matcher):
+        matcher.embedding_model = None
+        resultado = matcher.find_best_matches([criar_gap(CONTEXTOS[0])], CANDIDATOS)[0]
+        assert all(m.metadata["semantic_score"] == 0.5 for m in resultado.all_matches)
+        assert all(isinstance(m.strategy_used, MatchingStrategy) for m in resultado.all_matches)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Testes Unitários - Templates de Prompt Compilados
+=================================================
+
+Testes para: infrastructure/processamento/template_compilado.py e sua
+integração com os RegexLacunaDetector, SistemaLacunasPreciso e SemanticAnalyzer.
+"""
+
+import pytest
+
+from infrastructure.processamento.hybrid_lacuna_detector_imp001 import RegexLacunaDetector
+from infrastructure.processamento.placeholder_unification_system_imp001 import PlaceholderType
+from infrastructure.processamento.semantic_lacuna_detector_imp002 import SemanticAnalyzer
+from infrastructure.processamento import sistema_lacunas_preciso as preciso
+from infrastructure.processamento.template_compilado import CacheTemplates, TemplateCompilado
+
+TEMPLATE = (
+    "Escreva um artigo sobre {primary_keyword}.\n"
+    "Público: {target_audience}\n"
+    "  Tom {tone} e campo {extra}"
+)
+
+
+@pytest.fixture
+def detector():
+    return RegexLacunaDetector()
+
+
+class TestTemplateCompilado:
+    """Testes da AST do template"""
+
+    def test_linha_coluna_igual_ao_calculo_por_fatia(self, detector):
+        template = TemplateCompilado(TEMPLATE, "k")
+        for posicao in range(len(TEMPLATE) + 1):
+            assert template.linha_coluna(posicao) == (
+                detector._get_line_number(TEMPLATE, posicao),
+                detector._get_column_number(TEMPLATE, posicao)
+            )
+
+    def test_segmentos_sem_sobreposicao(self, detector):
+        template = TemplateCompilado(TEMPLATE, "k")
+        lacunas = [s for s in template.segmentos(detector.compiled_patterns) if not isinstance(s, str)]
+
+        # {primary_keyword} também casa com o padrão CUSTOM; o tipo específico vence
+        assert [l.placeholder_name for l in lacunas] == ["primary_keyword", "target_audience", "tone", "extra"]
+        assert lacunas[0].placeholder_type == PlaceholderType.PRIMARY_KEYWORD
+        assert lacunas[2].line_number == 3
+
+    def test_cache_lru_por_hash_do_conteudo(self):
+        cache = CacheTemplates(max_templates=2)
+        primeiro = cache.obter("a {x}")
+        assert cache.obter("a {x}") is primeiro
+        cache.obter("b")
+        cache.obter("c")
+        assert cache.obter("a {x}") is not primeiro
+        assert cache.get_stats()["hits"] == 1
+
+
+class TestIntegracaoDetectores:
+    """Detecção e preenchimento sobre o template compilado"""
+
+    def test_deteccao_repetida_igual_e_independente(self, detector):
+        primeira = detector.detect_gaps(TEMPLATE)
+        primeira[0].metadata["alterado"] = True
+        primeira[0].suggested_value = "x"
+        segunda = detector.detect_gaps(TEMPLATE)
+
+        assert [(g.placeholder_name, g.start_pos, g.confidence) for g in segunda] == \
+            [(g.placeholder_name, g.start_pos, g.confidence) for g in primeira]
+        assert "alterado" not in segunda[0].metadata
+        assert segunda[0].suggested_value is None
+        assert detector.metrics["pattern_usage"]["primary_keyword"] == 2
+
+    def test_metadados_de_posicao(self, detector):
+        gap = next(g for g in detector.detect_gaps(TEMPLATE) if g.placeholder_name == "tone")
+        assert gap.metadata["line_number"] == 3
+        assert gap.metadata["column_number"] == TEMPLATE.index("{tone}") - TEMPLATE.rindex("\n", 0, gap.start_pos)
+        assert gap.metadata["match_text"] == "{tone}"
+
+    def test_fill_gaps(self):
+        preenchido = preciso.RegexLacunaDetector().fill_gaps(TEMPLATE, {"primary_keyword": "seo local", "tone": "formal"})
+        assert preenchido.startswith("Escreva um artigo sobre seo local.")
+        assert "Tom formal" in preenchido
+        assert "{target_audience}" in preenchido and "{extra}" in preenchido
+
+    def test_detect_and_fill_gaps_retorna_texto_preenchido(self):
+        resultado = preciso.SistemaLacunasPreciso().detect_and_fill_gaps(TEMPLATE, {
+            preciso.PlaceholderType.PRIMARY_KEYWORD: ["seo local"],
+            preciso.PlaceholderType.TONE: ["formal"]
+        })
+
+        assert resultado["success"]
+        # O valor do tipo específico vence o do CUSTOM no mesmo placeholder
+        assert resultado["filled_text"].startswith("Escreva um artigo sobre seo local.")
+        assert "Tom formal" in resultado["filled_text"]
+        assert "{" not in resultado["filled_text"]
+
+    def test_analise_semantica_reaproveita_janela(self):
+        analyzer = SemanticAnalyzer()
+        texto = "Guia para iniciante sobre marketing e vendas: {primary_keyword}. " * 10
+
+        primeira = analyzer.analyze_context(texto, 300)
+        primeira.keywords.append("alterado")
+        segunda = analyzer.analyze_context(texto, 300)
+
+        assert segunda.topic == "negócios"
+        assert segunda.target_audience == "iniciante"
+        assert "alterado" not in segunda.keywords
+        assert segunda.surrounding_text == texto[100:500]
+        assert analyzer.metrics["successful_analyses"] == 2
@@ -0,0 +1,124 @@
+"""
+Testes do motor de normalização compartilhado.
+"""
+
+import re
+import unicodedata
+
+import pytest
+
+from shared.utils.motor_normalizacao import (
+    MotorNormalizacao,
+    PADRAO_CARACTERES_PERMITIDOS,
+    habilitar_metricas,
+    obter_motor,
+)
+from shared.utils.normalizador_central import NormalizadorCentral
+from infrastructure.processamento.normalizador_keywords import NormalizadorKeywords
+
+
+def normalizar_referencia(termo, remover_acentos=False, case_sensitive=False):
+    """Implementação original (pré-motor) usada como referência de paridade."""
+    if not termo:
+        return ""
+    termo = re.sub(r'\s+', ' ', termo.strip())
+    if not case_sensitive:
+        termo = termo.lower()
+    if remover_acentos:
+        termo = unicodedata.normalize('NFKD', termo).encode('ASCII', 'ignore').decode('ASCII')
+    if not re.fullmatch(PADRAO_CARACTERES_PERMITIDOS, termo):
+        return ""
+    return termo
+
+
+TERMOS = [
+    "  Palavra Chave  ", "Ação Rápida", "café com leite", "termo@invalido",
+    "MAIÚSCULAS", "x", "", "tab\tseparado", "pergunta?", "sstrriinngg", "palavra chave",
+]
+
+
+class TestMotorNormalizacao:
+
+    @pytest.mark.parametrize("remover_acentos", [False, True])
+    @pytest.mark.parametrize("case_sensitive", [False, True])
+    def test_paridade_com_implementacao_original(self, remover_acentos, case_sensitive):
+        motor = MotorNormalizacao(remover_acentos=remover_acentos, case_sensitive=case_sensitive)
+        for termo in TERMOS:
+            assert motor.normalizar(termo) == normalizar_referencia(termo, remover_acentos, case_sensitive)
+
+    def test_colapsa_espacos_repetidos(self):
+        motor = MotorNormalizacao()
+        assert motor.normalizar("  palavra   chave\t\tlonga ") == "palavra chave longa"
+        assert motor.normalizar("termo@invalido") == ""
+        assert NormalizadorCentral().normalizar_termo("Ação   Rápida") == "ação rápida"
+
+    def test_limites_de_tamanho(self):
+        motor = MotorNormalizacao(caracteres_permitidos=None, min_caracteres=3, max_caracteres=5)
+        assert motor.normalizar("ab") == ""
+        assert motor.normalizar("abcd") == "abcd"
+        assert motor.normalizar("abcdef") == ""
+
+    def test_cache_lru_limitado_e_taxa_de_acerto(self):
+        motor = MotorNormalizacao(tamanho_cache=2, coletar_metricas=True)
+        for termo in ["a", "b", "a", "c", "d"]:
+            motor.normalizar(termo)
+        metricas = motor.obter_metricas()
+        assert metricas["cache_tamanho"] == 2
+        assert metricas["cache_hits"] == 1
+        assert metricas["taxa_acerto_cache"] == pytest.approx(0.2)
+        assert metricas["termos_processados"] == 5
+
+    def test_lote_em_streaming_com_deduplicacao(self):
+        motor = MotorNormalizacao(coletar_metricas=True)
+
+        def gerador():
+            yield "Termo"
+            yield "  termo "
+            yield "outro@"
+            yield "outro"
+
+        lote = motor.normalizar_em_lote(gerador())
+        assert next(lote) == "termo"
+        assert list(lote) == ["outro"]
+        metricas = motor.obter_metricas()
+        assert metricas["duplicatas_removidas"] == 1
+        assert metricas["termos_processados"] == 4
+
+    def test_lote_sem_deduplicacao(self):
+        motor = MotorNormalizacao()
+        assert list(motor.normalizar_em_lote(["A", "a"], deduplicar=False)) == ["a", "a"]
+
+    def test_metricas_desabilitadas_nao_contam_vazao(self):
+        motor = MotorNormalizacao(coletar_metricas=False)
+        motor.normalizar("Termo")
+        assert list(motor.normalizar_em_lote(["a", "A"])) == ["a"]
+        metricas = motor.obter_metricas()
+        assert metricas["metricas_habilitadas"] is False
+        assert metricas["termos_processados"] == 0
+        assert metricas["duplicatas_removidas"] == 0
+        assert metricas["cache_misses"] == 3
+
+    def test_habilitar_metricas_nos_motores_compartilhados(self):
+        motor = obter_motor()
+        estado_original = motor.coletar_metricas
+        try:
+            habilitar_metricas(True)
+            assert motor.coletar_metricas is True
+            assert obter_motor(min_caracteres=7).coletar_metricas is True
+            habilitar_metricas(False)
+            assert motor.coletar_metricas is False
+        finally:
+            habilitar_metricas(estado_original)
+
+    def test_motor_compartilhado_por_configuracao(self):
+        assert obter_motor() is obter_motor()
+        assert obter_motor(remover_acentos=True) is not obter_motor()
+        assert NormalizadorKeywords().motor is obter_motor()
+        assert NormalizadorCentral().motor is NormalizadorCentral().motor
+        normalizador = NormalizadorCentral()
+        assert normalizador.motor is normalizador.motor
+
+    def test_normalizadores_respeitam_configuracao_alterada(self):
+        normalizador = NormalizadorKeywords()
+        normalizador.case_sensitive = True
+        assert normalizador.normalizar_termo("ABC") == "ABC"
@@ -9,14 +9,30 @@ Data: 2025-01-27
 
 import pytest
 import json
+import sys
 import time
+import types
 import asyncio
+import importlib.util
 from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+# O serviço importa get_db de backend.app.database no topo do módulo, mas esse
+# módulo não existe nesta árvore. Os testes substituem get_db no ponto de uso
+# (backend.app.services.prompt_filler_service_optimized.get_db).
+if importlib.util.find_spec("backend.app.database") is None:
+    def _get_db_sem_patch():
+        raise RuntimeError("get_db deve ser substituído com patch nos testes")
+        yield
+
+    _database = types.ModuleType("backend.app.database")
+    _database.get_db = _get_db_sem_patch
+    sys.modules["backend.app.database"] = _database
+
 from backend.app.services.prompt_filler_service_optimized import (
     PromptFillerServiceOptimized,
+    PlanoPreenchimento,
     ProcessingResult,
     ProcessingStatus
 )
@@ -468,74 +484,114 @@ class TestPromptFillerServiceOptimized:
         # Verificar estatísticas
         assert prompt_service.stats['errors'] == 1
     
-    def test_processar_lote_success(self, prompt_service, mock_logger):
-        """Testa processamento em lote com sucesso"""
-        # Mock do banco de dados
-        mock_db = Mock()
-        mock_session = Mock()
-        mock_db.__next__.return_value = mock_session
-        
-        # Mock de dados coletados
-        mock_dados1 = Mock()
-        mock_dados1.id = 1
-        mock_dados1.categoria_id = 1
-        mock_dados1.nicho_id = 1
-        mock_dados1.status = 'ativo'
-        
-        mock_dados2 = Mock()
-        mock_dados2.id = 2
-        mock_dados2.categoria_id = 2
-        mock_dados2.nicho_id = 1
-        mock_dados2.status = 'ativo'
-        
-        # Configurar query para retornar dados
-        mock_session.query.return_value.filter.return_value.all.return_value = [mock_dados1, mock_dados2]
-        
-        # Mock do processamento individual
-        with patch.object(prompt_service, 'processar_preenchimento') as mock_process:
-            mock_process.return_value = Mock()
-            
-            with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=mock_db):
-                with patch('time.time', side_effect=[1000.0, 1002.0]):
-                    resultados = prompt_service.processar_lote(1)
+    @pytest.fixture
+    def db_lote(self):
+        """Sessão SQLite em memória com um nicho, duas categorias e três itens de dados"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from backend.app.models.prompt_system import Base
+        
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        
+        template = (
+            "Escreva um artigo sobre [PALAVRA-CHAVE PRINCIPAL DO CLUSTER] usando "
+            "[PALAVRAS-CHAVE SECUNDÁRIAS]. Contexto: [CLUSTER DE CONTEÚDO]. "
+            "Repita [PALAVRA-CHAVE PRINCIPAL DO CLUSTER] no título."
+        )
+        nicho = Nicho(nome="Marketing")
+        categorias = [Categoria(nome="SEO", nicho=nicho), Categoria(nome="Ads", nicho=nicho)]
+        session.add_all(categorias)
+        session.flush()
+        session.add_all([
+            PromptBase(categoria_id=categoria.id, nome_arquivo="p.txt", conteudo=template, hash_conteudo="h1")
+            for categoria in categorias
+        ])
+        session.add_all([
+            DadosColetados(nicho_id=nicho.id, categoria_id=categorias[0].id, primary_keyword="seo local",
+                           secondary_keywords="google meu negocio", cluster_content="negocios locais"),
+            DadosColetados(nicho_id=nicho.id, categoria_id=categorias[1].id, primary_keyword="google ads",
+                           secondary_keywords="cpc, roas", cluster_content="midia paga"),
+            DadosColetados(nicho_id=nicho.id, categoria_id=categorias[1].id, primary_keyword="x",
+                           secondary_keywords="", cluster_content="", status='inativo'),
+        ])
+        session.commit()
+        yield session
+        session.close()
+    
+    def test_plano_preenchimento_compilado(self):
+        """Testa compilação do template em trechos e lacunas"""
+        plano = PlanoPreenchimento.compilar("A [CLUSTER DE CONTEÚDO] B [PALAVRA-CHAVE PRINCIPAL DO CLUSTER] C")
+        
+        assert plano.lacunas == ['[PALAVRA-CHAVE PRINCIPAL DO CLUSTER]', '[CLUSTER DE CONTEÚDO]']
+        assert plano.posicoes[0] == (2, 23, '[CLUSTER DE CONTEÚDO]')
+        assert plano.preencher({'primary_keyword': 'seo', 'cluster_content': 'local'}) == "A local B seo C"
+    
+    def test_processar_lote_success(self, prompt_service, mock_cache, db_lote):
+        """Testa processamento em lote: plano compilado uma vez e gravação única"""
+        with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=iter([db_lote])):
+            resultados = prompt_service.processar_lote(1)
         
-        # Verificar resultados
         assert len(resultados) == 2
-        assert mock_process.call_count == 2
-    
-    def test_processar_lote_with_errors(self, prompt_service, mock_logger):
-        """Testa processamento em lote com erros"""
-        # Mock do banco de dados
-        mock_db = Mock()
-        mock_session = Mock()
-        mock_db.__next__.return_value = mock_session
-        
-        # Mock de dados coletados
-        mock_dados1 = Mock()
-        mock_dados1.id = 1
-        mock_dados1.categoria_id = 1
-        mock_dados1.nicho_id = 1
-        mock_dados1.status = 'ativo'
+        assert all(r.id is not None for r in resultados)
+        assert "seo local" in resultados[0].prompt_preenchido
+        assert "[PALAVRA-CHAVE PRINCIPAL DO CLUSTER]" not in resultados[0].prompt_preenchido
+        assert json.loads(resultados[1].lacunas_detectadas) == [
+            '[PALAVRA-CHAVE PRINCIPAL DO CLUSTER]', '[PALAVRAS-CHAVE SECUNDÁRIAS]', '[CLUSTER DE CONTEÚDO]'
+        ]
+        assert db_lote.query(PromptPreenchido).count() == 2
         
-        mock_dados2 = Mock()
-        mock_dados2.id = 2
-        mock_dados2.categoria_id = 2
-        mock_dados2.nicho_id = 1
-        mock_dados2.status = 'ativo'
+        stats = prompt_service.get_stats()
+        assert stats['plan_compilations'] == 1
+        assert stats['plan_cache_hits'] == 1
+        assert stats['total_processed'] == 2
+        assert set(stats['batch_stage_timings']) == {'carga', 'compilacao', 'preenchimento', 'persistencia'}
+        assert stats['batch_stage_timings']['preenchimento']['last'] > 0
+        
+        # Segundo lote atualiza os registros existentes em vez de duplicá-los
+        with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=iter([db_lote])):
+            prompt_service.processar_lote(1)
+        assert db_lote.query(PromptPreenchido).count() == 2
+        assert prompt_service.get_stats()['plan_compilations'] == 1
+    
+    def test_processar_lote_with_errors(self, prompt_service, mock_cache, db_lote):
+        """Testa processamento em lote com item inválido e item vindo do cache"""
+        mock_cache.get.side_effect = lambda chave: "x" * 60 if chave.endswith("_2") else None
+        db_lote.query(DadosColetados).filter(DadosColetados.id == 1).update({'cluster_content': ''})
+        db_lote.query(PromptBase).filter(PromptBase.categoria_id == 1).update({'conteudo': '[CLUSTER DE CONTEÚDO]'})
+        db_lote.commit()
+        
+        with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=iter([db_lote])):
+            resultados = prompt_service.processar_lote(1)
+        
+        # Item 1 fica vazio após o preenchimento (inválido); item 2 vem do cache
+        assert [r.dados_coletados_id for r in resultados] == [2]
+        assert resultados[0].prompt_preenchido == "x" * 60
+        assert prompt_service.stats['errors'] == 1
+        assert prompt_service.stats['cache_hits'] == 1
+    
+    def test_plano_preenchimento_campo_ausente_falha(self):
+        """Testa paridade com o caminho por item: lacuna sem valor falha, valor vazio é aceito"""
+        plano = PlanoPreenchimento.compilar("A [PALAVRAS-CHAVE SECUNDÁRIAS] B")
         
-        # Configurar query para retornar dados
-        mock_session.query.return_value.filter.return_value.all.return_value = [mock_dados1, mock_dados2]
+        assert plano.preencher({'secondary_keywords': ''}) == "A  B"
+        with pytest.raises(ValueError):
+            plano.preencher({'secondary_keywords': None})
+    
+    def test_processar_lote_campo_ausente_e_categoria_sem_template(self, prompt_service, mock_logger, db_lote):
+        """Testa item com lacuna sem valor (erro) e categoria sem PromptBase (ignorada com aviso)"""
+        db_lote.query(DadosColetados).filter(DadosColetados.id == 1).update({'secondary_keywords': None})
+        db_lote.query(PromptBase).filter(PromptBase.categoria_id == 2).delete()
+        db_lote.commit()
         
-        # Mock do processamento individual com erro no segundo
-        with patch.object(prompt_service, 'processar_preenchimento') as mock_process:
-            mock_process.side_effect = [Mock(), Exception("Erro no segundo")]
-            
-            with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=mock_db):
-                with patch('time.time', side_effect=[1000.0, 1002.0]):
-                    resultados = prompt_service.processar_lote(1)
+        with patch('backend.app.services.prompt_filler_service_optimized.get_db', return_value=iter([db_lote])):
+            resultados = prompt_service.processar_lote(1)
         
-        # Verificar resultados (apenas o primeiro foi processado)
-        assert len(resultados) == 1
+        assert resultados == []
+        assert prompt_service.stats['errors'] == 2
+        mock_logger.warning.assert_called_once()
+        assert mock_logger.warning.call_args.kwargs['data'] == {'categorias_sem_template': [2]}
     
     def test_get_stats(self, prompt_service, mock_cache, mock_performance_monitor):
         """Testa obtenção de estatísticas"""